@@ -1,7 +1,7 @@
 import time
 from typing import Optional
 
-from hallo.permission_mask import PermissionMask
+from hallo.permission_mask import PermissionMask, PermissionMaskAttribute
 from abc import ABCMeta
 
 
@@ -10,6 +10,8 @@ class Destination(metaclass=ABCMeta):
     Abstract class for Channel and User. It just means messages can be sent to these entities.
     """
 
+    permission_mask = PermissionMaskAttribute()
+
     def __init__(self, server, address, name):
         self.server = server  # The server object this destination belongs to
         """:type : Server.Server"""
@@ -318,6 +320,7 @@ class User(Destination):
         :type new_user_group: user_group.UserGroup
         """
         self.user_group_list.add(new_user_group)
+        PermissionMask.rights_changed()
 
     def get_user_group_by_name(self, user_group_name):
         """
@@ -338,6 +341,7 @@ class User(Destination):
         :type user_group: user_group.UserGroup
         """
         self.user_group_list.remove(user_group)
+        PermissionMask.rights_changed()
 
     def get_channel_list(self):
         """
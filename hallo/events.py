@@ -12,12 +12,15 @@ class RawData(metaclass=ABCMeta):
 
 
 class RawDataIRC(RawData):
-    def __init__(self, line):
+    def __init__(self, line, message=None):
         """
         :param line: Line of text direct from the IRC server
         :type line: str
+        :param message: The line, parsed into prefix, command and parameters
+        :type message: hallo.inc.irc_message.IRCMessage | None
         """
         self.line = line
+        self.message = message
 
 
 class RawDataTelegram(RawData):
@@ -74,6 +74,14 @@ class Function(ABC):
         """Returns boolean representing whether this function is supposed to be persistent or not"""
         return False
 
+    @staticmethod
+    def is_reusable() -> bool:
+        """
+        Returns whether one object of this non-persistent function can be built when its module is loaded, and used for
+        every call, from any thread. Functions which store anything on the object while running should return False.
+        """
+        return True
+
     @staticmethod
     def load_function() -> 'Function':
         """Loads the function, persistent functions only."""
@@ -87,6 +95,13 @@ class Function(ABC):
         """Returns a list of events which this function may want to respond to in a passive way"""
         return set()
 
+    def get_passive_trigger(self) -> Optional[str]:
+        """
+        Returns a regex which the text of a message, notice or CTCP event must contain for passive_run to be called, or
+        None if passive_run should be called for every event. Use inline flags, e.g. (?i), for case insensitive triggers.
+        """
+        return None
+
     def passive_run(self, event: Event, hallo_obj) -> Optional[ServerEvent]:
         """Replies to an event not directly addressed to the bot.
         :param event: Event which has called the function
@@ -94,6 +109,18 @@ class Function(ABC):
         """
         pass
 
+    def schedule_jobs(self, hallo_obj) -> None:
+        """Schedules any jobs which the function runs at set times, on hallo's scheduler. Called when it is loaded.
+        :param hallo_obj: Hallo object which is loading the function
+        """
+        pass
+
+    def cancel_jobs(self, hallo_obj) -> None:
+        """Cancels the jobs scheduled by schedule_jobs. Called when the function is unloaded.
+        :param hallo_obj: Hallo object which is unloading the function
+        """
+        pass
+
     def get_help_name(self) -> str:
         """Returns the name to be printed for help documentation"""
         if self.help_name is None:
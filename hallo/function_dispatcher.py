@@ -5,7 +5,8 @@ import re
 import sys
 import inspect
 from types import ModuleType
-from typing import Set, Type, Dict, Optional, List, TypeVar
+from threading import Lock
+from typing import Set, Type, Dict, Optional, List, Tuple, TypeVar
 
 from hallo.destination import User, Channel
 from hallo.errors import (
@@ -24,6 +25,9 @@ from hallo.events import (
 )
 from hallo.function import Function
 from hallo.inc.commons import inherits_from
+from hallo.inc.name_trie import NameTrie
+from hallo.inc.trigger_matcher import TriggerMatcher
+from hallo.permission_mask import PermissionCache, PermissionMask
 from hallo.server import Server
 
 logger = logging.getLogger(__name__)
@@ -52,13 +56,30 @@ class FunctionDispatcher(object):
             {}
         )  # Dictionary of moduleObjects->functionClasses->namesList/eventsList
         self.function_names: Dict[str, Type[Function]] = {}  # Dictionary of names -> functionClasses
+        self.function_name_trie: NameTrie[Type[Function]] = NameTrie()  # Trie of name words -> functionClasses
         self.persistent_functions: Dict[Type[Function], Function] = (
             {}
         )  # Dictionary of persistent function objects. functionClass->functionObject
+        self.shared_functions: Dict[Type[Function], Function] = (
+            {}
+        )  # Dictionary of reusable non-persistent function objects, built once per module load
+        self._function_allocations: Dict[Type[Function], List[int]] = (
+            {}
+        )  # Dictionary of functionClasses -> [objects built when loading, objects built for calls]
+        self._allocation_lock = Lock()
         self.event_functions: Dict[Type[Event], Set[Type[Function]]] = (
             {}
         )  # Dictionary with events classes as keys and sets of function classes
         #  (which may want to act on those events) as values
+        self.passive_triggers: Dict[Type[Function], str] = {}  # Dictionary of functionClasses -> trigger regexes
+        self._passive_matchers: Dict[Type[Event], TriggerMatcher[Type[Function]]] = (
+            {}
+        )  # Combined trigger matchers for each event class, built when needed
+        self._passive_trigger_counts: Dict[Type[Function], List[int]] = (
+            {}
+        )  # Dictionary of functionClasses -> [hits, misses] of their passive trigger
+        self._passive_trigger_lock = Lock()
+        self.permission_cache = PermissionCache()  # Cache of resolved function rights
         # Load all functions
         for module_name in self.module_list:
             self.reload_module(module_name)
@@ -71,23 +92,11 @@ class FunctionDispatcher(object):
         """
         if flag_list is None:
             flag_list = []
-        # Find the function name. Try joining each amount of words in the message until you find a valid function name
+        # Find the longest function name the message starts with
         function_message_split = event.command_text.split()
         if not function_message_split:
             function_message_split = [""]
-        function_class_test = None
-        function_name_test = ""
-        function_args_test = ""
-        for function_name_test in [
-            " ".join(function_message_split[: x + 1])
-            for x in range(len(function_message_split))[::-1]
-        ]:
-            function_class_test = self.get_function_by_name(function_name_test)
-            function_args_test = " ".join(function_message_split)[
-                len(function_name_test):
-            ].strip()
-            if function_class_test is not None:
-                break
+        function_class_test, function_name_length = self.get_function_by_words(function_message_split)
         # If function isn't found, output a not found message
         if function_class_test is None:
             if EventMessage.FLAG_HIDE_ERRORS not in flag_list:
@@ -98,7 +107,10 @@ class FunctionDispatcher(object):
                 logger.error(error.get_log_line())
             return
         function_class = function_class_test
-        event.split_command_text(function_name_test, function_args_test)
+        event.split_command_text(
+            " ".join(function_message_split[:function_name_length]),
+            " ".join(function_message_split[function_name_length:]),
+        )
         # Check function rights and permissions
         if not self.check_function_permissions(
             function_class, event.server, event.user, event.channel
@@ -145,7 +157,16 @@ class FunctionDispatcher(object):
             return
         # Get list of functions that want things
         function_list = self.event_functions[event.__class__].copy()
+        # Check which functions' triggers match the text, so the rest can be skipped
+        triggered = None
+        if isinstance(event, ChannelUserTextEvent):
+            triggered = self.get_passive_matcher(event.__class__).matching(event.text)
         for function_class in function_list:
+            if triggered is not None and function_class in self.passive_triggers:
+                fired = function_class in triggered
+                self.count_passive_trigger(function_class, fired)
+                if not fired:
+                    continue
             # Check function rights and permissions
             if not self.check_function_permissions(
                 function_class,
@@ -174,6 +195,38 @@ class FunctionDispatcher(object):
                 logger.error(error.get_log_line())
                 continue
 
+    def get_passive_matcher(self, event_class: Type[Event]) -> TriggerMatcher[Type[Function]]:
+        """
+        Gets the combined matcher for the triggers of all the passive functions for an event class
+        :param event_class: Class of the event being dispatched
+        """
+        matcher = self._passive_matchers.get(event_class)
+        if matcher is None:
+            matcher = TriggerMatcher(
+                {
+                    function_class: self.passive_triggers[function_class]
+                    for function_class in self.event_functions.get(event_class, set())
+                    if function_class in self.passive_triggers
+                }
+            )
+            self._passive_matchers[event_class] = matcher
+        return matcher
+
+    def count_passive_trigger(self, function_class: Type[Function], fired: bool) -> None:
+        with self._passive_trigger_lock:
+            counts = self._passive_trigger_counts.setdefault(function_class, [0, 0])
+            counts[0 if fired else 1] += 1
+
+    def get_passive_trigger_stats(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Returns the number of times each passive function's trigger has matched and not matched, by function name
+        """
+        with self._passive_trigger_lock:
+            return {
+                function_class.__name__: (counts[0], counts[1])
+                for function_class, counts in self._passive_trigger_counts.items()
+            }
+
     def get_function_by_name(self, function_name: str) -> Optional[Type[Function]]:
         """
         Find a functionClass by a name specified by a user. Not functionClass.__name__
@@ -189,6 +242,22 @@ class FunctionDispatcher(object):
             return self.function_names[function_name]
         return None
 
+    def get_function_by_words(self, words: List[str]) -> Tuple[Optional[Type[Function]], int]:
+        """
+        Finds the function with the longest name which a list of words starts with. Words may also be joined by
+        underscores, as with get_function_by_name.
+        :param words: Words of a message addressed to hallo
+        :return: The function class, and the number of words in its name, or (None, 0) if no function matches
+        """
+        lower_words = [word.lower() for word in words]
+        function_class, name_length = self.function_name_trie.longest_match(lower_words)
+        underscore_class, underscore_length = self.function_name_trie.longest_match(
+            lower_words, split_underscores=True
+        )
+        if underscore_length > name_length:
+            return underscore_class, underscore_length
+        return function_class, name_length
+
     def get_function_class_list(self) -> List[Type[Function]]:
         """Returns a simple flat list of all function classes."""
         function_class_list = []
@@ -198,15 +267,41 @@ class FunctionDispatcher(object):
 
     def get_function_object(self, function_class: Type[FuncT]) -> FuncT:
         """
-        If persistent, gets an object from dictionary. Otherwise creates a new object.
+        If persistent or reusable, gets the object built when the function was loaded. Otherwise creates a new object.
         :param function_class: Class of function to retrieve or create function object for
         """
         if function_class.is_persistent():
-            function_obj = self.persistent_functions[function_class]
+            return self.persistent_functions[function_class]
+        function_obj = self.shared_functions.get(function_class)
+        if function_obj is None:
+            function_obj = self.build_function_object(function_class, False)
+        return function_obj
+
+    def build_function_object(self, function_class: Type[FuncT], loading: bool) -> FuncT:
+        """
+        Builds a new function object, loading persistent functions from their saved state, and counts it
+        :param function_class: Class of function to build an object of
+        :param loading: Whether the object is being built to load the function, rather than for a call
+        """
+        if function_class.is_persistent():
+            function_obj = function_class.load_function()
         else:
             function_obj = function_class()
+        with self._allocation_lock:
+            counts = self._function_allocations.setdefault(function_class, [0, 0])
+            counts[0 if loading else 1] += 1
         return function_obj
 
+    def get_allocation_stats(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Returns the number of function objects built when loading and built for calls, by function name
+        """
+        with self._allocation_lock:
+            return {
+                function_class.__name__: (counts[0], counts[1])
+                for function_class, counts in self._function_allocations.items()
+            }
+
     def check_function_permissions(
         self, function_class: Type[Function], server_obj: Server, user_obj: User, channel_obj: Optional[Channel]
     ) -> bool:
@@ -216,10 +311,24 @@ class FunctionDispatcher(object):
         :param user_obj: User which has requested the function
         :param channel_obj: Channel on which the function was requested
         """
-        # Get function name
-        function_name = function_class.__name__
-        right_name = "function_{}".format(function_name)
-        # Check rights
+        right_name = "function_{}".format(function_class.__name__)
+        return self.permission_cache.check(
+            right_name,
+            server_obj,
+            user_obj,
+            channel_obj,
+            lambda: self.resolve_right(right_name, server_obj, user_obj, channel_obj),
+        )
+
+    def resolve_right(
+        self, right_name: str, server_obj: Server, user_obj: User, channel_obj: Optional[Channel]
+    ) -> bool:
+        """Checks the value of a right, without using the permission cache
+        :param right_name: Name of the right to check
+        :param server_obj: Server on which to check the right
+        :param user_obj: User to check the right for
+        :param channel_obj: Channel in which to check the right
+        """
         if user_obj is not None:
             return user_obj.rights_check(right_name, channel_obj)
         if channel_obj is not None:
@@ -228,6 +337,12 @@ class FunctionDispatcher(object):
             return server_obj.rights_check(right_name)
         return self.hallo.rights_check(right_name)
 
+    def get_permission_cache_stats(self) -> Dict[str, float]:
+        """
+        Returns the hits, misses, hit rate and size of the permission cache
+        """
+        return self.permission_cache.get_stats()
+
     def reload_module(self, module_name: str) -> bool:
         """
         Reloads a function module, or loads it if it is not already loaded. Returns True on success, False on failure
@@ -280,15 +395,20 @@ class FunctionDispatcher(object):
             # Ensure it is a member of this module
             if not function_class.__module__.startswith(full_module_name):
                 continue
-            # Check it's a valid function object
+            # Check it's a valid function class, then build the one object which is checked and loaded
             if not self.check_function_class(function_class):
                 continue
+            function_obj = self.build_function_object(function_class, True)
+            if not self.check_function_object(function_obj):
+                continue
             # Try and load function, if it fails, try and unload it.
             try:
-                self.load_function(module_obj, function_class)
+                self.load_function(module_obj, function_class, function_obj)
             except NotImplementedError as e:
                 logger.warning("Failed to load function %s. ", function_class, exc_info=e)
                 self.unload_function(module_obj, function_class)
+        # Function classes have been replaced, so cached rights checks are no longer valid
+        PermissionMask.rights_changed()
         return True
 
     def unload_module_functions(self, module_obj) -> None:
@@ -316,8 +436,14 @@ class FunctionDispatcher(object):
         # Make sure it is a subclass of Function
         if not inherits_from(function_class, "Function"):
             return False
-        # Create function object
-        function_obj = function_class()
+        return True
+
+    @staticmethod
+    def check_function_object(function_obj: Function) -> bool:
+        """
+        Checks a newly built function object to see if it defines everything needed to load it
+        :param function_obj: Object of the function to check for ability to load
+        """
         # Check that help name is defined
         try:
             help_name = function_obj.get_help_name()
@@ -340,24 +466,37 @@ class FunctionDispatcher(object):
                 return False
         except NotImplementedError:
             return False
+        # Check that passive trigger is a valid regex, if there is one
+        passive_trigger = function_obj.get_passive_trigger()
+        if passive_trigger is not None:
+            try:
+                re.compile(passive_trigger)
+            except re.error as e:
+                logger.warning("Passive trigger for %s is not a valid regex: %s", function_obj.__class__.__name__, e)
+                return False
         # If it passed all those tests, it's valid, probably
         return True
 
-    def load_function(self, module_obj: ModuleType, function_class: Type[Function]) -> None:
+    def load_function(
+        self, module_obj: ModuleType, function_class: Type[Function], function_obj: Optional[Function] = None
+    ) -> None:
         """
         Loads a function class into all the relevant dictionaries
         :param module_obj: The module of the function
         :param function_class: Class of the function to load into dispatcher
+        :param function_obj: Object of the function, already built by check, or None to build one
         """
-        # If function is persistent, load it up and add to mPersistentFunctions
+        if function_obj is None:
+            function_obj = self.build_function_object(function_class, True)
+        # If function is persistent, add to mPersistentFunctions, if reusable, keep it for every call
         if function_class.is_persistent():
-            function_obj = function_class.load_function()
             self.persistent_functions[function_class] = function_obj
-        else:
-            function_obj = function_class()
+        elif function_class.is_reusable():
+            self.shared_functions[function_class] = function_obj
         # Get names list and events list
         names_list = function_obj.get_names()
         events_list = function_obj.get_passive_events()
+        passive_trigger = function_obj.get_passive_trigger()
         # Add names list and events list to mFunctionDict
         if module_obj not in self.function_dict:
             self.function_dict[module_obj] = {}
@@ -376,11 +515,16 @@ class FunctionDispatcher(object):
                     )
                 )
             self.function_names[function_name] = function_class
+            self.function_name_trie.add(function_name, function_class)
         # Add function to mEventFunctions
         for function_event in events_list:
             if function_event not in self.event_functions:
                 self.event_functions[function_event] = set()
             self.event_functions[function_event].add(function_class)
+        if passive_trigger is not None:
+            self.passive_triggers[function_class] = passive_trigger
+        self._passive_matchers = {}
+        function_obj.schedule_jobs(self.hallo)
 
     def unload_function(self, module_obj: ModuleType, function_class: Type[Function]) -> None:
         """
@@ -393,12 +537,15 @@ class FunctionDispatcher(object):
             return
         if function_class not in self.function_dict[module_obj]:
             return
+        # Cancel any jobs the function scheduled
+        self.get_function_object(function_class).cancel_jobs(self.hallo)
         # Get list of function names and list of events functions respond to
         names_list = self.function_dict[module_obj][function_class]["names"]
         events_list = self.function_dict[module_obj][function_class]["events"]
         # Remove names from mFunctionNames
         for function_name in names_list:
             del self.function_names[function_name]
+            self.function_name_trie.remove(function_name)
         # Remove events from mEventFunctions
         for function_event in events_list:
             if function_event not in self.event_functions:
@@ -406,6 +553,8 @@ class FunctionDispatcher(object):
             if function_class not in self.event_functions[function_event]:
                 continue
             self.event_functions[function_event].remove(function_class)
+        self.passive_triggers.pop(function_class, None)
+        self._passive_matchers = {}
         # If persistent, save object and remove from mPersistentFunctions
         if function_class.is_persistent():
             function_obj = self.persistent_functions[function_class]
@@ -415,6 +564,7 @@ class FunctionDispatcher(object):
                 error = FunctionSaveError(e, function_obj)
                 logger.error(error.get_log_line())
             del self.persistent_functions[function_class]
+        self.shared_functions.pop(function_class, None)
         # Remove from mFunctionDict
         del self.function_dict[module_obj][function_class]
 
@@ -3,15 +3,16 @@ import json
 import logging
 import time
 import re
-from datetime import datetime
+from threading import Event
 from typing import Union, Set, Dict, Optional
 
 import heartbeat
 
 from hallo.errors import MessageError
 from hallo.events import EventSecond, EventMinute, EventDay, EventHour
+from hallo.inc.scheduler import Scheduler, next_day, next_hour, next_minute, next_second
 from hallo.server import Server
-from hallo.permission_mask import PermissionMask
+from hallo.permission_mask import PermissionMask, PermissionMaskAttribute
 from hallo.server_factory import ServerFactory
 from hallo.server_irc import ServerIRC
 from hallo.user_group import UserGroup
@@ -25,6 +26,15 @@ usage_logger = logging.getLogger("usage")
 
 
 class Hallo:
+    permission_mask = PermissionMaskAttribute()
+    # Time events, and functions giving the time each is next due
+    TIME_EVENTS = [
+        (EventSecond, next_second),
+        (EventMinute, next_minute),
+        (EventHour, next_hour),
+        (EventDay, next_day),
+    ]
+
     def __init__(self):
         self.default_nick: str = "Hallo"
         self.default_prefix: Union[bool, str] = False
@@ -37,6 +47,8 @@ class Hallo:
         self.permission_mask: PermissionMask = PermissionMask()
         # TODO: manual FunctionDispatcher construction, user input?
         self.function_dispatcher: FunctionDispatcher = None
+        self.scheduler: Scheduler = Scheduler("hallo-scheduler")
+        self._closed = Event()
 
     def start(self) -> None:
         # If no function dispatcher, create one
@@ -74,6 +86,7 @@ class Hallo:
                 error = MessageError("No servers managed to connect in 60 seconds.")
                 logger.error(error.get_log_line())
                 return
+        self.schedule_time_events()
         self.open = True
         # Main loop, sticks around throughout the running of the bot
         logger.info("Connected to all servers.")
@@ -86,34 +99,37 @@ class Hallo:
         connected_list = [server.is_connected() for server in auto_connecting_servers]
         return any(connected_list)
 
+    def schedule_time_events(self) -> None:
+        """
+        Starts the scheduler, with jobs to send each time event to the FunctionDispatcher passive dispatcher
+        """
+        self.scheduler.start()
+        now = time.time()
+        for event_class, next_due in Hallo.TIME_EVENTS:
+            self.scheduler.schedule(
+                event_class.__name__, next_due(now), self.dispatch_time_event, event_class, recurrence=next_due
+            )
+
     def core_loop_time_events(self) -> None:
         """
-        Runs a loop to keep hallo running, while calling time events with the FunctionDispatcher passive dispatcher
+        Keeps hallo running until it is closed, while the scheduler sends time events
         """
-        last_date_time = datetime.now()
         while self.open:
-            now_date_time = datetime.now()
-            try:
-                if now_date_time.second != last_date_time.second:
-                    second = EventSecond()
-                    self.function_dispatcher.dispatch_passive(second)
-                if now_date_time.minute != last_date_time.minute:
-                    logger.debug("Core heartbeat")
-                    heartbeat.update_heartbeat(heartbeat_app_name)
-                    minute = EventMinute()
-                    self.function_dispatcher.dispatch_passive(minute)
-                if now_date_time.hour != last_date_time.hour:
-                    hour = EventHour()
-                    self.function_dispatcher.dispatch_passive(hour)
-                if now_date_time.day != last_date_time.day:
-                    day = EventDay()
-                    self.function_dispatcher.dispatch_passive(day)
-            except Exception as e:
-                logger.error("Error sending core time loop event.", exc_info=e)
-            last_date_time = now_date_time
-            time.sleep(0.1)
+            self._closed.wait()
         self.close()
 
+    def dispatch_time_event(self, event_class: type) -> None:
+        """
+        Sends a time event to the FunctionDispatcher passive dispatcher, if any functions want it
+        :param event_class: Class of time event to send
+        """
+        if event_class == EventMinute:
+            logger.debug("Core heartbeat")
+            heartbeat.update_heartbeat(heartbeat_app_name)
+        if not self.function_dispatcher.event_functions.get(event_class):
+            return
+        self.function_dispatcher.dispatch_passive(event_class())
+
     def save_json(self) -> None:
         """
         Saves the whole hallo config to a JSON file
@@ -182,6 +198,7 @@ class Hallo:
         :param user_group: UserGroup to add to the hallo object's list of user groups
         """
         self.user_group_list.add(user_group)
+        PermissionMask.rights_changed()
 
     def get_user_group_by_name(self, user_group_name: str) -> Optional[UserGroup]:
         """
@@ -201,6 +218,7 @@ class Hallo:
         :type user_group: UserGroup
         """
         self.user_group_list.remove(user_group)
+        PermissionMask.rights_changed()
 
     def add_server(self, server: Server) -> None:
         """
@@ -243,9 +261,11 @@ class Hallo:
         for server in self.server_list:
             if server.state != Server.STATE_CLOSED:
                 server.disconnect()
+        self.scheduler.stop()
         self.function_dispatcher.close()
         self.save_json()
         self.open = False
+        self._closed.set()
 
     def rights_check(self, right_name: str) -> bool:
         """
@@ -4,15 +4,19 @@ import logging
 import re
 import json
 import random
+import threading
+from collections import OrderedDict
 from datetime import timedelta
-from typing import List, Optional, Dict, TypeVar, Union, Callable, Generic, Type
+from typing import Any, Hashable, List, NamedTuple, Optional, Dict, TypeVar, Union, Callable, Generic, Type
 
-import requests
 from publicsuffixlist import PublicSuffixList
 
+from hallo.inc.http_client import ConditionalResponse, HttpClient
+
 logger = logging.getLogger(__name__)
 T = TypeVar('T')
 S = TypeVar('S')
+K = TypeVar('K', bound=Hashable)
 
 
 class Commons(object):
@@ -20,6 +24,8 @@ class Commons(object):
     Class of commons methods, useful anywhere, but all static.
     """
 
+    http_client: HttpClient = HttpClient()  # Shared by all requests, so connections to each host are reused
+
     @staticmethod
     def chunk_string_dot(string: str, length: int) -> List[str]:
         if len(string) <= length:
@@ -141,23 +147,59 @@ class Commons(object):
         :param headers: List of HTTP headers to add to request
         """
         headers_dict = Commons.create_headers_dict(headers)
-        resp = requests.get(url, headers=headers_dict)
+        resp = Commons.http_client.get(url, headers_dict)
         return resp.text
 
     @staticmethod
-    def load_url_json(url: str, headers: List[List[str]] = None, json_fix: bool = False) -> Dict:
+    def load_url_conditional(url: str, headers: List[List[str]] = None) -> ConditionalResponse:
+        """
+        Pulls a url, sending back the ETag and Last-Modified headers from last time it was pulled, so that pollers can
+        skip processing it if the server says it has not been modified.
+        :param url: URL to download
+        :param headers: List of HTTP headers to add to request
+        """
+        headers_dict = Commons.create_headers_dict(headers)
+        return Commons.http_client.get_conditional(url, headers_dict)
+
+    @staticmethod
+    def load_url_json(
+            url: str, headers: List[List[str]] = None, json_fix: bool = False, cache: Optional['KeyedCache'] = None
+    ) -> Dict:
         """
         Takes a url to a json resource, pulls it and returns a dictionary.
         :param url: URL of json to download
         :param headers: List of HTTP headers to add to request
         :param json_fix: Whether to "fix" the JSON being returned for parse errors
+        :param cache: Cache of responses to use, if responses from this URL can be reused. Server errors and invalid
+        JSON are raised, and cached as errors if the cache caches errors.
         """
         if headers is None:
             headers = []
-        code = Commons.load_url_string(url, headers)
+        if cache is None:
+            return Commons._parse_json(Commons.load_url_string(url, headers), json_fix)
+        key = (url, tuple(tuple(header) for header in headers), json_fix)
+        # The text is cached rather than the dictionary, so that callers can't change each other's results
+        code = cache.get(key, lambda: Commons._load_url_json_text(url, headers, json_fix))
+        return json.loads(code)
+
+    @staticmethod
+    def _load_url_json_text(url: str, headers: List[List[str]], json_fix: bool) -> str:
+        resp = Commons.http_client.get(url, Commons.create_headers_dict(headers))
+        if resp.status_code >= 500:
+            resp.raise_for_status()
+        code = Commons._fix_json(resp.text) if json_fix else resp.text
+        Commons._parse_json(code, False)
+        return code
+
+    @staticmethod
+    def _fix_json(code: str) -> str:
+        code = re.sub(",+", ",", code)
+        return code.replace("[,", "[").replace(",]", "]")
+
+    @staticmethod
+    def _parse_json(code: str, json_fix: bool) -> Dict:
         if json_fix:
-            code = re.sub(",+", ",", code)
-            code = code.replace("[,", "[").replace(",]", "]")
+            code = Commons._fix_json(code)
         try:
             output_dict = json.loads(code)
         except Exception as e:
@@ -174,7 +216,7 @@ class Commons(object):
         :param headers: List of HTTP headers to add to the request
         """
         headers_dict = Commons.create_headers_dict(headers)
-        requests.put(url, headers=headers_dict, json=data)
+        Commons.http_client.put(url, data, headers_dict)
 
     @staticmethod
     def check_numbers(message: str) -> bool:
@@ -376,27 +418,254 @@ class Commons(object):
         return string.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
 
 
+def _fresh_error(error: Exception) -> Exception:
+    """
+    Returns a new instance of a shared error, with the same type and attributes, to raise from it in its place.
+    Raising the shared error itself would add each caller's frames to its traceback, keeping them alive.
+    """
+    new_error = type(error).__new__(type(error), *error.args)
+    new_error.__dict__.update(error.__dict__)
+    return new_error
+
+
+class _Flight:
+    """
+    A fetch in progress, which other callers wanting the same value can wait for, rather than fetching it again
+    """
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[Exception] = None
+
+    def result(self) -> Any:
+        self.done.wait()
+        if self.error is not None:
+            raise _fresh_error(self.error) from self.error
+        return self.value
+
+
+def _start_refresh(refresh: Callable[[], None]) -> None:
+    threading.Thread(target=refresh, name="cache-refresh", daemon=True).start()
+
+
 class CachedObject(Generic[S]):
-    def __init__(self, setter: Callable[[], S], cache_expiry: Optional[timedelta] = None) -> None:
+    """
+    Caches a single value for a time. Concurrent callers share one fetch of a new value, rather than each making their
+    own. If max_stale is set, an expired value keeps being returned for up to that long after it expires, while a new
+    value is fetched in the background.
+    """
+
+    def __init__(
+            self, setter: Callable[[], S], cache_expiry: Optional[timedelta] = None, max_stale: Optional[timedelta] = None
+    ) -> None:
         """
-        :type setter: Callable
-        :type cache_expiry: timedelta
+        :param setter: Function to call to get a new value
+        :param cache_expiry: How long the value is kept for, 5 minutes by default
+        :param max_stale: How long after expiring the old value may be returned while a new one is fetched, if at all
         """
         self.setter: Callable[[], S] = setter
         self.cache_expiry: timedelta = (
             cache_expiry if cache_expiry is not None else timedelta(minutes=5)
         )
+        self.max_stale: Optional[timedelta] = max_stale
         self.cache_time: Optional[datetime.datetime] = None
         self.value: Optional[S] = None
+        self._lock = threading.Lock()
+        self._flight: Optional[_Flight] = None
 
     def get(self) -> S:
-        if (
-            self.cache_time is None
-            or (self.cache_time + self.cache_expiry) < datetime.datetime.now()
-        ):
-            self.value = self.setter()
-            self.cache_time = datetime.datetime.now()
-        return self.value
+        with self._lock:
+            if self.cache_time is not None:
+                age = datetime.datetime.now() - self.cache_time
+                if age <= self.cache_expiry:
+                    return self.value
+                if self.max_stale is not None and age <= self.cache_expiry + self.max_stale:
+                    if self._flight is None:
+                        flight = self._flight = _Flight()
+                        _start_refresh(lambda: self._refresh(flight, True))
+                    return self.value
+            flight = self._flight
+            is_leader = flight is None
+            if is_leader:
+                flight = self._flight = _Flight()
+        if is_leader:
+            self._refresh(flight, False)
+        return flight.result()
+
+    def _refresh(self, flight: _Flight, background: bool) -> None:
+        try:
+            flight.value = self.setter()
+            with self._lock:
+                self.value = flight.value
+                self.cache_time = datetime.datetime.now()
+        except Exception as e:
+            flight.error = e
+            if background:
+                logger.warning("Failed to refresh cached value in the background", exc_info=e)
+        finally:
+            with self._lock:
+                self._flight = None
+            flight.done.set()
+
+
+class _CacheEntry(NamedTuple):
+    expiry: datetime.datetime
+    value: Any  # Value, or exception raised getting it
+    size: int
+    is_error: bool
+
+
+class KeyedCache(Generic[K, S]):
+    """
+    Thread-safe cache of values by key, where each value expires after a time, and the least recently used values
+    are evicted once the cache is full. Errors raised getting a value can be cached too, so that a failing resource
+    is not requested again straight away. As with CachedObject, concurrent callers share one fetch of each value, and
+    expired values can be returned for up to max_stale while they are fetched again in the background.
+    Named caches are listed in KeyedCache.named_caches, so their stats can be reported.
+    """
+
+    named_caches: Dict[str, 'KeyedCache'] = {}
+
+    def __init__(
+            self,
+            max_size: int = 100,
+            cache_expiry: Optional[timedelta] = None,
+            name: Optional[str] = None,
+            max_bytes: Optional[int] = None,
+            size_of: Optional[Callable[[S], int]] = None,
+            error_expiry: Optional[timedelta] = None,
+            max_stale: Optional[timedelta] = None,
+    ) -> None:
+        """
+        :param max_size: Maximum number of values to keep
+        :param cache_expiry: How long each value is kept for, 5 minutes by default. If zero, only errors are cached.
+        :param name: Name to list the cache under, for stats. Replaces any cache listed with the same name.
+        :param max_bytes: Maximum total size of values to keep, as measured by size_of
+        :param size_of: Function giving the size of a value, in bytes
+        :param error_expiry: How long to keep errors raised getting a value, if they should be cached
+        :param max_stale: How long after expiring a value may be returned while a new one is fetched, if at all
+        """
+        self.max_size = max_size
+        self.cache_expiry: timedelta = (
+            cache_expiry if cache_expiry is not None else timedelta(minutes=5)
+        )
+        self.name = name
+        self.max_bytes = max_bytes
+        self.size_of = size_of
+        self.error_expiry = error_expiry
+        self.max_stale = max_stale
+        self._lock = threading.Lock()
+        self._entries: Dict[K, _CacheEntry] = OrderedDict()
+        self._flights: Dict[K, _Flight] = {}
+        self.total_bytes = 0
+        self.hit_count = 0
+        self.miss_count = 0
+        self.stale_count = 0
+        self.eviction_count = 0
+        if name is not None:
+            KeyedCache.named_caches[name] = self
+
+    @classmethod
+    def for_responses(
+            cls,
+            name: str,
+            cache_expiry: timedelta,
+            max_size: int = 100,
+            max_bytes: int = 1_000_000,
+            error_expiry: Optional[timedelta] = timedelta(minutes=1),
+    ) -> 'KeyedCache[Hashable, str]':
+        """
+        Creates a named cache for the text of HTTP responses, such as for Commons.load_url_json(), sized by length
+        :param name: Name to list the cache under, for stats
+        :param cache_expiry: How long each response is kept for. If zero, only errors are cached.
+        :param max_size: Maximum number of responses to keep
+        :param max_bytes: Maximum total length of responses to keep
+        :param error_expiry: How long to keep errors, so that a failing API is not hammered
+        """
+        return cls(max_size, cache_expiry, name, max_bytes, len, error_expiry)
+
+    def get(self, key: K, setter: Callable[[], S]) -> S:
+        """
+        Returns the value cached for a key, or gets, caches and returns a new value if there is none, or it expired
+        :param key: Key the value is cached under
+        :param setter: Function to call to get a new value
+        """
+        now = datetime.datetime.now()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expiry >= now:
+                self.hit_count += 1
+                self._entries.move_to_end(key)
+                if entry.is_error:
+                    raise _fresh_error(entry.value) from entry.value
+                return entry.value
+            if (
+                    entry is not None and not entry.is_error and self.max_stale is not None
+                    and entry.expiry + self.max_stale >= now
+            ):
+                self.stale_count += 1
+                self._entries.move_to_end(key)
+                if key not in self._flights:
+                    flight = self._flights[key] = _Flight()
+                    _start_refresh(lambda: self._fetch(key, setter, flight, True))
+                return entry.value
+            self.miss_count += 1
+            flight = self._flights.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = self._flights[key] = _Flight()
+        if is_leader:
+            self._fetch(key, setter, flight, False)
+        return flight.result()
+
+    def _fetch(self, key: K, setter: Callable[[], S], flight: _Flight, background: bool) -> None:
+        try:
+            flight.value = setter()
+            if self.cache_expiry > timedelta(0):
+                size = self.size_of(flight.value) if self.size_of is not None else 0
+                self._store(key, _CacheEntry(datetime.datetime.now() + self.cache_expiry, flight.value, size, False))
+        except Exception as e:
+            flight.error = e
+            if background:
+                logger.warning("Failed to refresh cached value for %s in the background", key, exc_info=e)
+            elif self.error_expiry is not None:
+                self._store(key, _CacheEntry(datetime.datetime.now() + self.error_expiry, e, 0, True))
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _store(self, key: K, entry: _CacheEntry) -> None:
+        if self.max_bytes is not None and entry.size > self.max_bytes:
+            return
+        with self._lock:
+            old_entry = self._entries.pop(key, None)
+            if old_entry is not None:
+                self.total_bytes -= old_entry.size
+            self._entries[key] = entry
+            self.total_bytes += entry.size
+            while len(self._entries) > self.max_size or (
+                    self.max_bytes is not None and self.total_bytes > self.max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= evicted.size
+                self.eviction_count += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "bytes": self.total_bytes,
+            "hits": self.hit_count,
+            "misses": self.miss_count,
+            "stale": self.stale_count,
+            "evictions": self.eviction_count,
+        }
 
 
 def inherits_from(child: Type, parent_name: str) -> bool:
@@ -0,0 +1,69 @@
+import logging
+import time
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Hashable, List, NamedTuple, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+
+
+class HostTaskResults(NamedTuple):
+    results: Dict[Any, Any]  # Results of tasks which finished, by key
+    errors: Dict[Any, Exception]  # Exceptions raised by tasks which failed, by key
+    timed_out: List[Any]  # Keys of tasks which were still running at the deadline, and left to finish in the background
+    not_started: List[Any]  # Keys of tasks which had not been started by the deadline
+
+
+def run_by_host(
+    tasks: List[Tuple[K, str, Callable[[], T]]],
+    max_workers: int,
+    max_per_host: int,
+    timeout: float,
+    name: str = "host-pool",
+) -> HostTaskResults:
+    """
+    Runs tasks concurrently, on up to max_workers threads, with no more than max_per_host tasks for the same host
+    running at once, so that one slow host can neither be hammered nor hold up tasks for every other host.
+    Tasks for each host are started in the order given. Tasks which have not finished by the deadline are abandoned:
+    they are left to finish in the background, and their results are discarded.
+    :param tasks: List of tasks, as tuples of a unique key, the host the task contacts, and the function to call
+    :param max_workers: Maximum number of tasks to run at once
+    :param max_per_host: Maximum number of tasks to run at once for any one host
+    :param timeout: Seconds after which to stop waiting for tasks
+    :param name: Name used for naming threads
+    """
+    deadline = time.monotonic() + timeout
+    waiting: Dict[str, Deque[Tuple[K, Callable[[], T]]]] = OrderedDict()
+    for key, host, func in tasks:
+        waiting.setdefault(host, deque()).append((key, func))
+    running: Dict[Future, Tuple[K, str]] = {}
+    host_counts: Counter = Counter()
+    results: Dict[K, T] = {}
+    errors: Dict[K, Exception] = {}
+    executor = ThreadPoolExecutor(max_workers, thread_name_prefix=name)
+    try:
+        while True:
+            # Start as many waiting tasks as the limits allow
+            for host, queue in waiting.items():
+                while queue and host_counts[host] < max_per_host and len(running) < max_workers:
+                    key, func = queue.popleft()
+                    running[executor.submit(func)] = (key, host)
+                    host_counts[host] += 1
+            remaining = deadline - time.monotonic()
+            if not running or remaining <= 0:
+                break
+            done, _ = wait(list(running), timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                key, host = running.pop(future)
+                host_counts[host] -= 1
+                try:
+                    results[key] = future.result()
+                except Exception as e:
+                    errors[key] = e
+    finally:
+        executor.shutdown(wait=False)
+    timed_out = [key for key, host in running.values()]
+    not_started = [key for queue in waiting.values() for key, func in queue]
+    return HostTaskResults(results, errors, timed_out, not_started)
@@ -0,0 +1,346 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from http.cookiejar import DefaultCookiePolicy
+from typing import Any, Deque, Dict, Mapping, NamedTuple, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+Timeout = Union[float, Tuple[float, float]]
+ValidatorKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class RateLimitedError(Exception):
+    """
+    Raised when a server responds 429 Too Many Requests.
+    """
+
+    def __init__(self, url: str, retry_after: Optional[float]) -> None:
+        """
+        :param url: URL which was requested
+        :param retry_after: Seconds the server asked to wait before retrying, if it said
+        """
+        super().__init__(f"Rate limited by server when requesting {url}, retry after {retry_after} seconds")
+        self.url = url
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str], now: Optional[datetime] = None) -> Optional[float]:
+    """
+    Parses a Retry-After header, which may be a number of seconds or an HTTP date, into a number of seconds
+    :param value: Value of the header
+    :param now: Time to count from, if not now
+    """
+    if value is None:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_time = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_time.tzinfo is None:
+        retry_time = retry_time.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (retry_time - now).total_seconds())
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """
+    Raised instead of sending a request to a host which has been failing, until its cool-down is over.
+    """
+
+    def __init__(self, host: str, retry_in: float) -> None:
+        """
+        :param host: Host which requests were not sent to
+        :param retry_in: Seconds until requests to the host will be tried again
+        """
+        super().__init__(f"Requests to {host} are failing, not retrying for {retry_in:.0f} seconds")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class _HostCircuit:
+    def __init__(self, window: int) -> None:
+        self.state = CircuitBreaker.CLOSED
+        self.outcomes: Deque[bool] = deque(maxlen=window)  # Whether each recent request failed
+        self.consecutive_failures = 0
+        self.request_count = 0
+        self.failure_count = 0
+        self.open_until = 0.0
+        self.trial_running = False
+
+
+class CircuitBreaker:
+    """
+    Tracks the error rate of requests to each host. Once requests to a host fail repeatedly, the circuit for that host
+    opens, and requests to it fail straight away for a cool-down, rather than each blocking a thread until it times
+    out. After the cool-down, one trial request is let through, and the circuit closes again if it succeeds.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        error_rate_threshold: float = 0.5,
+        window: int = 20,
+        min_requests: int = 10,
+        cool_down: float = 60,
+    ) -> None:
+        """
+        :param failure_threshold: Number of failures in a row after which to open a host's circuit
+        :param error_rate_threshold: Fraction of recent requests failing, after which to open a host's circuit
+        :param window: Number of recent requests to count the error rate over
+        :param min_requests: Number of recent requests needed before the error rate is used
+        :param cool_down: Seconds to fail requests to a host straight away, once its circuit opens
+        """
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.window = window
+        self.min_requests = min_requests
+        self.cool_down = cool_down
+        self._lock = threading.Lock()
+        self._circuits: Dict[str, _HostCircuit] = {}
+
+    def before_request(self, host: str) -> None:
+        """
+        Checks whether a request may be sent to a host
+        :raises CircuitOpenError: If the host's circuit is open
+        """
+        now = time.monotonic()
+        with self._lock:
+            circuit = self._circuits.get(host)
+            if circuit is None or circuit.state == self.CLOSED:
+                return
+            if circuit.state == self.OPEN and now >= circuit.open_until:
+                circuit.state = self.HALF_OPEN
+            if circuit.state == self.HALF_OPEN and not circuit.trial_running:
+                circuit.trial_running = True
+                return
+            raise CircuitOpenError(host, max(0.0, circuit.open_until - now))
+
+    def record(self, host: str, failed: bool) -> None:
+        """
+        Records the outcome of a request to a host
+        :param host: Host the request was sent to
+        :param failed: Whether the request failed, by not getting a response or getting a server error
+        """
+        with self._lock:
+            circuit = self._circuits.setdefault(host, _HostCircuit(self.window))
+            circuit.request_count += 1
+            circuit.outcomes.append(failed)
+            circuit.trial_running = False
+            if not failed:
+                circuit.consecutive_failures = 0
+                circuit.state = self.CLOSED
+                return
+            circuit.failure_count += 1
+            circuit.consecutive_failures += 1
+            error_rate = sum(circuit.outcomes) / len(circuit.outcomes)
+            if (
+                circuit.state == self.HALF_OPEN
+                or circuit.consecutive_failures >= self.failure_threshold
+                or (len(circuit.outcomes) >= self.min_requests and error_rate >= self.error_rate_threshold)
+            ):
+                if circuit.state != self.OPEN:
+                    logger.warning("Requests to %s are failing, opening circuit for %ss", host, self.cool_down)
+                circuit.state = self.OPEN
+                circuit.open_until = time.monotonic() + self.cool_down
+
+    def get_states(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns the state, request counts and recent error rate of each host which has been requested
+        """
+        now = time.monotonic()
+        with self._lock:
+            return {
+                host: {
+                    "state": circuit.state,
+                    "requests": circuit.request_count,
+                    "failures": circuit.failure_count,
+                    "error_rate": sum(circuit.outcomes) / len(circuit.outcomes) if circuit.outcomes else 0.0,
+                    "retry_in": max(0.0, circuit.open_until - now) if circuit.state == self.OPEN else 0.0,
+                }
+                for host, circuit in self._circuits.items()
+            }
+
+
+class ConditionalResponse(NamedTuple):
+    status_code: int
+    text: str
+    not_modified: bool  # Whether the server answered 304 Not Modified, in which case text is the copy from last time
+
+
+class PrefixResponse(NamedTuple):
+    status_code: int
+    headers: Mapping[str, str]
+    content: bytes  # Start of the body, up to the maximum number of bytes asked for
+    complete: bool  # Whether content is the whole body
+
+
+class _Validators(NamedTuple):
+    etag: Optional[str]
+    last_modified: Optional[str]
+    text: str
+
+
+class HttpClient:
+    """
+    Shared HTTP client. Connections are kept alive and pooled for each host, every request has a timeout, so a stuck
+    server cannot hang a thread forever, and responses are gzip compressed where the server supports it.
+    For pollers, get_conditional() remembers the ETag and Last-Modified headers of each URL and sends them back, so
+    that servers can answer 304 Not Modified, rather than sending the whole resource again.
+    Responses of 429 Too Many Requests raise RateLimitedError, so callers can back off as long as the server asks.
+    Requests to hosts which keep failing raise CircuitOpenError for a cool-down, see CircuitBreaker.
+    """
+
+    DEFAULT_TIMEOUT = (5, 30)  # Connect and read timeouts, in seconds
+    PREFIX_CHUNK_SIZE = 8192  # Bytes to read at a time by get_prefix()
+
+    def __init__(self, pool_size: int = 10, timeout: Timeout = DEFAULT_TIMEOUT, max_validators: int = 500) -> None:
+        """
+        :param pool_size: Number of hosts to keep connection pools for, and connections to keep open to each host
+        :param timeout: Default timeout for requests, in seconds, or a tuple of connect and read timeouts
+        :param max_validators: Maximum number of URLs to remember ETag and Last-Modified headers for
+        """
+        self.timeout = timeout
+        self.max_validators = max_validators
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Accept-Encoding"] = "gzip, deflate"
+        # The session is shared by everything, so must not pass cookies set by one user's request to another's
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        self._lock = threading.Lock()
+        self._validators: Dict[ValidatorKey, _Validators] = OrderedDict()
+        self.request_count = 0
+        self.not_modified_count = 0
+        self.circuit_breaker = CircuitBreaker()
+
+    def _send(self, method: str, url: str, timeout: Optional[Timeout], **kwargs: Any) -> requests.Response:
+        host = urlsplit(url).netloc.lower()
+        self.circuit_breaker.before_request(host)
+        self.request_count += 1
+        try:
+            resp = self.session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+        except requests.RequestException:
+            self.circuit_breaker.record(host, True)
+            raise
+        self.circuit_breaker.record(host, resp.status_code >= 500)
+        return self._check_rate_limit(resp)
+
+    def get(self, url: str, headers: Dict[str, str] = None, timeout: Timeout = None) -> requests.Response:
+        """
+        Sends a GET request
+        :param url: URL to request
+        :param headers: HTTP headers to send
+        :param timeout: Timeout for this request, if not the default
+        """
+        return self._send("GET", url, timeout, headers=headers)
+
+    def put(self, url: str, data: Any, headers: Dict[str, str] = None, timeout: Timeout = None) -> requests.Response:
+        """
+        Sends a PUT request, with data encoded as JSON
+        :param url: URL to send the request to
+        :param data: Data to send, as JSON
+        :param headers: HTTP headers to send
+        :param timeout: Timeout for this request, if not the default
+        """
+        return self._send("PUT", url, timeout, headers=headers, json=data)
+
+    def get_prefix(
+        self,
+        url: str,
+        headers: Dict[str, str] = None,
+        max_bytes: int = 65536,
+        until: Optional[bytes] = None,
+        timeout: Timeout = None,
+    ) -> PrefixResponse:
+        """
+        Sends a GET request, but only reads the start of the body, so that large pages and files are not downloaded
+        just to read their headers, or the title of a page.
+        :param url: URL to request
+        :param headers: HTTP headers to send
+        :param max_bytes: Maximum number of bytes of the body to read
+        :param until: Bytes after which to stop reading, if they are found
+        :param timeout: Timeout for this request, if not the default
+        """
+        resp = self._send("GET", url, timeout, headers=headers, stream=True)
+        content = b""
+        complete = True
+        try:
+            for chunk in resp.iter_content(self.PREFIX_CHUNK_SIZE):
+                content += chunk
+                if len(content) >= max_bytes or (until is not None and until in content):
+                    complete = False
+                    break
+        finally:
+            resp.close()
+        return PrefixResponse(resp.status_code, resp.headers, content[:max_bytes], complete)
+
+    @staticmethod
+    def _check_rate_limit(resp: requests.Response) -> requests.Response:
+        if resp.status_code == 429:
+            raise RateLimitedError(resp.url, parse_retry_after(resp.headers.get("Retry-After")))
+        return resp
+
+    def get_conditional(
+        self, url: str, headers: Dict[str, str] = None, timeout: Timeout = None
+    ) -> ConditionalResponse:
+        """
+        Sends a GET request, with If-None-Match and If-Modified-Since headers if the URL has been fetched with the
+        same headers before. If the server answers 304 Not Modified, the text from last time is returned.
+        :param url: URL to request
+        :param headers: HTTP headers to send
+        :param timeout: Timeout for this request, if not the default
+        """
+        headers = dict(headers or {})
+        key = (url, tuple(sorted(headers.items())))
+        with self._lock:
+            cached = self._validators.get(key)
+            if cached is not None:
+                self._validators.move_to_end(key)
+        if cached is not None:
+            if cached.etag is not None:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified is not None:
+                headers["If-Modified-Since"] = cached.last_modified
+        resp = self.get(url, headers, timeout)
+        if resp.status_code == 304 and cached is not None:
+            self.not_modified_count += 1
+            return ConditionalResponse(resp.status_code, cached.text, True)
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        with self._lock:
+            if resp.ok and (etag is not None or last_modified is not None):
+                self._validators[key] = _Validators(etag, last_modified, resp.text)
+                self._validators.move_to_end(key)
+                while len(self._validators) > self.max_validators:
+                    self._validators.popitem(last=False)
+            else:
+                self._validators.pop(key, None)
+        return ConditionalResponse(resp.status_code, resp.text, False)
+
+    def get_breaker_states(self) -> Dict[str, Dict[str, Any]]:
+        return self.circuit_breaker.get_states()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "requests": self.request_count,
+            "not_modified": self.not_modified_count,
+            "validators": len(self._validators),
+            "open_circuits": sum(
+                state["state"] != CircuitBreaker.CLOSED for state in self.circuit_breaker.get_states().values()
+            ),
+        }
@@ -0,0 +1,112 @@
+from typing import Dict, NamedTuple, Optional, Tuple
+
+TAG_ESCAPES = {":": ";", "s": " ", "\\": "\\", "r": "\r", "n": "\n"}
+
+
+def unescape_tag_value(value: str) -> str:
+    """
+    Unescapes an IRCv3 message tag value
+    :param value: Escaped tag value, as sent by the server
+    """
+    if "\\" not in value:
+        return value
+    output = []
+    chars = iter(value)
+    for char in chars:
+        if char != "\\":
+            output.append(char)
+            continue
+        escaped = next(chars, None)
+        if escaped is None:
+            break
+        output.append(TAG_ESCAPES.get(escaped, escaped))
+    return "".join(output)
+
+
+def parse_tags(tag_string: str) -> Dict[str, str]:
+    """
+    Parses the IRCv3 tags section of a message, without the leading @
+    :param tag_string: Semicolon separated list of key=value tags
+    """
+    tags = {}
+    for tag in tag_string.split(";"):
+        if not tag:
+            continue
+        key, _, value = tag.partition("=")
+        tags[key] = unescape_tag_value(value)
+    return tags
+
+
+class IRCMessage(NamedTuple):
+    """
+    A single line from an IRC server, parsed according to RFC 1459, with IRCv3 message tags.
+    """
+
+    raw: str  # The line as received
+    tags: Dict[str, str]  # IRCv3 message tags
+    prefix: Optional[str]  # Full prefix (source) of the message, without the leading colon
+    nick: Optional[str]  # Nick (or server name) part of the prefix
+    user: Optional[str]  # User part of the prefix
+    host: Optional[str]  # Host part of the prefix
+    command: str  # Command or numeric, upper case
+    params: Tuple[str, ...]  # All parameters, including the trailing parameter, if any
+    trailing: Optional[str]  # The trailing parameter (after " :"), or None if there was not one
+
+    @staticmethod
+    def parse(line: str) -> Optional["IRCMessage"]:
+        """
+        Parses a line from an IRC server, returning None if it does not contain a command.
+        :param line: Line of text from the server, without the line ending
+        """
+        rest = line
+        tags = {}
+        if rest.startswith("@"):
+            tag_string, _, rest = rest[1:].partition(" ")
+            tags = parse_tags(tag_string)
+            rest = rest.lstrip(" ")
+        prefix = nick = user = host = None
+        if rest.startswith(":"):
+            prefix, _, rest = rest[1:].partition(" ")
+            rest = rest.lstrip(" ")
+            nick, _, user_host = prefix.partition("!")
+            if user_host:
+                user, _, host = user_host.partition("@")
+                host = host or None
+            else:
+                nick, _, host = nick.partition("@")
+                host = host or None
+        trailing = None
+        if rest.startswith(":"):
+            return None
+        middle, separator, trailing_text = rest.partition(" :")
+        if separator:
+            trailing = trailing_text
+        middle_split = middle.split()
+        if not middle_split:
+            return None
+        params = middle_split[1:]
+        if trailing is not None:
+            params.append(trailing)
+        return IRCMessage(
+            line,
+            tags,
+            prefix,
+            nick,
+            user,
+            host,
+            middle_split[0].upper(),
+            tuple(params),
+            trailing,
+        )
+
+    def is_numeric(self) -> bool:
+        return len(self.command) == 3 and self.command.isdigit()
+
+    def param(self, index: int, default: str = "") -> str:
+        """
+        Returns the parameter at the given index, or a default value if there are not that many parameters
+        """
+        try:
+            return self.params[index]
+        except IndexError:
+            return default
@@ -0,0 +1,82 @@
+from collections import deque
+from typing import Deque, List, Optional
+
+CRLF = b"\r\n"
+
+
+def decode_line(raw_bytes: bytes) -> str:
+    """
+    Decodes a line of bytes, trying a couple character sets
+    :param raw_bytes: Array bytes to be decoded to string.
+    """
+    try:
+        return raw_bytes.decode("utf-8")
+    except UnicodeDecodeError:
+        try:
+            return raw_bytes.decode("iso-8859-1")
+        except UnicodeDecodeError:
+            return raw_bytes.decode("cp1252")
+
+
+def decode_lines(raw_bytes: bytes, line_ending: bytes = CRLF) -> List[str]:
+    """
+    Decodes a block of complete lines, splitting on the line ending.
+    The whole block is decoded as utf-8 in one go where possible, only falling back to decoding line by line (with
+    the character set fallbacks of decode_line) if that fails.
+    :param raw_bytes: Block of bytes, containing one or more lines, without a trailing line ending
+    :param line_ending: Line ending separating the lines
+    """
+    try:
+        return raw_bytes.decode("utf-8").split(line_ending.decode("utf-8"))
+    except UnicodeDecodeError:
+        return [decode_line(raw_line) for raw_line in raw_bytes.split(line_ending)]
+
+
+class LineBuffer:
+    """
+    Buffers raw bytes read from a stream, splitting out and decoding complete lines, and keeping any partial line
+    until the rest of it arrives.
+    """
+
+    CHUNK_SIZE = 65536  # Recommended number of bytes to read from the stream at once
+
+    def __init__(self, line_ending: bytes = CRLF) -> None:
+        """
+        :param line_ending: Bytes which mark the end of a line
+        """
+        self.line_ending = line_ending
+        self._buffer = bytearray()  # Bytes received which are not yet part of a complete line
+        self._lines: Deque[str] = deque()  # Complete, decoded lines which have not yet been read
+
+    def feed(self, data: bytes) -> None:
+        """
+        Adds newly received data to the buffer, splitting out any lines which it completes
+        :param data: Bytes received from the stream
+        """
+        # Only search the new data (and enough of the old to catch a line ending split across reads)
+        search_start = max(0, len(self._buffer) - len(self.line_ending) + 1)
+        self._buffer += data
+        end = self._buffer.rfind(self.line_ending, search_start)
+        if end == -1:
+            return
+        complete = bytes(self._buffer[:end])
+        del self._buffer[: end + len(self.line_ending)]
+        self._lines.extend(decode_lines(complete, self.line_ending))
+
+    def pop_line(self) -> Optional[str]:
+        """
+        Returns the next complete line, or None if there is not one available
+        """
+        if not self._lines:
+            return None
+        return self._lines.popleft()
+
+    def has_line(self) -> bool:
+        return len(self._lines) > 0
+
+    def clear(self) -> None:
+        """
+        Discards all buffered data, for example after reconnecting.
+        """
+        self._buffer = bytearray()
+        self._lines.clear()
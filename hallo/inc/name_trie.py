@@ -0,0 +1,85 @@
+from typing import Dict, Generic, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class NameTrieNode(Generic[T]):
+    def __init__(self) -> None:
+        self.children: Dict[str, "NameTrieNode[T]"] = {}
+        self.value: Optional[T] = None
+
+
+class NameTrie(Generic[T]):
+    """
+    Word level trie, mapping multi-word names to values, which can find the longest name at the start of a list of
+    words, in time linear in the number of words, however many names are stored.
+    """
+
+    def __init__(self) -> None:
+        self.root: NameTrieNode[T] = NameTrieNode()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, name: str, value: T) -> None:
+        """
+        Adds a name to the trie, replacing any value already stored for it
+        :param name: Name, with words separated by single spaces
+        :param value: Value to store for the name
+        """
+        node = self.root
+        for word in name.split(" "):
+            node = node.children.setdefault(word, NameTrieNode())
+        if node.value is None:
+            self._size += 1
+        node.value = value
+
+    def remove(self, name: str) -> None:
+        """
+        Removes a name from the trie, pruning any branches left empty
+        :param name: Name to remove
+        """
+        path = [self.root]
+        words = name.split(" ")
+        for word in words:
+            node = path[-1].children.get(word)
+            if node is None:
+                return
+            path.append(node)
+        if path[-1].value is None:
+            return
+        path[-1].value = None
+        self._size -= 1
+        for word, node, parent in zip(reversed(words), reversed(path[1:]), reversed(path[:-1])):
+            if node.value is not None or node.children:
+                break
+            del parent.children[word]
+
+    def get(self, name: str) -> Optional[T]:
+        node = self.root
+        for word in name.split(" "):
+            node = node.children.get(word)
+            if node is None:
+                return None
+        return node.value
+
+    def longest_match(self, words: List[str], split_underscores: bool = False) -> Tuple[Optional[T], int]:
+        """
+        Finds the longest name which the list of words starts with
+        :param words: Words to match against, should already be lower case if names are
+        :param split_underscores: Whether to treat underscores in the words as separating words
+        :return: The value of the longest matching name, and the number of words it used, or (None, 0) if no names match
+        """
+        node = self.root
+        best_value = None
+        best_length = 0
+        for index, word in enumerate(words):
+            for part in (word.split("_") if split_underscores else [word]):
+                node = node.children.get(part)
+                if node is None:
+                    return best_value, best_length
+            if node.value is not None:
+                best_value = node.value
+                best_length = index + 1
+        return best_value, best_length
@@ -0,0 +1,228 @@
+import heapq
+import itertools
+import logging
+import time
+from datetime import datetime, timedelta
+from threading import Condition, Thread
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from hallo.inc.worker_pool import WorkerPool
+
+logger = logging.getLogger(__name__)
+
+
+def next_second(after: float) -> float:
+    """Returns the timestamp of the start of the next second after a timestamp"""
+    return float(int(after) + 1)
+
+
+def next_minute(after: float) -> float:
+    """Returns the timestamp of the start of the next minute after a timestamp, in local time"""
+    start = datetime.fromtimestamp(after).replace(second=0, microsecond=0)
+    return (start + timedelta(minutes=1)).timestamp()
+
+
+def next_hour(after: float) -> float:
+    """Returns the timestamp of the start of the next hour after a timestamp, in local time"""
+    start = datetime.fromtimestamp(after).replace(minute=0, second=0, microsecond=0)
+    return (start + timedelta(hours=1)).timestamp()
+
+
+def next_day(after: float) -> float:
+    """Returns the timestamp of the start of the next day after a timestamp, in local time"""
+    start = datetime.fromtimestamp(after).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (start + timedelta(days=1)).timestamp()
+
+
+class ScheduledJob:
+    def __init__(
+        self,
+        name: str,
+        func: Callable,
+        args: tuple,
+        due: float,
+        recurrence: Optional[Callable[[float], float]],
+    ) -> None:
+        """
+        :param name: Unique name of the job
+        :param func: Function to call when the job is due
+        :param args: Arguments to call the function with
+        :param due: Timestamp the job is next due
+        :param recurrence: Function giving the next due timestamp after a given due timestamp, None for one-shot jobs
+        """
+        self.name = name
+        self.func = func
+        self.args = args
+        self.due = due
+        self.recurrence = recurrence
+        self.cancelled = False
+        self.running = False
+        # Stats
+        self.last_run: Optional[float] = None  # Timestamp the last run started
+        self.last_duration: Optional[float] = None  # Seconds the last run took
+        self.last_lateness: Optional[float] = None  # Seconds after it was due that the last run started
+        self.run_count = 0
+        self.skipped_count = 0  # Runs skipped because the previous run had not finished
+        self.failed_count = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "due": self.due,
+            "running": self.running,
+            "last_run": self.last_run,
+            "last_duration": self.last_duration,
+            "last_lateness": self.last_lateness,
+            "runs": self.run_count,
+            "skipped": self.skipped_count,
+            "failed": self.failed_count,
+        }
+
+
+class Scheduler:
+    """
+    Runs one-shot and recurring jobs when they are due. A single thread sleeps until the next job is due, then hands
+    it to a worker pool to run. If a recurring job is still running when it is next due, that run is skipped, rather
+    than overlapping.
+    Due times are timestamps, as from time.time(), so jobs can be lined up with the wall clock.
+    """
+
+    def __init__(self, name: str = "scheduler", worker_count: int = 4) -> None:
+        """
+        :param name: Name of the scheduler, used for naming threads
+        :param worker_count: Number of jobs which may run at once
+        """
+        self.name = name
+        self._cond = Condition()
+        self._heap: List[Tuple[float, int, ScheduledJob]] = []  # Due time, insertion order and job
+        self._order = itertools.count()
+        self._jobs: Dict[str, ScheduledJob] = {}
+        self._pool = WorkerPool(name, worker_count)
+        self._thread = None
+        self._running = False
+
+    def start(self) -> None:
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._pool.start()
+            self._thread = Thread(target=self._run, name="{}-timer".format(self.name))
+            self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops the scheduler. Running jobs are allowed to finish, but no more will be started. Jobs stay scheduled, in
+        case the scheduler is started again.
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._pool.stop()
+
+    def schedule(
+        self,
+        name: str,
+        due: float,
+        func: Callable,
+        *args: Any,
+        interval: Optional[float] = None,
+        recurrence: Optional[Callable[[float], float]] = None
+    ) -> ScheduledJob:
+        """
+        Schedules a job, replacing any job already scheduled with the same name.
+        :param name: Unique name of the job
+        :param due: Timestamp when the job should first run
+        :param func: Function to call
+        :param args: Arguments to call the function with
+        :param interval: Seconds between runs, for jobs which recur at a fixed interval
+        :param recurrence: Function giving the next due timestamp after a given due timestamp, for jobs which recur
+        irregularly, such as at the start of each day
+        """
+        if interval is not None:
+            recurrence = lambda last_due: last_due + interval  # noqa: E731
+        job = ScheduledJob(name, func, args, due, recurrence)
+        with self._cond:
+            old_job = self._jobs.get(name)
+            if old_job is not None:
+                old_job.cancelled = True
+            self._jobs[name] = job
+            self._push(job)
+        return job
+
+    def cancel(self, name: str) -> bool:
+        """
+        Cancels a job, if it is scheduled. A run which has already started will finish.
+        :param name: Name of the job to cancel
+        :return: Whether a job by that name was scheduled
+        """
+        with self._cond:
+            job = self._jobs.pop(name, None)
+            if job is None:
+                return False
+            job.cancelled = True
+            self._cond.notify_all()
+            return True
+
+    def get_job(self, name: str) -> Optional[ScheduledJob]:
+        return self._jobs.get(name)
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """
+        Returns stats for each scheduled job, in order of when they are next due
+        """
+        with self._cond:
+            jobs = sorted(self._jobs.values(), key=lambda job: job.due)
+            return [job.get_stats() for job in jobs]
+
+    def _push(self, job: ScheduledJob) -> None:
+        heapq.heappush(self._heap, (job.due, next(self._order), job))
+        # Only the timer thread needs waking, and only if this job is now first, but it is cheap to wake it anyway
+        self._cond.notify_all()
+
+    def _run(self) -> None:
+        with self._cond:
+            while self._running:
+                now = time.time()
+                while self._heap and self._heap[0][0] <= now:
+                    due, _, job = heapq.heappop(self._heap)
+                    # Skip entries for cancelled jobs
+                    if job.cancelled:
+                        continue
+                    self._start_job(job, now)
+                    if job.recurrence is None:
+                        del self._jobs[job.name]
+                        continue
+                    job.due = job.recurrence(due)
+                    # If runs were missed, e.g. the system was suspended, don't try and catch up on each
+                    if job.due <= now:
+                        job.due = job.recurrence(now)
+                    self._push(job)
+                wait = self._heap[0][0] - now if self._heap else None
+                self._cond.wait(wait)
+
+    def _start_job(self, job: ScheduledJob, now: float) -> None:
+        if job.running:
+            job.skipped_count += 1
+            logger.warning("Scheduled job %s is still running, skipping this run", job.name)
+            return
+        job.running = True
+        if not self._pool.submit(job.name, self._run_job, job, now - job.due):
+            job.running = False
+            job.skipped_count += 1
+
+    def _run_job(self, job: ScheduledJob, lateness: float) -> None:
+        start = time.time()
+        try:
+            job.func(*job.args)
+        except Exception as e:
+            job.failed_count += 1
+            logger.error("Scheduled job %s failed", job.name, exc_info=e)
+        finally:
+            with self._cond:
+                job.running = False
+                job.last_run = start
+                job.last_duration = time.time() - start
+                job.last_lateness = lateness
+                job.run_count += 1
+
@@ -0,0 +1,245 @@
+import logging
+import time
+from collections import deque
+from threading import Condition
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter. Holds up to burst tokens, refilled at rate tokens per second.
+    A rate of zero or less disables the limit.
+    """
+
+    def __init__(self, burst: float, rate: float) -> None:
+        """
+        :param burst: Maximum number of tokens held, i.e. how many lines can be sent at once after a quiet period
+        :param rate: Number of tokens added per second
+        """
+        self.burst = burst
+        self.rate = rate
+        self.tokens = float(burst)
+        self._last_refill = time.monotonic()
+
+    def is_limited(self) -> bool:
+        return self.rate > 0
+
+    def refill(self, now: float) -> None:
+        if self.rate > 0:
+            self.tokens = min(self.burst, self.tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def try_take(self) -> bool:
+        """
+        Takes a token if one is available. Call refill() first.
+        """
+        if not self.is_limited():
+            return True
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def take_forced(self) -> None:
+        """
+        Takes a token if one is available, but never waits. Used for lines which must go out regardless of the limit.
+        """
+        self.tokens = max(0.0, self.tokens - 1)
+
+    def time_until_token(self) -> float:
+        """
+        Seconds until another token will be available. Call refill() first.
+        """
+        if not self.is_limited() or self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+class SendQueue:
+    """
+    Queue of outbound lines for a server, sent by a single writer in priority order and rate limited by a token bucket,
+    so that long replies don't get the bot kicked for flooding.
+    Essential lines (e.g. PONG and QUIT) skip the rate limit, normal lines (e.g. replies) are sent before bulk lines
+    (e.g. subscription posts). Lines of the same priority are sent in the order they were queued.
+    The writer takes all lines which may be sent at once as a batch, so they can be written in a single call.
+    """
+
+    PRIORITY_ESSENTIAL = 0  # Sent immediately, not rate limited
+    PRIORITY_NORMAL = 1  # Replies and commands
+    PRIORITY_BULK = 2  # Unprompted messages, such as subscription updates
+    MAX_BATCH_BYTES = 8192  # Maximum bytes to take in one batch
+    LATENCY_WINDOW = 100  # Number of recent lines to average latency over
+
+    def __init__(self, burst: int = 5, rate: float = 0.5) -> None:
+        """
+        :param burst: Number of lines which may be sent at once, after a quiet period
+        :param rate: Number of lines per second which may be sent after the burst is used. Zero disables the limit
+        """
+        self._cond = Condition()
+        self._bucket = TokenBucket(burst, rate)
+        self._queues: Dict[int, Deque[Tuple[bytes, float]]] = {
+            SendQueue.PRIORITY_ESSENTIAL: deque(),
+            SendQueue.PRIORITY_NORMAL: deque(),
+            SendQueue.PRIORITY_BULK: deque(),
+        }  # Waiting lines and the time they were queued, for each priority
+        self._in_flight = False  # Whether a batch has been taken by the writer, but not yet sent
+        self._closed = False
+        self._listener = None  # Called whenever a line is queued
+        # Counters
+        self._queue_length = 0
+        self._latencies: Deque[float] = deque(maxlen=SendQueue.LATENCY_WINDOW)
+        self.max_latency = 0.0
+        self.sent_count = 0
+        self.batch_count = 0
+
+    def set_listener(self, listener: Optional[Callable[[], None]]) -> None:
+        """
+        Sets a callback to be called, from the queueing thread, whenever a line is queued.
+        Used to wake writers which cannot block on next_batch().
+        """
+        self._listener = listener
+
+    def put(self, data: bytes, priority: int = PRIORITY_NORMAL) -> None:
+        """
+        Queues a line to be sent
+        :param data: Encoded line, including line ending
+        :param priority: Priority of the line
+        """
+        with self._cond:
+            if self._closed:
+                return
+            self._queues[priority].append((data, time.monotonic()))
+            self._queue_length += 1
+            self._cond.notify_all()
+        listener = self._listener
+        if listener is not None:
+            listener()
+
+    def pop_batch(self) -> Tuple[List[bytes], Optional[float]]:
+        """
+        Takes all the lines which may be sent right now, without blocking.
+        :return: List of lines to send, and the number of seconds until more could be sent, or None if nothing is
+        waiting. Call batch_sent() after sending the lines.
+        """
+        with self._cond:
+            return self._pop_batch()
+
+    def _pop_batch(self) -> Tuple[List[bytes], Optional[float]]:
+        now = time.monotonic()
+        self._bucket.refill(now)
+        batch = []
+        batch_bytes = 0
+        for priority in [SendQueue.PRIORITY_ESSENTIAL, SendQueue.PRIORITY_NORMAL, SendQueue.PRIORITY_BULK]:
+            queue = self._queues[priority]
+            while queue and batch_bytes < SendQueue.MAX_BATCH_BYTES:
+                if priority == SendQueue.PRIORITY_ESSENTIAL:
+                    self._bucket.take_forced()
+                elif not self._bucket.try_take():
+                    break
+                data, queued_time = queue.popleft()
+                batch.append(data)
+                batch_bytes += len(data)
+                self._record_latency(now - queued_time)
+        self._queue_length -= len(batch)
+        if batch:
+            self._in_flight = True
+            self.batch_count += 1
+            self.sent_count += len(batch)
+        if self._queue_length == 0:
+            return batch, None
+        if batch_bytes >= SendQueue.MAX_BATCH_BYTES:
+            return batch, 0
+        return batch, self._bucket.time_until_token()
+
+    def _record_latency(self, latency: float) -> None:
+        self._latencies.append(latency)
+        self.max_latency = max(self.max_latency, latency)
+
+    def next_batch(self, timeout: Optional[float] = None) -> Optional[List[bytes]]:
+        """
+        Waits until there are lines which may be sent, and takes them.
+        :param timeout: Maximum seconds to wait, or None to wait until lines are available or the queue is closed
+        :return: List of lines to send, empty if the timeout passed, or None if the queue has been closed.
+        Call batch_sent() after sending the lines.
+        """
+        end_time = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self._closed:
+                batch, wait = self._pop_batch()
+                if batch:
+                    return batch
+                if end_time is not None:
+                    remaining = end_time - time.monotonic()
+                    if remaining <= 0:
+                        return []
+                    wait = remaining if wait is None else min(wait, remaining)
+                self._cond.wait(wait)
+            return None
+
+    def batch_sent(self) -> None:
+        """
+        Marks the last batch taken as sent, or failed.
+        """
+        with self._cond:
+            self._in_flight = False
+            self._cond.notify_all()
+
+    def flush(self, timeout: float) -> bool:
+        """
+        Waits until all essential lines have been sent, e.g. before closing the connection after a QUIT.
+        :param timeout: Maximum seconds to wait
+        :return: Whether the lines were sent in time
+        """
+        end_time = time.monotonic() + timeout
+        with self._cond:
+            while self._queues[SendQueue.PRIORITY_ESSENTIAL] or self._in_flight:
+                remaining = end_time - time.monotonic()
+                if remaining <= 0 or self._closed:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def clear(self) -> None:
+        """
+        Discards all waiting lines, e.g. when reconnecting.
+        """
+        with self._cond:
+            for queue in self._queues.values():
+                queue.clear()
+            self._queue_length = 0
+            self._cond.notify_all()
+
+    def close(self) -> None:
+        """
+        Discards all waiting lines, and causes next_batch() to return None.
+        """
+        with self._cond:
+            self._closed = True
+            for queue in self._queues.values():
+                queue.clear()
+            self._queue_length = 0
+            self._cond.notify_all()
+
+    def is_closed(self) -> bool:
+        return self._closed
+
+    def queue_length(self) -> int:
+        return self._queue_length
+
+    def get_stats(self) -> Dict[str, float]:
+        with self._cond:
+            latencies = list(self._latencies)
+            return {
+                "queue_length": self._queue_length,
+                "queue_essential": len(self._queues[SendQueue.PRIORITY_ESSENTIAL]),
+                "queue_normal": len(self._queues[SendQueue.PRIORITY_NORMAL]),
+                "queue_bulk": len(self._queues[SendQueue.PRIORITY_BULK]),
+                "sent": self.sent_count,
+                "batches": self.batch_count,
+                "latency_avg": sum(latencies) / len(latencies) if latencies else 0.0,
+                "latency_max": self.max_latency,
+                "burst": self._bucket.burst,
+                "rate": self._bucket.rate,
+            }
@@ -0,0 +1,51 @@
+import logging
+import re
+from typing import Dict, Generic, Hashable, Optional, Pattern, Set, TypeVar
+
+logger = logging.getLogger(__name__)
+K = TypeVar("K", bound=Hashable)
+
+INLINE_FLAGS_REGEX = re.compile(r"^\(\?[aiLmsux]+\)")
+SCOPED_FLAGS = [(re.IGNORECASE, "i"), (re.MULTILINE, "m"), (re.DOTALL, "s"), (re.VERBOSE, "x")]
+
+
+def scoped_pattern(pattern: Pattern) -> str:
+    """
+    Returns the source of a compiled regex as a group which can be combined with other patterns, with any flags it was
+    compiled with scoped to that group.
+    :param pattern: Compiled regex
+    """
+    source = INLINE_FLAGS_REGEX.sub("", pattern.pattern)
+    flags = "".join(letter for flag, letter in SCOPED_FLAGS if pattern.flags & flag)
+    return "(?{}:{})".format(flags, source)
+
+
+class TriggerMatcher(Generic[K]):
+    """
+    Matches text against a set of trigger regexes at once. All the triggers are combined into one regex, which is
+    used to quickly reject text which matches none of them. Only if that matches, are the triggers checked one by one.
+    """
+
+    def __init__(self, triggers: Dict[K, str]) -> None:
+        """
+        :param triggers: Dictionary of keys to trigger regexes
+        """
+        self.patterns: Dict[K, Pattern] = {key: re.compile(trigger) for key, trigger in triggers.items()}
+        self.combined: Optional[Pattern] = None
+        if self.patterns:
+            try:
+                self.combined = re.compile("|".join(scoped_pattern(p) for p in self.patterns.values()))
+            except re.error as e:
+                # Patterns with numbered backreferences, or clashing group names, cannot be combined
+                logger.warning("Could not combine trigger patterns, checking each separately: %s", e)
+
+    def matching(self, text: str) -> Set[K]:
+        """
+        Returns the keys of all triggers which match somewhere in the text
+        :param text: Text to check
+        """
+        if not self.patterns:
+            return set()
+        if self.combined is not None and self.combined.search(text) is None:
+            return set()
+        return {key for key, pattern in self.patterns.items() if pattern.search(text)}
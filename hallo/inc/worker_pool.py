@@ -0,0 +1,223 @@
+import logging
+import time
+from collections import OrderedDict, deque
+from threading import Condition, Thread
+from typing import Any, Callable, Deque, Dict, Hashable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerTask:
+    def __init__(self, key: Hashable, priority: int, func: Callable, args: tuple) -> None:
+        self.key = key
+        self.priority = priority
+        self.func = func
+        self.args = args
+        self.cancelled = False  # Set if the task was dropped from the queue before running
+        self.started = False
+
+
+class WorkerPool:
+    """
+    Fixed size pool of worker threads, running tasks from per-key serial queues.
+    Tasks submitted with the same key (e.g. the same channel or private chat) are run one at a time, in the order they
+    were submitted. Tasks with different keys are run concurrently, up to the number of workers.
+
+    Overload policy: once max_queue_depth tasks are waiting, a new passive task is dropped. A new normal task causes
+    the oldest waiting passive task to be dropped in its place, or if there are no passive tasks waiting, the new
+    normal task is dropped. Essential tasks (e.g. server PINGs) are never dropped, and are queued even if over the
+    limit.
+    """
+
+    PRIORITY_ESSENTIAL = 0  # Never dropped
+    PRIORITY_NORMAL = 1  # Dropped only if there are no passive tasks to drop instead
+    PRIORITY_PASSIVE = 2  # Dropped first when the pool is overloaded
+
+    def __init__(self, name: str, worker_count: int = 8, max_queue_depth: int = 1000) -> None:
+        """
+        :param name: Name of the pool, used for naming threads
+        :param worker_count: Number of worker threads to run tasks on
+        :param max_queue_depth: Number of tasks which may be waiting, before tasks start being dropped
+        """
+        self.name = name
+        self.worker_count = worker_count
+        self.max_queue_depth = max_queue_depth
+        self._cond = Condition()
+        self._queues: Dict[Hashable, Deque[WorkerTask]] = {}  # Waiting tasks for each key
+        self._scheduled_keys: Set[Hashable] = set()  # Keys which are waiting for a worker, or being run
+        self._ready_keys: Deque[Hashable] = deque()  # Keys which have tasks waiting and no worker
+        self._passive_tasks: Dict[WorkerTask, None] = OrderedDict()  # Waiting passive tasks, oldest first
+        self._workers = []
+        self._running = False
+        self._generation = 0  # Incremented on each start, so that workers from before a restart exit
+        # Counters
+        self._queue_length = 0
+        self._busy_workers = 0
+        self._busy_time = 0.0
+        self._start_time = None
+        self.submitted_count = 0
+        self.completed_count = 0
+        self.failed_count = 0
+        self.dropped_counts = {
+            WorkerPool.PRIORITY_NORMAL: 0,
+            WorkerPool.PRIORITY_PASSIVE: 0,
+        }
+
+    def start(self) -> None:
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._generation += 1
+            self._start_time = time.monotonic()
+            self._workers = []
+            for x in range(self.worker_count):
+                worker = Thread(
+                    target=self._run_worker,
+                    args=(self._generation,),
+                    name="{}-worker-{}".format(self.name, x),
+                )
+                self._workers.append(worker)
+                worker.start()
+
+    def stop(self) -> None:
+        """
+        Stops the workers once they have finished their current tasks. Waiting tasks are discarded.
+        """
+        with self._cond:
+            self._running = False
+            self._queues.clear()
+            self._scheduled_keys.clear()
+            self._ready_keys.clear()
+            self._passive_tasks.clear()
+            self._queue_length = 0
+            self._cond.notify_all()
+
+    def submit(self, key: Hashable, func: Callable, *args: Any, priority: int = PRIORITY_NORMAL) -> bool:
+        """
+        Queues a task to be run after any other tasks with the same key. Returns False if the task was dropped.
+        :param key: Key to order tasks by, tasks with the same key are run in order
+        :param func: Function to call
+        :param args: Arguments to call the function with
+        :param priority: Priority of the task, determining whether it can be dropped when overloaded
+        """
+        task = WorkerTask(key, priority, func, args)
+        with self._cond:
+            self.submitted_count += 1
+            if self._queue_length >= self.max_queue_depth and priority != WorkerPool.PRIORITY_ESSENTIAL:
+                if priority == WorkerPool.PRIORITY_PASSIVE or not self._drop_passive_task():
+                    self.dropped_counts[priority] += 1
+                    logger.warning("Worker pool %s overloaded, dropping task for %s", self.name, key)
+                    return False
+            self._queues.setdefault(key, deque()).append(task)
+            self._queue_length += 1
+            if priority == WorkerPool.PRIORITY_PASSIVE:
+                self._passive_tasks[task] = None
+            if key not in self._scheduled_keys:
+                self._scheduled_keys.add(key)
+                self._ready_keys.append(key)
+                self._cond.notify()
+        return True
+
+    def _drop_passive_task(self) -> bool:
+        """
+        Drops the oldest waiting passive task, to make room. Must be called with the lock held.
+        """
+        if not self._passive_tasks:
+            return False
+        task, _ = self._passive_tasks.popitem(last=False)
+        task.cancelled = True
+        self._queue_length -= 1
+        self.dropped_counts[WorkerPool.PRIORITY_PASSIVE] += 1
+        return True
+
+    def _next_task(self, generation: int) -> Optional[WorkerTask]:
+        """
+        Waits for, and returns, the next task which can be run. Returns None when the pool is stopped.
+        :param generation: Which start of the pool the calling worker belongs to
+        """
+        with self._cond:
+            while True:
+                if not self._running or generation != self._generation:
+                    return None
+                if not self._ready_keys:
+                    self._cond.wait()
+                    continue
+                key = self._ready_keys.popleft()
+                queue = self._queues.get(key)
+                while queue and queue[0].cancelled:
+                    queue.popleft()
+                if not queue:
+                    self._queues.pop(key, None)
+                    self._scheduled_keys.discard(key)
+                    continue
+                task = queue.popleft()
+                task.started = True
+                self._passive_tasks.pop(task, None)
+                self._queue_length -= 1
+                self._busy_workers += 1
+                return task
+
+    def _finish_task(self, task: WorkerTask, duration: float, failed: bool, generation: int) -> None:
+        with self._cond:
+            self._busy_workers -= 1
+            self._busy_time += duration
+            self.completed_count += 1
+            if failed:
+                self.failed_count += 1
+            if not self._running or generation != self._generation:
+                return
+            if self._queues.get(task.key):
+                self._ready_keys.append(task.key)
+                self._cond.notify()
+            else:
+                self._queues.pop(task.key, None)
+                self._scheduled_keys.discard(task.key)
+
+    def _run_worker(self, generation: int) -> None:
+        while True:
+            task = self._next_task(generation)
+            if task is None:
+                return
+            start = time.monotonic()
+            failed = False
+            try:
+                task.func(*task.args)
+            except Exception as e:
+                failed = True
+                logger.error("Worker pool %s task failed for %s", self.name, task.key, exc_info=e)
+            self._finish_task(task, time.monotonic() - start, failed, generation)
+
+    def queue_length(self) -> int:
+        """Returns the number of tasks waiting to be run"""
+        return self._queue_length
+
+    def busy_workers(self) -> int:
+        """Returns the number of workers currently running a task"""
+        return self._busy_workers
+
+    def utilisation(self) -> float:
+        """
+        Returns the fraction of available worker time which has been spent running tasks since the pool started
+        """
+        if self._start_time is None or self.worker_count == 0:
+            return 0
+        elapsed = time.monotonic() - self._start_time
+        if elapsed <= 0:
+            return 0
+        return min(1.0, self._busy_time / (elapsed * self.worker_count))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "workers": self.worker_count,
+                "busy_workers": self._busy_workers,
+                "utilisation": self.utilisation(),
+                "queue_length": self._queue_length,
+                "max_queue_depth": self.max_queue_depth,
+                "submitted": self.submitted_count,
+                "completed": self.completed_count,
+                "failed": self.failed_count,
+                "dropped_normal": self.dropped_counts[WorkerPool.PRIORITY_NORMAL],
+                "dropped_passive": self.dropped_counts[WorkerPool.PRIORITY_PASSIVE],
+            }
@@ -72,6 +72,10 @@ class Protein(Function):
         """Returns a list of events which this function may want to respond to in a passive way"""
         return {EventMessage}
 
+    def get_passive_trigger(self):
+        """Returns a regex which a message must contain for passive_run to be called"""
+        return r"^\s*[ACGUTacgut]{3,}\s*$"
+
     def passive_run(self, event, hallo_obj):
         """Replies to an event not directly addressed to the bot."""
         if not isinstance(event, EventMessage):
@@ -189,6 +189,10 @@ class Convert(Function):
     def get_passive_events(self):
         return {EventMessage}
 
+    def get_passive_trigger(self):
+        """Returns a regex which a message must contain for passive_run to be called"""
+        return r"(?i)[0-9]|inf|nan"
+
     def passive_run(self, event, hallo_obj):
         if not isinstance(event, EventMessage):
             return
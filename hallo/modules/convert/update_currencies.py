@@ -2,9 +2,9 @@ import logging
 import time
 from xml.dom import minidom
 
-from hallo.events import EventHour
 from hallo.function import Function
 from hallo.inc.commons import Commons
+from hallo.inc.scheduler import next_hour
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +14,8 @@ class UpdateCurrencies(Function):
     Updates all currencies in the ConvertRepo
     """
 
+    JOB_NAME = "update currencies"  # Name of the scheduled job which updates currencies at the start of each hour
+
     def __init__(self):
         """
         Constructor
@@ -48,10 +50,15 @@ class UpdateCurrencies(Function):
         # Return output
         return event.create_response("\n".join(output_lines))
 
-    def get_passive_events(self):
-        return {EventHour}
+    def schedule_jobs(self, hallo_obj):
+        hallo_obj.scheduler.schedule(
+            self.JOB_NAME, next_hour(time.time()), self.scheduled_update, hallo_obj, recurrence=next_hour
+        )
+
+    def cancel_jobs(self, hallo_obj):
+        hallo_obj.scheduler.cancel(self.JOB_NAME)
 
-    def passive_run(self, event, hallo_obj):
+    def scheduled_update(self, hallo_obj):
         # Get convert repo
         function_dispatcher = hallo_obj.function_dispatcher
         convert_function = function_dispatcher.get_function_by_name("convert")
@@ -63,7 +70,6 @@ class UpdateCurrencies(Function):
         output_lines = self.update_all(repo)
         for line in output_lines:
             logger.info(line)
-        return None
 
     def update_all(self, repo):
         output_lines = []
@@ -1,11 +1,16 @@
+import time
+
 import hallo.modules.dailys.dailys_field_factory
 from hallo.events import EventMessage
 from hallo.function import Function
+from hallo.inc.scheduler import next_minute
 import hallo.modules.dailys.dailys_field
 import hallo.modules.dailys.dailys_repo
 
 
 class Dailys(Function):
+    JOB_NAME = "dailys load"  # Name of the scheduled job which loads the dailys repo, and schedules its fields' jobs
+
     def __init__(self):
         """
         Constructor
@@ -26,8 +31,18 @@ class Dailys(Function):
     def get_dailys_repo(self, hallo_obj):
         if self.dailys_repo is None:
             self.dailys_repo = hallo.modules.dailys.dailys_repo.DailysRepo.load_json(hallo_obj)
+            self.dailys_repo.schedule_jobs(hallo_obj.scheduler)
         return self.dailys_repo
 
+    def schedule_jobs(self, hallo_obj):
+        # Spreadsheets can't be loaded until hallo has added its servers, so load them once it is running
+        hallo_obj.scheduler.schedule(self.JOB_NAME, next_minute(time.time()), self.get_dailys_repo, hallo_obj)
+
+    def cancel_jobs(self, hallo_obj):
+        hallo_obj.scheduler.cancel(self.JOB_NAME)
+        if self.dailys_repo is not None:
+            self.dailys_repo.cancel_jobs(hallo_obj.scheduler)
+
     @staticmethod
     def is_persistent():
         return True
@@ -55,6 +70,7 @@ class Dailys(Function):
     def run(self, event):
         if event.text.strip().lower() in ["reload", "redeploy", "refresh"]:
             self.dailys_repo.save_json()
+            self.dailys_repo.cancel_jobs(event.server.hallo.scheduler)
             self.dailys_repo = None
             self.get_dailys_repo(event.server.hallo)
             return event.reply(event.create_response("Dailys repository reloaded."))
@@ -45,6 +45,20 @@ class DailysField(metaclass=ABCMeta):
         """
         raise NotImplementedError()
 
+    def schedule_jobs(self, scheduler):
+        """
+        Schedules any jobs which the field runs at set times
+        :type scheduler: hallo.inc.scheduler.Scheduler
+        """
+        pass
+
+    def cancel_jobs(self, scheduler):
+        """
+        Cancels the jobs scheduled by schedule_jobs
+        :type scheduler: hallo.inc.scheduler.Scheduler
+        """
+        pass
+
     def to_json(self):
         raise NotImplementedError()
 
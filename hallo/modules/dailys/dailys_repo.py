@@ -11,6 +11,23 @@ class DailysRepo:
     def add_spreadsheet(self, spreadsheet: hallo.modules.dailys.dailys_spreadsheet.DailysSpreadsheet):
         self.spreadsheets.append(spreadsheet)
 
+    def schedule_jobs(self, scheduler):
+        """
+        Schedules the jobs of every field in every spreadsheet
+        :type scheduler: hallo.inc.scheduler.Scheduler
+        """
+        for spreadsheet in self.spreadsheets:
+            for field in spreadsheet.fields_list:
+                field.schedule_jobs(scheduler)
+
+    def cancel_jobs(self, scheduler):
+        """
+        :type scheduler: hallo.inc.scheduler.Scheduler
+        """
+        for spreadsheet in self.spreadsheets:
+            for field in spreadsheet.fields_list:
+                field.cancel_jobs(scheduler)
+
     def get_by_location(self, event):
         for ds in self.spreadsheets:
             if ds.user == event.user and ds.destination == event.channel:
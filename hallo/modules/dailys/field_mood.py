@@ -1,7 +1,7 @@
 from datetime import timedelta, datetime, time
 from threading import RLock
 
-from hallo.events import EventMessage, EventMinute, RawDataTelegram, RawDataTelegramOutbound
+from hallo.events import EventMessage, RawDataTelegram, RawDataTelegramOutbound
 import hallo.modules.dailys.dailys_field
 import hallo.modules.dailys.field_sleep
 
@@ -65,7 +65,43 @@ class DailysMoodField(hallo.modules.dailys.dailys_field.DailysField):
 
     @staticmethod
     def passive_events():
-        return [EventMessage, EventMinute]
+        return [EventMessage]
+
+    @property
+    def job_name(self):
+        """Name of the scheduled job which sends mood queries at the set times"""
+        user = self.spreadsheet.user
+        destination = self.spreadsheet.destination
+        return "dailys mood {} {} {}".format(
+            user.server.name, user.address, destination.address if destination is not None else ""
+        ).strip()
+
+    def schedule_jobs(self, scheduler):
+        if not any(isinstance(t, time) for t in self.times):
+            return
+        scheduler.schedule(
+            self.job_name,
+            self.next_query_time(datetime.now().timestamp()),
+            self.send_time_query,
+            recurrence=self.next_query_time,
+        )
+
+    def cancel_jobs(self, scheduler):
+        scheduler.cancel(self.job_name)
+
+    def next_query_time(self, after):
+        """
+        Returns the timestamp of the next set mood query time after a given timestamp, in local time
+        :type after: float
+        :rtype: float
+        """
+        after_datetime = datetime.fromtimestamp(after)
+        times = sorted(t for t in self.times if isinstance(t, time))
+        for query_date in [after_datetime.date(), after_datetime.date() + timedelta(1)]:
+            for time_val in times:
+                query_datetime = datetime.combine(query_date, time_val)
+                if query_datetime > after_datetime:
+                    return query_datetime.timestamp()
 
     def get_current_data(self, mood_date):
         """
@@ -119,16 +155,6 @@ class DailysMoodField(hallo.modules.dailys.dailys_field.DailysField):
         :rtype: None
         """
         mood_date = evt.get_send_time().date()
-        if isinstance(evt, EventMinute):
-            # Get the largest time which is less than the current time. If none, do nothing.
-            times = [t for t in self.times if isinstance(t, time)]
-            past_times = [t for t in times if t < evt.get_send_time().time()]
-            if len(past_times) == 0:
-                return
-            latest_time = max(past_times)
-            if not self.has_triggered_for_time(mood_date, latest_time):
-                return self.send_mood_query(mood_date, latest_time)
-            return
         if isinstance(evt, EventMessage):
             # Check if it's a morning/night message
             input_clean = evt.text.strip().lower()
@@ -197,6 +223,24 @@ class DailysMoodField(hallo.modules.dailys.dailys_field.DailysField):
                 return self.process_mood_response(input_split[-1], time_val, data[1])
         return None
 
+    def send_time_query(self, now=None):
+        """
+        Sends the mood query for the latest set time which has passed today, unless it has already been sent
+        :type now: datetime | None
+        :rtype: None
+        """
+        if now is None:
+            now = datetime.now()
+        mood_date = now.date()
+        # Get the largest time which is not after the current time. If none, do nothing.
+        times = [t for t in self.times if isinstance(t, time)]
+        past_times = [t for t in times if t <= now.time()]
+        if len(past_times) == 0:
+            return
+        latest_time = max(past_times)
+        if not self.has_triggered_for_time(mood_date, latest_time):
+            self.send_mood_query(mood_date, latest_time)
+
     def mood_acronym(self):
         return "".join([m[0] for m in self.moods]).upper()
 
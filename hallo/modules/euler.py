@@ -31,6 +31,11 @@ class Euler(Function):
             '"euler <number>" for the solution to project euler problem of the given number.'
         )
 
+    @staticmethod
+    def is_reusable():
+        # Solutions read the hallo object from the function object, which run sets for each call
+        return False
+
     def run(self, event):
         # Some functions might need this.
         self.mHalloObject = event.server.hallo
@@ -1,5 +1,7 @@
+from datetime import timedelta
+
 from hallo.function import Function
-from hallo.inc.commons import Commons
+from hallo.inc.commons import Commons, KeyedCache
 
 
 class E621(Function):
@@ -7,6 +9,8 @@ class E621(Function):
     Returns a random image from e621
     """
 
+    response_cache = KeyedCache.for_responses("e621", timedelta(0))  # Results are random, so only errors are cached
+
     def __init__(self):
         """
         Constructor
@@ -46,7 +50,7 @@ class E621(Function):
         url = "https://e621.net/posts.json?tags=order:random%20score:%3E0%20{}%20&limit=1".format(
             line_clean
         )
-        return_list = Commons.load_url_json(url)
+        return_list = Commons.load_url_json(url, cache=self.response_cache)
         if len(return_list["posts"]) == 0:
             return None
         else:
@@ -1,3 +1,5 @@
+import re
+
 from hallo.events import EventMessage
 from hallo.function import Function
 import hallo.modules.games.games
@@ -46,6 +48,10 @@ class HigherOrLower(Function):
         """Returns a list of events which this function may want to respond to in a passive way"""
         return {EventMessage}
 
+    def get_passive_trigger(self):
+        """Returns a regex which a message must contain for passive_run to be called"""
+        return "(?i)" + "|".join(re.escape(cmd) for cmd in self.END_CMDS + self.HIGH_CMDS + self.LOW_CMDS)
+
     # Interesting functions from here
     def run(self, event):
         line_clean = event.command_args.strip().lower()
@@ -1,7 +1,11 @@
+from datetime import datetime
+
 from hallo.function import Function
 import threading
 
 from hallo.function_dispatcher import FunctionDispatcher
+from hallo.inc.commons import Commons, KeyedCache
+from hallo.server_irc import ServerIRC
 
 
 class ConfigSave(Function):
@@ -84,12 +88,268 @@ class ActiveThreads(Function):
         """
         Returns current number of active threads.. should probably be gods only, but it is not. Format: active_thread
         """
+        output = "I think I have {} active threads right now.".format(
+            threading.active_count()
+        )
+        hallo_obj = event.server.hallo
+        pool_lines = []
+        for server in hallo_obj.server_list:
+            if not isinstance(server, ServerIRC):
+                continue
+            stats = server.get_worker_stats()
+            if stats is None:
+                continue
+            pool_lines.append(
+                "{}: {}/{} workers busy, {} lines queued, {:.0%} utilisation, {} lines dropped".format(
+                    server.name,
+                    stats["busy_workers"],
+                    stats["workers"],
+                    stats["queue_length"],
+                    stats["utilisation"],
+                    stats["dropped_normal"] + stats["dropped_passive"],
+                )
+            )
+        if pool_lines:
+            output += "\nWorker pools:\n" + "\n".join(pool_lines)
+        send_lines = []
+        for server in hallo_obj.server_list:
+            if not isinstance(server, ServerIRC):
+                continue
+            stats = server.get_send_stats()
+            if stats is None:
+                continue
+            send_lines.append(
+                "{}: {} lines queued, {} lines sent, {:.2f}s average latency, {:.2f}s max latency".format(
+                    server.name,
+                    stats["queue_length"],
+                    stats["sent"],
+                    stats["latency_avg"],
+                    stats["latency_max"],
+                )
+            )
+        if send_lines:
+            output += "\nSend queues:\n" + "\n".join(send_lines)
+        return event.create_response(output)
+
+
+class PassiveStats(Function):
+    """
+    Lists how often each passive function's trigger has matched chat lines.
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        super().__init__()
+        # Name for use in help listing
+        self.help_name = "passive stats"
+        # Names which can be used to address the function
+        self.names = {"passive stats", "passivestats", "passive trigger stats"}
+        # Help documentation, if it's just a single line, can be set here
+        self.help_docs = (
+            "Lists how many messages matched and skipped each passive function's trigger. Format: passive stats"
+        )
+
+    def run(self, event):
+        function_dispatcher: FunctionDispatcher = event.server.hallo.function_dispatcher
+        stats = function_dispatcher.get_passive_trigger_stats()
+        if not stats:
+            return event.create_response("No messages have been checked against passive triggers yet.")
+        lines = [
+            "{}: {} matched, {} skipped".format(name, hits, misses)
+            for name, (hits, misses) in sorted(stats.items())
+        ]
+        return event.create_response("Passive trigger stats:\n" + "\n".join(lines))
+
+
+class FunctionAllocations(Function):
+    """
+    Shows how many function objects were built when loading modules, and how many are still built for each call.
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        super().__init__()
+        # Name for use in help listing
+        self.help_name = "function allocations"
+        # Names which can be used to address the function
+        self.names = {"function allocations", "functionallocations", "function allocation stats"}
+        # Help documentation, if it's just a single line, can be set here
+        self.help_docs = (
+            "Shows how many function objects were built when loading modules, and which functions build a new object "
+            "for each call. Format: function allocations"
+        )
+
+    def run(self, event):
+        function_dispatcher: FunctionDispatcher = event.server.hallo.function_dispatcher
+        stats = function_dispatcher.get_allocation_stats()
+        total_loading = sum(loading for loading, _ in stats.values())
+        total_calls = sum(calls for _, calls in stats.values())
+        lines = [
+            "{} built when loading, {} built for calls, {} shared by all calls, {} persistent".format(
+                total_loading,
+                total_calls,
+                len(function_dispatcher.shared_functions),
+                len(function_dispatcher.persistent_functions),
+            )
+        ]
+        lines += [
+            "{}: {} built when loading, {} built for calls".format(name, loading, calls)
+            for name, (loading, calls) in sorted(stats.items())
+            if calls
+        ]
+        return event.create_response("Function allocations:\n" + "\n".join(lines))
+
+
+class PermissionCacheStats(Function):
+    """
+    Shows how often function permission checks are answered from the permission cache.
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        super().__init__()
+        # Name for use in help listing
+        self.help_name = "permission cache stats"
+        # Names which can be used to address the function
+        self.names = {"permission cache stats", "permissioncachestats", "permission stats"}
+        # Help documentation, if it's just a single line, can be set here
+        self.help_docs = (
+            "Shows how many function permission checks were answered from the cache. Format: permission cache stats"
+        )
+
+    def run(self, event):
+        function_dispatcher: FunctionDispatcher = event.server.hallo.function_dispatcher
+        stats = function_dispatcher.get_permission_cache_stats()
         return event.create_response(
-            "I think I have {} active threads right now.".format(
-                threading.active_count()
+            "Permission cache: {} hits, {} misses, {:.0%} hit rate, {} entries.".format(
+                stats["hits"], stats["misses"], stats["hit_rate"], stats["size"]
+            )
+        )
+
+
+class LookupCacheStats(Function):
+    """
+    Shows the size, hit rate and evictions of each named cache, such as the response caches of lookup functions.
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        super().__init__()
+        # Name for use in help listing
+        self.help_name = "lookup cache stats"
+        # Names which can be used to address the function
+        self.names = {"lookup cache stats", "lookupcachestats", "cache stats"}
+        # Help documentation, if it's just a single line, can be set here
+        self.help_docs = (
+            "Shows the size, hit rate and evictions of each lookup response cache. Format: lookup cache stats"
+        )
+
+    def run(self, event):
+        if not KeyedCache.named_caches:
+            return event.create_response("There are no lookup caches.")
+        lines = []
+        for name, cache in sorted(KeyedCache.named_caches.items()):
+            stats = cache.get_stats()
+            lookups = stats["hits"] + stats["misses"]
+            lines.append(
+                "{}: {} entries, {} bytes, {} hits, {} misses, {:.0%} hit rate, {} evictions".format(
+                    name,
+                    stats["size"],
+                    stats["bytes"],
+                    stats["hits"],
+                    stats["misses"],
+                    stats["hits"] / lookups if lookups else 0,
+                    stats["evictions"],
+                )
+            )
+        return event.create_response("Lookup caches:\n" + "\n".join(lines))
+
+
+class CircuitBreakers(Function):
+    """
+    Shows the state and error rate of the circuit breaker for each host which outbound requests have been sent to.
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        super().__init__()
+        # Name for use in help listing
+        self.help_name = "circuit breakers"
+        # Names which can be used to address the function
+        self.names = {"circuit breakers", "circuitbreakers", "circuit breaker", "breaker states"}
+        # Help documentation, if it's just a single line, can be set here
+        self.help_docs = (
+            "Shows whether requests to each host are being sent, or failing fast after repeated errors. "
+            "Format: circuit breakers"
+        )
+
+    def run(self, event):
+        states = Commons.http_client.circuit_breaker.get_states()
+        if not states:
+            return event.create_response("No outbound requests have been made.")
+        lines = []
+        for host, state in sorted(states.items(), key=lambda item: (item[1]["state"] == "closed", item[0])):
+            line = "{}: {}, {} requests, {} failures, {:.0%} recent error rate".format(
+                host, state["state"], state["requests"], state["failures"], state["error_rate"]
             )
+            if state["retry_in"]:
+                line += ", retrying in {:.0f}s".format(state["retry_in"])
+            lines.append(line)
+        return event.create_response("Circuit breakers:\n" + "\n".join(lines))
+
+
+class ScheduledJobs(Function):
+    """
+    Lists the jobs in hallo's scheduler, and how they last ran.
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        super().__init__()
+        # Name for use in help listing
+        self.help_name = "scheduled jobs"
+        # Names which can be used to address the function
+        self.names = {"scheduled jobs", "scheduledjobs", "scheduler", "scheduler stats"}
+        # Help documentation, if it's just a single line, can be set here
+        self.help_docs = (
+            "Lists scheduled jobs, when they are next due, and the time, duration and lateness of their last run. "
+            "Format: scheduled jobs"
         )
 
+    def run(self, event):
+        job_stats = event.server.hallo.scheduler.get_stats()
+        if not job_stats:
+            return event.create_response("There are no scheduled jobs.")
+        lines = []
+        for stats in job_stats:
+            line = "{}: next due {}, {} runs, {} skipped, {} failed".format(
+                stats["name"],
+                datetime.fromtimestamp(stats["due"]).strftime("%Y-%m-%d %H:%M:%S"),
+                stats["runs"],
+                stats["skipped"],
+                stats["failed"],
+            )
+            if stats["last_run"] is not None:
+                line += ", last ran {} for {:.3f}s, {:.3f}s late".format(
+                    datetime.fromtimestamp(stats["last_run"]).strftime("%Y-%m-%d %H:%M:%S"),
+                    stats["last_duration"],
+                    stats["last_lateness"],
+                )
+            lines.append(line)
+        return event.create_response("Scheduled jobs:\n" + "\n".join(lines))
+
 
 class Help(Function):
     """
@@ -110,23 +370,21 @@ class Help(Function):
             'Gives information about commands.  Use "help" for a list of commands, '
             'or "help <command>" for help on a specific command.'
         )
-        self.hallo_obj = None  # Hallo object containing everything.
 
     def run(self, event):
-        self.hallo_obj = event.server.hallo
+        function_dispatcher = event.server.hallo.function_dispatcher
         if event.command_args.strip() == "":
             return event.create_response(
-                self.list_all_functions(event.user, event.channel)
+                self.list_all_functions(function_dispatcher, event.user, event.channel)
             )
         else:
             function_name = event.command_args.strip().lower()
-            return event.create_response(self.get_help_on_function(function_name))
+            return event.create_response(self.get_help_on_function(function_dispatcher, function_name))
 
-    def list_all_functions(self, user_obj, channel_obj):
+    def list_all_functions(self, function_dispatcher, user_obj, channel_obj):
         """Returns a list of all functions."""
         # Get required objects
         server_obj = user_obj.server
-        function_dispatcher = self.hallo_obj.function_dispatcher
         # Get list of function classes
         function_class_list = function_dispatcher.get_function_class_list()
         # Construct list of available function names
@@ -143,10 +401,8 @@ class Help(Function):
         output_string = "List of available functions: " + ", ".join(output_list)
         return output_string
 
-    def get_help_on_function(self, function_name):
+    def get_help_on_function(self, function_dispatcher, function_name):
         """Returns help documentation on a specified function."""
-        # Get required objects
-        function_dispatcher = self.hallo_obj.function_dispatcher
         function_class = function_dispatcher.get_function_by_name(function_name)
         # If function isn't defined, return an error.
         if function_class is None:
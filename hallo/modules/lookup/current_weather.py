@@ -1,6 +1,8 @@
+from datetime import timedelta
+
 import hallo.modules
 from hallo.function import Function
-from hallo.inc.commons import Commons
+from hallo.inc.commons import Commons, KeyedCache
 import hallo.modules.user_data
 
 
@@ -9,6 +11,8 @@ class CurrentWeather(Function):
     Returns the current weather in your location, or asks for your location.
     """
 
+    response_cache = KeyedCache.for_responses("current weather", timedelta(minutes=10))
+
     def __init__(self):
         """
         Constructor
@@ -55,7 +59,7 @@ class CurrentWeather(Function):
         url = "https://api.openweathermap.org/data/2.5/weather{}&APPID={}".format(
             self.build_query(location_entry), api_key
         )
-        response = Commons.load_url_json(url)
+        response = Commons.load_url_json(url, cache=self.response_cache)
         if str(response["cod"]) != "200":
             return event.create_response("Location not recognised.")
         city_name = response["name"]
@@ -1,6 +1,8 @@
+from datetime import timedelta
+
 from hallo.events import EventMessage
 from hallo.function import Function
-from hallo.inc.commons import Commons
+from hallo.inc.commons import Commons, KeyedCache
 
 
 class InSpace(Function):
@@ -8,6 +10,8 @@ class InSpace(Function):
     Looks up the current amount and names of people in space
     """
 
+    response_cache = KeyedCache.for_responses("in space", timedelta(hours=1))
+
     def __init__(self):
         """
         Constructor
@@ -22,7 +26,7 @@ class InSpace(Function):
 
     def run(self, event):
         space_dict = Commons.load_url_json(
-            "https://www.howmanypeopleareinspacerightnow.com/space.json"
+            "https://www.howmanypeopleareinspacerightnow.com/space.json", cache=self.response_cache
         )
         space_number = str(space_dict["number"])
         space_names = ", ".join(
@@ -37,6 +41,10 @@ class InSpace(Function):
         """Returns a list of events which this function may want to respond to in a passive way"""
         return {EventMessage}
 
+    def get_passive_trigger(self):
+        """Returns a regex which a message must contain for passive_run to be called"""
+        return r"(?i)in space"
+
     def passive_run(self, event, hallo_obj):
         """Replies to an event not directly addressed to the bot."""
         if not isinstance(event, EventMessage):
@@ -1,7 +1,8 @@
 import urllib.parse
+from datetime import timedelta
 
 from hallo.function import Function
-from hallo.inc.commons import Commons
+from hallo.inc.commons import Commons, KeyedCache
 
 
 class Translate(Function):
@@ -9,6 +10,8 @@ class Translate(Function):
     Uses google translate to translate a phrase to english, or to any specified language
     """
 
+    response_cache = KeyedCache.for_responses("translate", timedelta(days=1))
+
     def __init__(self):
         """
         Constructor
@@ -45,6 +48,6 @@ class Translate(Function):
                 trans_safe, lang_from, lang_to
             )
         )
-        trans_dict = Commons.load_url_json(url, [], True)
+        trans_dict = Commons.load_url_json(url, [], True, self.response_cache)
         translation_string = " ".join([x[0] for x in trans_dict[0]])
         return event.create_response("Translation: {}".format(translation_string))
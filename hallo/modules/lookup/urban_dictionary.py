@@ -1,5 +1,7 @@
+from datetime import timedelta
+
 from hallo.function import Function
-from hallo.inc.commons import Commons
+from hallo.inc.commons import Commons, KeyedCache
 
 
 class UrbanDictionary(Function):
@@ -7,6 +9,8 @@ class UrbanDictionary(Function):
     Urban Dictionary lookup function.
     """
 
+    response_cache = KeyedCache.for_responses("urban dictionary", timedelta(hours=6))
+
     def __init__(self):
         """
         Constructor
@@ -22,7 +26,7 @@ class UrbanDictionary(Function):
     def run(self, event):
         url_line = event.command_args.replace(" ", "+").lower()
         url = "https://api.urbandictionary.com/v0/define?term={}".format(url_line)
-        urban_dict = Commons.load_url_json(url)
+        urban_dict = Commons.load_url_json(url, cache=self.response_cache)
         if len(urban_dict["list"]) > 0:
             definition = (
                 urban_dict["list"][0]["definition"].replace("\r", "").replace("\n", "")
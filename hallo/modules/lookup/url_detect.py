@@ -1,13 +1,19 @@
 import html
 import imghdr
+import logging
 import math
 import re
 import struct
-import urllib.request
+from datetime import timedelta
+from functools import partial
+from urllib.parse import urlsplit, urlunsplit
 
 from hallo.events import EventMessage
 from hallo.function import Function
-from hallo.inc.commons import Commons
+from hallo.inc.commons import Commons, KeyedCache
+from hallo.inc.host_pool import run_by_host
+
+logger = logging.getLogger(__name__)
 
 
 class UrlDetect(Function):
@@ -15,6 +21,18 @@ class UrlDetect(Function):
     URL detection and title printing.
     """
 
+    USER_AGENT = "Mozilla/5.0 (X11; Linux i686; rv:23.0) Gecko/20100101 Firefox/23.0"
+    MAX_URLS = 5  # Maximum number of links in one message to describe
+    MAX_PREFIX_BYTES = 65536  # Maximum bytes of each page or file to read, for its title or image header
+    URL_WORKERS = 4  # Maximum number of links to read at once
+    URL_PER_HOST = 2  # Maximum number of links to read at once from any one host
+    MESSAGE_DEADLINE = 10  # Seconds to wait for the links in a message, slower links are not described
+    url_regex = re.compile(r"\b((https?://|www.)[-A-Z0-9+&?%@#/=~_|$:,.]*[A-Z0-9+&@#/%=~_|$])", re.I)
+    # Descriptions by normalised link, so that reposted links are not read again
+    description_cache = KeyedCache(
+        500, timedelta(minutes=5), "url detect", error_expiry=timedelta(minutes=1)
+    )
+
     def __init__(self):
         """
         Constructor
@@ -26,7 +44,6 @@ class UrlDetect(Function):
         self.names = {"urldetect"}
         # Help documentation, if it's just a single line, can be set here
         self.help_docs = "URL detection."
-        self.hallo_obj = None
 
     def run(self, event):
         return event.create_response("This function does not take input.")
@@ -35,51 +52,87 @@ class UrlDetect(Function):
         """Returns a list of events which this function may want to respond to in a passive way"""
         return {EventMessage}
 
+    def get_passive_trigger(self):
+        """Returns a regex which a message must contain for passive_run to be called"""
+        return r"(?i)\b(https?://|www.)"
+
     def passive_run(self, event, hallo_obj):
         """Replies to an event not directly addressed to the bot."""
         if not isinstance(event, EventMessage):
             return
-        # Get hallo object for stuff to use
-        self.hallo_obj = hallo_obj
-        # Search for a link
-        url_regex = re.compile(
-            r"\b((https?://|www.)[-A-Z0-9+&?%@#/=~_|$:,.]*[A-Z0-9+&@#/%=~_|$])", re.I
-        )
-        url_search = url_regex.search(event.text)
-        if not url_search:
+        url_addresses = self.find_urls(event.text)
+        if not url_addresses:
             return None
-        # Get link address
-        url_address = url_search.group(1)
-        # Add protocol if missing
-        if "://" not in url_address:
-            url_address = "http://" + url_address
-        # Ignore local links.
-        if (
-            "127.0.0.1" in url_address
-            or "192.168." in url_address
-            or "10." in url_address
-            or "172." in url_address
-        ):
+        # Describe every link concurrently, giving up on any which take too long
+        results = run_by_host(
+            [
+                (url_address, urlsplit(url_address).netloc, partial(self.get_url_description, url_address, hallo_obj))
+                for url_address in url_addresses
+            ],
+            self.URL_WORKERS,
+            self.URL_PER_HOST,
+            self.MESSAGE_DEADLINE,
+            name="url-detect",
+        )
+        for url_address, error in results.errors.items():
+            logger.warning("Failed to read URL %s", url_address, exc_info=error)
+        outputs = [
+            results.results[url_address] for url_address in url_addresses
+            if results.results.get(url_address) is not None
+        ]
+        if not outputs:
             return None
+        return event.create_response("\n".join(outputs))
+
+    def find_urls(self, text):
+        """Finds the normalised addresses of the links in a message, ignoring local links and repeated links"""
+        url_addresses = []
+        for url_search in self.url_regex.finditer(text):
+            # Get link address
+            url_address = url_search.group(1)
+            # Add protocol if missing
+            if "://" not in url_address:
+                url_address = "http://" + url_address
+            # Ignore local links.
+            if (
+                "127.0.0.1" in url_address
+                or "192.168." in url_address
+                or "10." in url_address
+                or "172." in url_address
+            ):
+                continue
+            url_address = self.normalise_url(url_address)
+            if url_address not in url_addresses:
+                url_addresses.append(url_address)
+        return url_addresses[:self.MAX_URLS]
+
+    @staticmethod
+    def normalise_url(url_address):
+        """Lower cases the scheme and host of a link, so that the same link is only described once"""
+        url_parts = urlsplit(url_address)
+        return urlunsplit(
+            (url_parts.scheme.lower(), url_parts.netloc.lower(), url_parts.path or "/", url_parts.query,
+             url_parts.fragment)
+        )
+
+    def get_url_description(self, url_address, hallo_obj):
+        """Returns the description of a link, from the cache if it was described recently"""
+        return self.description_cache.get(url_address, lambda: self.describe_url(url_address, hallo_obj))
+
+    def describe_url(self, url_address, hallo_obj):
+        """Describes a link, reading the headers and only as much of the page or file as is needed"""
         # Get page info
-        page_request = urllib.request.Request(url_address)
-        page_request.add_header(
-            "User-Agent",
-            "Mozilla/5.0 (X11; Linux i686; rv:23.0) Gecko/20100101 Firefox/23.0",
+        page = Commons.http_client.get_prefix(
+            url_address, {"User-Agent": self.USER_AGENT}, self.MAX_PREFIX_BYTES, b"</title>"
         )
-        page_opener = urllib.request.build_opener()
-        page_info = str(page_opener.open(page_request).info())
-        if "Content-Type:" in page_info:
-            page_type = page_info.split()[page_info.split().index("Content-Type:") + 1]
-        else:
-            page_type = ""
+        if page.status_code >= 400:
+            return None
+        page_type = page.headers.get("Content-Type", "").split(";")[0].strip()
         # Get the website name
         url_site = Commons.get_domain_name(url_address).lower()
         # Get response if link is an image
         if "image" in page_type:
-            return event.create_response(
-                self.url_image(url_address, page_opener, page_request, page_type)
-            )
+            return self.url_image(url_address, page, page_type, hallo_obj)
         # Get a response depending on the website
         output = None
         site_readers = {
@@ -91,33 +144,42 @@ class UrlDetect(Function):
             "youtu": self.site_youtube,
         }
         if url_site in site_readers:
-            output = site_readers[url_site](url_address, page_opener, page_request)
+            output = site_readers[url_site](url_address, page, hallo_obj)
         # If other url, return generic URL response
         if output is None:
-            output = self.url_generic(url_address, page_opener, page_request)
-        return None if output is None else event.create_response(output)
+            output = self.url_generic(url_address, page)
+        return output
 
-    def url_image(self, url_address, page_opener, page_request, page_type):
+    def url_image(self, url_address, page, page_type, hallo_obj):
         """Handling direct image links"""
         # Get the website name
         url_site = Commons.get_domain_name(url_address).lower()
         # If website name is speedtest or imgur, hand over to those handlers
         if url_site == "speedtest":
-            return self.site_speedtest(url_address, page_opener, page_type)
+            return self.site_speedtest(url_address, page, hallo_obj)
         if url_site == "imgur":
-            return self.site_imgur(url_address, page_opener, page_type)
-        # Image handling
-        image_data = page_opener.open(page_request).read()
-        image_width, image_height = self.get_image_size(image_data)
-        image_size = len(image_data)
-        image_size_str = self.file_size_to_string(image_size)
-        return "Image: {} ({}px by {}px) {}.".format(
-            page_type, image_width, image_height, image_size_str
-        )
+            return self.site_imgur(url_address, page, hallo_obj)
+        # Image handling, the image size is read from its header, so the rest of the image isn't downloaded
+        try:
+            image_dimensions = self.get_image_size(page.content)
+        except (IndexError, struct.error):
+            image_dimensions = None
+        if page.headers.get("Content-Length", "").isdigit():
+            image_size = int(page.headers["Content-Length"])
+        elif page.complete:
+            image_size = len(page.content)
+        else:
+            image_size = None
+        output = "Image: {}".format(page_type)
+        if image_dimensions is not None:
+            output += " ({}px by {}px)".format(*image_dimensions)
+        if image_size is not None:
+            output += " {}".format(self.file_size_to_string(image_size))
+        return output + "."
 
-    def url_generic(self, url_address, page_opener, page_request):
+    def url_generic(self, url_address, page):
         """Handling for generic links not caught by any other url handling function."""
-        page_code = page_opener.open(page_request).read(4096).decode("utf-8", "ignore")
+        page_code = page.content.decode("utf-8", "ignore")
         if page_code.count("</title>") == 0:
             return None
         title_search = re.search(r"<title[^>]*>([^<]*)</title>", page_code, re.I)
@@ -129,11 +191,11 @@ class UrlDetect(Function):
             return "URL title: {}".format(title_clean.replace("\n", ""))
         return None
 
-    def site_ebay(self, url_address, page_opener, page_request):
+    def site_ebay(self, url_address, page, hallo_obj):
         """Handling for ebay links"""
         # Get the ebay item id
         item_id = url_address.split("/")[-1]
-        api_key = self.hallo_obj.get_api_key("ebay")
+        api_key = hallo_obj.get_api_key("ebay")
         if api_key is None:
             return None
         # Get API response
@@ -167,15 +229,15 @@ class UrlDetect(Function):
         output += "Ends: {}".format(item_end_time)
         return output
 
-    def site_imdb(self, url_address, page_opener, page_request):
+    def site_imdb(self, url_address, page, hallo_obj):
         """Handling for imdb links"""
         # If URL isn't to an imdb title, just do normal url handling.
         if "imdb.com/title" not in url_address:
-            return self.url_generic(url_address, page_opener, page_request)
+            return self.url_generic(url_address, page)
         # Get the imdb movie ID
         movie_id_search = re.search("title/(tt[0-9]*)", url_address)
         if movie_id_search is None:
-            return self.url_generic(url_address, page_opener, page_request)
+            return self.url_generic(url_address, page)
         movie_id = movie_id_search.group(1)
         # Download API response
         api_url = "https://www.omdbapi.com/?i={}".format(movie_id)
@@ -192,16 +254,16 @@ class UrlDetect(Function):
         )
         return output
 
-    def site_imgur(self, url_address, page_opener, page_request):
+    def site_imgur(self, url_address, page, hallo_obj):
         """Handling imgur links"""
         # Hand off imgur album links to a different handler function.
         if "/a/" in url_address:
-            return self.site_imgur_album(url_address, page_opener, page_request)
+            return self.site_imgur_album(url_address, page, hallo_obj)
         # Handle individual imgur image links
         imgur_id = url_address.split("/")[-1].split(".")[0]
         api_url = "https://api.imgur.com/3/image/{}".format(imgur_id)
         # Load API response (in json) using Client-ID.
-        api_key = self.hallo_obj.get_api_key("imgur")
+        api_key = hallo_obj.get_api_key("imgur")
         if api_key is None:
             return None
         api_dict = Commons.load_url_json(api_url, [["Authorization", api_key]])
@@ -218,12 +280,12 @@ class UrlDetect(Function):
         )
         return output
 
-    def site_imgur_album(self, url_address, page_opener, page_request):
+    def site_imgur_album(self, url_address, page, hallo_obj):
         """Handling imgur albums"""
         imgur_id = url_address.split("/")[-1].split("#")[0]
         api_url = "https://api.imgur.com/3/album/{}".format(imgur_id)
         # Load API response (in json) using Client-ID.
-        api_key = self.hallo_obj.get_api_key("imgur")
+        api_key = hallo_obj.get_api_key("imgur")
         if api_key is None:
             return None
         api_dict = Commons.load_url_json(api_url, [["Authorization", api_key]])
@@ -256,18 +318,13 @@ class UrlDetect(Function):
         output += "{} images.".format(album_count)
         return output
 
-    def site_speedtest(self, url_address, page_opener, page_request):
+    def site_speedtest(self, url_address, page, hallo_obj):
         """Handling speedtest links"""
         if url_address[-4:] == ".png":
             url_number = url_address[32:-4]
             url_address = "https://www.speedtest.net/my-result/".format(url_number)
-            page_request = urllib.request.Request(url_address)
-            page_request.add_header(
-                "User-Agent",
-                "Mozilla/5.0 (X11; Linux i686; rv:23.0) Gecko/20100101 Firefox/23.0",
-            )
-            page_opener = urllib.request.build_opener()
-        page_code = page_opener.open(page_request).read().decode("utf-8")
+        # The results are further down the page than the prefix which was read, so read the whole page
+        page_code = Commons.load_url_string(url_address, [["User-Agent", self.USER_AGENT]])
         page_code = re.sub(r"\s+", "", page_code)
         download = re.search("<h3>Download</h3><p>([0-9.]*)", page_code).group(1)
         upload = re.search("<h3>Upload</h3><p>([0-9.]*)", page_code).group(1)
@@ -276,7 +333,7 @@ class UrlDetect(Function):
             download, upload, ping
         )
 
-    def site_youtube(self, url_address, page_opener, page_request):
+    def site_youtube(self, url_address, page, hallo_obj):
         """Handling for youtube links"""
         # Find video id
         if "youtu.be" in url_address:
@@ -284,7 +341,7 @@ class UrlDetect(Function):
         else:
             video_id = url_address.split("/")[-1].split("=")[1].split("&")[0]
         # Find API url
-        api_key = self.hallo_obj.get_api_key("youtube")
+        api_key = hallo_obj.get_api_key("youtube")
         if api_key is None:
             return None
         api_url = (
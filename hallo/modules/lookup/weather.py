@@ -3,7 +3,7 @@ import re
 
 import hallo.modules.user_data
 from hallo.function import Function
-from hallo.inc.commons import Commons
+from hallo.inc.commons import Commons, KeyedCache
 
 
 class Weather(Function):
@@ -11,6 +11,8 @@ class Weather(Function):
     Currently returns a random weather phrase. In future perhaps nightvale weather?
     """
 
+    response_cache = KeyedCache.for_responses("weather", datetime.timedelta(minutes=30))
+
     def __init__(self):
         """
         Constructor
@@ -92,7 +94,7 @@ class Weather(Function):
             "https://api.openweathermap.org/data/2.5/forecast/daily{}"
             "&cnt=16&APPID={}".format(self.build_query(location_entry), api_key)
         )
-        response = Commons.load_url_json(url)
+        response = Commons.load_url_json(url, cache=self.response_cache)
         # Check API responded well
         if str(response["cod"]) != "200":
             return event.create_response("Location not recognised.")
@@ -1,7 +1,8 @@
 import re
+from datetime import timedelta
 
 from hallo.function import Function
-from hallo.inc.commons import Commons
+from hallo.inc.commons import Commons, KeyedCache
 
 
 class Wiki(Function):
@@ -9,6 +10,8 @@ class Wiki(Function):
     Lookup wiki article and return the first paragraph or so.
     """
 
+    response_cache = KeyedCache.for_responses("wiki", timedelta(hours=6))
+
     def __init__(self):
         """
         Constructor
@@ -27,7 +30,7 @@ class Wiki(Function):
             "https://en.wikipedia.org/w/api.php?format=json&action=query&titles={}"
             "&prop=revisions&rvprop=content&redirects=True".format(line_clean)
         )
-        article_dict = Commons.load_url_json(url)
+        article_dict = Commons.load_url_json(url, cache=self.response_cache)
         page_code = list(article_dict["query"]["pages"])[0]
         article_text = article_dict["query"]["pages"][page_code]["revisions"][0]["*"]
         old_scan = article_text
@@ -1,5 +1,7 @@
+from datetime import timedelta
+
 from hallo.function import Function
-from hallo.inc.commons import Commons
+from hallo.inc.commons import Commons, KeyedCache
 
 
 class CatGif(Function):
@@ -7,6 +9,8 @@ class CatGif(Function):
     Returns a random cat gif
     """
 
+    response_cache = KeyedCache.for_responses("cat gif", timedelta(0))  # Results are random, so only errors are cached
+
     def __init__(self):
         """
         Constructor
@@ -33,6 +37,6 @@ class CatGif(Function):
         url = "http://thecatapi.com/api/images/get?format=json&api_key={}&type=gif".format(
             api_key
         )
-        cat_obj = Commons.load_url_json(url)[0]
+        cat_obj = Commons.load_url_json(url, cache=self.response_cache)[0]
         cat_url = cat_obj["url"]
         return event.create_response(cat_url)
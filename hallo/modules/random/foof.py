@@ -61,3 +61,7 @@ class Foof(Function):
     def get_passive_events(self):
         """Returns a list of events which this function may want to respond to in a passive way"""
         return {EventMessage}
+
+    def get_passive_trigger(self):
+        """Returns a regex which a message must contain for passive_run to be called"""
+        return r"(?i)foo+f"
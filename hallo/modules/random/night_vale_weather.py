@@ -24,15 +24,12 @@ class NightValeWeather(Function):
             "Returns the current weather in the style of the podcast 'Welcome to Night Vale' "
             "Format: nightvale weather"
         )
-        self.hallo_obj = None
 
     def run(self, event):
-        # Get hallo object
-        self.hallo_obj = event.server.hallo
         # Get playlist data from youtube api
         try:
             playlist_data = self.get_youtube_playlist(
-                "PL1-VZZ6QMhCdx8eC4R3VlCmSn1Kq2QWGP"
+                event.server.hallo, "PL1-VZZ6QMhCdx8eC4R3VlCmSn1Kq2QWGP"
             )
         except Exception as e:
             return event.create_response("No api key loaded for youtube.")
@@ -61,11 +58,15 @@ class NightValeWeather(Function):
         """Returns a list of events which this function may want to respond to in a passive way"""
         return {EventMessage}
 
-    def get_youtube_playlist(self, playlist_id, page_token=None):
+    def get_passive_trigger(self):
+        """Returns a regex which a message must contain for passive_run to be called"""
+        return r"(?i) with the weather"
+
+    def get_youtube_playlist(self, hallo_obj, playlist_id, page_token=None):
         """Returns a list of video information for a youtube playlist."""
         list_videos = []
         # Get API key
-        api_key = self.hallo_obj.get_api_key("youtube")
+        api_key = hallo_obj.get_api_key("youtube")
         if api_key is None:
             raise Exception("Youtube API key missing.")
         # Find API url
@@ -89,7 +90,7 @@ class NightValeWeather(Function):
         # Check if there's another page to add
         if "nextPageToken" in api_dict:
             list_videos.extend(
-                self.get_youtube_playlist(playlist_id, api_dict["nextPageToken"])
+                self.get_youtube_playlist(hallo_obj, playlist_id, api_dict["nextPageToken"])
             )
         # Return list
         return list_videos
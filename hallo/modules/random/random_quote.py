@@ -1,5 +1,7 @@
+from datetime import timedelta
+
 from hallo.function import Function
-from hallo.inc.commons import Commons
+from hallo.inc.commons import Commons, KeyedCache
 
 
 class RandomQuote(Function):
@@ -7,6 +9,8 @@ class RandomQuote(Function):
     Returns a random quote
     """
 
+    response_cache = KeyedCache.for_responses("random quote", timedelta(days=1))
+
     def __init__(self):
         """
         Constructor
@@ -22,7 +26,7 @@ class RandomQuote(Function):
     def run(self, event):
         url = "https://type.fit/api/quotes"
         # Get api response
-        json_dict = Commons.load_url_json(url)
+        json_dict = Commons.load_url_json(url, cache=self.response_cache)
         # Select a random quote from response
         quote = Commons.get_random_choice(json_dict)[0]
         # Construct response
@@ -1,13 +1,13 @@
 import logging
 import os
 from datetime import timedelta, datetime
-from typing import Dict, Optional, Union, List, Callable
+from typing import Any, Dict, Optional, Tuple, Union, List, Callable
 
 import dateutil.parser
 
 import hallo.modules.user_data
 from hallo.destination import User
-from hallo.inc.commons import CachedObject, Commons
+from hallo.inc.commons import CachedObject, Commons, KeyedCache
 import hallo.modules.subscriptions.subscription_common
 
 logger = logging.getLogger(__name__)
@@ -58,6 +58,7 @@ class FAKey:
     class FAReader:
         NOTES_INBOX = "inbox"
         NOTES_OUTBOX = "outbox"
+        PAGE_CACHE_SIZE = 200  # Maximum number of user, favourites, submission and journal pages to cache
 
         class FALoginFailedError(Exception):
             pass
@@ -66,30 +67,38 @@ class FAKey:
             self.a = cookie_a
             self.b = cookie_b
             self.timeout: timedelta = timedelta(seconds=60)
+            # Notifications and notes pages are shared by several sources, so may be returned up to another timeout
+            # out of date while they are refreshed in the background, rather than every source waiting on the refresh
             self.notification_page_cache = CachedObject(
                 lambda: FAKey.FAReader.FANotificationsPage(
                     self._get_api_data("notifications/others.json", True)
                 ),
                 self.timeout,
+                self.timeout,
             )
             self.submissions_page_cache = CachedObject(
                 lambda: FAKey.FAReader.FASubmissionsPage(
                     self._get_api_data("notifications/submissions.json", True)
                 ),
                 self.timeout,
+                self.timeout,
             )
             self.notes_page_inbox_cache = CachedObject(
                 lambda: FAKey.FAReader.FANotesPage(
                     self._get_api_data("notes/inbox.json", True), self.NOTES_INBOX
                 ),
                 self.timeout,
+                self.timeout,
             )
             self.notes_page_outbox_cache = CachedObject(
                 lambda: FAKey.FAReader.FANotesPage(
                     self._get_api_data("notes/outbox.json", True), self.NOTES_OUTBOX
                 ),
                 self.timeout,
+                self.timeout,
             )
+            # Shared by every FA source using this key, so pages loaded by one source are reused by the others
+            self.page_cache: KeyedCache[Tuple[str, str], Any] = KeyedCache(self.PAGE_CACHE_SIZE, self.timeout)
 
         def _get_api_data(self, path: str, needs_cookie: bool = False) -> Union[Dict, List]:
             fa_api_url = os.getenv("FA_API_URL", "https://faexport.spangle.org.uk")
@@ -113,6 +122,9 @@ class FAKey:
             raise ValueError("Invalid FA note folder.")
 
         def get_user_page(self, username: str) -> 'FAKey.FAReader.FAUserPage':
+            return self.page_cache.get(("user", username.lower()), lambda: self._load_user_page(username))
+
+        def _load_user_page(self, username: str) -> 'FAKey.FAReader.FAUserPage':
             # Needs shout list, for checking own shouts
             data = self._get_api_data("/user/{}.json".format(username))
 
@@ -123,12 +135,20 @@ class FAKey:
             return user_page
 
         def get_user_fav_page(self, username: str) -> 'FAKey.FAReader.FAUserFavouritesPage':
+            return self.page_cache.get(("favourites", username.lower()), lambda: self._load_user_fav_page(username))
+
+        def _load_user_fav_page(self, username: str) -> 'FAKey.FAReader.FAUserFavouritesPage':
             # This endpoint returns a list of submission IDs
             id_list: List[int] = self._get_api_data("/user/{}/favorites.json".format(username))
             fav_page = FAKey.FAReader.FAUserFavouritesPage(id_list, username)
             return fav_page
 
         def get_submission_page(self, submission_id: Union[int, str]) -> 'FAKey.FAReader.FAViewSubmissionPage':
+            return self.page_cache.get(
+                ("submission", str(submission_id)), lambda: self._load_submission_page(submission_id)
+            )
+
+        def _load_submission_page(self, submission_id: Union[int, str]) -> 'FAKey.FAReader.FAViewSubmissionPage':
             data = self._get_api_data("/submission/{}.json".format(submission_id))
 
             def comment_data_getter():
@@ -142,6 +162,9 @@ class FAKey:
             return sub_page
 
         def get_journal_page(self, journal_id: Union[int, str]) -> 'FAKey.FAReader.FAViewJournalPage':
+            return self.page_cache.get(("journal", str(journal_id)), lambda: self._load_journal_page(journal_id))
+
+        def _load_journal_page(self, journal_id: Union[int, str]) -> 'FAKey.FAReader.FAViewJournalPage':
             data = self._get_api_data("/journal/{}.json".format(journal_id))
 
             def comment_data_getter():
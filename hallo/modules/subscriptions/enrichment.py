@@ -0,0 +1,106 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from hallo.inc.host_pool import run_by_host
+
+logger = logging.getLogger(__name__)
+_MISSING = object()
+
+
+class EnrichmentCache:
+    """
+    Thread-safe, least-recently-used cache of enrichments, the extra data fetched to build the events for some items.
+    It is shared by all sources, so that subscriptions to the same feed only fetch the extra data for an item once.
+    """
+
+    def __init__(self, max_size: int = 500) -> None:
+        """
+        :param max_size: Maximum number of enrichments to keep
+        """
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._cache: Dict[Hashable, Any] = OrderedDict()
+        self.hit_count = 0
+        self.miss_count = 0
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Returns the enrichment cached for a key, or _MISSING if there is none
+        """
+        with self._lock:
+            value = self._cache.get(key, _MISSING)
+            if value is _MISSING:
+                self.miss_count += 1
+            else:
+                self.hit_count += 1
+                self._cache.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+def enrich_all(
+    tasks: List[Tuple[Hashable, str, Callable[[], Any]]],
+    cache: EnrichmentCache,
+    max_workers: int,
+    max_per_host: int,
+    timeout: float,
+) -> Dict[Hashable, Any]:
+    """
+    Fetches enrichments concurrently, within a time budget. Cached enrichments are not fetched again, and fetches
+    which finish after the deadline are still cached, for the next time they are needed.
+    :param tasks: List of enrichments to fetch, as tuples of a cache key, the URL fetched, and the function to call
+    :param cache: Cache of enrichments
+    :param max_workers: Maximum number of enrichments to fetch at once
+    :param max_per_host: Maximum number of enrichments to fetch at once from any one host
+    :param timeout: Seconds after which to stop waiting for enrichments
+    :return: Enrichments which were cached or fetched in time, by cache key. Failed or late ones are missing.
+    """
+    enrichments = {}
+    to_fetch = []
+    fetch_keys = set()
+    for key, url, func in tasks:
+        if key in enrichments or key in fetch_keys:
+            continue
+        cached = cache.get(key)
+        if cached is not _MISSING:
+            enrichments[key] = cached
+            continue
+        fetch_keys.add(key)
+        to_fetch.append((key, urlparse(url).netloc, _caching(cache, key, func)))
+    if not to_fetch:
+        return enrichments
+    results = run_by_host(to_fetch, max_workers, max_per_host, timeout, name="subscription-enrich")
+    for key, error in results.errors.items():
+        logger.warning("Failed to fetch enrichment for %s", key, exc_info=error)
+    if results.timed_out or results.not_started:
+        logger.warning(
+            "Enrichments timed out after %ss, sending %s items without them",
+            timeout,
+            len(results.timed_out) + len(results.not_started),
+        )
+    enrichments.update(results.results)
+    return enrichments
+
+
+def _caching(cache: EnrichmentCache, key: Hashable, func: Callable[[], Any]) -> Callable[[], Any]:
+    def fetch() -> Optional[Any]:
+        value = func()
+        cache.put(key, value)
+        return value
+    return fetch
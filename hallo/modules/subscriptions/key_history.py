@@ -0,0 +1,80 @@
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Dict, List, Optional, Union
+
+Key = Union[str, int]
+LastKeys = Union[List[Key], Dict]  # Either a plain list of keys, newest first, or a KeyHistory as JSON
+
+
+class KeyHistory:
+    """
+    Ordered history of the keys of the items a stream source has seen, and when each was last seen, for checking
+    which items are new. Keys are kept up to a maximum count and age, rather than only for the items in the latest
+    state, so that items which drop out of a feed for a while are not posted again when they come back.
+    """
+
+    def __init__(self, max_count: int = 1000, max_age: Optional[timedelta] = timedelta(days=30)) -> None:
+        """
+        :param max_count: Maximum number of keys to keep
+        :param max_age: How long after a key was last seen to keep it, or None to keep keys regardless of age
+        """
+        self.max_count = max_count
+        self.max_age = max_age
+        self._seen: Dict[Key, int] = OrderedDict()  # Timestamp each key was last seen, least recently seen first
+
+    def __contains__(self, key: Key) -> bool:
+        return key in self._seen
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def keys(self) -> List[Key]:
+        """
+        Returns the keys in the history, most recently seen first
+        """
+        return list(reversed(self._seen))
+
+    def add(self, keys: List[Key], now: Optional[float] = None) -> None:
+        """
+        Records keys as seen, and drops any keys which are now too old, or too many.
+        :param keys: Keys of the items seen, in the order of the state, newest first
+        :param now: Timestamp they were seen, if not now
+        """
+        now = int(time.time() if now is None else now)
+        for key in reversed(keys):
+            self._seen[key] = now
+            self._seen.move_to_end(key)
+        if self.max_age is not None:
+            oldest = now - self.max_age.total_seconds()
+            while self._seen and next(iter(self._seen.values())) < oldest:
+                self._seen.popitem(last=False)
+        # Never drop keys which were seen just now
+        while len(self._seen) > max(self.max_count, len(keys)):
+            self._seen.popitem(last=False)
+
+    def to_json(self) -> Dict:
+        # Keys seen at the same time are grouped together, as most keys are seen in batches
+        seen_groups = []
+        for key, seen in self._seen.items():
+            if seen_groups and seen_groups[-1][0] == seen:
+                seen_groups[-1][1].append(key)
+            else:
+                seen_groups.append([seen, [key]])
+        return {"seen": seen_groups}
+
+    @classmethod
+    def from_json(
+            cls,
+            json_data: Optional[LastKeys],
+            max_count: int = 1000,
+            max_age: Optional[timedelta] = timedelta(days=30)
+    ) -> 'KeyHistory':
+        history = cls(max_count, max_age)
+        if isinstance(json_data, dict):
+            for seen, keys in json_data["seen"]:
+                for key in keys:
+                    history._seen[key] = seen
+        elif json_data:
+            history.add(list(json_data))
+        return history
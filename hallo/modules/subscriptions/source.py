@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Generic, List, Optional, Dict, TypeVar
+from typing import Generic, Hashable, List, Optional, Dict, TypeVar
 
 from hallo.destination import Channel, User, Destination
 from hallo.events import EventMessage
@@ -12,10 +12,52 @@ Update = TypeVar("Update")
 class Source(ABC, Generic[State, Update]):
     type_name: str = None
     type_names: List[str] = None
+    host: Optional[str] = None  # Host which current_state() fetches from, if all sources of this type use the same one
 
     def __init__(self):
         pass
 
+    def get_host(self) -> str:
+        """
+        Returns the host which current_state() fetches from, so that checks of sources on the same host can be limited.
+        """
+        return self.host or self.type_name
+
+    def get_fetch_key(self) -> Optional[Hashable]:
+        """
+        Returns a key identifying what current_state() fetches, if other sources with the same key would fetch exactly
+        the same state, so that it can be fetched once and shared between them. None if the state can't be shared.
+        """
+        return None
+
+    def share_state(self, fetched_by: 'Source', state: State) -> None:
+        """
+        Called on each other source sharing a fetch key, with the state fetched by fetched_by.current_state(), so that
+        sources can copy anything which current_state() records as it fetches, such as a refreshed title.
+        """
+        pass
+
+    def get_batch_key(self) -> Optional[Hashable]:
+        """
+        Returns a key shared by sources whose states can be fetched together, in fewer requests, by current_states().
+        None if the state of this source can only be fetched alone.
+        """
+        return None
+
+    @classmethod
+    def batch_sources(cls, sources: List['Source']) -> List[List['Source']]:
+        """
+        Splits sources sharing a batch key into batches which can each be fetched by one call to current_states()
+        """
+        return [[source] for source in sources]
+
+    @classmethod
+    def current_states(cls, sources: List['Source']) -> List[State]:
+        """
+        Fetches the current states of a batch of sources, in the same order as the sources
+        """
+        return [source.current_state() for source in sources]
+
     @abstractmethod
     def matches_name(self, name_clean: str) -> bool:
         pass
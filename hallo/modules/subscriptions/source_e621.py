@@ -1,5 +1,5 @@
 import urllib.parse
-from typing import Dict, List, Optional
+from typing import Dict, Hashable, List, Optional
 
 from hallo.destination import Channel, User, Destination
 from hallo.events import EventMessage, EventMessageWithPhoto
@@ -10,9 +10,10 @@ from hallo.server import Server
 
 class E621Source(hallo.modules.subscriptions.stream_source.StreamSource[Dict]):
     type_name: str = "e621"
+    host: str = "e621.net"
     type_names: List[str] = ["e621", "e621 search", "search e621"]
 
-    def __init__(self, search: str, last_keys: List[hallo.modules.subscriptions.stream_source.Key] = None):
+    def __init__(self, search: str, last_keys: Optional[hallo.modules.subscriptions.stream_source.LastKeys] = None):
         super().__init__(last_keys)
         self.search: str = search
 
@@ -29,6 +30,9 @@ class E621Source(hallo.modules.subscriptions.stream_source.StreamSource[Dict]):
             argument
         )
 
+    def get_fetch_key(self) -> Hashable:
+        return "e621", self.search
+
     def current_state(self) -> List[Dict]:
         search = "{} order:-id".format(self.search)  # Sort by id
         url = "https://e621.net/posts.json?tags={}&limit=50".format(
@@ -70,6 +74,6 @@ class E621Source(hallo.modules.subscriptions.stream_source.StreamSource[Dict]):
     def to_json(self) -> Dict:
         return {
             "type": self.type_name,
-            "last_keys": self.last_keys,
+            "last_keys": self.key_history.to_json(),
             "search": self.search
         }
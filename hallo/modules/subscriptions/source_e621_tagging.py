@@ -17,7 +17,7 @@ class E621TaggingSource(hallo.modules.subscriptions.source_e621.E621Source):
             self,
             search: str,
             tags: List[str],
-            last_keys: Optional[List[hallo.modules.subscriptions.stream_source.Key]] = None
+            last_keys: Optional[hallo.modules.subscriptions.stream_source.LastKeys] = None
     ):
         super().__init__(search, last_keys)
         self.tags: List[str] = tags
@@ -96,7 +96,7 @@ class E621TaggingSource(hallo.modules.subscriptions.source_e621.E621Source):
     def to_json(self) -> Dict:
         return {
             "type": self.type_name,
-            "last_keys": self.last_keys,
+            "last_keys": self.key_history.to_json(),
             "search": self.search,
             "tags": self.tags
         }
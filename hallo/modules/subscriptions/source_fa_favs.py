@@ -41,6 +41,7 @@ def fa_key_from_input(user: User, sub_repo) -> hallo.modules.subscriptions.commo
 
 class FAFavsSource(hallo.modules.subscriptions.stream_source.StreamSource[SubmissionId]):
     type_name: str = "fa_user_favs"
+    host: str = "www.furaffinity.net"
     type_names: List[str] = [
         "fa user favs",
         "furaffinity user favs",
@@ -54,7 +55,7 @@ class FAFavsSource(hallo.modules.subscriptions.stream_source.StreamSource[Submis
             self,
             fa_key: hallo.modules.subscriptions.common_fa_key.FAKey,
             username: str,
-            last_keys: Optional[List[hallo.modules.subscriptions.stream_source.Key]] = None
+            last_keys: Optional[hallo.modules.subscriptions.stream_source.LastKeys] = None
     ):
         super().__init__(last_keys)
         self.username = username
@@ -117,7 +118,7 @@ class FAFavsSource(hallo.modules.subscriptions.stream_source.StreamSource[Submis
     def to_json(self) -> Dict:
         return {
             "type": self.type_name,
-            "last_keys": self.last_keys,
+            "last_keys": self.key_history.to_json(),
             "fa_key_user_address": self.fa_key.user.address,
             "username": self.username
         }
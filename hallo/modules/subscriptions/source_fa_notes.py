@@ -15,12 +15,13 @@ class FANotesInboxSource(
     ]
 ):
     type_name = "fa_notes_inbox"
+    host: str = "www.furaffinity.net"
     type_names = ["fa notes inbox"]
 
     def __init__(
             self,
             fa_key: hallo.modules.subscriptions.common_fa_key.FAKey,
-            last_keys: Optional[List[hallo.modules.subscriptions.stream_source.Key]] = None
+            last_keys: Optional[hallo.modules.subscriptions.stream_source.LastKeys] = None
     ):
         super().__init__(last_keys)
         self.fa_key = fa_key
@@ -74,19 +75,20 @@ class FANotesInboxSource(
         return {
             "type": self.type_name,
             "fa_key_user_address": self.fa_key.user.address,
-            "last_keys": self.last_keys
+            "last_keys": self.key_history.to_json()
         }
 
 
 class FANotesOutboxSource(hallo.modules.subscriptions.stream_source.StreamSource[
                               hallo.modules.subscriptions.common_fa_key.FAKey.FAReader.FANote]):
     type_name = "fa_notes_outbox"
+    host: str = "www.furaffinity.net"
     type_names = ["fa notes outbox"]
 
     def __init__(
             self,
             fa_key: hallo.modules.subscriptions.common_fa_key.FAKey,
-            last_keys: Optional[List[hallo.modules.subscriptions.stream_source.Key]] = None
+            last_keys: Optional[hallo.modules.subscriptions.stream_source.LastKeys] = None
     ):
         super().__init__(last_keys)
         self.fa_key = fa_key
@@ -141,12 +143,13 @@ class FANotesOutboxSource(hallo.modules.subscriptions.stream_source.StreamSource
         return {
             "type": self.type_name,
             "fa_key_user_address": self.fa_key.user.address,
-            "last_keys": self.last_keys
+            "last_keys": self.key_history.to_json()
         }
 
 
 class FANotesSource(hallo.modules.subscriptions.source.Source[Dict, Dict]):
     type_name: str = "fa_notif_notes"
+    host: str = "www.furaffinity.net"
     type_names: List[str] = ["fa notes notifications", "fa notes", "furaffinity notes"]
 
     def __init__(self, fa_key: hallo.modules.subscriptions.common_fa_key.FAKey, inbox_source: FANotesInboxSource,
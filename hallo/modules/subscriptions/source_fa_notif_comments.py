@@ -16,12 +16,13 @@ class FASubmissionCommentSource(
     ]
 ):
     type_name = "fa_submission_comments"
+    host: str = "www.furaffinity.net"
     type_names = ["fa submission comments"]
 
     def __init__(
             self,
             fa_key: hallo.modules.subscriptions.common_fa_key.FAKey,
-            last_keys: Optional[List[hallo.modules.subscriptions.stream_source.Key]] = None
+            last_keys: Optional[hallo.modules.subscriptions.stream_source.LastKeys] = None
     ):
         super().__init__(last_keys)
         self.fa_key = fa_key
@@ -88,7 +89,7 @@ class FASubmissionCommentSource(
         return {
             "type": self.type_name,
             "fa_key_user_address": self.fa_key.user.address,
-            "last_keys": self.last_keys
+            "last_keys": self.key_history.to_json()
         }
 
 
@@ -98,12 +99,13 @@ class FAJournalCommentSource(
     ]
 ):
     type_name = "fa_journal_comments"
+    host: str = "www.furaffinity.net"
     type_names = ["fa journal comments"]
 
     def __init__(
             self,
             fa_key: hallo.modules.subscriptions.common_fa_key.FAKey,
-            last_keys: Optional[List[hallo.modules.subscriptions.stream_source.Key]] = None
+            last_keys: Optional[hallo.modules.subscriptions.stream_source.LastKeys] = None
     ):
         super().__init__(last_keys)
         self.fa_key = fa_key
@@ -171,7 +173,7 @@ class FAJournalCommentSource(
         return {
             "type": self.type_name,
             "fa_key_user_address": self.fa_key.user.address,
-            "last_keys": self.last_keys
+            "last_keys": self.key_history.to_json()
         }
 
 
@@ -181,11 +183,12 @@ class FAShoutSource(
     ]
 ):
     type_name = "fa_shouts"
+    host: str = "www.furaffinity.net"
     type_names = ["fa shouts"]
 
     def __init__(
             self, fa_key: hallo.modules.subscriptions.common_fa_key.FAKey,
-            last_keys: Optional[List[hallo.modules.subscriptions.stream_source.Key]] = None
+            last_keys: Optional[hallo.modules.subscriptions.stream_source.LastKeys] = None
     ):
         super().__init__(last_keys)
         self.fa_key = fa_key
@@ -251,12 +254,13 @@ class FAShoutSource(
         return {
             "type": self.type_name,
             "fa_key_user_address": self.fa_key.user.address,
-            "last_keys": self.last_keys
+            "last_keys": self.key_history.to_json()
         }
 
 
 class FACommentNotificationsSource(hallo.modules.subscriptions.source.Source[Dict, Dict]):
     type_name: str = "fa_notif_comments"
+    host: str = "www.furaffinity.net"
     type_names: List[str] = [
         "{}{}{}".format(fa, comments, notifications)
         for fa in ["fa ", "furaffinity "]
@@ -14,6 +14,7 @@ class FAFavNotificationsSource(
     ]
 ):
     type_name: str = "fa_notif_favs"
+    host: str = "www.furaffinity.net"
     type_names: List[str] = [
         "fa favs notifications",
         "fa favs",
@@ -26,7 +27,7 @@ class FAFavNotificationsSource(
     def __init__(
             self,
             fa_key: hallo.modules.subscriptions.common_fa_key.FAKey,
-            last_keys: Optional[List[hallo.modules.subscriptions.stream_source.Key]] = None
+            last_keys: Optional[hallo.modules.subscriptions.stream_source.LastKeys] = None
     ):
         super().__init__(last_keys)
         self.fa_key = fa_key
@@ -77,5 +78,5 @@ class FAFavNotificationsSource(
         return {
             "type": self.type_name,
             "fa_key_user_address": self.fa_key.user.address,
-            "last_keys": self.last_keys
+            "last_keys": self.key_history.to_json()
         }
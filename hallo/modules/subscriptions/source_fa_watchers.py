@@ -15,6 +15,7 @@ class FAUserWatchersSource(
     ]
 ):
     type_name: str = "fa_user_watchers"
+    host: str = "www.furaffinity.net"
     type_names: List[str] = [
         "fa user watchers",
         "fa user new watchers",
@@ -23,7 +24,7 @@ class FAUserWatchersSource(
     ]
 
     def __init__(self, fa_key: hallo.modules.subscriptions.common_fa_key.FAKey, username: str,
-                 last_keys: Optional[List[hallo.modules.subscriptions.stream_source.Key]] = None):
+                 last_keys: Optional[hallo.modules.subscriptions.stream_source.LastKeys] = None):
         super().__init__(last_keys)
         self.fa_key = fa_key
         self.username = username
@@ -86,12 +87,13 @@ class FAUserWatchersSource(
             "type": self.type_name,
             "fa_key_user_address": self.fa_key.user.address,
             "username": self.username,
-            "last_keys": self.last_keys
+            "last_keys": self.key_history.to_json()
         }
 
 
 class FAWatchersSource(FAUserWatchersSource):
     type_name: str = "fa_notif_watchers"
+    host: str = "www.furaffinity.net"
     type_names: List[str] = [
         "{}{}{}{}".format(fa, new, watchers, notifications)
         for fa in ["fa ", "furaffinity "]
@@ -103,7 +105,7 @@ class FAWatchersSource(FAUserWatchersSource):
     def __init__(
             self,
             fa_key: hallo.modules.subscriptions.common_fa_key.FAKey,
-            last_keys: Optional[List[hallo.modules.subscriptions.stream_source.Key]] = None
+            last_keys: Optional[hallo.modules.subscriptions.stream_source.LastKeys] = None
     ):
         username = fa_key.get_fa_reader().get_notification_page().username
         super().__init__(fa_key, username, last_keys)
@@ -132,5 +134,5 @@ class FAWatchersSource(FAUserWatchersSource):
         return {
             "type": self.type_name,
             "fa_key_user_address": self.fa_key.user.address,
-            "last_keys": self.last_keys
+            "last_keys": self.key_history.to_json()
         }
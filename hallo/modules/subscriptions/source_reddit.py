@@ -1,6 +1,6 @@
 import logging
 import re
-from typing import Dict, List, Optional
+from typing import Dict, Hashable, List, Optional
 
 from bs4 import BeautifulSoup
 
@@ -36,12 +36,16 @@ def _direct_url_vreddit(url: str, item: Dict) -> Optional[str]:
         return None
 
 
-def _direct_url_red(url: str) -> Optional[str]:
+def _redgifs_page_url(url: str) -> Optional[str]:
     redgifs_regex = re.compile(r"(?:https?://)?(?:www\.)?redgifs\.com/watch/([a-z]+)", re.IGNORECASE)
     redgifs_match = redgifs_regex.match(url)
     if redgifs_match is None:
         return None
-    page_source = Commons.load_url_string(redgifs_match.group(0))
+    return redgifs_match.group(0)
+
+
+def _direct_url_red(page_url: str) -> Optional[str]:
+    page_source = Commons.load_url_string(page_url)
     page_soup = BeautifulSoup(page_source, "html.parser")
     sources = page_soup.select(".video-player-wrapper video source")
     if not sources:
@@ -67,34 +71,108 @@ def _get_direct_url(url: str, item: Dict) -> Optional[str]:
     vreddit_direct = _direct_url_vreddit(url, item)
     if vreddit_direct is not None:
         return vreddit_direct
-    redgif_direct = _direct_url_red(url)
-    if redgif_direct is not None:
-        return redgif_direct
     return None
 
 
+def _is_media_url(url: str) -> bool:
+    return url.split(".")[-1].lower() in ["png", "jpg", "jpeg", "bmp", "gif", "mp4", "gifv"]
+
+
 class RedditSource(hallo.modules.subscriptions.stream_source.StreamSource[Dict]):
     type_name: str = "subreddit"
+    host: str = "www.reddit.com"
     type_names: List[str] = ["reddit", "subreddit"]
+    BATCH_SIZE = 20  # Maximum number of subreddits to fetch in one combined listing
+    MAX_URL_LENGTH = 2000  # Maximum length of the URL of a combined listing
+    LISTING_LIMIT = 100  # Number of posts to ask for in a combined listing, which is the most reddit will return
 
     def __init__(
             self, subreddit: str,
-            last_keys: Optional[List[hallo.modules.subscriptions.stream_source.Key]] = None
+            last_keys: Optional[hallo.modules.subscriptions.stream_source.LastKeys] = None
     ):
         super().__init__(last_keys)
         self.subreddit = subreddit
 
+    def get_fetch_key(self) -> Hashable:
+        return "subreddit", self.subreddit.lower()
+
+    def get_batch_key(self) -> Hashable:
+        return "subreddit"
+
     def current_state(self) -> List[Dict]:
         url = "https://www.reddit.com/r/{}/new.json".format(self.subreddit)
         results = Commons.load_url_json(url)
         return results["data"]["children"]
 
+    @classmethod
+    def _listing_url(cls, subreddits: List[str]) -> str:
+        return "https://www.reddit.com/r/{}/new.json?limit={}".format("+".join(subreddits), cls.LISTING_LIMIT)
+
+    @classmethod
+    def batch_sources(cls, sources: List['RedditSource']) -> List[List['RedditSource']]:
+        batches = []
+        batch = []
+        for source in sources:
+            subreddits = [batch_source.subreddit for batch_source in batch] + [source.subreddit]
+            if batch and (len(batch) >= cls.BATCH_SIZE or len(cls._listing_url(subreddits)) > cls.MAX_URL_LENGTH):
+                batches.append(batch)
+                batch = []
+            batch.append(source)
+        if batch:
+            batches.append(batch)
+        return batches
+
+    @classmethod
+    def current_states(cls, sources: List['RedditSource']) -> List[List[Dict]]:
+        """
+        Fetches the newest posts of a batch of subreddits in one combined listing, and splits them by subreddit.
+        A full listing may have cut off posts from quieter subreddits, so if none of the posts from a subreddit
+        have been seen before, its posts are fetched separately, so that none are missed.
+        """
+        results = Commons.load_url_json(cls._listing_url([source.subreddit for source in sources]))
+        children = results["data"]["children"]
+        by_subreddit: Dict[str, List[Dict]] = {source.subreddit.lower(): [] for source in sources}
+        for item in children:
+            subreddit_items = by_subreddit.get(item["data"]["subreddit"].lower())
+            if subreddit_items is not None:
+                subreddit_items.append(item)
+        states = []
+        for source in sources:
+            items = by_subreddit[source.subreddit.lower()]
+            if len(children) >= cls.LISTING_LIMIT and not any(
+                    source.item_to_key(item) in source.key_history for item in items
+            ):
+                items = source.current_state()
+            states.append(items)
+        return states
+
     def item_to_key(self, item: Dict) -> hallo.modules.subscriptions.stream_source.Key:
         return item["data"]["name"]
 
+    def enrichment_url(self, item: Dict) -> Optional[str]:
+        url = item["data"]["url"]
+        if _is_media_url(url) or _get_direct_url(url, item) is not None:
+            return None
+        return _redgifs_page_url(url)
+
+    def enrich(self, item: Dict, url: str) -> Optional[str]:
+        return _direct_url_red(url)
+
+    def enriched_item_to_event(
+            self, server: Server, channel: Optional[Channel], user: Optional[User],
+            item: Dict, enrichment: str
+    ) -> EventMessage:
+        return self._item_to_event(server, channel, user, item, enrichment)
+
     def item_to_event(
             self, server: Server, channel: Optional[Channel], user: Optional[User],
             item: Dict
+    ) -> EventMessage:
+        return self._item_to_event(server, channel, user, item, _get_direct_url(item["data"]["url"], item))
+
+    def _item_to_event(
+            self, server: Server, channel: Optional[Channel], user: Optional[User],
+            item: Dict, direct_url: Optional[str]
     ) -> EventMessage:
         link = "https://reddit.com/r/{}/comments/{}/".format(
             self.subreddit, item["data"]["id"]
@@ -104,9 +182,8 @@ class RedditSource(hallo.modules.subscriptions.stream_source.StreamSource[Dict])
         author_link = "https://www.reddit.com/user/{}".format(author)
         url = item["data"]["url"]
         # Check if link is direct to a media file, if so, add photo to output message
-        file_extension = url.split(".")[-1].lower()
-        if file_extension in ["png", "jpg", "jpeg", "bmp", "gif", "mp4", "gifv"]:
-            if file_extension == "gifv":
+        if _is_media_url(url):
+            if url.lower().endswith(".gifv"):
                 url = url[:-4] + "mp4"
             # Make output message
             output = (
@@ -119,9 +196,7 @@ class RedditSource(hallo.modules.subscriptions.stream_source.StreamSource[Dict])
             )
             output_evt.formatting = EventMessage.Formatting.HTML
             return output_evt
-        # Handle external sites we can embed
-        direct_url = _get_direct_url(url, item)
-        # If a direct url was found, send that
+        # If a direct url was found for an external site we can embed, send that
         if direct_url is not None:
             output = (
                 f"Update on /r/{Commons.html_escape(self.subreddit)}/ subreddit. "
@@ -182,7 +257,7 @@ class RedditSource(hallo.modules.subscriptions.stream_source.StreamSource[Dict])
         return {
             "type": self.type_name,
             "subreddit": self.subreddit,
-            "last_keys": self.last_keys
+            "last_keys": self.key_history.to_json()
         }
 
 
@@ -1,6 +1,7 @@
 import hashlib
 import re
-from typing import List, Dict, Optional
+from typing import Any, Hashable, Iterator, List, Dict, Optional
+from urllib.parse import urlparse
 from xml.etree import ElementTree
 
 from bs4 import BeautifulSoup
@@ -11,27 +12,86 @@ from hallo.inc.commons import Commons
 import hallo.modules.subscriptions.stream_source
 from hallo.server import Server
 
+ATOM = "{http://www.w3.org/2005/Atom}"
+
 
 def _get_item_title(feed_item: ElementTree.Element) -> str:
     title_elem = feed_item.find("title")
     if title_elem is not None:
         return title_elem.text
-    return feed_item.find("{http://www.w3.org/2005/Atom}title").text
+    return feed_item.find(f"{ATOM}title").text
 
 
 def get_rss_item_link(feed_item: ElementTree.Element) -> str:
     link_elem = feed_item.find("link")
     if link_elem is not None:
         return link_elem.text
-    return feed_item.find("{http://www.w3.org/2005/Atom}link").get("href")
+    return feed_item.find(f"{ATOM}link").get("href")
+
+
+class FeedReader:
+    """
+    Reads the items of an RSS or Atom feed incrementally, as they are iterated over, so that a poll which only needs
+    the newest items does not parse the whole feed. Items are detached from the document as they are read, so the
+    document is never built up in memory, but read items are kept, so the feed can be iterated over more than once.
+    """
+
+    CHUNK_SIZE = 65536
+
+    def __init__(self, rss_data: str) -> None:
+        self._data: Optional[str] = rss_data
+        self._offset = 0
+        self._parser = ElementTree.XMLPullParser(events=("start", "end"))
+        self._stack: List[ElementTree.Element] = []
+        self._items: List[ElementTree.Element] = []
+        self._title: Optional[str] = None
+        self._title_found = False
 
+    @property
+    def title(self) -> str:
+        while not self._title_found and self._read():
+            pass
+        return self._title if self._title is not None else "No title"
 
-def _get_feed_items(rss_elem: ElementTree.Element) -> List[ElementTree.Element]:
-    channel_elem = rss_elem.find("channel")
-    if channel_elem is not None:
-        return channel_elem.findall("item")
-    else:
-        return rss_elem.findall("{http://www.w3.org/2005/Atom}entry")
+    def __iter__(self) -> Iterator[ElementTree.Element]:
+        index = 0
+        while True:
+            while index < len(self._items):
+                yield self._items[index]
+                index += 1
+            if not self._read():
+                return
+
+    def _read(self) -> bool:
+        """
+        Parses the next chunk of the feed.
+        :return: Whether there was any of the feed left to parse
+        """
+        if self._data is None:
+            return False
+        if self._offset < len(self._data):
+            self._parser.feed(self._data[self._offset:self._offset + self.CHUNK_SIZE])
+            self._offset += self.CHUNK_SIZE
+        else:
+            self._parser.close()
+            self._data = None
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                self._stack.append(elem)
+                continue
+            self._stack.pop()
+            depth = len(self._stack)
+            parent = self._stack[-1] if self._stack else None
+            in_channel = depth == 2 and parent.tag == "channel"
+            if (in_channel and elem.tag == "item") or (depth == 1 and elem.tag == f"{ATOM}entry"):
+                self._items.append(elem)
+                parent.remove(elem)
+            elif not self._title_found and (
+                    (in_channel and elem.tag == "title") or (depth == 1 and elem.tag == f"{ATOM}title")
+            ):
+                self._title = elem.text
+                self._title_found = True
+        return True
 
 
 class RssSource(hallo.modules.subscriptions.stream_source.StreamSource[ElementTree.Element]):
@@ -42,37 +102,40 @@ class RssSource(hallo.modules.subscriptions.stream_source.StreamSource[ElementTr
             self,
             url: str,
             feed_title: Optional[str] = None,
-            last_keys: Optional[List[hallo.modules.subscriptions.stream_source.Key]] = None
+            last_keys: Optional[hallo.modules.subscriptions.stream_source.LastKeys] = None
     ):
         super().__init__(last_keys)
         self.url = url
+        self._last_items: Optional[FeedReader] = None
         if feed_title is None:
             feed_title = self._get_feed_title()
         self.feed_title = feed_title
 
     def _get_feed_title(self) -> str:
-        rss_data = self.get_rss_data()
-        rss_elem = ElementTree.fromstring(rss_data)
-        channel_elem = rss_elem.find("channel")
-        title = None
-        if channel_elem is not None:
-            # Update title
-            title_elem = channel_elem.find("title")
-        else:
-            title_elem = rss_elem.find("{http://www.w3.org/2005/Atom}title")
-        if title_elem is not None:
-            title = title_elem.text
-        return title if title is not None else "No title"
+        return FeedReader(self.get_rss_data()).title
 
-    def get_rss_data(self) -> str:
-        headers = None
+    def get_host(self) -> str:
+        return urlparse(self.url).netloc.lower() or self.type_name
+
+    def get_fetch_key(self) -> Hashable:
+        return "rss", self.url
+
+    def share_state(self, fetched_by: 'RssSource', state: FeedReader) -> None:
+        self.feed_title = fetched_by.feed_title
+        self._last_items = state
+
+    def _get_headers(self) -> Optional[List[List[str]]]:
         # Tumblr feeds need "GoogleBot" in the URL, or they'll give a GDPR notice
         if "tumblr.com" in self.url:
-            headers = [
+            return [
                 ["User-Agent", "Hallo IRCBot hallo@dr-spangle.com (GoogleBot/4.5.1)"]
             ]
-        # Actually get the data
-        rss_data = Commons.load_url_string(self.url, headers)
+        return None
+
+    def get_rss_data(self) -> str:
+        return self._fix_rss_data(Commons.load_url_string(self.url, self._get_headers()))
+
+    def _fix_rss_data(self, rss_data: str) -> str:
         # PHDComics doesn't always escape ampersands correctly
         if "phdcomics" in self.url:
             rss_data = rss_data.replace("& ", "&amp; ")
@@ -81,12 +144,16 @@ class RssSource(hallo.modules.subscriptions.stream_source.StreamSource[ElementTr
             rss_data = rss_data[2:]
         return rss_data
 
-    def current_state(self) -> List[ElementTree.Element]:
-        rss_data = self.get_rss_data()
-        rss_elem = ElementTree.fromstring(rss_data)
+    def current_state(self) -> FeedReader:
+        resp = Commons.load_url_conditional(self.url, self._get_headers())
+        # If the feed has not been modified, there is no need to parse it again
+        if resp.not_modified and self._last_items is not None:
+            return self._last_items
+        feed = FeedReader(self._fix_rss_data(resp.text))
         # Update title
-        self.feed_title = self._get_feed_title()
-        return _get_feed_items(rss_elem)
+        self.feed_title = feed.title
+        self._last_items = feed
+        return feed
 
     def item_to_key(self, item: ElementTree.Element) -> hallo.modules.subscriptions.stream_source.Key:
         item_guid_elem = item.find("guid")
@@ -117,47 +184,27 @@ class RssSource(hallo.modules.subscriptions.stream_source.StreamSource[ElementTr
         output_evt = EventMessage(server, channel, user, output, inbound=False)
         return output_evt
 
-    def _format_custom_sites(
-            self, server: Server, channel: Optional[Channel], user: Optional[User],
-            item: ElementTree.Element
-    ) -> Optional[EventMessage]:
+    def enrichment_url(self, item: ElementTree.Element) -> Optional[str]:
         if "xkcd.com" in self.url:
-            item_title = item.find("title").text
-            item_link = item.find("link").text
-            comic_number = item_link.strip("/").split("/")[-1]
-            json_link = f"https://xkcd.com/{comic_number}/info.0.json"
-            comic_json = Commons.load_url_json(json_link)
-            alt_text = comic_json["alt"]
-            output = f'Update on "{self.feed_title}" RSS feed. "{item_title}" {item_link}\nAlt text: {alt_text}'
-            return EventMessage(server, channel, user, output, inbound=False)
-        if "awoocomic" in self.feed_title:
-            item_title = item.find("title").text
-            if " - " in item_title:
-                item_title = item_title.split(" - ")[0]
-            item_link = item.find("link").text
-            output = f'Update on "{self.feed_title}" RSS feed. "{item_title}" {item_link}'
-            return EventMessage(server, channel, user, output, inbound=False)
+            comic_number = item.find("link").text.strip("/").split("/")[-1]
+            return f"https://xkcd.com/{comic_number}/info.0.json"
         if "smbc-comics.com" in self.url:
-            item_title = item.find("title").text
-            item_link = item.find("link").text
-            page_code = Commons.load_url_string(item_link)
-            soup = BeautifulSoup(page_code, "html.parser")
+            return item.find("link").text
+        if "rss.app" in self.url:
+            return get_rss_item_link(item)
+        return None
+
+    def enrich(self, item: ElementTree.Element, url: str) -> Optional[Any]:
+        if "xkcd.com" in self.url:
+            comic_json = Commons.load_url_json(url)
+            return comic_json["alt"]
+        if "smbc-comics.com" in self.url:
+            soup = BeautifulSoup(Commons.load_url_string(url), "html.parser")
             comic_img = soup.select_one("img#cc-comic")
-            alt_text = comic_img["title"]
             after_comic_img = soup.select_one("#aftercomic img")
-            return EventMessageWithPhoto(
-                server,
-                channel,
-                user,
-                f'Update on "{self.feed_title}" RSS feed. "{item_title}" {item_link}\nAlt text: {alt_text}',
-                [comic_img["src"], after_comic_img["src"]],
-                inbound=False
-            )
+            return comic_img["title"], [comic_img["src"], after_comic_img["src"]]
         if "rss.app" in self.url:
-            item_title = _get_item_title(item)
-            item_link = get_rss_item_link(item)
-            page_code = Commons.load_url_string(item_link)
-            soup = BeautifulSoup(page_code, "html.parser")
+            soup = BeautifulSoup(Commons.load_url_string(url), "html.parser")
             head_script = soup.select_one("head script")
             if head_script is None:
                 return None
@@ -165,7 +212,43 @@ class RssSource(hallo.modules.subscriptions.stream_source.StreamSource[ElementTr
             url_result = url_regex.search(head_script.text)
             if url_result is None:
                 return None
-            output = f'Update on "{self.feed_title}" RSS feed. "{item_title}" {url_result.group(1)}'
+            return url_result.group(1)
+        return None
+
+    def enriched_item_to_event(
+            self, server: Server, channel: Optional[Channel], user: Optional[User],
+            item: ElementTree.Element, enrichment: Any
+    ) -> EventMessage:
+        item_title = _get_item_title(item)
+        item_link = get_rss_item_link(item)
+        if "xkcd.com" in self.url:
+            output = f'Update on "{self.feed_title}" RSS feed. "{item_title}" {item_link}\nAlt text: {enrichment}'
+            return EventMessage(server, channel, user, output, inbound=False)
+        if "smbc-comics.com" in self.url:
+            alt_text, image_urls = enrichment
+            return EventMessageWithPhoto(
+                server,
+                channel,
+                user,
+                f'Update on "{self.feed_title}" RSS feed. "{item_title}" {item_link}\nAlt text: {alt_text}',
+                image_urls,
+                inbound=False
+            )
+        if "rss.app" in self.url:
+            output = f'Update on "{self.feed_title}" RSS feed. "{item_title}" {enrichment}'
+            return EventMessage(server, channel, user, output, inbound=False)
+        return self.item_to_event(server, channel, user, item)
+
+    def _format_custom_sites(
+            self, server: Server, channel: Optional[Channel], user: Optional[User],
+            item: ElementTree.Element
+    ) -> Optional[EventMessage]:
+        if "awoocomic" in self.feed_title:
+            item_title = item.find("title").text
+            if " - " in item_title:
+                item_title = item_title.split(" - ")[0]
+            item_link = item.find("link").text
+            output = f'Update on "{self.feed_title}" RSS feed. "{item_title}" {item_link}'
             return EventMessage(server, channel, user, output, inbound=False)
         if "nitter.net" in self.url:
             item_title = _get_item_title(item)
@@ -204,5 +287,5 @@ class RssSource(hallo.modules.subscriptions.stream_source.StreamSource[ElementTr
             "type": self.type_name,
             "url": self.url,
             "title": self.feed_title,
-            "last_keys": self.last_keys
+            "last_keys": self.key_history.to_json()
         }
@@ -23,7 +23,7 @@ class TwitterSource(hallo.modules.subscriptions.source_rss.RssSource):
             self,
             handle: str,
             extra: Optional[str],
-            last_keys: Optional[List[hallo.modules.subscriptions.stream_source.Key]] = None
+            last_keys: Optional[hallo.modules.subscriptions.stream_source.LastKeys] = None
     ):
         url = f"https://nitter.net/{handle}/rss"
         if extra is not None:
@@ -80,5 +80,5 @@ class TwitterSource(hallo.modules.subscriptions.source_rss.RssSource):
             "type": self.type_name,
             "handle": self.handle,
             "extra": self.extra,
-            "last_keys": self.last_keys
+            "last_keys": self.key_history.to_json()
         }
@@ -1,42 +1,97 @@
 from abc import abstractmethod
-from typing import TypeVar, Union, List, Generic, Optional
+from datetime import timedelta
+from functools import partial
+from typing import Any, TypeVar, List, Generic, Optional, Iterable, Tuple
 
 from hallo.destination import Channel, User
 from hallo.events import EventMessage
+import hallo.modules.subscriptions.enrichment
+import hallo.modules.subscriptions.key_history
 import hallo.modules.subscriptions.source
 from hallo.server import Server
 
 Item = TypeVar("Item")
-Key = Union[str, int]
+Key = hallo.modules.subscriptions.key_history.Key
+LastKeys = hallo.modules.subscriptions.key_history.LastKeys
 
 
 class StreamSource(hallo.modules.subscriptions.source.Source[List[Item], List[Item]], Generic[Item]):
-    def __init__(self, last_keys: Optional[List[Key]]):
+    KEY_HISTORY_COUNT = 1000  # Maximum number of keys of seen items to keep
+    KEY_HISTORY_AGE = timedelta(days=30)  # How long to keep the keys of items which are no longer seen
+    ENRICH_WORKERS = 4  # Maximum number of enrichments to fetch at once
+    ENRICH_PER_HOST = 2  # Maximum number of enrichments to fetch at once from any one host
+    ENRICH_TIMEOUT = 15  # Seconds to wait for the enrichments of each update, items are sent without late ones
+    enrichment_cache = hallo.modules.subscriptions.enrichment.EnrichmentCache()
+
+    def __init__(self, last_keys: Optional[LastKeys]):
+        """
+        :param last_keys: Keys of previously seen items, as a list of keys, newest first, or as key history JSON
+        """
         super().__init__()
-        self.last_keys: List[Key] = last_keys or []
+        self.key_history = self._new_key_history(last_keys)
+
+    def _new_key_history(
+            self, last_keys: Optional[LastKeys]
+    ) -> hallo.modules.subscriptions.key_history.KeyHistory:
+        return hallo.modules.subscriptions.key_history.KeyHistory.from_json(
+            last_keys, self.KEY_HISTORY_COUNT, self.KEY_HISTORY_AGE
+        )
+
+    @property
+    def last_keys(self) -> List[Key]:
+        """Keys of previously seen items, most recently seen first"""
+        return self.key_history.keys()
+
+    @last_keys.setter
+    def last_keys(self, last_keys: Optional[LastKeys]) -> None:
+        self.key_history = self._new_key_history(last_keys)
 
     @abstractmethod
     def current_state(self) -> List[Item]:
         pass
 
-    def state_change(self, state: List[Item]) -> List[Item]:
+    SEEN_RUN_LENGTH = 5  # Number of previously-seen items in a row after which the rest of a state is not read
+
+    def _read_state(self, state: Iterable[Item]) -> Tuple[List[Item], List[Key]]:
+        """
+        Reads items from the start of a state, up to a run of previously-seen items, so that a state which is parsed
+        lazily need not be parsed beyond the items which might be new.
+        :return: List of items read, and list of their keys
+        """
+        items = []
+        keys = []
+        seen_run = 0
+        for item in state:
+            key = self.item_to_key(item)
+            items.append(item)
+            keys.append(key)
+            if key in self.key_history:
+                seen_run += 1
+                if seen_run >= self.SEEN_RUN_LENGTH:
+                    break
+            else:
+                seen_run = 0
+        return items, keys
+
+    def state_change(self, state: Iterable[Item]) -> List[Item]:
         # If no last keys, All state is update
-        if not self.last_keys:
-            return state
+        if not self.key_history:
+            return list(state)
         # Otherwise, get all the items before the last of the previously-seen keys.
+        items, keys = self._read_state(state)
         new_items = []
         batch = []
-        for item in state:
-            key = self.item_to_key(item)
-            if key in self.last_keys:
+        for item, key in zip(items, keys):
+            if key in self.key_history:
                 new_items += batch
                 batch = []
             else:
                 batch.append(item)
         return new_items
 
-    def save_state(self, state: List[Item]) -> None:
-        self.last_keys = [self.item_to_key(item) for item in state]
+    def save_state(self, state: Iterable[Item]) -> None:
+        items, keys = self._read_state(state)
+        self.key_history.add(keys)
 
     def events(
             self,
@@ -45,7 +100,53 @@ class StreamSource(hallo.modules.subscriptions.source.Source[List[Item], List[It
             user: Optional[User],
             update: List[Item]
     ) -> List[EventMessage]:
-        return [self.item_to_event(server, channel, user, item) for item in update[::-1]]
+        enrich_urls = [self.enrichment_url(item) for item in update]
+        enrichments = hallo.modules.subscriptions.enrichment.enrich_all(
+            [
+                ((self.type_name, url), url, partial(self.enrich, item, url))
+                for item, url in zip(update, enrich_urls)
+                if url is not None
+            ],
+            self.enrichment_cache,
+            self.ENRICH_WORKERS,
+            self.ENRICH_PER_HOST,
+            self.ENRICH_TIMEOUT,
+        )
+        events = []
+        for item, url in zip(update[::-1], enrich_urls[::-1]):
+            enrichment = enrichments.get((self.type_name, url))
+            if enrichment is None:
+                events.append(self.item_to_event(server, channel, user, item))
+            else:
+                events.append(self.enriched_item_to_event(server, channel, user, item, enrichment))
+        return events
+
+    def enrichment_url(self, item: Item) -> Optional[str]:
+        """
+        Returns the URL of any extra data to fetch to create a fuller event for an item, or None if there is none.
+        Enrichments are fetched concurrently when creating events, and cached by this URL.
+        """
+        return None
+
+    def enrich(self, item: Item, url: str) -> Optional[Any]:
+        """
+        Fetches the extra data to create a fuller event for an item, given by enrichment_url(). If this returns None,
+        fails, or takes too long, the item's event is created by item_to_event() instead.
+        """
+        return None
+
+    def enriched_item_to_event(
+            self,
+            server: Server,
+            channel: Optional[Channel],
+            user: Optional[User],
+            item: Item,
+            enrichment: Any
+    ) -> EventMessage:
+        """
+        Creates the event for an item, using the extra data fetched by enrich()
+        """
+        return self.item_to_event(server, channel, user, item)
 
     @abstractmethod
     def item_to_key(self, item: Item) -> Key:
@@ -1,4 +1,5 @@
 import logging
+import random
 from datetime import timedelta, datetime
 from typing import Dict, Optional, Type
 
@@ -8,6 +9,7 @@ import isodate
 from hallo.destination import Destination, Channel, User
 from hallo.events import EventMessage
 from hallo.hallo import Hallo
+from hallo.inc.http_client import RateLimitedError
 import hallo.modules.subscriptions.source
 import hallo.modules.subscriptions.subscription_factory
 import hallo.modules.subscriptions.subscription_exception
@@ -18,6 +20,12 @@ logger = logging.getLogger(__name__)
 
 
 class Subscription:
+    UPDATE_GAP_WEIGHT = 0.3  # Weight given to the latest gap between updates, in the average gap between updates
+    ADAPTIVE_FRACTION = 0.25  # Fraction of the expected gap between updates to wait between checks, in adaptive mode
+    JITTER = 0.1  # Fraction by which to randomly vary the wait between checks, in adaptive mode
+    MAX_ERROR_BACKOFF = 8  # Maximum number of times to double the wait between checks after errors, in adaptive mode
+    FAILED_RETRY_DELAY = timedelta(minutes=1)  # Wait before retrying a failed check, unless in adaptive mode
+
     def __init__(
             self,
             server: Server,
@@ -25,14 +33,28 @@ class Subscription:
             source: 'hallo.modules.new_subscriptions.source.Source',
             period: timedelta,
             last_check: Optional[datetime],
-            last_update: Optional[datetime]
+            last_update: Optional[datetime],
+            max_period: Optional[timedelta] = None
     ):
+        """
+        :param period: Time between checks, or the minimum time between checks, in adaptive mode
+        :param max_period: Maximum time between checks, if the subscription is in adaptive mode
+        """
         self.server: Server = server
         self.destination: Destination = destination
         self.source: hallo.modules.subscriptions.source.Source = source
         self.period: timedelta = period
         self.last_check: Optional[datetime] = last_check
         self.last_update: Optional[datetime] = last_update
+        self.max_period: Optional[timedelta] = max_period
+        self.next_check: Optional[datetime] = None
+        self.first_check: Optional[datetime] = None
+        self.update_gap: Optional[timedelta] = None  # Moving average of the time between updates
+        self.error_count: int = 0  # Number of checks which have failed in a row
+
+    @property
+    def is_adaptive(self) -> bool:
+        return self.max_period is not None
 
     @classmethod
     def create_from_input(
@@ -49,16 +71,34 @@ class Subscription:
         argument = input_evt.command_args.strip()
         split_args = argument.split()
         feed_delta = timedelta(minutes=10)
+        max_delta = None
         if len(split_args) > 1:
             try:
                 feed_delta = isodate.parse_duration(split_args[-1])
                 argument = argument[:-len(split_args[-1])].strip()
+                # Two periods give the minimum and maximum period, for adaptive mode
+                if len(split_args) > 2:
+                    try:
+                        feed_delta, max_delta = isodate.parse_duration(split_args[-2]), feed_delta
+                        argument = argument[:-len(split_args[-2])].strip()
+                    except isodate.isoerror.ISO8601Error:
+                        pass
             except isodate.isoerror.ISO8601Error:
                 try:
                     feed_delta = isodate.parse_duration(split_args[0])
                     argument = argument[len(split_args[0]):].strip()
+                    if len(split_args) > 2:
+                        try:
+                            max_delta = isodate.parse_duration(split_args[1])
+                            argument = argument[len(split_args[1]):].strip()
+                        except isodate.isoerror.ISO8601Error:
+                            pass
                 except isodate.isoerror.ISO8601Error:
                     pass
+        if max_delta is not None and max_delta < feed_delta:
+            raise hallo.modules.subscriptions.subscription_exception.SubscriptionException(
+                "The maximum period between checks must not be shorter than the minimum period."
+            )
         try:
             source = source_class.from_input(argument, input_evt.user, sub_repo)
             subscription = Subscription(
@@ -67,7 +107,8 @@ class Subscription:
                 source,
                 feed_delta,
                 None,
-                None
+                None,
+                max_delta
             )
             subscription.update(False)
         except Exception as e:
@@ -77,30 +118,102 @@ class Subscription:
         return subscription
 
     def needs_check(self) -> bool:
+        if self.next_check is not None:
+            return datetime.now() >= self.next_check
         if self.last_check is None:
             return True
         if datetime.now() > self.last_check + self.period:
             return True
         return False
 
+    def get_next_check(self) -> datetime:
+        """
+        Returns when the subscription is next due to be checked
+        """
+        if self.next_check is not None:
+            return self.next_check
+        if self.last_check is None:
+            return datetime.now()
+        return self.last_check + self.period
+
     def update(self, send: bool = True) -> bool:
         """
         Update subscriptions, get new state, find the change, send messages, and save state
         :param send: Whether to send messages
         :return: Whether messages were sent
         """
-        new_state = self.source.current_state()
+        return self.apply_state(self.source.current_state(), send)
+
+    def apply_state(self, new_state, send: bool = True) -> bool:
+        """
+        Find the change from a newly fetched state, send messages, and save state
+        :param new_state: Current state of the source, from source.current_state()
+        :param send: Whether to send messages
+        :return: Whether messages were sent
+        """
         was_update = False
+        now = datetime.now()
         if send:
             update = self.source.state_change(new_state)
             if update:
                 was_update = True
-                self.last_update = datetime.now()
+                if self.last_update is not None:
+                    self._add_update_gap(now - self.last_update)
+                self.last_update = now
                 self.send(update)
         self.source.save_state(new_state)
-        self.last_check = datetime.now()
+        self.last_check = now
+        if self.first_check is None:
+            self.first_check = now
+        self.error_count = 0
+        self.next_check = now + self.check_interval(now)
         return was_update
 
+    def check_failed(self, error: Exception) -> None:
+        """
+        Records a failed check. If the server asked to wait before retrying, the next check is delayed that long. In
+        adaptive mode, the wait between checks is doubled for each failure in a row, up to the maximum period.
+        Otherwise, the check will be retried after a minute, or the period, if that is shorter.
+        :param error: Exception the check failed with
+        """
+        now = datetime.now()
+        self.error_count += 1
+        if self.is_adaptive:
+            delay = self._jitter(min(self.max_period, self.period * 2 ** min(self.error_count, self.MAX_ERROR_BACKOFF)))
+        else:
+            delay = min(self.period, self.FAILED_RETRY_DELAY)
+        if isinstance(error, RateLimitedError):
+            retry_after = self.period if error.retry_after is None else timedelta(seconds=error.retry_after)
+            delay = max(delay, retry_after)
+        self.next_check = now + delay
+
+    def check_interval(self, now: datetime) -> timedelta:
+        """
+        Returns how long to wait before the next check. In adaptive mode, this is a fraction of the expected gap
+        between updates, kept between the period and max period. The expected gap is the average gap between
+        updates, or the time since the last update, if that is longer.
+        :param now: Time of the check
+        """
+        if not self.is_adaptive:
+            return self.period
+        expected_gap = self.update_gap or timedelta(0)
+        # If there has been no update yet, the source has been quiet at least since it was first checked
+        quiet_since = self.last_update or self.first_check
+        if quiet_since is not None:
+            expected_gap = max(expected_gap, now - quiet_since)
+        interval = min(self.max_period, max(self.period, expected_gap * self.ADAPTIVE_FRACTION))
+        return self._jitter(interval)
+
+    def _jitter(self, interval: timedelta) -> timedelta:
+        # Vary the interval, so that subscriptions added at the same time do not all get checked at the same time
+        return interval * random.uniform(1 - self.JITTER, 1 + self.JITTER)
+
+    def _add_update_gap(self, gap: timedelta) -> None:
+        if self.update_gap is None:
+            self.update_gap = gap
+        else:
+            self.update_gap = self.update_gap * (1 - self.UPDATE_GAP_WEIGHT) + gap * self.UPDATE_GAP_WEIGHT
+
     def send(self, update):
         channel = self.destination if isinstance(self.destination, Channel) else None
         user = self.destination if isinstance(self.destination, User) else None
@@ -147,6 +260,10 @@ class Subscription:
         last_update = None
         if "last_update" in json_data:
             last_update = dateutil.parser.parse(json_data["last_update"])
+        # Load adaptive mode and check timing
+        max_period = None
+        if "max_period" in json_data:
+            max_period = isodate.parse_duration(json_data["max_period"])
         # Load source
         source = hallo.modules.subscriptions.subscription_factory.SubscriptionFactory.source_from_json(
             json_data["source"], destination, sub_repo
@@ -157,8 +274,16 @@ class Subscription:
             source,
             period,
             last_check,
-            last_update
+            last_update,
+            max_period
         )
+        if "next_check" in json_data:
+            subscription.next_check = dateutil.parser.parse(json_data["next_check"])
+        if "first_check" in json_data:
+            subscription.first_check = dateutil.parser.parse(json_data["first_check"])
+        if "update_gap" in json_data:
+            subscription.update_gap = isodate.parse_duration(json_data["update_gap"])
+        subscription.error_count = json_data.get("error_count", 0)
         return subscription
 
     def to_json(self) -> Dict:
@@ -173,5 +298,15 @@ class Subscription:
             json_data["last_check"] = self.last_check.isoformat()
         if self.last_update is not None:
             json_data["last_update"] = self.last_update.isoformat()
+        if self.max_period is not None:
+            json_data["max_period"] = isodate.duration_isoformat(self.max_period)
+        if self.next_check is not None:
+            json_data["next_check"] = self.next_check.isoformat()
+        if self.first_check is not None:
+            json_data["first_check"] = self.first_check.isoformat()
+        if self.update_gap is not None:
+            json_data["update_gap"] = isodate.duration_isoformat(self.update_gap)
+        if self.error_count:
+            json_data["error_count"] = self.error_count
         json_data["source"] = self.source.to_json()
         return json_data
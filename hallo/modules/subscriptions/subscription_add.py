@@ -41,7 +41,9 @@ class SubscriptionAdd(Function):
         # Help documentation, if it's just a single line, can be set here
         self.help_docs = (
             "Adds a new subscription to be checked for updates which will be posted to the current location."
-            " Format: add subscription <sub type> <sub details> <update period?>"
+            " Format: add subscription <sub type> <sub details> <update period?> <max update period?>"
+            " Given a max update period, checks are spaced out between the two periods, depending how often the"
+            " subscription updates."
         )
 
     def run(self, event: EventMessage) -> EventMessage:
@@ -76,7 +78,9 @@ class SubscriptionAdd(Function):
             # Add new subscription to list
             sub_repo.add_sub(sub_obj)
             # Save list
-            sub_repo.save_json()
+            sub_repo.save()
+        # Make sure the next check is scheduled before the new subscription is due
+        sub_check_obj.schedule_next_check(event.server.hallo)
         # Send response
         return event.create_response(
             f"Created a new {source_class.type_name} subscription for {sub_obj.source.title}"
@@ -1,10 +1,15 @@
 import logging
-from typing import Set, Type, Optional
+import time
+from functools import partial
+from typing import Any, Dict, Hashable, List, Set, Tuple
 
 from hallo.errors import SubscriptionCheckError
-from hallo.events import Event, EventMinute, EventMessage, ServerEvent
+from hallo.events import EventMessage
 from hallo.function import Function
 from hallo.hallo import Hallo
+from hallo.inc.host_pool import run_by_host
+from hallo.inc.scheduler import next_minute
+import hallo.modules.subscriptions.subscription
 import hallo.modules.subscriptions.subscription_factory
 import hallo.modules.subscriptions.subscription_repo
 
@@ -20,6 +25,11 @@ class SubscriptionCheck(Function):
     sub_words = ["sub", "subs", "subscription", "subscriptions"]
 
     NAMES_ALL = ["*", "all"]
+    FETCH_WORKERS = 8  # Maximum number of subscriptions to fetch at once
+    FETCH_PER_HOST = 2  # Maximum number of subscriptions to fetch at once from any one host
+    CHECK_DEADLINE = 50  # Seconds to wait for fetches in each check, slower fetches are discarded and retried later
+    MIN_CHECK_GAP = 30  # Minimum seconds between checks, so fetches which outlast a check are not retried straight away
+    JOB_NAME = "subscription check"  # Name of the scheduled job which checks subscriptions when they are next due
 
     def __init__(self):
         """
@@ -52,10 +62,14 @@ class SubscriptionCheck(Function):
         self.help_docs = "Checks a specified feed for updates and returns them. Format: subscription check <feed name>"
         self.subscription_repo = None
         """ :type : hallo.modules.subscriptions.subscription_repo.SubscriptionRepo | None"""
+        self._fetching: Set[
+            hallo.modules.subscriptions.subscription.Subscription
+        ] = set()  # Subscriptions being fetched, which may outlast a check
+        self.saved_fetch_count = 0  # Number of fetches saved by sharing and batching fetches
 
     def get_sub_repo(self, hallo_obj: Hallo) -> hallo.modules.subscriptions.subscription_repo.SubscriptionRepo:
         if self.subscription_repo is None:
-            self.subscription_repo = hallo.modules.subscriptions.subscription_repo.SubscriptionRepo.load_json(
+            self.subscription_repo = hallo.modules.subscriptions.subscription_repo.SubscriptionRepo.load(
                 hallo_obj
             )
         return self.subscription_repo
@@ -73,11 +87,34 @@ class SubscriptionCheck(Function):
     def save_function(self) -> None:
         """Saves the function, persistent functions only."""
         if self.subscription_repo is not None:
-            self.subscription_repo.save_json()
+            self.subscription_repo.save()
 
-    def get_passive_events(self) -> Set[Type[Event]]:
-        """Returns a list of events which this function may want to respond to in a passive way"""
-        return {EventMinute}
+    def schedule_jobs(self, hallo_obj: Hallo) -> None:
+        # Subscriptions can't be loaded until hallo has added its servers, so load them in the first check
+        hallo_obj.scheduler.schedule(self.JOB_NAME, next_minute(time.time()), self.scheduled_check, hallo_obj)
+
+    def cancel_jobs(self, hallo_obj: Hallo) -> None:
+        hallo_obj.scheduler.cancel(self.JOB_NAME)
+
+    def schedule_next_check(self, hallo_obj: Hallo) -> None:
+        """
+        Schedules the next check for when the earliest subscription is due, unless a check is scheduled sooner
+        """
+        sub_repo = self.get_sub_repo(hallo_obj)
+        with sub_repo.sub_lock:
+            next_checks = [search_sub.get_next_check() for search_sub in sub_repo.sub_list]
+        if not next_checks:
+            return
+        due = max(min(next_checks).timestamp(), time.time() + self.MIN_CHECK_GAP)
+        job = hallo_obj.scheduler.get_job(self.JOB_NAME)
+        if job is None or job.due > due:
+            hallo_obj.scheduler.schedule(self.JOB_NAME, due, self.scheduled_check, hallo_obj)
+
+    def scheduled_check(self, hallo_obj: Hallo) -> None:
+        try:
+            self.check_due(hallo_obj)
+        finally:
+            self.schedule_next_check(hallo_obj)
 
     def run(self, event: EventMessage) -> EventMessage:
         # Handy variables
@@ -102,10 +139,11 @@ class SubscriptionCheck(Function):
                 try:
                     update = search_sub.update() or update
                 except Exception as e:
+                    search_sub.check_failed(e)
                     error = SubscriptionCheckError(search_sub, e)
                     logger.error(error.get_log_line(), exc_info=e)
             # Save list
-            sub_repo.save_json()
+            sub_repo.save()
         # Output response to user
         if not update:
             return event.create_response(
@@ -115,21 +153,117 @@ class SubscriptionCheck(Function):
             f"Subscription updates were found."
         )
 
-    def passive_run(self, event: Event, hallo_obj: Hallo) -> Optional[ServerEvent]:
-        # Check through all feeds to see which need updates
+    def check_due(self, hallo_obj: Hallo) -> None:
+        """
+        Checks all the subscriptions which are due, fetching their states concurrently, and sends any updates
+        """
         sub_repo = self.get_sub_repo(hallo_obj)
+        start_time = time.monotonic()
+        # Find which feeds need updates, skipping any still being fetched from a previous check
+        with sub_repo.sub_lock:
+            due_subs = [
+                search_sub for search_sub in sub_repo.sub_list
+                if search_sub.needs_check() and search_sub not in self._fetching
+            ]
+            self._fetching.update(due_subs)
+        # Group subscriptions which would fetch the same state, so it is only fetched once
+        fetch_groups: Dict[Hashable, List[hallo.modules.subscriptions.subscription.Subscription]] = {}
+        for search_sub in due_subs:
+            fetch_key = search_sub.source.get_fetch_key()
+            fetch_groups.setdefault(search_sub if fetch_key is None else fetch_key, []).append(search_sub)
+        # Batch together fetches which sources can make in fewer requests
+        batches: List[Tuple[Hashable, ...]] = []
+        batchable: Dict[Hashable, List[Hashable]] = {}
+        for fetch_key, group in fetch_groups.items():
+            batch_key = group[0].source.get_batch_key()
+            if batch_key is None:
+                batches.append((fetch_key,))
+            else:
+                batchable.setdefault(batch_key, []).append(fetch_key)
+        for batch_fetch_keys in batchable.values():
+            source_keys = {fetch_groups[fetch_key][0].source: fetch_key for fetch_key in batch_fetch_keys}
+            source_class = type(fetch_groups[batch_fetch_keys[0]][0].source)
+            for source_batch in source_class.batch_sources(list(source_keys)):
+                batches.append(tuple(source_keys[source] for source in source_batch))
+        saved_fetches = len(due_subs) - len(batches)
+        self.saved_fetch_count += saved_fetches
+        # Fetch their states concurrently, without holding the lock
+        fetch_results = run_by_host(
+            [
+                (
+                    batch,
+                    fetch_groups[batch[0]][0].source.get_host(),
+                    partial(self._fetch_states, [fetch_groups[fetch_key] for fetch_key in batch])
+                )
+                for batch in batches
+            ],
+            self.FETCH_WORKERS,
+            self.FETCH_PER_HOST,
+            self.CHECK_DEADLINE,
+            name="subscription-check",
+        )
+        states: Dict[Hashable, Any] = {}
+        for batch, batch_states in fetch_results.results.items():
+            states.update(zip(batch, batch_states))
+        errors: Dict[Hashable, Exception] = {
+            fetch_key: error for batch, error in fetch_results.errors.items() for fetch_key in batch
+        }
+        timed_out = [fetch_key for batch in fetch_results.timed_out for fetch_key in batch]
+        not_started = [fetch_key for batch in fetch_results.not_started for fetch_key in batch]
+        fetch_keys = {
+            search_sub: fetch_key for fetch_key, group in fetch_groups.items() for search_sub in group
+        }
+        # Apply the new states in the order of the subscription list, so updates are sent in a consistent order
+        failed_count = 0
+        fetched_count = 0
         with sub_repo.sub_lock:
             logger.debug("SubCheck - Got lock")
+            for fetch_key in not_started:
+                self._fetching.difference_update(fetch_groups[fetch_key])
             for search_sub in sub_repo.sub_list:
-                # Only check those which have been too long since last check
-                if search_sub.needs_check():
-                    # Get new items
-                    try:
-                        logger.debug("SubCheck - Checking %s", search_sub.source.title)
-                        search_sub.update()
-                    except Exception as e:
-                        error = SubscriptionCheckError(search_sub, e)
-                        logger.error(error.get_log_line(), exc_info=e)
+                fetch_key = fetch_keys.get(search_sub)
+                if fetch_key in errors:
+                    failed_count += 1
+                    search_sub.check_failed(errors[fetch_key])
+                    error = SubscriptionCheckError(search_sub, errors[fetch_key])
+                    logger.error(error.get_log_line(), exc_info=errors[fetch_key])
+                if fetch_key not in states:
+                    continue
+                fetched_count += 1
+                try:
+                    fetched_by = fetch_groups[fetch_key][0].source
+                    if search_sub.source is not fetched_by:
+                        search_sub.source.share_state(fetched_by, states[fetch_key])
+                    search_sub.apply_state(states[fetch_key])
+                except Exception as e:
+                    failed_count += 1
+                    search_sub.check_failed(e)
+                    error = SubscriptionCheckError(search_sub, e)
+                    logger.error(error.get_log_line(), exc_info=e)
             # Save list
-            sub_repo.save_json()
-        return
+            sub_repo.save()
+        logger.info(
+            "Subscription check: %s due, %s fetched, %s failed, %s timed out, %s requests saved, in %.2fs",
+            len(due_subs),
+            fetched_count,
+            failed_count,
+            sum(len(fetch_groups[fetch_key]) for fetch_key in timed_out + not_started),
+            saved_fetches,
+            time.monotonic() - start_time,
+        )
+
+    def _fetch_states(
+            self, groups: List[List[hallo.modules.subscriptions.subscription.Subscription]]
+    ) -> List[Any]:
+        """
+        Fetches the current states for a batch of groups of subscriptions, where each group shares one state
+        """
+        try:
+            sources = [group[0].source for group in groups]
+            logger.debug("SubCheck - Checking %s", ", ".join(source.title for source in sources))
+            if len(sources) == 1:
+                return [sources[0].current_state()]
+            return type(sources[0]).current_states(sources)
+        finally:
+            for group in groups:
+                self._fetching.difference_update(group)
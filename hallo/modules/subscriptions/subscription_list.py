@@ -74,6 +74,11 @@ class SubscriptionList(Function):
             new_line = f"{search_item.source.type_name} - {search_item.source.title}"
             if search_item.last_update is not None:
                 new_line += f" ({search_item.last_update.isoformat()})"
+            next_check = search_item.get_next_check().replace(microsecond=0).isoformat()
+            if search_item.is_adaptive:
+                new_line += f" [next check {next_check}, adaptive]"
+            else:
+                new_line += f" [next check {next_check}]"
             sub_names.append(new_line)
         sub_names.sort()
         return event.create_response(
@@ -73,6 +73,7 @@ class SubscriptionRemove(Function):
             if len(test_subs) > 0:
                 for del_sub in test_subs:
                     sub_repo.remove_sub(del_sub)
+                sub_repo.save()
                 title_line = f"Removed {len(test_subs)} subscriptions:"
                 if len(test_subs) == 1:
                     title_line = "Removed subscription:"
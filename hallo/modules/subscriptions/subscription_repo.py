@@ -1,14 +1,17 @@
 import json
+import logging
 from threading import Lock
-from typing import List, Type, TypeVar
+from typing import List, Optional, Type, TypeVar
 
 import hallo.modules.subscriptions.subscription_exception
 from hallo.destination import Destination
 import hallo.modules.subscriptions.subscription_common
 import hallo.modules.subscriptions.subscription
 import hallo.modules.subscriptions.subscription_factory
+import hallo.modules.subscriptions.subscription_store
 from hallo.inc.commons import inherits_from
 
+logger = logging.getLogger(__name__)
 T = TypeVar("T", bound=hallo.modules.subscriptions.subscription_common.SubscriptionCommon)
 
 
@@ -21,6 +24,7 @@ class SubscriptionRepo:
         self.sub_list: List[hallo.modules.subscriptions.subscription.Subscription] = []
         self.common_list: List[hallo.modules.subscriptions.subscription_common.SubscriptionCommon] = []
         self.sub_lock: Lock = Lock()
+        self.store: Optional[hallo.modules.subscriptions.subscription_store.SubscriptionStore] = None
 
     def add_sub(self, new_sub: hallo.modules.subscriptions.subscription.Subscription) -> None:
         """
@@ -93,9 +97,54 @@ class SubscriptionRepo:
             )
         )
 
+    def save(self) -> None:
+        """
+        Saves any subscriptions and common configuration which have changed to the subscription store
+        :return: None
+        """
+        if self.store is None:
+            self.store = hallo.modules.subscriptions.subscription_store.SubscriptionStore()
+        subs = [(sub, sub.to_json()) for sub in self.sub_list]
+        common = [common_json for common_json in (common.to_json() for common in self.common_list) if common_json]
+        self.store.save(subs, common)
+
+    @staticmethod
+    def load(hallo_obj, path: str = None) -> 'SubscriptionRepo':
+        """
+        Constructs a new SubscriptionRepo from the subscription store. If there is no store yet, subscriptions are
+        imported from the JSON file, if there is one, and saved to a new store.
+        :param path: Path of the subscription store, if not the default
+        :return: Newly constructed list of subscriptions
+        """
+        store = hallo.modules.subscriptions.subscription_store.SubscriptionStore(
+            path or hallo.modules.subscriptions.subscription_store.SubscriptionStore.DEFAULT_PATH
+        )
+        if not store.exists():
+            new_sub_list = SubscriptionRepo.load_json(hallo_obj)
+            new_sub_list.store = store
+            new_sub_list.save()
+            logger.info("Imported %s subscriptions from JSON to %s", len(new_sub_list.sub_list), store.path)
+            return new_sub_list
+        new_sub_list = SubscriptionRepo()
+        new_sub_list.store = store
+        sub_rows, common_rows = store.load()
+        # Common config must be loaded first, as subscriptions use it.
+        for common_elem in common_rows:
+            new_common_obj = hallo.modules.subscriptions.subscription_factory.SubscriptionFactory.common_from_json(
+                common_elem
+            )
+            new_sub_list.common_list.append(new_common_obj)
+        for row_id, sub_elem in sub_rows:
+            new_sub_obj = hallo.modules.subscriptions.subscription.Subscription.from_json(
+                sub_elem, hallo_obj, new_sub_list
+            )
+            new_sub_list.add_sub(new_sub_obj)
+            store.track(new_sub_obj, row_id, sub_elem)
+        return new_sub_list
+
     def save_json(self) -> None:
         """
-        Saves the whole subscription list to a JSON file
+        Saves the whole subscription list to a JSON file, as an export. The subscription store is saved with save()
         :return: None
         """
         json_obj = {"subs": []}
@@ -115,7 +164,7 @@ class SubscriptionRepo:
     @staticmethod
     def load_json(hallo_obj) -> 'SubscriptionRepo':
         """
-        Constructs a new SubscriptionRepo from the JSON file
+        Constructs a new SubscriptionRepo from the JSON file. Used to import subscriptions into a new store
         :return: Newly constructed list of subscriptions
         """
         new_sub_list = SubscriptionRepo()
@@ -0,0 +1,108 @@
+import json
+import logging
+import os
+import sqlite3
+from threading import Lock
+from typing import Dict, Hashable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SubscriptionStore:
+    """
+    Stores subscriptions and common configuration in an SQLite database, in WAL mode, with one row of JSON for each.
+    The store remembers what it last saved for each subscription, and each save only writes the rows which have
+    changed, all in one transaction, so that a crash part way through a save leaves the previous save intact.
+    """
+
+    DEFAULT_PATH = "store/subscriptions.db"
+
+    def __init__(self, path: str = DEFAULT_PATH) -> None:
+        """
+        :param path: Path of the database file
+        """
+        self.path = path
+        self._lock = Lock()
+        self._saved_subs: Dict[Hashable, Tuple[int, str]] = {}  # Row id and JSON last saved, for each subscription
+        self._saved_common: List[str] = []
+        self.write_count = 0  # Number of rows written or deleted, over all saves
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS subs (id INTEGER PRIMARY KEY, data TEXT NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS common (id INTEGER PRIMARY KEY, data TEXT NOT NULL)")
+        return conn
+
+    def load(self) -> Tuple[List[Tuple[int, Dict]], List[Dict]]:
+        """
+        Loads all rows from the database
+        :return: List of subscription row ids and JSON, in the order they were added, and list of common config JSON
+        """
+        with self._lock:
+            conn = self._connect()
+            try:
+                sub_rows = conn.execute("SELECT id, data FROM subs ORDER BY id").fetchall()
+                common_rows = conn.execute("SELECT data FROM common ORDER BY id").fetchall()
+            finally:
+                conn.close()
+            self._saved_common = [data for (data,) in common_rows]
+        return [(row_id, json.loads(data)) for row_id, data in sub_rows], [json.loads(data) for (data,) in common_rows]
+
+    def track(self, sub: Hashable, row_id: int, json_data: Dict) -> None:
+        """
+        Records that a subscription was loaded from a given row, so that saves update that row.
+        :param sub: Subscription which was loaded
+        :param row_id: Id of the row it was loaded from
+        :param json_data: JSON it was loaded from
+        """
+        with self._lock:
+            self._saved_subs[sub] = (row_id, self.dumps(json_data))
+
+    @staticmethod
+    def dumps(json_data: Dict) -> str:
+        return json.dumps(json_data, sort_keys=True, separators=(",", ":"))
+
+    def save(self, subs: List[Tuple[Hashable, Dict]], common: List[Dict]) -> int:
+        """
+        Saves the subscriptions and common config, writing only the rows which have changed since the last save.
+        :param subs: List of subscriptions and their JSON, in order
+        :param common: List of common config JSON
+        :return: Number of rows written or deleted
+        """
+        with self._lock:
+            saved_subs = dict(self._saved_subs)
+            writes = 0
+            conn = self._connect()
+            try:
+                with conn:
+                    for sub, json_data in subs:
+                        data = self.dumps(json_data)
+                        saved = saved_subs.get(sub)
+                        if saved is None:
+                            cursor = conn.execute("INSERT INTO subs (data) VALUES (?)", (data,))
+                            saved_subs[sub] = (cursor.lastrowid, data)
+                            writes += 1
+                        elif saved[1] != data:
+                            conn.execute("UPDATE subs SET data = ? WHERE id = ?", (data, saved[0]))
+                            saved_subs[sub] = (saved[0], data)
+                            writes += 1
+                    current = set(sub for sub, _ in subs)
+                    for sub in [sub for sub in saved_subs if sub not in current]:
+                        conn.execute("DELETE FROM subs WHERE id = ?", (saved_subs.pop(sub)[0],))
+                        writes += 1
+                    common_data = [self.dumps(json_data) for json_data in common]
+                    if common_data != self._saved_common:
+                        conn.execute("DELETE FROM common")
+                        conn.executemany("INSERT INTO common (data) VALUES (?)", [(data,) for data in common_data])
+                        writes += len(common_data) + 1
+            finally:
+                conn.close()
+            # Only remember what was saved once the transaction has been committed
+            self._saved_subs = saved_subs
+            self._saved_common = common_data
+            self.write_count += writes
+        return writes
@@ -1,9 +1,22 @@
+import itertools
+
+_versions = itertools.count(1)
+
+
 class PermissionMask(object):
     """
     Permission mask object, stores which rights are enabled or disabled by level
     """
 
     rights_map = None
+    version = 0  # Changed whenever any right may have changed, anywhere, so that resolved rights can be cached
+
+    @staticmethod
+    def rights_changed():
+        """
+        Marks that rights may have changed, invalidating any cached rights checks
+        """
+        PermissionMask.version = next(_versions)
 
     def __init__(self):
         self.rights_map = {}
@@ -22,6 +35,7 @@ class PermissionMask(object):
         :param right: Name of the right to set
         :param value: Value to set the right to
         """
+        old_value = self.rights_map.get(right)
         if value is None and right in self.rights_map:
             del self.rights_map[right]
         try:
@@ -34,6 +48,8 @@ class PermissionMask(object):
             value = False
         if value in [True, False]:
             self.rights_map[right] = value
+        if self.rights_map.get(right) != old_value:
+            PermissionMask.rights_changed()
 
     def is_empty(self):
         """Returns a boolean representing whether the PermissionMask is "empty" or has no rights set."""
@@ -57,3 +73,89 @@ class PermissionMask(object):
         for map_right in json_obj:
             new_mask.set_right(map_right, json_obj[map_right])
         return new_mask
+
+
+class PermissionMaskAttribute(object):
+    """
+    Descriptor for the permission_mask attribute of objects with rights, which invalidates cached rights checks
+    whenever the mask is replaced
+    """
+
+    def __set_name__(self, owner, name):
+        self.attr_name = "_" + name
+
+    def __get__(self, obj, obj_type=None):
+        if obj is None:
+            return self
+        return obj.__dict__.get(self.attr_name)
+
+    def __set__(self, obj, value):
+        # Setting the first mask of a new object can't change any rights which have been checked already
+        replacing = self.attr_name in obj.__dict__
+        obj.__dict__[self.attr_name] = value
+        if replacing:
+            PermissionMask.rights_changed()
+
+
+class PermissionCache(object):
+    """
+    Cache of resolved rights checks, keyed by the right name and the server, user and channel it was checked for.
+    Entries are only used while PermissionMask.version is unchanged, so any change to any rights invalidates them all.
+    """
+
+    MAX_SIZE = 10000  # Maximum number of entries, before the cache is cleared
+
+    def __init__(self, max_size=MAX_SIZE):
+        """
+        :param max_size: Maximum number of entries to hold
+        :type max_size: int
+        """
+        self.max_size = max_size
+        self.entries = {}
+        """:type : dict[tuple, tuple]"""
+        self.version = PermissionMask.version
+        self.hits = 0
+        self.misses = 0
+
+    def check(self, right_name, server_obj, user_obj, channel_obj, resolve):
+        """
+        Returns the cached result of a rights check, or resolves and caches it
+        :param right_name: Name of the right being checked
+        :type right_name: str
+        :param server_obj: Server the right is being checked on
+        :param user_obj: User the right is being checked for
+        :param channel_obj: Channel the right is being checked in
+        :param resolve: Function which resolves the right, if it isn't cached
+        :type resolve: () -> bool
+        :rtype: bool
+        """
+        # Read the version first, so a change made while resolving is not hidden
+        version = PermissionMask.version
+        if version != self.version:
+            self.entries = {}
+            self.version = version
+        # Objects are keyed by identity, and held in the entry so that identity stays unique
+        key = (right_name, id(server_obj), id(user_obj), id(channel_obj))
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        result = resolve()
+        if len(self.entries) >= self.max_size:
+            self.entries = {}
+        self.entries[key] = (version, result, (server_obj, user_obj, channel_obj))
+        return result
+
+    def get_stats(self):
+        """
+        Returns the number of hits and misses, hit rate and size of the cache
+        :rtype: dict[str, float]
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self.entries),
+        }
@@ -1,7 +1,8 @@
 from abc import ABCMeta
+from collections import OrderedDict
 
 from hallo.destination import Channel, User
-from hallo.permission_mask import PermissionMask
+from hallo.permission_mask import PermissionMask, PermissionMaskAttribute
 
 
 class ServerException(Exception):
@@ -23,6 +24,7 @@ class Server(metaclass=ABCMeta):
     STATE_DISCONNECTING = "disconnecting"
 
     type = None
+    permission_mask = PermissionMaskAttribute()
 
     def __init__(self, hallo):
         """
@@ -179,6 +181,49 @@ class Server(metaclass=ABCMeta):
         """Returns boolean representing whether the server is connected or not."""
         return self.state == Server.STATE_OPEN
 
+    @property
+    def channel_list(self):
+        """
+        Copy of the list of channels on this server, in the order they were added, which is safe to iterate while
+        channels are added or removed. Use the get and find methods to look up a channel.
+        :rtype: list[destination.Channel]
+        """
+        return list(self._channels.values())
+
+    @channel_list.setter
+    def channel_list(self, channel_list):
+        # Channels are stored by id, as their address and name can change, and indexed into buckets by address and
+        # lower case name, so that any one channel can be removed without scanning the rest.
+        self._channels = OrderedDict()
+        """ :type : dict[int, destination.Channel]"""
+        self._channels_by_address = {}
+        """ :type : dict[str, list[destination.Channel]]"""
+        self._channels_by_name = {}
+        """ :type : dict[str, list[destination.Channel]]"""
+        for channel_obj in channel_list:
+            self.add_channel(channel_obj)
+
+    @property
+    def user_list(self):
+        """
+        Copy of the list of users on this server, in the order they were added, which is safe to iterate while users
+        are added or removed. Use the get methods to look up a user.
+        :rtype: list[destination.User]
+        """
+        return list(self._users.values())
+
+    @user_list.setter
+    def user_list(self, user_list):
+        # Stored and indexed the same way as channels
+        self._users = OrderedDict()
+        """ :type : dict[int, destination.User]"""
+        self._users_by_address = {}
+        """ :type : dict[str, list[destination.User]]"""
+        self._users_by_name = {}
+        """ :type : dict[str, list[destination.User]]"""
+        for user_obj in user_list:
+            self.add_user(user_obj)
+
     def get_channel_by_name(self, channel_name):
         """
         Returns a Channel object with the specified channel name.
@@ -186,11 +231,16 @@ class Server(metaclass=ABCMeta):
         :type channel_name: str
         :rtype: Optional[Destination.Channel]
         """
-        channel_name = channel_name.lower()
-        for channel in self.channel_list:
-            if channel.name == channel_name:
-                return channel
-        return None
+        return self._lookup(self._channels_by_name, channel_name.lower())
+
+    def find_channel_by_address(self, address):
+        """
+        Returns the Channel object with the specified address, without creating one if it doesn't exist.
+        :param address: Address of the channel
+        :type address: str
+        :rtype: Optional[destination.Channel]
+        """
+        return self._lookup(self._channels_by_address, address)
 
     def get_channel_by_address(self, address, channel_name=None):
         """
@@ -201,9 +251,9 @@ class Server(metaclass=ABCMeta):
         :type channel_name: str
         :rtype: destination.Channel
         """
-        for channel in self.channel_list:
-            if channel.address == address:
-                return channel
+        channel = self.find_channel_by_address(address)
+        if channel is not None:
+            return channel
         if channel_name is None:
             channel_name = self.get_name_by_address(address)
         new_channel = Channel(self, address, channel_name)
@@ -224,7 +274,20 @@ class Server(metaclass=ABCMeta):
         :param channel_obj: Adds a channel to the list, without joining it
         :type channel_obj: destination.Channel
         """
-        self.channel_list.append(channel_obj)
+        self._channels[id(channel_obj)] = channel_obj
+        self._index(self._channels_by_address, channel_obj.address, channel_obj)
+        self._index(self._channels_by_name, channel_obj.name.lower(), channel_obj)
+
+    def remove_channel(self, channel_obj):
+        """
+        Removes a channel from the channel list
+        :param channel_obj: Channel to remove
+        :type channel_obj: destination.Channel
+        """
+        if self._channels.pop(id(channel_obj), None) is None:
+            return
+        self._unindex(self._channels_by_address, channel_obj.address, channel_obj)
+        self._unindex(self._channels_by_name, channel_obj.name.lower(), channel_obj)
 
     def join_channel(self, channel_obj):
         """
@@ -241,7 +304,7 @@ class Server(metaclass=ABCMeta):
         :type channel_obj: destination.Channel
         """
         # If channel isn't in channel list, do nothing
-        if channel_obj not in self.channel_list:
+        if id(channel_obj) not in self._channels:
             return
         # Set channel to not AutoJoin, for the future
         channel_obj.auto_join = False
@@ -255,12 +318,8 @@ class Server(metaclass=ABCMeta):
         :type user_name: str
         :rtype: destination.User | None
         """
-        user_name = user_name.lower()
-        for user in self.user_list:
-            if user.name == user_name:
-                return user
-        # No user by that name exists, return None
-        return None
+        # Returns None if no user by that name exists
+        return self._lookup(self._users_by_name, user_name.lower())
 
     def get_user_by_address(self, address, user_name=None):
         """
@@ -271,9 +330,9 @@ class Server(metaclass=ABCMeta):
         :type user_name: str
         :return: Destination.User | None
         """
-        for user in self.user_list:
-            if user.address == address:
-                return user
+        user = self._lookup(self._users_by_address, address)
+        if user is not None:
+            return user
         if user_name is None:
             user_name = self.get_name_by_address(address)
         # No user by that name exists, so create one
@@ -291,7 +350,96 @@ class Server(metaclass=ABCMeta):
         :param user_obj: User to add to user list
         :type user_obj: destination.User
         """
-        self.user_list.append(user_obj)
+        self._users[id(user_obj)] = user_obj
+        self._index(self._users_by_address, user_obj.address, user_obj)
+        self._index(self._users_by_name, user_obj.name.lower(), user_obj)
+
+    def remove_user(self, user_obj):
+        """
+        Removes a user from the user list
+        :param user_obj: User to remove
+        :type user_obj: destination.User
+        """
+        if self._users.pop(id(user_obj), None) is None:
+            return
+        self._unindex(self._users_by_address, user_obj.address, user_obj)
+        self._unindex(self._users_by_name, user_obj.name.lower(), user_obj)
+
+    def rename_user(self, user_obj, name, address):
+        """
+        Changes the name and address of a user, such as when they change nick, keeping the user indexes up to date
+        :param user_obj: User to rename
+        :type user_obj: destination.User
+        :param name: New name of the user
+        :type name: str
+        :param address: New address of the user
+        :type address: str
+        """
+        indexed = id(user_obj) in self._users
+        if indexed:
+            self._unindex(self._users_by_address, user_obj.address, user_obj)
+            self._unindex(self._users_by_name, user_obj.name.lower(), user_obj)
+        user_obj.name = name
+        user_obj.address = address
+        if indexed:
+            self._index(self._users_by_address, address, user_obj)
+            self._index(self._users_by_name, name.lower(), user_obj)
+
+    def prune_user(self, user_obj):
+        """
+        Removes a user who has left every channel hallo can see them in from the user list, unless they need saving.
+        A fresh user object will be created if they are seen again.
+        :param user_obj: User who has parted, quit or been kicked
+        :type user_obj: destination.User
+        """
+        if user_obj.is_persistent():
+            return
+        if user_obj.memberships_list:
+            return
+        if self.nick is not None and user_obj.address == self.nick.lower():
+            return
+        self.remove_user(user_obj)
+
+    @staticmethod
+    def _lookup(index, key):
+        """
+        Returns the first destination added under a key of an index, or None
+        :type index: dict[str, list[destination.Destination]]
+        :type key: str
+        :rtype: destination.Destination | None
+        """
+        bucket = index.get(key)
+        if bucket is None:
+            return None
+        return bucket[0]
+
+    @staticmethod
+    def _index(index, key, destination_obj):
+        """
+        Adds a destination to the bucket for a key of an index
+        :type index: dict[str, list[destination.Destination]]
+        :type key: str
+        :type destination_obj: destination.Destination
+        """
+        index.setdefault(key, []).append(destination_obj)
+
+    @staticmethod
+    def _unindex(index, key, destination_obj):
+        """
+        Removes a destination from the bucket for a key of an index, leaving any other destinations with the same key
+        :type index: dict[str, list[destination.Destination]]
+        :type key: str
+        :type destination_obj: destination.Destination
+        """
+        bucket = index.get(key)
+        if bucket is None:
+            return
+        for i, other in enumerate(bucket):
+            if other is destination_obj:
+                del bucket[i]
+                break
+        if not bucket:
+            del index[key]
 
     def rights_check(self, right_name: str) -> bool:
         """
@@ -1,5 +1,6 @@
 from hallo.server import Server
 from hallo.server_irc import ServerIRC
+from hallo.server_irc_async import ServerIRCAsync
 from hallo.server_telegram import ServerTelegram
 
 
@@ -20,6 +21,8 @@ class ServerFactory:
     def new_server_from_json(self, json_obj):
         server_type = json_obj["type"]
         if server_type == Server.TYPE_IRC:
+            if json_obj.get("transport") == ServerIRCAsync.TRANSPORT:
+                return ServerIRCAsync.from_json(json_obj, self.hallo)
             return ServerIRC.from_json(json_obj, self.hallo)
         elif server_type == Server.TYPE_TELEGRAM:
             return ServerTelegram.from_json(json_obj, self.hallo)
@@ -24,6 +24,10 @@ from hallo.events import (
 from hallo.permission_mask import PermissionMask
 from hallo.server import Server, ServerException
 from hallo.inc.commons import Commons
+from hallo.inc.irc_message import IRCMessage
+from hallo.inc.line_buffer import LineBuffer, decode_line
+from hallo.inc.send_queue import SendQueue
+from hallo.inc.worker_pool import WorkerPool
 
 endl = "\r\n"
 logger = logging.getLogger(__name__)
@@ -31,6 +35,11 @@ logger = logging.getLogger(__name__)
 
 class ServerIRC(Server):
     MAX_MSG_LENGTH = 462
+    DEFAULT_WORKER_COUNT = 8
+    DEFAULT_MAX_QUEUE_DEPTH = 1000
+    DEFAULT_SEND_BURST = 5
+    DEFAULT_SEND_RATE = 0.5
+    SEND_FLUSH_TIMEOUT = 2  # Seconds to wait for a QUIT to be sent before closing the connection
     type = Server.TYPE_IRC
 
     def __init__(self, hallo, server_name=None, server_url=None, server_port=6667):
@@ -57,8 +66,15 @@ class ServerIRC(Server):
             "STATUS"  # Command to send to nickserv to check if a user is identified
         )
         self.nickserv_ident_response = "\\b3\\b"  # Regex to search for to validate identity in response to IdentCommand
+        self.worker_count = self.DEFAULT_WORKER_COUNT  # Number of threads to process lines from the server on
+        self.max_queue_depth = self.DEFAULT_MAX_QUEUE_DEPTH  # Number of lines to queue before dropping passive lines
+        self.send_burst = self.DEFAULT_SEND_BURST  # Number of lines which can be sent at once without being throttled
+        self.send_rate = self.DEFAULT_SEND_RATE  # Lines per second which can be sent once the burst is used up
         # IRC specific dynamic variables
         self._socket = None  # Socket to communicate to the server
+        self._line_buffer = LineBuffer()  # Buffer of data read from the socket, split into lines
+        self._worker_pool = None  # Pool of worker threads which received lines are processed on
+        self._send_queue = None  # Queue of lines waiting to be written to the server
         self._welcome_message = (
             ""  # Server's welcome message when connecting. MOTD and all.
         )
@@ -82,6 +98,19 @@ class ServerIRC(Server):
             None  # Boolean, whether or not the user is identified
         )
         self._connect_lock = RLock()
+        self._message_handlers = {
+            "PING": (self.parse_line_ping, "ping"),
+            "PONG": (None, "pong"),
+            "PRIVMSG": (self.parse_line_message, "message"),
+            "JOIN": (self.parse_line_join, "join"),
+            "PART": (self.parse_line_part, "part"),
+            "QUIT": (self.parse_line_quit, "quit"),
+            "MODE": (self.parse_line_mode, "mode"),
+            "NOTICE": (self.parse_line_notice, "notice"),
+            "NICK": (self.parse_line_nick, "nick"),
+            "INVITE": (self.parse_line_invite, "invite"),
+            "KICK": (self.parse_line_kick, "kick"),
+        }  # Handler method and line type for each command received from the server
         if server_name is not None:
             self.name = server_name
         if server_url is not None:
@@ -96,6 +125,12 @@ class ServerIRC(Server):
             raise ServerException("Already started.")
         self.state = Server.STATE_CONNECTING
         with self._connect_lock:
+            self._worker_pool = WorkerPool(
+                "irc-{}".format(self.name), self.worker_count, self.max_queue_depth
+            )
+            self._worker_pool.start()
+            self._send_queue = SendQueue(self.send_burst, self.send_rate)
+            Thread(target=self.run_writer, args=(self._send_queue,)).start()
             Thread(target=self.run).start()
 
     def connect(self):
@@ -137,6 +172,10 @@ class ServerIRC(Server):
         # Create new socket
         self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self._socket.settimeout(5)
+        self._line_buffer.clear()
+        # Lines queued for the previous connection should not be sent on this one
+        if self._send_queue is not None:
+            self._send_queue.clear()
         try:
             # Connect to socket
             self._socket.connect((self.server_address, self.server_port))
@@ -155,34 +194,58 @@ class ServerIRC(Server):
         # If first line is null, that means connection was closed.
         if first_line is None:
             raise ServerException
-        self._welcome_message = first_line + "\n"
-        # Send nick and full name to server
-        logger.info(
-            "Sending nick and user info to server: {}".format(self.name)
-        )
-        self.send_raw("NICK {}".format(self.get_nick()))
-        self.send_raw("USER {}".format(self.get_full_name()))
+        self.begin_login(first_line)
         # Wait for MOTD to end
         while self.state == Server.STATE_CONNECTING:
             next_welcome_line = self.read_line_from_socket()
             if next_welcome_line is None:
                 raise ServerException
-            self._welcome_message += next_welcome_line + "\n"
-            if (
-                "376" in next_welcome_line
-                or "endofmessage" in next_welcome_line.replace(" ", "").lower()
-            ):
+            if self.parse_welcome_line(next_welcome_line):
                 break
-            if next_welcome_line.split()[0] == "PING":
-                self.parse_line_ping(next_welcome_line)
-            if (
-                len(next_welcome_line.split()[1]) == 3
-                and next_welcome_line.split()[1].isdigit()
-            ):
-                self.parse_line_numeric(next_welcome_line, False)
         # Check we're still connecting
         if self.state != Server.STATE_CONNECTING:
             return
+        self.finish_login()
+
+    def begin_login(self, first_line):
+        """
+        Internal method, handles the first line from the server, and sends nick and user info to log in.
+        :param first_line: First line received from the server after connecting
+        :type first_line: str
+        """
+        self._welcome_message = first_line + "\n"
+        # Send nick and full name to server
+        logger.info(
+            "Sending nick and user info to server: {}".format(self.name)
+        )
+        self.send_raw("NICK {}".format(self.get_nick()))
+        self.send_raw("USER {}".format(self.get_full_name()))
+
+    def parse_welcome_line(self, welcome_line):
+        """
+        Internal method, handles a line received while waiting for the MOTD to end.
+        :param welcome_line: Line received from the server
+        :type welcome_line: str
+        :return: Whether the MOTD has ended
+        :rtype: bool
+        """
+        self._welcome_message += welcome_line + "\n"
+        message = IRCMessage.parse(welcome_line.replace("\r", ""))
+        if message is None:
+            return False
+        # RPL_ENDOFMOTD, or ERR_NOMOTD if the server has no MOTD
+        if message.command in ["376", "422"]:
+            return True
+        if message.command == "PING":
+            self.parse_line_ping(message)
+        elif message.is_numeric():
+            self.parse_line_numeric(message, False)
+        return False
+
+    def finish_login(self):
+        """
+        Internal method, identifies with nickserv and joins channels, once the MOTD has ended.
+        """
         # Identify with nickserv
         if self.nickserv_pass:
             ident_evt = EventMessage(
@@ -194,7 +257,7 @@ class ServerIRC(Server):
                 "IDENTIFY {}".format(self.nickserv_pass),
                 inbound=False,
             )
-            self.send(ident_evt)
+            self.send(ident_evt, SendQueue.PRIORITY_NORMAL)
         # Join channels
         logger.info(
             "Joining channels on {}, identifying.".format(self.name)
@@ -226,6 +289,8 @@ class ServerIRC(Server):
             try:
                 quit_evt = EventQuit(self, None, quit_message, inbound=False)
                 self.send(quit_evt)
+                if self._send_queue is not None:
+                    self._send_queue.flush(self.SEND_FLUSH_TIMEOUT)
             except Exception as e:
                 error = ExceptionError(
                     'Failed to send quit message on "{}" IRC server'.format(self.name),
@@ -252,6 +317,8 @@ class ServerIRC(Server):
         Method to read from stream and process. Will connect and call internal parsing methods or whatnot.
         Needs to be started in it's own thread, only exits when the server connection ends
         """
+        worker_pool = self._worker_pool
+        send_queue = self._send_queue
         with self._connect_lock:
             self.connect()
             while self.state == Server.STATE_OPEN:
@@ -278,57 +345,209 @@ class ServerIRC(Server):
                     continue
                 else:
                     # Parse line
-                    Thread(target=self.parse_line, args=(next_line,)).start()
+                    self.queue_line(next_line)
         self.disconnect()
+        worker_pool.stop()
+        send_queue.close()
+
+    def run_writer(self, send_queue):
+        """
+        Internal method
+        Writes lines from the send queue to the socket, as the flood limit allows. Needs to be started in its own
+        thread, exits when the send queue is closed.
+        :param send_queue: Queue of lines to send
+        :type send_queue: SendQueue
+        """
+        while True:
+            batch = send_queue.next_batch()
+            if batch is None:
+                return
+            try:
+                self.write_batch(batch)
+            finally:
+                send_queue.batch_sent()
+
+    def write_batch(self, batch):
+        """
+        Internal method, writes a batch of lines to the socket in one go. Lines are dropped if there is no connection.
+        :param batch: Encoded lines to send
+        :type batch: list[bytes]
+        """
+        sock = self._socket
+        if sock is None:
+            return
+        try:
+            sock.sendall(b"".join(batch))
+        except OSError as e:
+            error = ExceptionError(
+                'Failed to send data to "{}" IRC server'.format(self.name), e, self
+            )
+            logger.error(error.get_log_line())
+
+    def queue_line(self, new_line):
+        """
+        Queues a line from the server to be parsed by the worker pool, after any earlier lines from the server
+        :param new_line: Line of data from the server to parse
+        :type new_line: str
+        """
+        message = IRCMessage.parse(new_line.replace("\r", ""))
+        if message is None:
+            self._worker_pool.submit((self.name, ""), self.parse_line, new_line)
+            return
+        queue_key, priority = self.get_message_queue_key(message)
+        # Worker pools may be shared between servers, so include the server in the key
+        self._worker_pool.submit((self.name, queue_key), self.handle_message, message, priority=priority)
+
+    def get_message_queue_key(self, message):
+        """
+        Works out which queue a line from the server should be parsed in, and how important it is.
+        Lines are all parsed in order on the server's queue, so that changes to users and channels (nick changes, joins,
+        names replies, etc) are applied in the order the server sent them. Only function dispatch for messages and
+        notices is then spread across queues, by destination, see submit_dispatch().
+        PINGs are essential and have their own queue. Other lines which change server state are essential too, as
+        dropping them would leave users and channels out of date. Channel messages and notices which will only go to
+        passive functions can be dropped first.
+        :param message: Parsed line of data from the server
+        :type message: IRCMessage
+        :return: Tuple of queue key and WorkerPool priority
+        :rtype: (str, int)
+        """
+        command = message.command
+        if command == "PING":
+            return "PING", WorkerPool.PRIORITY_ESSENTIAL
+        if command not in ["PRIVMSG", "NOTICE"] or not message.params:
+            return "", WorkerPool.PRIORITY_ESSENTIAL
+        target = message.params[0].lower()
+        if target == self.get_nick().lower():
+            return "", WorkerPool.PRIORITY_NORMAL
+        message_text = message.param(1)
+        if command == "NOTICE" or not self.is_prefixed_text(target, message_text):
+            return "", WorkerPool.PRIORITY_PASSIVE
+        return "", WorkerPool.PRIORITY_NORMAL
+
+    def submit_dispatch(self, event, priority, dispatch_func, *args):
+        """
+        Runs function dispatch for a parsed message or notice on the worker queue for the channel or user it came from,
+        so that slow functions for one destination don't hold up parsing of the lines after it. Runs it straight away
+        if there is no worker pool.
+        :param event: Event being dispatched
+        :type event: EventMessage | EventNotice
+        :param priority: WorkerPool priority of the dispatch
+        :type priority: int
+        :param dispatch_func: FunctionDispatcher method to call
+        :type dispatch_func: Callable
+        :param args: Arguments to call it with
+        """
+        worker_pool = self._worker_pool
+        if worker_pool is None:
+            dispatch_func(*args)
+            return
+        destination = event.channel if event.channel is not None else event.user
+        worker_pool.submit((self.name, destination.address), dispatch_func, *args, priority=priority)
+
+    def is_prefixed_text(self, channel_address, message_text):
+        """
+        Quick check of whether a message in a channel starts with the prefix for addressing hallo, without creating a
+        channel object for it.
+        :param channel_address: Address of the channel the message was sent in
+        :type channel_address: str
+        :param message_text: Text of the message
+        :type message_text: str
+        :rtype: bool
+        """
+        channel = self.find_channel_by_address(channel_address)
+        prefix = self.get_prefix() if channel is None else channel.get_prefix()
+        if prefix is False:
+            prefix = self.get_nick()
+        return message_text.lower().startswith(prefix.lower())
+
+    def get_worker_stats(self):
+        """
+        Returns the counters of the worker pool processing lines from this server, or None if it is not running.
+        :rtype: dict | None
+        """
+        if self._worker_pool is None:
+            return None
+        return self._worker_pool.get_stats()
+
+    def get_send_stats(self):
+        """
+        Returns the counters of the queue of lines being sent to this server, or None if it is not running.
+        :rtype: dict | None
+        """
+        if self._send_queue is None:
+            return None
+        return self._send_queue.get_stats()
 
-    def send(self, event):
+    def send(self, event, priority=None):
+        """
+        Sends an event to the server
+        :param event: Event to send, should be outbound.
+        :type event: events.ServerEvent
+        :param priority: SendQueue priority to send with. By default PINGs and QUITs are essential, text is sent as
+        bulk (such as subscription updates) and anything else is normal. Replies are sent as normal.
+        :type priority: int | None
+        """
+        if isinstance(event, (EventPing, EventQuit)):
+            priority = SendQueue.PRIORITY_ESSENTIAL
+        elif priority is None:
+            priority = (
+                SendQueue.PRIORITY_BULK
+                if isinstance(event, ChannelUserTextEvent)
+                else SendQueue.PRIORITY_NORMAL
+            )
         if isinstance(event, EventPing):
-            self.send_raw("PONG {}".format(event.ping_number))
+            self.send_raw("PONG :{}".format(event.ping_number), priority)
             event.log()
             return
         if isinstance(event, EventQuit):
-            self.send_raw("QUIT :{}".format(event.quit_message))
+            self.send_raw("QUIT :{}".format(event.quit_message), priority)
             event.log()
             return
         if isinstance(event, EventNameChange):
-            self.send_raw("NICK {}".format(event.new_name))
+            self.send_raw("NICK {}".format(event.new_name), priority)
             event.log()
             return
         if isinstance(event, EventJoin):
             if event.password is not None:
                 self.send_raw(
-                    "JOIN {} {}".format(event.channel.address, event.password)
+                    "JOIN {} {}".format(event.channel.address, event.password),
+                    priority,
                 )
             else:
-                self.send_raw("JOIN {}".format(event.channel.address))
+                self.send_raw("JOIN {}".format(event.channel.address), priority)
             event.log()
             return
         if isinstance(event, EventLeave):
             if event.leave_message is not None:
                 self.send_raw(
-                    "PART {} {}".format(event.channel.address, event.leave_message)
+                    "PART {} {}".format(event.channel.address, event.leave_message),
+                    priority,
                 )
             else:
-                self.send_raw("PART {}".format(event.channel.address))
+                self.send_raw("PART {}".format(event.channel.address), priority)
             event.log()
             return
         if isinstance(event, EventKick):
             self.send_raw(
                 "KICK {} {} {}".format(
                     event.channel.address, event.kicked_user.address, event.kick_message
-                )
+                ),
+                priority,
             )
             event.log()
             return
         if isinstance(event, EventInvite):
             self.send_raw(
-                "INVITE {} {}".format(event.user.address, event.channel.address)
+                "INVITE {} {}".format(event.user.address, event.channel.address),
+                priority,
             )
             event.log()
             return
         if isinstance(event, EventMode):
             self.send_raw(
-                "MODE {} {}".format(event.channel.address, event.mode_changes)
+                "MODE {} {}".format(event.channel.address, event.mode_changes),
+                priority,
             )
             event.log()
             return
@@ -362,7 +581,8 @@ class ServerIRC(Server):
                     if isinstance(event, EventCTCP):
                         data_line_line = "\x01{}\x01".format(data_line_line)
                     self.send_raw(
-                        "{} {} :{}".format(msg_type_name, dest_addr, data_line_line)
+                        "{} {} :{}".format(msg_type_name, dest_addr, data_line_line),
+                        priority,
                     )
                     # Log sent data, if it's not message or notice
                     event = event_class(
@@ -385,15 +605,17 @@ class ServerIRC(Server):
     def reply(self, old_event, new_event):
         super().reply(old_event, new_event)
         # We can't do any fancy reply mechanics on IRC, so just send the event.
-        self.send(new_event)
+        self.send(new_event, SendQueue.PRIORITY_NORMAL)
 
-    def send_raw(self, data):
-        """Sends raw data to the server
+    def send_raw(self, data, priority=SendQueue.PRIORITY_NORMAL):
+        """Queues raw data to be sent to the server
         :param data: Data to send to server
         :type data: str
+        :param priority: Priority to send the data with, from SendQueue
+        :type priority: int
         """
-        if self.state != Server.STATE_CLOSED:
-            self._socket.send((data + endl).encode("utf-8"))
+        if self.state != Server.STATE_CLOSED and self._send_queue is not None:
+            self._send_queue.put((data + endl).encode("utf-8"), priority)
 
     def join_channel(self, channel_obj):
         """Joins a specified channel
@@ -401,7 +623,7 @@ class ServerIRC(Server):
         :type channel_obj: destination.Channel
         """
         # If channel isn't in channel list, add it
-        if channel_obj not in self.channel_list:
+        if id(channel_obj) not in self._channels:
             self.add_channel(channel_obj)
         # Set channel to AutoJoin, for the future
         channel_obj.auto_join = True
@@ -429,57 +651,46 @@ class ServerIRC(Server):
         """
         # Cleaning up carriage returns
         new_line = new_line.replace("\r", "")
-        # TODO: add stuff about time last ping was seen, for reconnection checking
-        if len(new_line) < 5 or (new_line[0] != ":" and new_line[0:4] != "PING"):
+        message = IRCMessage.parse(new_line)
+        if message is None:
             self.parse_line_unhandled(new_line)
             self.parse_line_raw(new_line, "unhandled")
-        elif new_line.split()[0] == "PING":
-            self.parse_line_ping(new_line)
-            self.parse_line_raw(new_line, "ping")
-        elif new_line.split()[1] == "PRIVMSG":
-            self.parse_line_message(new_line)
-            self.parse_line_raw(new_line, "message")
-        elif new_line.split()[1] == "JOIN":
-            self.parse_line_join(new_line)
-            self.parse_line_raw(new_line, "join")
-        elif new_line.split()[1] == "PART":
-            self.parse_line_part(new_line)
-            self.parse_line_raw(new_line, "part")
-        elif new_line.split()[1] == "QUIT":
-            self.parse_line_quit(new_line)
-            self.parse_line_raw(new_line, "quit")
-        elif new_line.split()[1] == "MODE":
-            self.parse_line_mode(new_line)
-            self.parse_line_raw(new_line, "mode")
-        elif new_line.split()[1] == "NOTICE":
-            self.parse_line_notice(new_line)
-            self.parse_line_raw(new_line, "notice")
-        elif new_line.split()[1] == "NICK":
-            self.parse_line_nick(new_line)
-            self.parse_line_raw(new_line, "nick")
-        elif new_line.split()[1] == "INVITE":
-            self.parse_line_invite(new_line)
-            self.parse_line_raw(new_line, "invite")
-        elif new_line.split()[1] == "KICK":
-            self.parse_line_kick(new_line)
-            self.parse_line_raw(new_line, "kick")
-        elif len(new_line.split()[1]) == 3 and new_line.split()[1].isdigit():
-            self.parse_line_numeric(new_line)
-            self.parse_line_raw(new_line, "numeric")
-        else:
-            self.parse_line_unhandled(new_line)
-            self.parse_line_raw(new_line, "unhandled")
-        return
+            return
+        self.handle_message(message)
+
+    def handle_message(self, message):
+        """
+        Hands a parsed line from the IRC server to the handler for its command
+        :param message: Line from the server, already parsed
+        :type message: IRCMessage
+        """
+        # TODO: add stuff about time last ping was seen, for reconnection checking
+        if message.prefix is None and message.command != "PING":
+            self.parse_line_unhandled(message.raw)
+            self.parse_line_raw(message.raw, "unhandled")
+            return
+        handler, line_type = self._message_handlers.get(message.command, (None, None))
+        if line_type is None and message.is_numeric():
+            handler, line_type = self.parse_line_numeric, "numeric"
+        if line_type is None:
+            self.parse_line_unhandled(message.raw)
+            self.parse_line_raw(message.raw, "unhandled")
+            return
+        if handler is not None:
+            handler(message)
+        self.parse_line_raw(message.raw, line_type)
 
-    def parse_line_ping(self, ping_line):
+    def parse_line_ping(self, ping_message):
         """
         Parses a PING message from the server
-        :param ping_line: Raw line to be parsed into ping event from the server
-        :type ping_line: str
+        :param ping_message: Parsed line to be turned into ping event from the server
+        :type ping_message: IRCMessage
         """
         # Get data
-        ping_number = ping_line.split()[1]
-        ping_evt = EventPing(self, ping_number).with_raw_data(RawDataIRC(ping_line))
+        ping_number = ping_message.param(0)
+        ping_evt = EventPing(self, ping_number).with_raw_data(
+            RawDataIRC(ping_message.raw, ping_message)
+        )
         # Respond
         pong_evt = ping_evt.get_pong()
         self.send(pong_evt)
@@ -489,22 +700,22 @@ class ServerIRC(Server):
         function_dispatcher = self.hallo.function_dispatcher
         function_dispatcher.dispatch_passive(ping_evt)
 
-    def parse_line_message(self, message_line):
+    def parse_line_message(self, message):
         """
         Parses a PRIVMSG message from the server
-        :param message_line: full privmsg line to parse from server
-        :type message_line: str
+        :param message: parsed privmsg line from server
+        :type message: IRCMessage
         """
         # Parse out the message text
-        message_text = ":".join(message_line.split(":")[2:])
+        message_text = message.param(1)
         # Parse out the message sender
-        message_sender_name = message_line.split("!")[0].replace(":", "")
+        message_sender_name = message.nick
         # Parse out where the message went to (e.g. channel or private message to Hallo)
-        message_destination_name = message_line.split()[2].lower()
+        message_destination_name = message.param(0).lower()
         # Test for CTCP message, hand to CTCP parser if so.
-        message_ctcp_bool = message_text[0] == "\x01"
+        message_ctcp_bool = message_text.startswith("\x01")
         if message_ctcp_bool:
-            self.parse_line_ctcp(message_line)
+            self.parse_line_ctcp(message)
             return
         # Test for private message or public message.
         message_private_bool = (
@@ -526,40 +737,51 @@ class ServerIRC(Server):
             None if message_private_bool else message_channel,
             message_sender,
             message_text,
-        ).with_raw_data(RawDataIRC(message_line))
+        ).with_raw_data(RawDataIRC(message.raw, message))
         # Print and Log the message
         message_evt.log()
         # Get function dispatcher ready
         function_dispatcher = self.hallo.function_dispatcher
         if message_private_bool:
-            function_dispatcher.dispatch(message_evt)
+            self.submit_dispatch(
+                message_evt, WorkerPool.PRIORITY_NORMAL, function_dispatcher.dispatch, message_evt
+            )
         else:
             # Update channel activity
             message_channel.update_activity()
             # Send to function dispatcher, or passive dispatcher
             if message_evt.is_prefixed:
                 if message_evt.is_prefixed is True:
-                    function_dispatcher.dispatch(message_evt)
+                    self.submit_dispatch(
+                        message_evt, WorkerPool.PRIORITY_NORMAL, function_dispatcher.dispatch, message_evt
+                    )
                 else:
-                    function_dispatcher.dispatch(message_evt, [message_evt.is_prefixed])
+                    self.submit_dispatch(
+                        message_evt,
+                        WorkerPool.PRIORITY_NORMAL,
+                        function_dispatcher.dispatch,
+                        message_evt,
+                        [message_evt.is_prefixed],
+                    )
             else:
-                function_dispatcher.dispatch_passive(message_evt)
+                self.submit_dispatch(
+                    message_evt, WorkerPool.PRIORITY_PASSIVE, function_dispatcher.dispatch_passive, message_evt
+                )
 
-    def parse_line_ctcp(self, ctcp_line):
+    def parse_line_ctcp(self, ctcp_message):
         """
         Parses a CTCP message from the server
-        :param ctcp_line: line of CTCP data to parse from the server
-        :type ctcp_line: str
+        :param ctcp_message: parsed privmsg line containing CTCP data from the server
+        :type ctcp_message: IRCMessage
         """
         # Parse out the ctcp message text
-        message_text = ":".join(ctcp_line.split(":")[2:])[1:-1]
+        message_text = ctcp_message.param(1).strip("\x01")
         # Parse out the message sender
-        message_sender_name = ctcp_line.split("!")[0].replace(":", "")
+        message_sender_name = ctcp_message.nick
         # Parse out where the message went to (e.g. channel or private message to Hallo)
-        message_destination_name = ctcp_line.split()[2].lower()
+        message_destination_name = ctcp_message.param(0).lower()
         # Parse out the CTCP command and arguments
-        message_ctcp_command = message_text.split()[0]
-        message_ctcp_arguments = " ".join(message_text.split()[1:])
+        message_ctcp_command, _, message_ctcp_arguments = message_text.partition(" ")
         # Test for private message or public message
         message_private_bool = (
             message_destination_name.lower() == self.get_nick().lower()
@@ -621,15 +843,15 @@ class ServerIRC(Server):
         function_dispatcher = self.hallo.function_dispatcher
         function_dispatcher.dispatch_passive(ctcp_evt)
 
-    def parse_line_join(self, join_line):
+    def parse_line_join(self, join_message):
         """
         Parses a JOIN message from the server
-        :param join_line: Raw line from server for the JOIN event
-        :type join_line: str
+        :param join_message: Parsed line from server for the JOIN event
+        :type join_message: IRCMessage
         """
         # Parse out the channel and client from the JOIN data
-        join_channel_name = ":".join(join_line.split(":")[2:]).lower()
-        join_client_name = join_line.split("!")[0][1:]
+        join_channel_name = join_message.param(0).lower()
+        join_client_name = join_message.nick
         # Get relevant objects
         join_channel = self.get_channel_by_address(
             join_channel_name.lower(), join_channel_name
@@ -640,7 +862,7 @@ class ServerIRC(Server):
         join_client.update_activity()
         # Create join event
         join_evt = EventJoin(self, join_channel, join_client).with_raw_data(
-            RawDataIRC(join_line)
+            RawDataIRC(join_message.raw, join_message)
         )
         # Print and log
         join_evt.log()
@@ -655,16 +877,16 @@ class ServerIRC(Server):
         function_dispatcher = self.hallo.function_dispatcher
         function_dispatcher.dispatch_passive(join_evt)
 
-    def parse_line_part(self, part_line):
+    def parse_line_part(self, part_message):
         """
         Parses a PART message from the server
-        :param part_line: Raw line from the server to parse for part event
-        :type part_line: str
+        :param part_message: Parsed line from the server for part event
+        :type part_message: IRCMessage
         """
         # Parse out channel, client and message from PART data
-        part_channel_name = part_line.split()[2]
-        part_client_name = part_line.split("!")[0][1:]
-        part_message = ":".join(part_line.split(":")[2:])
+        part_channel_name = part_message.param(0)
+        part_client_name = part_message.nick
+        part_text = part_message.param(1)
         # Get channel and user object
         part_channel = self.get_channel_by_address(
             part_channel_name.lower(), part_channel_name
@@ -674,45 +896,41 @@ class ServerIRC(Server):
         )
         # Create leave event
         leave_evt = EventLeave(
-            self, part_channel, part_client, part_message
-        ).with_raw_data(RawDataIRC(part_line))
+            self, part_channel, part_client, part_text
+        ).with_raw_data(RawDataIRC(part_message.raw, part_message))
         # Print and log
         leave_evt.log()
         # Remove user from channel's user list
         part_channel.remove_user(part_client)
-        # Try to work out if the user is still on the server
-        # TODO: this needs to be nicer
-        user_still_on_server = False
-        for channel_server in self.channel_list:
-            if part_client in channel_server.get_user_list():
-                user_still_on_server = True
-        if not user_still_on_server:
+        # If the user isn't in any other channel hallo is in, treat them as gone from the server
+        if not part_client.get_channel_list():
             part_client.set_online(False)
+            self.prune_user(part_client)
         # Pass to passive FunctionDispatcher
         function_dispatcher = self.hallo.function_dispatcher
         function_dispatcher.dispatch_passive(leave_evt)
 
-    def parse_line_quit(self, quit_line):
+    def parse_line_quit(self, quit_message):
         """
         Parses a QUIT message from the server
-        :param quit_line: Raw line from server to parse for quit event
-        :type quit_line: str
+        :param quit_message: Parsed line from server for quit event
+        :type quit_message: IRCMessage
         """
         # Parse client and message
-        quit_client_name = quit_line.split("!")[0][1:]
-        quit_message = ":".join(quit_line.split(":")[2:])
+        quit_client_name = quit_message.nick
+        quit_text = quit_message.param(0)
         # Get client object
         quit_client = self.get_user_by_address(
             quit_client_name.lower(), quit_client_name
         )
         # Create quit event
-        quit_evt = EventQuit(self, quit_client, quit_message).with_raw_data(
-            RawDataIRC(quit_line)
+        quit_evt = EventQuit(self, quit_client, quit_text).with_raw_data(
+            RawDataIRC(quit_message.raw, quit_message)
         )
         # Print and Log to all channels on server
         quit_evt.log()
         # Remove user from user list on all channels
-        for channel in self.channel_list:
+        for channel in quit_client.get_channel_list():
             channel.remove_user(quit_client)
         # Remove auth stuff from user
         quit_client.set_online(False)
@@ -722,28 +940,23 @@ class ServerIRC(Server):
                 channel.set_in_channel(False)
             for user in self.user_list:
                 user.set_online(False)
+        else:
+            self.prune_user(quit_client)
         # Pass to passive FunctionDispatcher
         function_dispatcher = self.hallo.function_dispatcher
         function_dispatcher.dispatch_passive(quit_evt)
 
-    def parse_line_mode(self, mode_line):
+    def parse_line_mode(self, mode_message):
         """
         Parses a MODE message from the server
-        :param mode_line: Raw line of mode event to be parsed.
-        :type mode_line: str
+        :param mode_message: Parsed line of mode event.
+        :type mode_message: IRCMessage
         """
         # Parsing out MODE data
-        mode_channel_name = mode_line.split()[2].lower()
-        mode_client_name = mode_line.split()[0][1:]
-        if "!" in mode_client_name:
-            mode_client_name = mode_client_name.split("!")[0]
-        mode_mode = mode_line.split()[3]
-        if mode_mode[0] == ":":
-            mode_mode = mode_mode[1:]
-        if len(mode_line.split()) >= 4:
-            mode_args = " ".join(mode_line.split()[4:])
-        else:
-            mode_args = ""
+        mode_channel_name = mode_message.param(0).lower()
+        mode_client_name = mode_message.nick
+        mode_mode = mode_message.param(1)
+        mode_args = " ".join(mode_message.params[2:])
         # Get client and channel objects
         mode_channel = self.get_channel_by_address(
             mode_channel_name.lower(), mode_channel_name
@@ -780,7 +993,7 @@ class ServerIRC(Server):
         if mode_args != "":
             mode_full = "{} {}".format(mode_mode, mode_args)
         mode_evt = EventMode(self, mode_channel, mode_client, mode_full).with_raw_data(
-            RawDataIRC(mode_line)
+            RawDataIRC(mode_message.raw, mode_message)
         )
         # # Printing and logging
         mode_evt.log()
@@ -788,16 +1001,16 @@ class ServerIRC(Server):
         function_dispatcher = self.hallo.function_dispatcher
         function_dispatcher.dispatch_passive(mode_evt)
 
-    def parse_line_notice(self, notice_line):
+    def parse_line_notice(self, notice_message):
         """
         Parses a NOTICE message from the server
-        :param notice_line: Raw line of the NOTICE event from the server
-        :type notice_line: str
+        :param notice_message: Parsed line of the NOTICE event from the server
+        :type notice_message: IRCMessage
         """
         # Parsing out NOTICE data
-        notice_channel_name = notice_line.split()[2]
-        notice_client_name = notice_line.split("!")[0][1:]
-        notice_message = ":".join(notice_line.split(":")[2:])
+        notice_channel_name = notice_message.param(0)
+        notice_client_name = notice_message.nick
+        notice_text = notice_message.param(1)
         # Get client and channel objects
         notice_channel = self.get_channel_by_address(
             notice_channel_name.lower(), notice_channel_name
@@ -809,8 +1022,8 @@ class ServerIRC(Server):
         notice_client.update_activity()
         # Create notice event
         notice_event = EventNotice(
-            self, notice_channel, notice_client, notice_message
-        ).with_raw_data(RawDataIRC(notice_line))
+            self, notice_channel, notice_client, notice_text
+        ).with_raw_data(RawDataIRC(notice_message.raw, notice_message))
         # Print to console, log to file
         notice_event.log()
         # Checking if user is registered
@@ -821,34 +1034,33 @@ class ServerIRC(Server):
         ):
             # check if notice message contains command and user name
             if (
-                self._check_useridentity_user in notice_message
-                and self.nickserv_ident_command in notice_message
+                self._check_useridentity_user in notice_text
+                and self.nickserv_ident_command in notice_text
             ):
                 # Make regex query of identity response
                 regex_ident_response = re.compile(
                     self.nickserv_ident_response, re.IGNORECASE
                 )
                 # check if response is in notice message
-                if regex_ident_response.search(notice_message) is not None:
+                if regex_ident_response.search(notice_text) is not None:
                     self._check_useridentity_result = True
                 else:
                     self._check_useridentity_result = False
         # Pass to passive FunctionDispatcher
         function_dispatcher = self.hallo.function_dispatcher
-        function_dispatcher.dispatch_passive(notice_event)
+        self.submit_dispatch(
+            notice_event, WorkerPool.PRIORITY_PASSIVE, function_dispatcher.dispatch_passive, notice_event
+        )
 
-    def parse_line_nick(self, nick_line):
+    def parse_line_nick(self, nick_message):
         """
         Parses a NICK message from the server
-        :param nick_line: Line from server specifying nick change
-        :type nick_line: str
+        :param nick_message: Parsed line from server specifying nick change
+        :type nick_message: IRCMessage
         """
         # Parse out NICK change data
-        nick_client_name = nick_line.split("!")[0][1:]
-        if nick_line.count(":") > 1:
-            nick_new_nick = nick_line.split(":")[2]
-        else:
-            nick_new_nick = nick_line.split()[2]
+        nick_client_name = nick_message.nick
+        nick_new_nick = nick_message.param(0)
         # Get user object
         nick_client = self.get_user_by_address(
             nick_client_name.lower(), nick_client_name
@@ -858,28 +1070,27 @@ class ServerIRC(Server):
             self.nick = nick_new_nick
         # TODO: Check whether this verifies anything that means automatic flags need to be applied
         # Update name for user object
-        nick_client.name = nick_new_nick
-        nick_client.address = nick_new_nick.lower()
+        self.rename_user(nick_client, nick_new_nick, nick_new_nick.lower())
         # Create name change event
         chname_evt = EventNameChange(
             self, nick_client, nick_client_name, nick_new_nick
-        ).with_raw_data(RawDataIRC(nick_line))
+        ).with_raw_data(RawDataIRC(nick_message.raw, nick_message))
         # Printing and logging
         chname_evt.log()
         # Pass to passive FunctionDispatcher
         function_dispatcher = self.hallo.function_dispatcher
         function_dispatcher.dispatch_passive(chname_evt)
 
-    def parse_line_invite(self, invite_line):
+    def parse_line_invite(self, invite_message):
         """
         Parses an INVITE message from the server
-        :param invite_line: Line from the server specifying invite event
-        :type invite_line: str
+        :param invite_message: Parsed line from the server specifying invite event
+        :type invite_message: IRCMessage
         """
         # Parse out INVITE data
-        inviter_client_name = invite_line.split("!")[0][1:]
-        invite_channel_name = ":".join(invite_line.split(":")[2:])
-        invited_client_name = invite_line.split()[2]
+        inviter_client_name = invite_message.nick
+        invite_channel_name = invite_message.param(1)
+        invited_client_name = invite_message.param(0)
         # Get destination objects
         inviter_client = self.get_user_by_address(
             inviter_client_name.lower(), inviter_client_name
@@ -894,7 +1105,7 @@ class ServerIRC(Server):
         # Create invite event
         invite_evt = EventInvite(
             self, invite_channel, inviter_client, invited_client
-        ).with_raw_data(RawDataIRC(invite_line))
+        ).with_raw_data(RawDataIRC(invite_message.raw, invite_message))
         # Printing and logging
         invite_evt.log()
         # Check if they are an op, then join the channel.
@@ -907,17 +1118,17 @@ class ServerIRC(Server):
         function_dispatcher = self.hallo.function_dispatcher
         function_dispatcher.dispatch_passive(invite_evt)
 
-    def parse_line_kick(self, kick_line):
+    def parse_line_kick(self, kick_message):
         """
         Parses a KICK message from the server
-        :param kick_line: Line from the server specifying kick event
-        :type kick_line: str
+        :param kick_message: Parsed line from the server specifying kick event
+        :type kick_message: IRCMessage
         """
         # Parse out KICK data
-        kick_channel_name = kick_line.split()[2]
-        kicked_client_name = kick_line.split()[3]
-        kick_message = ":".join(kick_line.split(":")[2:])
-        kicking_user_name = kick_line.split("!")[0][1:]
+        kick_channel_name = kick_message.param(0)
+        kicked_client_name = kick_message.param(1)
+        kick_text = kick_message.param(2)
+        kicking_user_name = kick_message.nick
         # GetObjects
         kick_channel = self.get_channel_by_address(
             kick_channel_name.lower(), kick_channel_name
@@ -930,8 +1141,8 @@ class ServerIRC(Server):
         )
         # Create kick event
         kick_evt = EventKick(
-            self, kick_channel, kicking_client, kicked_client, kick_message
-        ).with_raw_data(RawDataIRC(kick_line))
+            self, kick_channel, kicking_client, kicked_client, kick_text
+        ).with_raw_data(RawDataIRC(kick_message.raw, kick_message))
         # Log, if applicable
         kick_evt.log()
         # Remove kicked user from user list
@@ -939,23 +1150,26 @@ class ServerIRC(Server):
         # If it was the bot who was kicked, set "in channel" status to False
         if kicked_client.name == self.get_nick():
             kick_channel.set_in_channel(False)
+        elif not kicked_client.get_channel_list():
+            kicked_client.set_online(False)
+            self.prune_user(kicked_client)
         # Pass to passive FunctionDispatcher
         function_dispatcher = self.hallo.function_dispatcher
         function_dispatcher.dispatch_passive(kick_evt)
 
-    def parse_line_numeric(self, numeric_line, motd_ended=True):
+    def parse_line_numeric(self, numeric_message, motd_ended=True):
         """
         Parses a numeric message from the server
-        :param numeric_line: Numeric type line from server.
-        :type numeric_line: str
+        :param numeric_message: Parsed numeric type line from server.
+        :type numeric_message: IRCMessage
         :param motd_ended: Whether MOTD has ended.
         :type motd_ended: bool
         """
         # Parse out numeric line data
-        numeric_code = numeric_line.split()[1]
+        numeric_code = numeric_message.command
         # Print to console
         logger.info(
-            "[{}] Numeric server info: {}".format(self.name, numeric_line)
+            "[{}] Numeric server info: {}".format(self.name, numeric_message.raw)
         )
         # TODO: add logging?
         # Check for a 433 "ERR_NICKNAMEINUSE"
@@ -981,7 +1195,7 @@ class ServerIRC(Server):
         # Check for ISON response, telling you which users are online
         if numeric_code == "303":
             # Parse out data
-            users_online = ":".join(numeric_line.split(":")[2:])
+            users_online = numeric_message.param(-1)
             users_online_list = users_online.split()
             # Mark them all as online
             for user_name in users_online_list:
@@ -993,8 +1207,8 @@ class ServerIRC(Server):
         # Check for NAMES request reply, telling you who is in a channel.
         elif numeric_code == "353":
             # Parse out data
-            channel_name = numeric_line.split(":")[1].split()[-1].lower()
-            channel_user_list = ":".join(numeric_line.split(":")[2:])
+            channel_name = numeric_message.param(-2).lower()
+            channel_user_list = numeric_message.param(-1)
             # Get channel object
             channel_obj = self.get_channel_by_address(
                 channel_name.lower(), channel_name
@@ -1032,29 +1246,28 @@ class ServerIRC(Server):
     def read_line_from_socket(self):
         """
         Private method to read a line from the IRC socket.
+        Reads data in large chunks, buffering any lines beyond the first, and any partial line at the end.
         :return: A line of text from the socket
         :rtype: str
         """
-        next_line = b""
         while self.state != Server.STATE_CLOSED:
-            next_byte = None
+            next_line = self._line_buffer.pop_line()
+            if next_line is not None:
+                return next_line
+            next_chunk = None
             try:
-                next_byte = self._socket.recv(1)
+                next_chunk = self._socket.recv(LineBuffer.CHUNK_SIZE)
             except socket.timeout as e:
                 if e.args[0] != "timed out":
-                    raise ServerException("Failed to receive byte. {}".format(e))
+                    raise ServerException("Failed to receive data. {}".format(e))
             except Exception as e:
                 # Raise an exception, to reconnect.
-                raise ServerException("Failed to receive byte. {}".format(e))
-            if next_byte is None:
+                raise ServerException("Failed to receive data. {}".format(e))
+            if next_chunk is None:
                 continue
-            if len(next_byte) != 1:
-                raise ServerException(
-                    "Length of next byte incorrect: {}".format(next_byte)
-                )
-            next_line += next_byte
-            if next_line.endswith(endl.encode()):
-                return self.decode_line(next_line[: -len(endl)])
+            if len(next_chunk) == 0:
+                raise ServerException("Connection closed by server.")
+            self._line_buffer.feed(next_chunk)
 
     def decode_line(self, raw_bytes):
         """
@@ -1062,14 +1275,7 @@ class ServerIRC(Server):
         :param raw_bytes: Array bytes to be decoded to string.
         :type raw_bytes: bytearray | bytes
         """
-        try:
-            output_line = raw_bytes.decode("utf-8")
-        except UnicodeDecodeError:
-            try:
-                output_line = raw_bytes.decode("iso-8859-1")
-            except UnicodeDecodeError:
-                output_line = raw_bytes.decode("cp1252")
-        return output_line
+        return decode_line(raw_bytes)
 
     def check_channel_user_list(self, channel_obj):
         """
@@ -1161,7 +1367,8 @@ class ServerIRC(Server):
                     nickserv_obj,
                     "{} {}".format(self.nickserv_ident_command, user_obj.address),
                     inbound=False,
-                )
+                ),
+                SendQueue.PRIORITY_NORMAL,
             )
             # loop for 5 seconds
             for _ in range(10):
@@ -1221,8 +1428,7 @@ class ServerIRC(Server):
         old_nick = self.get_nick()
         # Update my user object
         hallo_user = self.get_user_by_address(old_nick.lower(), old_nick)
-        hallo_user.name = nick
-        hallo_user.address = nick.lower()
+        self.rename_user(hallo_user, nick, nick.lower())
         self.nick = nick
         if nick != old_nick:
             nick_evt = EventNameChange(self, hallo_user, old_nick, nick, inbound=False)
@@ -1290,7 +1496,8 @@ class ServerIRC(Server):
                     nickserv_obj,
                     "IDENTIFY {}".format(self.nickserv_pass),
                     inbound=False,
-                )
+                ),
+                SendQueue.PRIORITY_NORMAL,
             )
 
     def get_name_by_address(self, address):
@@ -1317,6 +1524,14 @@ class ServerIRC(Server):
         json_obj["port"] = self.server_port
         if self.full_name is not None:
             json_obj["full_name"] = self.full_name
+        if self.worker_count != self.DEFAULT_WORKER_COUNT:
+            json_obj["worker_count"] = self.worker_count
+        if self.max_queue_depth != self.DEFAULT_MAX_QUEUE_DEPTH:
+            json_obj["max_queue_depth"] = self.max_queue_depth
+        if self.send_burst != self.DEFAULT_SEND_BURST:
+            json_obj["send_burst"] = self.send_burst
+        if self.send_rate != self.DEFAULT_SEND_RATE:
+            json_obj["send_rate"] = self.send_rate
         if self.nickserv_pass is not None:
             json_obj["nickserv"] = {}  # TODO
             json_obj["nickserv"]["nick"] = self.nickserv_nick
@@ -1325,15 +1540,23 @@ class ServerIRC(Server):
             json_obj["nickserv"]["identity_response"] = self.nickserv_ident_response
         return json_obj
 
-    @staticmethod
-    def from_json(json_obj, hallo):
+    @classmethod
+    def from_json(cls, json_obj, hallo):
         name = json_obj["name"]
         address = json_obj["address"]
         port = json_obj["port"]
-        new_server = ServerIRC(hallo, name, address, port)
+        new_server = cls(hallo, name, address, port)
         new_server.auto_connect = json_obj["auto_connect"]
         if "full_name" in json_obj:
             new_server.full_name = json_obj["full_name"]
+        if "worker_count" in json_obj:
+            new_server.worker_count = json_obj["worker_count"]
+        if "max_queue_depth" in json_obj:
+            new_server.max_queue_depth = json_obj["max_queue_depth"]
+        if "send_burst" in json_obj:
+            new_server.send_burst = json_obj["send_burst"]
+        if "send_rate" in json_obj:
+            new_server.send_rate = json_obj["send_rate"]
         if "nickserv" in json_obj:
             new_server.nickserv_nick = json_obj["nickserv"]["nick"]
             new_server.nickserv_pass = json_obj["nickserv"]["password"]
@@ -0,0 +1,273 @@
+import asyncio
+import logging
+from threading import Lock, Thread
+
+from hallo.errors import ExceptionError
+from hallo.inc.line_buffer import LineBuffer
+from hallo.inc.send_queue import SendQueue
+from hallo.inc.worker_pool import WorkerPool
+from hallo.server import Server, ServerException
+from hallo.server_irc import ServerIRC
+
+logger = logging.getLogger(__name__)
+
+
+class IRCEventLoop:
+    """
+    A single asyncio event loop, running in its own thread, which handles the connections for every asyncio IRC server.
+    Lines received are handed off to one shared WorkerPool, so the number of threads does not grow as servers are
+    added.
+    """
+
+    WORKER_COUNT = 8
+    MAX_QUEUE_DEPTH = 5000
+    _shared = None
+    _shared_lock = Lock()
+
+    @classmethod
+    def shared(cls):
+        """
+        Returns the event loop shared by all asyncio IRC servers
+        :rtype: IRCEventLoop
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = IRCEventLoop()
+            return cls._shared
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.worker_pool = WorkerPool("irc-async", self.WORKER_COUNT, self.MAX_QUEUE_DEPTH)
+        self._lock = Lock()
+        self._thread = None
+        self._server_count = 0  # Number of servers currently using the loop and worker pool
+
+    def acquire(self):
+        """
+        Registers a server as using the loop, starting the loop thread and worker pool if needed.
+        """
+        with self._lock:
+            self._server_count += 1
+            if self._thread is None:
+                self._thread = Thread(target=self._run_loop, name="irc-async-loop", daemon=True)
+                self._thread.start()
+            self.worker_pool.start()
+
+    def release(self):
+        """
+        Unregisters a server from the loop, stopping the worker pool once no servers are using it.
+        """
+        with self._lock:
+            self._server_count = max(0, self._server_count - 1)
+            if self._server_count == 0:
+                self.worker_pool.stop()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def run_coroutine(self, coroutine):
+        """
+        Schedules a coroutine to run on the loop, from any thread
+        :rtype: concurrent.futures.Future
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def call_soon(self, callback, *args):
+        """
+        Schedules a callback to run on the loop, from any thread
+        """
+        self.loop.call_soon_threadsafe(callback, *args)
+
+
+class ServerIRCAsync(ServerIRC):
+    """
+    IRC server which runs its connection on the shared asyncio event loop, rather than a thread of its own.
+    Connecting, reading, writing, reconnecting and keepalive pings are all handled on the loop.
+    """
+
+    TRANSPORT = "asyncio"
+    CONNECT_TIMEOUT = 10  # Seconds to wait for the connection to open
+    RECONNECT_DELAY_MIN = 3  # Seconds to wait before the first reconnection attempt
+    RECONNECT_DELAY_MAX = 300  # Maximum seconds to wait between reconnection attempts
+    KEEPALIVE_INTERVAL = 120  # Seconds without receiving anything before sending a keepalive PING
+    KEEPALIVE_TIMEOUT = 60  # Seconds to wait for a response to a keepalive PING before reconnecting
+
+    def __init__(self, hallo, server_name=None, server_url=None, server_port=6667):
+        super().__init__(hallo, server_name, server_url, server_port)
+        self._event_loop = IRCEventLoop.shared()
+        self._reader = None  # asyncio StreamReader for the connection
+        self._writer = None  # asyncio StreamWriter for the connection
+        self._run_future = None  # Future of the coroutine running this server's connection
+        self._send_wake = None  # asyncio Event, set when lines are added to the send queue
+
+    def start(self):
+        """
+        Starts the server connection on the shared event loop
+        """
+        if self.state != Server.STATE_CLOSED:
+            raise ServerException("Already started.")
+        self.state = Server.STATE_CONNECTING
+        self._event_loop.acquire()
+        self._worker_pool = self._event_loop.worker_pool
+        send_queue = SendQueue(self.send_burst, self.send_rate)
+        send_queue.set_listener(lambda: self._event_loop.call_soon(self._wake_writer))
+        self._send_queue = send_queue
+        self._run_future = self._event_loop.run_coroutine(self._run(send_queue))
+        # Release in a callback, so that it happens even if the coroutine is cancelled before it starts
+        self._run_future.add_done_callback(lambda future: self._stopped(send_queue))
+
+    def _stopped(self, send_queue):
+        """
+        Internal method, called when the connection coroutine has finished.
+        """
+        send_queue.close()
+        self._event_loop.release()
+
+    async def _run(self, send_queue):
+        """
+        Internal method, connects to the server and reads lines from it, reconnecting with backoff until disconnected.
+        """
+        reconnect_delay = self.RECONNECT_DELAY_MIN
+        self._send_wake = asyncio.Event()
+        write_task = asyncio.ensure_future(self._write_loop(send_queue))
+        try:
+            while self.state in [Server.STATE_CONNECTING, Server.STATE_OPEN]:
+                try:
+                    await self._connect()
+                    if self.state == Server.STATE_OPEN:
+                        reconnect_delay = self.RECONNECT_DELAY_MIN
+                    await self._read_loop()
+                except (OSError, asyncio.TimeoutError, ServerException) as e:
+                    error = ExceptionError(
+                        'Connection error on "{}" IRC server'.format(self.name), e, self
+                    )
+                    logger.error(error.get_log_line())
+                self._close_transport()
+                if self.state not in [Server.STATE_CONNECTING, Server.STATE_OPEN]:
+                    break
+                self.state = Server.STATE_CONNECTING
+                logger.info(
+                    "Reconnecting to %s in %s seconds.", self.name, reconnect_delay
+                )
+                await asyncio.sleep(reconnect_delay)
+                reconnect_delay = min(reconnect_delay * 2, self.RECONNECT_DELAY_MAX)
+        finally:
+            write_task.cancel()
+            self._close_transport()
+
+    async def _connect(self):
+        """
+        Internal method, opens the connection and logs in to the server.
+        """
+        self._line_buffer.clear()
+        # Lines queued for the previous connection should not be sent on this one
+        self._send_queue.clear()
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.server_address, self.server_port),
+            self.CONNECT_TIMEOUT,
+        )
+        logger.info(
+            "Waiting for first message from server: {}".format(self.name)
+        )
+        first_line = await self._read_line()
+        self.begin_login(first_line)
+        while self.state == Server.STATE_CONNECTING:
+            next_welcome_line = await self._read_line()
+            if self.parse_welcome_line(next_welcome_line):
+                break
+        if self.state != Server.STATE_CONNECTING:
+            return
+        self.finish_login()
+
+    async def _read_loop(self):
+        """
+        Internal method, reads lines from the server and hands them to the worker pool, while connected.
+        """
+        while self.state == Server.STATE_OPEN:
+            next_line = await self._read_line()
+            self.queue_line(next_line)
+
+    async def _read_line(self):
+        """
+        Internal method, reads the next line from the server. Sends a keepalive PING if the server goes quiet, and
+        raises ServerException if the connection is closed or the server does not respond to the PING.
+        :rtype: str
+        """
+        awaiting_pong = False
+        while True:
+            next_line = self._line_buffer.pop_line()
+            if next_line is not None:
+                return next_line
+            timeout = self.KEEPALIVE_TIMEOUT if awaiting_pong else self.KEEPALIVE_INTERVAL
+            try:
+                next_chunk = await asyncio.wait_for(
+                    self._reader.read(LineBuffer.CHUNK_SIZE), timeout
+                )
+            except asyncio.TimeoutError:
+                if awaiting_pong:
+                    raise ServerException("No response to keepalive ping.")
+                self.send_raw("PING :keepalive", SendQueue.PRIORITY_ESSENTIAL)
+                awaiting_pong = True
+                continue
+            if len(next_chunk) == 0:
+                raise ServerException("Connection closed by server.")
+            awaiting_pong = False
+            self._line_buffer.feed(next_chunk)
+
+    async def _write_loop(self, send_queue):
+        """
+        Internal method, writes lines from the send queue to the connection, as the flood limit allows.
+        """
+        while True:
+            batch, wait = send_queue.pop_batch()
+            if batch:
+                try:
+                    self._write(b"".join(batch))
+                finally:
+                    send_queue.batch_sent()
+                continue
+            # Nothing can be sent yet, wait until more is queued or the flood limit allows more
+            self._send_wake.clear()
+            try:
+                await asyncio.wait_for(self._send_wake.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def _wake_writer(self):
+        """
+        Internal method, wakes the writer when lines are queued. Must be called on the event loop.
+        """
+        if self._send_wake is not None:
+            self._send_wake.set()
+
+    def _write(self, data):
+        """
+        Internal method, writes data to the connection. Must be called on the event loop.
+        Data is dropped if there is no connection.
+        """
+        if self._writer is not None and not self._writer.transport.is_closing():
+            self._writer.write(data)
+
+    def _close_transport(self):
+        """
+        Internal method, closes the connection, after sending any buffered data. Must be called on the event loop.
+        """
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = None
+        self._writer = None
+
+    def disconnect(self, force=False):
+        """
+        Disconnect from the server, ending the connection coroutine.
+        """
+        super().disconnect(force)
+        if self._run_future is not None:
+            self._run_future.cancel()
+            self._run_future = None
+
+    def to_json(self):
+        json_obj = super().to_json()
+        json_obj["transport"] = self.TRANSPORT
+        return json_obj
@@ -1,5 +1,8 @@
 from hallo.function_dispatcher import FunctionDispatcher
+from hallo.events import EventMessage
 from hallo.hallo import Hallo
+from hallo.inc.commons import Commons
+from hallo.test.modules.random.mock_roller import MockRoller
 
 
 def test_fd_load_order(hallo_getter):
@@ -89,3 +92,78 @@ def test_open_close(hallo_getter):
 # load_function
 # unload_function
 # close
+
+
+def test_get_function_by_words(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({})
+    fd = FunctionDispatcher({"subscriptions", "math"}, hallo)
+    try:
+        add_class = fd.get_function_by_name("rss add")
+        assert add_class is not None
+        assert fd.get_function_by_words(["RSS", "add", "http://example.com"]) == (add_class, 2)
+        assert fd.get_function_by_words(["rss_add", "http://example.com"]) == (add_class, 1)
+        assert fd.get_function_by_words(["not", "a", "function"]) == (None, 0)
+        assert fd.get_function_by_words([]) == (None, 0)
+    finally:
+        fd.close()
+    assert len(fd.function_name_trie) == 0
+
+
+def test_dispatch_passive_triggers(hallo_getter, monkeypatch):
+    hallo, test_server, test_channel, test_user = hallo_getter({"random"})
+    roller = MockRoller()
+    roller.answer = 0
+    monkeypatch.setattr(Commons, "get_random_int", roller.roll)
+    foof_class = hallo.function_dispatcher.get_function_by_name("foof")
+    assert hallo.function_dispatcher.passive_triggers[foof_class] == r"(?i)foo+f"
+    hallo.function_dispatcher.dispatch_passive(EventMessage(test_server, test_channel, test_user, "hello there"))
+    test_server.get_send_data(0)
+    hallo.function_dispatcher.dispatch_passive(EventMessage(test_server, test_channel, test_user, "fooooof"))
+    data = test_server.get_send_data(1, test_channel, EventMessage)
+    assert "doo" in data[0].text.lower()
+    assert hallo.function_dispatcher.get_passive_trigger_stats()["Foof"] == (1, 1)
+
+
+def test_check_function_permissions_cached(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({"euler"})
+    fd = hallo.function_dispatcher
+    function_class = fd.get_function_by_name("euler")
+    # The first check sets the default_function right on hallo, which invalidates the cache
+    assert fd.check_function_permissions(function_class, test_server, test_user, test_channel)
+    assert fd.check_function_permissions(function_class, test_server, test_user, test_channel)
+    hits = fd.get_permission_cache_stats()["hits"]
+    assert fd.check_function_permissions(function_class, test_server, test_user, test_channel)
+    assert fd.get_permission_cache_stats()["hits"] == hits + 1
+    test_channel.permission_mask.set_right("function_{}".format(function_class.__name__), False)
+    assert not fd.check_function_permissions(function_class, test_server, test_user, test_channel)
+
+
+def test_reusable_function_objects(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({"euler", "random"})
+    fd = hallo.function_dispatcher
+    foof_class = fd.get_function_by_name("foof")
+    euler_class = fd.get_function_by_name("euler")
+
+    assert fd.get_function_object(foof_class) is fd.get_function_object(foof_class)
+    assert fd.get_function_object(euler_class) is not fd.get_function_object(euler_class)
+    fd.dispatch(EventMessage(test_server, None, test_user, "foof"))
+
+    stats = fd.get_allocation_stats()
+    assert stats["Foof"] == (1, 0)
+    assert stats["Euler"] == (1, 2)
+    # Reloading builds a new shared object from the new class
+    old_foof = fd.get_function_object(foof_class)
+    assert fd.reload_module("random")
+    new_foof = fd.get_function_object(fd.get_function_by_name("foof"))
+    assert new_foof is not old_foof
+    assert foof_class not in fd.shared_functions
+
+
+def test_function_jobs_scheduled(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({})
+    fd = FunctionDispatcher({"convert"}, hallo)
+    try:
+        assert hallo.scheduler.get_job("update currencies") is not None
+    finally:
+        fd.close()
+    assert hallo.scheduler.get_job("update currencies") is None
@@ -0,0 +1,66 @@
+from hallo.permission_mask import PermissionCache, PermissionMask
+from hallo.user_group import UserGroup
+
+
+def test_set_right_changes_version():
+    mask = PermissionMask()
+    version = PermissionMask.version
+    mask.set_right("test_right", True)
+    assert PermissionMask.version != version
+    version = PermissionMask.version
+    mask.set_right("test_right", "true")
+    assert PermissionMask.version == version
+    mask.set_right("test_right", None)
+    assert PermissionMask.version != version
+
+
+def test_cache_hits(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({})
+    cache = PermissionCache()
+    calls = []
+
+    def resolve():
+        calls.append(1)
+        return test_user.rights_check("test_right", test_channel)
+
+    test_user.permission_mask.set_right("test_right", True)
+    assert cache.check("test_right", test_server, test_user, test_channel, resolve)
+    assert cache.check("test_right", test_server, test_user, test_channel, resolve)
+    assert len(calls) == 1
+    assert cache.get_stats()["hits"] == 1
+    assert cache.get_stats()["misses"] == 1
+
+
+def test_cache_invalidated(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({})
+    cache = PermissionCache()
+
+    def check():
+        return cache.check(
+            "test_right", test_server, test_user, test_channel, lambda: test_user.rights_check("test_right", test_channel)
+        )
+
+    test_user.permission_mask.set_right("test_right", True)
+    assert check()
+    # Changing a right
+    test_user.permission_mask.set_right("test_right", False)
+    assert not check()
+    # Replacing a mask
+    test_user.permission_mask = PermissionMask()
+    test_channel.permission_mask.set_right("test_right", True)
+    assert check()
+    # Joining a user group
+    group = UserGroup("test_group", hallo)
+    group.permission_mask.set_right("test_right", False)
+    test_user.add_user_group(group)
+    assert not check()
+    test_user.remove_user_group(group)
+    assert check()
+
+
+def test_cache_max_size(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({})
+    cache = PermissionCache(max_size=5)
+    for x in range(12):
+        cache.check("right_{}".format(x), test_server, test_user, None, lambda: True)
+    assert cache.get_stats()["size"] <= 5
@@ -0,0 +1,77 @@
+from hallo.destination import Channel, User
+
+
+def test_get_user_by_address(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({})
+    assert test_server.get_user_by_address("test") is test_user
+    new_user = test_server.get_user_by_address("new_user", "New_User")
+    assert new_user in test_server.get_user_list()
+    assert test_server.get_user_by_address("new_user") is new_user
+    assert test_server.get_user_by_name("new_user") is new_user
+
+
+def test_rename_user(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({})
+    test_server.rename_user(test_user, "Renamed", "renamed")
+    assert test_user.name == "Renamed"
+    assert test_user.address == "renamed"
+    assert test_server.get_user_by_name("renamed") is test_user
+    assert test_server.get_user_by_name("test") is None
+    assert test_server.get_user_by_address("renamed") is test_user
+    new_user = test_server.get_user_by_address("test", "test")
+    assert new_user is not test_user
+
+
+def test_remove_user(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({})
+    duplicate = User(test_server, "test", "test")
+    test_server.add_user(duplicate)
+    assert test_server.get_user_by_address("test") is test_user
+    test_server.remove_user(test_user)
+    assert all(user is not test_user for user in test_server.user_list)
+    assert test_server.get_user_by_address("test") is duplicate
+    assert test_server.get_user_by_name("test") is duplicate
+
+
+def test_channels(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({})
+    assert test_server.get_channel_by_address("#test") is test_channel
+    assert test_server.get_channel_by_name("#TEST") is test_channel
+    other = Channel(test_server, "#other", "#other")
+    test_server.add_channel(other)
+    assert test_server.get_channel_by_name("#other") is other
+    test_server.remove_channel(other)
+    assert test_server.get_channel_by_name("#other") is None
+    assert other not in test_server.channel_list
+
+
+def test_find_channel_by_address(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({})
+    assert test_server.find_channel_by_address("#test") is test_channel
+    assert test_server.find_channel_by_address("#missing") is None
+    assert all(channel.address != "#missing" for channel in test_server.channel_list)
+
+
+def test_prune_user(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({})
+    saved = test_server.get_user_by_address("saved", "saved")
+    saved.use_caps_lock = True
+    gone = test_server.get_user_by_address("gone", "gone")
+    test_channel.add_user(gone)
+    test_server.prune_user(gone)
+    assert test_server.get_user_by_name("gone") is gone
+    test_channel.remove_user(gone)
+    test_server.prune_user(gone)
+    test_server.prune_user(saved)
+    assert test_server.get_user_by_name("gone") is None
+    assert gone not in test_server.user_list
+    assert test_server.get_user_by_name("saved") is saved
+
+
+def test_user_list_assignment(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({})
+    other = User(test_server, "other", "Other")
+    test_server.user_list = [other]
+    assert test_server.user_list == [other]
+    assert test_server.get_user_by_name("other") is other
+    assert test_server.get_user_by_name("test") is None
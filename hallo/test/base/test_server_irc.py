@@ -0,0 +1,179 @@
+import time
+
+import pytest
+
+from hallo.events import EventMessage, EventNameChange, EventPing
+from hallo.hallo import Hallo
+from hallo.inc.irc_message import IRCMessage
+from hallo.inc.send_queue import SendQueue
+from hallo.inc.worker_pool import WorkerPool
+from hallo.server import Server
+from hallo.server_irc import ServerIRC
+
+
+@pytest.fixture
+def irc_server():
+    server = ServerIRC(Hallo(), "test", "irc.example.net", 6667)
+    server.nick = "Hallo"
+    server.prefix = False
+    return server
+
+
+@pytest.mark.parametrize(
+    "line, key, priority",
+    [
+        ("PING :12345", "PING", WorkerPool.PRIORITY_ESSENTIAL),
+        (":a!b@c PRIVMSG #Chan :hello there", "", WorkerPool.PRIORITY_PASSIVE),
+        (":a!b@c PRIVMSG #chan :hallo: roll d6", "", WorkerPool.PRIORITY_NORMAL),
+        (":Alice!b@c PRIVMSG hallo :roll d6", "", WorkerPool.PRIORITY_NORMAL),
+        (":a!b@c NOTICE #chan :notice", "", WorkerPool.PRIORITY_PASSIVE),
+        (":a!b@c JOIN :#chan", "", WorkerPool.PRIORITY_ESSENTIAL),
+        (":a!b@c PART #chan :bye", "", WorkerPool.PRIORITY_ESSENTIAL),
+        (":a!b@c MODE #chan +o d", "", WorkerPool.PRIORITY_ESSENTIAL),
+        (":a!b@c QUIT :bye", "", WorkerPool.PRIORITY_ESSENTIAL),
+        (":a!b@c NICK :d", "", WorkerPool.PRIORITY_ESSENTIAL),
+        (":irc.example.net 353 hallo = #chan :a b c", "", WorkerPool.PRIORITY_ESSENTIAL),
+    ],
+)
+def test_get_message_queue_key(irc_server, line, key, priority):
+    assert irc_server.get_message_queue_key(IRCMessage.parse(line)) == (key, priority)
+
+
+def test_get_message_queue_key__channel_prefix(irc_server):
+    channel = irc_server.get_channel_by_address("#chan", "#chan")
+    channel.prefix = "!"
+    assert irc_server.get_message_queue_key(
+        IRCMessage.parse(":a!b@c PRIVMSG #chan :!roll d6")
+    ) == ("", WorkerPool.PRIORITY_NORMAL)
+    assert irc_server.get_message_queue_key(
+        IRCMessage.parse(":a!b@c PRIVMSG #chan :hallo: roll d6")
+    ) == ("", WorkerPool.PRIORITY_PASSIVE)
+
+
+def test_queue_line__nick_then_message(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({})
+    server = ServerIRC(hallo, "test", "irc.example.net", 6667)
+    server.nick = "Hallo"
+    server.parse_line(":someone!user@host JOIN #chan")
+    user = server.get_user_by_address("someone")
+    dispatched = []
+
+    def dispatch_passive(event):
+        # Passive functions which are slow to handle a nick change should not let later lines overtake it
+        if isinstance(event, EventNameChange):
+            time.sleep(0.01)
+        if isinstance(event, EventMessage):
+            dispatched.append(event)
+
+    hallo.function_dispatcher.dispatch_passive = dispatch_passive
+    server._worker_pool = WorkerPool("irc-test", 4, 100)
+    server._worker_pool.start()
+    try:
+        for x in range(10):
+            old_nick, new_nick = "someone{}".format(x or ""), "someone{}".format(x + 1)
+            server.queue_line(":{}!user@host NICK :{}".format(old_nick, new_nick))
+            server.queue_line(":{}!user@host PRIVMSG #chan :hello".format(new_nick))
+        for _ in range(100):
+            if len(dispatched) == 10 and server._worker_pool.queue_length() == 0:
+                break
+            time.sleep(0.05)
+    finally:
+        server._worker_pool.stop()
+    # Each message was parsed after the nick change before it, so came from the same, renamed, user
+    assert len(dispatched) == 10
+    assert all(event.user is user for event in dispatched)
+    assert user.address == "someone10"
+    assert [u.address for u in server.user_list] == ["someone10"]
+
+
+def test_json_worker_config(irc_server):
+    assert "worker_count" not in irc_server.to_json()
+    irc_server.worker_count = 2
+    irc_server.max_queue_depth = 50
+    new_server = ServerIRC.from_json(irc_server.to_json(), irc_server.hallo)
+    assert new_server.worker_count == 2
+    assert new_server.max_queue_depth == 50
+
+
+@pytest.mark.parametrize(
+    "line, motd_ended",
+    [
+        (":irc.example.net 375 Hallo :- irc.example.net Message of the day -", False),
+        (":irc.example.net NOTICE Hallo :End of message of the day coming up", False),
+        (":irc.example.net 376 Hallo :End of /MOTD command.", True),
+        (":irc.example.net 422 Hallo :MOTD File is missing", True),
+    ],
+)
+def test_parse_welcome_line(irc_server, line, motd_ended):
+    assert irc_server.parse_welcome_line(line) is motd_ended
+
+
+def test_handle_message__join_part(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({})
+    server = ServerIRC(hallo, "test", "irc.example.net", 6667)
+    # Channel may be sent as a middle or trailing parameter
+    server.parse_line(":someone!user@host JOIN #chan")
+    server.parse_line(":other!user@host JOIN :#chan")
+    channel = server.get_channel_by_address("#chan")
+    assert {user.name for user in channel.get_user_list()} == {"someone", "other"}
+    server.parse_line(":someone!user@host PART #chan :see: you later")
+    assert {user.name for user in channel.get_user_list()} == {"other"}
+
+
+def test_handle_message__departed_users_removed(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({})
+    server = ServerIRC(hallo, "test", "irc.example.net", 6667)
+    server.nick = "Hallo"
+    for nick in ["parter", "quitter", "kicked", "grouped", "Hallo"]:
+        server.parse_line(":{0}!user@host JOIN #chan".format(nick))
+    server.parse_line(":kicked!user@host JOIN #other")
+    grouped = server.get_user_by_address("grouped")
+    grouped.extra_data_dict["note"] = "saved"
+    server.parse_line(":parter!user@host PART #chan :bye")
+    server.parse_line(":quitter!user@host QUIT :bye")
+    server.parse_line(":grouped!user@host QUIT :bye")
+    server.parse_line(":Hallo!user@host KICK #chan kicked :out")
+    assert {user.address for user in server.user_list} == {"kicked", "grouped", "hallo"}
+    server.parse_line(":Hallo!user@host KICK #other kicked :out")
+    assert {user.address for user in server.user_list} == {"grouped", "hallo"}
+    assert server.get_user_by_name("parter") is None
+    assert server.get_user_by_address("grouped") is grouped
+
+
+def test_handle_message__names_reply(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({})
+    server = ServerIRC(hallo, "test", "irc.example.net", 6667)
+    server.parse_line(":irc.example.net 353 Hallo = #chan :@op +voiced plain")
+    channel = server.get_channel_by_address("#chan")
+    assert {user.name for user in channel.get_user_list()} == {"op", "voiced", "plain"}
+
+
+def test_send_priorities(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({})
+    server = ServerIRC(hallo, "test", "irc.example.net", 6667)
+    server.state = Server.STATE_OPEN
+    server._send_queue = SendQueue(burst=100, rate=0)
+    channel = server.get_channel_by_address("#chan", "#chan")
+    user = server.get_user_by_address("someone", "someone")
+    # Subscription style update, sent unprompted
+    server.send(EventMessage(server, channel, None, "subscription update", inbound=False))
+    # Reply to a command
+    command = EventMessage(server, channel, user, "hallo: roll d6")
+    server.reply(command, command.create_response("I rolled 4"))
+    server.send(EventPing(server, "12345", inbound=False))
+    batch, _ = server._send_queue.pop_batch()
+    server.state = Server.STATE_CLOSED
+    assert batch == [
+        b"PONG :12345\r\n",
+        b"PRIVMSG #chan :I rolled 4\r\n",
+        b"PRIVMSG #chan :subscription update\r\n",
+    ]
+
+
+def test_json_send_config(irc_server):
+    assert "send_rate" not in irc_server.to_json()
+    irc_server.send_burst = 10
+    irc_server.send_rate = 1.5
+    new_server = ServerIRC.from_json(irc_server.to_json(), irc_server.hallo)
+    assert new_server.send_burst == 10
+    assert new_server.send_rate == 1.5
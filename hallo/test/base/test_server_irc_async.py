@@ -0,0 +1,171 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from hallo.server import Server
+from hallo.server_factory import ServerFactory
+from hallo.server_irc import ServerIRC
+from hallo.server_irc_async import ServerIRCAsync, IRCEventLoop
+
+
+class FakeIRCServer:
+    """
+    Minimal IRC server, listening on localhost, which records what clients send to it
+    """
+
+    def __init__(self):
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen(5)
+        self.port = self.listener.getsockname()[1]
+        self.connections = []
+        self.received = []
+        self.thread = threading.Thread(target=self._accept, daemon=True)
+        self.thread.start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.listener.accept()
+            except OSError:
+                return
+            self.connections.append(conn)
+            conn.sendall(b":irc.example.net NOTICE * :Welcome\r\n")
+            threading.Thread(target=self._read, args=(conn,), daemon=True).start()
+
+    def _read(self, conn):
+        data = b""
+        while True:
+            try:
+                chunk = conn.recv(4096)
+            except OSError:
+                return
+            if not chunk:
+                return
+            data += chunk
+            while b"\r\n" in data:
+                line, data = data.split(b"\r\n", 1)
+                self.received.append(line.decode())
+                if line.startswith(b"USER"):
+                    conn.sendall(b":irc.example.net 376 hallo :End of /MOTD command.\r\n")
+
+    def send(self, line):
+        self.connections[-1].sendall(line.encode() + b"\r\n")
+
+    def drop_connection(self):
+        self.connections[-1].shutdown(socket.SHUT_RDWR)
+        self.connections[-1].close()
+
+    def close(self):
+        self.listener.close()
+        for conn in self.connections:
+            conn.close()
+
+
+def wait_for(condition, timeout=5):
+    end = time.time() + timeout
+    while not condition():
+        assert time.time() < end, "Timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def fake_irc():
+    server = FakeIRCServer()
+    yield server
+    server.close()
+
+
+def test_connect_and_pong(hallo_getter, fake_irc):
+    hallo, test_server, test_channel, test_user = hallo_getter({})
+    server = ServerIRCAsync(hallo, "fake", "127.0.0.1", fake_irc.port)
+    hallo.add_server(server)
+    server.start()
+    try:
+        wait_for(lambda: server.state == Server.STATE_OPEN)
+        assert "NICK {}".format(server.get_nick()) in fake_irc.received
+        fake_irc.send("PING :12345")
+        wait_for(lambda: "PONG :12345" in fake_irc.received)
+    finally:
+        server.disconnect()
+    assert server.state == Server.STATE_CLOSED
+    wait_for(lambda: any(line.startswith("QUIT") for line in fake_irc.received))
+
+
+def test_channel_message_processed(hallo_getter, fake_irc):
+    hallo, test_server, test_channel, test_user = hallo_getter({})
+    server = ServerIRCAsync(hallo, "fake", "127.0.0.1", fake_irc.port)
+    hallo.add_server(server)
+    server.start()
+    try:
+        wait_for(lambda: server.state == Server.STATE_OPEN)
+        fake_irc.send(":someone!user@host JOIN :#chan")
+        wait_for(lambda: server.get_channel_by_name("#chan") is not None)
+        channel = server.get_channel_by_name("#chan")
+        wait_for(lambda: any(user.name == "someone" for user in channel.get_user_list()))
+    finally:
+        server.disconnect()
+
+
+def test_reconnect(hallo_getter, fake_irc):
+    hallo, test_server, test_channel, test_user = hallo_getter({})
+    server = ServerIRCAsync(hallo, "fake", "127.0.0.1", fake_irc.port)
+    server.RECONNECT_DELAY_MIN = 0.1
+    hallo.add_server(server)
+    server.start()
+    try:
+        wait_for(lambda: server.state == Server.STATE_OPEN)
+        fake_irc.drop_connection()
+        wait_for(lambda: len(fake_irc.connections) == 2)
+        wait_for(lambda: server.state == Server.STATE_OPEN)
+    finally:
+        server.disconnect()
+
+
+def test_keepalive(hallo_getter, fake_irc):
+    hallo, test_server, test_channel, test_user = hallo_getter({})
+    server = ServerIRCAsync(hallo, "fake", "127.0.0.1", fake_irc.port)
+    server.KEEPALIVE_INTERVAL = 0.2
+    hallo.add_server(server)
+    server.start()
+    try:
+        wait_for(lambda: server.state == Server.STATE_OPEN)
+        wait_for(lambda: "PING :keepalive" in fake_irc.received)
+    finally:
+        server.disconnect()
+
+
+def test_servers_share_threads(hallo_getter, fake_irc):
+    hallo, test_server, test_channel, test_user = hallo_getter({})
+    first = ServerIRCAsync(hallo, "fake1", "127.0.0.1", fake_irc.port)
+    hallo.add_server(first)
+    first.start()
+    servers = [first]
+    try:
+        wait_for(lambda: first.state == Server.STATE_OPEN)
+        # Fake IRC server threads are daemon threads, so only count the others
+        thread_count = len([t for t in threading.enumerate() if not t.daemon])
+        for x in range(5):
+            server = ServerIRCAsync(hallo, "fake{}".format(x + 2), "127.0.0.1", fake_irc.port)
+            hallo.add_server(server)
+            server.start()
+            servers.append(server)
+        wait_for(lambda: all(s.state == Server.STATE_OPEN for s in servers))
+        assert len([t for t in threading.enumerate() if not t.daemon]) == thread_count
+    finally:
+        for server in servers:
+            server.disconnect()
+    wait_for(lambda: IRCEventLoop.shared().worker_pool.busy_workers() == 0)
+
+
+def test_factory_transport(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({})
+    factory = ServerFactory(hallo)
+    json_obj = ServerIRC(hallo, "example", "irc.example.net", 6667).to_json()
+    assert type(factory.new_server_from_json(json_obj)) == ServerIRC
+    json_obj["transport"] = "asyncio"
+    new_server = factory.new_server_from_json(json_obj)
+    assert isinstance(new_server, ServerIRCAsync)
+    assert new_server.to_json()["transport"] == "asyncio"
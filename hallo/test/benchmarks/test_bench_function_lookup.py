@@ -0,0 +1,49 @@
+import time
+
+import pytest
+
+from hallo.function_dispatcher import FunctionDispatcher
+
+
+def prefix_join_lookup(function_dispatcher, words):
+    """
+    The previous approach to finding a function name in FunctionDispatcher.dispatch, for comparison: joining each
+    prefix of the message, longest first, and looking each one up.
+    """
+    for x in range(len(words))[::-1]:
+        function_name = " ".join(words[: x + 1])
+        function_class = function_dispatcher.get_function_by_name(function_name)
+        if function_class is not None:
+            return function_class, x + 1
+    return None, 0
+
+
+@pytest.mark.benchmark
+def test_bench_function_lookup(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter()
+    function_dispatcher = hallo.function_dispatcher
+    messages = [
+        "rss add https://example.com/feed.xml",
+        "subscription check",
+        "roll d6",
+        "convert 10 metres to feet and then show me the answer please",
+        "this is not a function at all but it is quite a long message to search through",
+    ]
+    message_words = [message.split() for message in messages] * 20000
+    start = time.perf_counter()
+    old_results = [prefix_join_lookup(function_dispatcher, words) for words in message_words]
+    old_time = time.perf_counter() - start
+    start = time.perf_counter()
+    new_results = [function_dispatcher.get_function_by_words(words) for words in message_words]
+    new_time = time.perf_counter() - start
+    assert old_results == new_results
+    print(
+        "\nFunction lookup, {} names, {} messages: prefix join {:.0f}/sec, trie {:.0f}/sec ({:.1f}x)".format(
+            len(function_dispatcher.function_names),
+            len(message_words),
+            len(message_words) / old_time,
+            len(message_words) / new_time,
+            old_time / new_time,
+        )
+    )
+    assert new_time < old_time
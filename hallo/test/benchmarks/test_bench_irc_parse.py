@@ -0,0 +1,110 @@
+import time
+
+import pytest
+
+from hallo.inc.irc_message import IRCMessage
+
+
+def irc_corpus(line_count):
+    """
+    Builds a list of IRC lines, in the mix seen on a busy server: channel messages, JOINs, MODEs and numerics
+    """
+    lines = []
+    for x in range(line_count):
+        kind = x % 4
+        if kind == 0:
+            lines.append(
+                ":user{0}!~user{0}@host-{0}.example.com PRIVMSG #busy :hello there: number {0}".format(x)
+            )
+        elif kind == 1:
+            lines.append(":user{0}!~user{0}@host-{0}.example.com JOIN :#busy".format(x))
+        elif kind == 2:
+            lines.append(":op!~op@staff.example.com MODE #busy +o user{}".format(x))
+        else:
+            lines.append(
+                ":irc.example.net 353 Hallo = #busy :" + " ".join("@user{}".format(x + y) for y in range(20))
+            )
+    return lines
+
+
+def split_parse(line):
+    """
+    The previous approach to parsing in ServerIRC, for comparison: an if/elif chain splitting the line for each
+    command compared, then each handler splitting it again to pull out the fields it needs.
+    """
+    if line.split()[0] == "PING":
+        return "PING", line.split()[1], None, None
+    elif line.split()[1] == "PONG":
+        return "PONG", None, None, None
+    elif line.split()[1] == "PRIVMSG":
+        text = ":".join(line.split(":")[2:])
+        sender = line.split("!")[0].replace(":", "")
+        destination = line.split()[2].lower()
+        return "PRIVMSG", sender, destination, text
+    elif line.split()[1] == "JOIN":
+        channel = ":".join(line.split(":")[2:]).lower()
+        client = line.split("!")[0][1:]
+        return "JOIN", client, channel, None
+    elif line.split()[1] == "PART":
+        return "PART", None, None, None
+    elif line.split()[1] == "QUIT":
+        return "QUIT", None, None, None
+    elif line.split()[1] == "MODE":
+        channel = line.split()[2].lower()
+        client = line.split()[0][1:]
+        if "!" in client:
+            client = client.split("!")[0]
+        mode = line.split()[3]
+        if mode[0] == ":":
+            mode = mode[1:]
+        args = " ".join(line.split()[4:])
+        return "MODE", client, channel, "{} {}".format(mode, args)
+    elif len(line.split()[1]) == 3 and line.split()[1].isdigit():
+        code = line.split()[1]
+        channel = line.split(":")[1].split()[-1].lower()
+        users = ":".join(line.split(":")[2:])
+        return code, None, channel, users
+    return None, None, None, None
+
+
+def message_parse(line):
+    """
+    Parses the line once, then reads the same fields from the parsed message
+    """
+    message = IRCMessage.parse(line)
+    command = message.command
+    if command == "PING":
+        return command, message.param(0), None, None
+    if command == "PRIVMSG":
+        return command, message.nick, message.param(0).lower(), message.param(1)
+    if command == "JOIN":
+        return command, message.nick, message.param(0).lower(), None
+    if command == "MODE":
+        return command, message.nick, message.param(0).lower(), " ".join(message.params[1:])
+    if message.is_numeric():
+        return command, None, message.param(-2).lower(), message.param(-1)
+    return None, None, None, None
+
+
+def time_parse(lines, parse, repeats=3):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        results = [parse(line) for line in lines]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return results, best
+
+
+@pytest.mark.benchmark
+def test_bench_irc_parse():
+    lines = irc_corpus(100000)
+    old_results, old_time = time_parse(lines, split_parse)
+    new_results, new_time = time_parse(lines, message_parse)
+    assert old_results == new_results
+    print(
+        "\nIRC parsing, {} lines: split {:.0f} lines/sec, IRCMessage {:.0f} lines/sec ({:.1f}x)".format(
+            len(lines), len(lines) / old_time, len(lines) / new_time, old_time / new_time
+        )
+    )
+    assert new_time < old_time
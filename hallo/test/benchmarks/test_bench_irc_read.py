@@ -0,0 +1,89 @@
+import socket
+import time
+from threading import Thread
+
+import pytest
+
+from hallo.hallo import Hallo
+from hallo.server import Server, ServerException
+from hallo.server_irc import ServerIRC, endl
+
+
+def irc_burst(line_count):
+    """
+    Builds a burst of raw IRC data, similar to what is received while joining a busy channel: MOTD, NAMES, JOINs
+    and chatter.
+    """
+    lines = []
+    for x in range(line_count):
+        kind = x % 4
+        if kind == 0:
+            lines.append(":irc.example.net 372 Hallo :- Message of the day line {} ☃".format(x))
+        elif kind == 1:
+            lines.append(
+                ":irc.example.net 353 Hallo = #busy :"
+                + " ".join("@user{}".format(x + y) for y in range(20))
+            )
+        elif kind == 2:
+            lines.append(":user{0}!~user{0}@host-{0}.example.com JOIN :#busy".format(x))
+        else:
+            lines.append(":user{0}!~user{0}@host-{0}.example.com PRIVMSG #busy :hello there, number {0}".format(x))
+    return "".join(line + endl for line in lines).encode("utf-8"), lines
+
+
+def read_line_byte_at_a_time(sock):
+    """
+    The previous implementation of ServerIRC.read_line_from_socket, for comparison
+    """
+    next_line = b""
+    while True:
+        next_byte = sock.recv(1)
+        if len(next_byte) != 1:
+            raise ServerException("Length of next byte incorrect: {}".format(next_byte))
+        next_line += next_byte
+        if next_line.endswith(endl.encode()):
+            return next_line[: -len(endl)].decode("utf-8")
+
+
+def replay(raw_data, read_line):
+    """
+    Sends the raw data through a socket pair, and times how long it takes to read it all back as lines
+    """
+    server_sock, client_sock = socket.socketpair()
+    writer = Thread(target=lambda: (server_sock.sendall(raw_data), server_sock.close()))
+    read_lines = []
+    start = time.perf_counter()
+    writer.start()
+    try:
+        while True:
+            read_lines.append(read_line(client_sock))
+    except ServerException:
+        pass
+    elapsed = time.perf_counter() - start
+    writer.join()
+    client_sock.close()
+    return read_lines, elapsed
+
+
+@pytest.mark.benchmark
+def test_bench_read_line_from_socket():
+    raw_data, lines = irc_burst(20000)
+    server = ServerIRC(Hallo(), "bench", "irc.example.net", 6667)
+    server.state = Server.STATE_OPEN
+
+    def buffered_read_line(sock):
+        server._socket = sock
+        return server.read_line_from_socket()
+
+    old_lines, old_time = replay(raw_data, read_line_byte_at_a_time)
+    new_lines, new_time = replay(raw_data, buffered_read_line)
+    server.state = Server.STATE_CLOSED
+
+    assert old_lines == lines
+    assert new_lines == lines
+    print(
+        "\nread_line_from_socket, {} lines: recv(1) {:.0f} lines/sec, buffered {:.0f} lines/sec ({:.1f}x)".format(
+            len(lines), len(lines) / old_time, len(lines) / new_time, old_time / new_time
+        )
+    )
+    assert new_time < old_time
@@ -0,0 +1,48 @@
+import time
+
+import pytest
+
+from hallo.events import EventMessage
+
+
+@pytest.mark.benchmark
+def test_bench_passive_dispatch(hallo_getter):
+    # Silly is left out, as Reply has no trigger and re-reads its xml for every line
+    hallo, test_server, test_channel, test_user = hallo_getter({"bio", "convert", "games", "lookup", "math", "random"})
+    function_dispatcher = hallo.function_dispatcher
+    lines = [
+        "hey everyone, how is it going today?",
+        "not bad, just got back from the shops",
+        "did anyone see the match last night",
+        "yeah it was pretty good honestly",
+    ]
+    events = [EventMessage(test_server, test_channel, test_user, line) for line in lines] * 500
+    # Time dispatch without triggers, as before
+    triggers = function_dispatcher.passive_triggers
+    function_dispatcher.passive_triggers = {}
+    function_dispatcher._passive_matchers = {}
+    start = time.perf_counter()
+    for event in events:
+        function_dispatcher.dispatch_passive(event)
+    old_time = time.perf_counter() - start
+    # Time dispatch with triggers
+    function_dispatcher.passive_triggers = triggers
+    function_dispatcher._passive_matchers = {}
+    start = time.perf_counter()
+    for event in events:
+        function_dispatcher.dispatch_passive(event)
+    new_time = time.perf_counter() - start
+    test_server.get_send_data()
+    stats = function_dispatcher.get_passive_trigger_stats()
+    print(
+        "\nPassive dispatch, {} triggers, {} lines: no triggers {:.0f}/sec, triggers {:.0f}/sec ({:.1f}x), "
+        "{} function calls skipped".format(
+            len(triggers),
+            len(events),
+            len(events) / old_time,
+            len(events) / new_time,
+            old_time / new_time,
+            sum(misses for hits, misses in stats.values()),
+        )
+    )
+    assert new_time < old_time
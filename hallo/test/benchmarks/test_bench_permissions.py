@@ -0,0 +1,35 @@
+import time
+
+import pytest
+
+from hallo.user_group import UserGroup
+
+
+@pytest.mark.benchmark
+def test_bench_permissions(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter()
+    function_dispatcher = hallo.function_dispatcher
+    for name in ["group_a", "group_b", "group_c"]:
+        test_user.add_user_group(UserGroup(name, hallo))
+    function_classes = function_dispatcher.get_function_class_list()
+    checks = 50000
+    start = time.perf_counter()
+    for x in range(checks):
+        function_class = function_classes[x % len(function_classes)]
+        function_dispatcher.resolve_right(
+            "function_{}".format(function_class.__name__), test_server, test_user, test_channel
+        )
+    old_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for x in range(checks):
+        function_class = function_classes[x % len(function_classes)]
+        function_dispatcher.check_function_permissions(function_class, test_server, test_user, test_channel)
+    new_time = time.perf_counter() - start
+    stats = function_dispatcher.get_permission_cache_stats()
+    print(
+        "\nPermission checks, {} functions, user in 3 groups: uncached {:.0f}/sec, cached {:.0f}/sec ({:.1f}x), "
+        "{:.1%} hit rate".format(
+            len(function_classes), checks / old_time, checks / new_time, old_time / new_time, stats["hit_rate"]
+        )
+    )
+    assert new_time < old_time
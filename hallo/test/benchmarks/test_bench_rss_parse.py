@@ -0,0 +1,72 @@
+import time
+import tracemalloc
+from xml.etree import ElementTree
+
+import pytest
+
+from hallo.modules.subscriptions.source_rss import FeedReader, RssSource
+
+
+def build_feed(item_count):
+    items = "".join(
+        "<item><title>Episode {0}</title><link>http://example.com/ep{0}</link><guid>ep{0}</guid>"
+        "<description>{1}</description></item>".format(num, "Show notes. " * 40)
+        for num in range(item_count, 0, -1)
+    )
+    return '<rss version="2.0"><channel><title>Podcast</title>{}</channel></rss>'.format(items)
+
+
+def old_check(source, rss_data):
+    """
+    The previous approach to RssSource.current_state, for comparison: parsing the whole feed, then parsing it again
+    for the title, and diffing every item against the list of last keys.
+    """
+    rss_elem = ElementTree.fromstring(rss_data)
+    ElementTree.fromstring(rss_data).find("channel").find("title")
+    state = rss_elem.find("channel").findall("item")
+    new_items = []
+    batch = []
+    for item in state:
+        if source.item_to_key(item) in source.last_keys:
+            new_items += batch
+            batch = []
+        else:
+            batch.append(item)
+    source.last_keys = [source.item_to_key(item) for item in state]
+    return new_items
+
+
+def new_check(source, rss_data):
+    feed = FeedReader(rss_data)
+    assert feed.title == "Podcast"
+    new_items = source.state_change(feed)
+    source.save_state(feed)
+    return new_items
+
+
+def measure(check, source, rss_data):
+    tracemalloc.start()
+    start = time.perf_counter()
+    new_items = check(source, rss_data)
+    duration = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return new_items, duration, peak
+
+
+@pytest.mark.benchmark
+def test_bench_rss_parse():
+    item_count = 8500
+    rss_data = build_feed(item_count)
+    last_keys = ["ep{}".format(num) for num in range(item_count - 2, 0, -1)]
+    old_items, old_time, old_peak = measure(old_check, RssSource("http://example.com", "Podcast", last_keys), rss_data)
+    new_items, new_time, new_peak = measure(new_check, RssSource("http://example.com", "Podcast", last_keys), rss_data)
+    assert [item.find("guid").text for item in old_items] == [item.find("guid").text for item in new_items]
+    print(
+        "\nRSS check, {:.1f}MB feed, 2 new items: full parse {:.0f}ms, {:.1f}MB peak, "
+        "incremental parse {:.1f}ms, {:.1f}MB peak".format(
+            len(rss_data) / 1e6, old_time * 1e3, old_peak / 1e6, new_time * 1e3, new_peak / 1e6
+        )
+    )
+    assert new_time < old_time
+    assert new_peak < old_peak
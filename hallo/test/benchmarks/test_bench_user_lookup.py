@@ -0,0 +1,75 @@
+import time
+
+import pytest
+
+from hallo.destination import User
+from hallo.test.server_mock import ServerMock
+
+
+def scan_user_by_address(user_list, address):
+    """
+    The previous approach to Server.get_user_by_address, for comparison: scanning the user list.
+    """
+    for user in user_list:
+        if user.address == address:
+            return user
+    return None
+
+
+@pytest.mark.benchmark
+def test_bench_user_lookup(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({})
+    user_count = 50000
+    for x in range(user_count):
+        test_server.add_user(User(test_server, "user{}".format(x), "User{}".format(x)))
+    # Messages come from a spread of users, old and new
+    addresses = ["user{}".format((x * 7919) % user_count) for x in range(2000)]
+    user_list = test_server.user_list
+    start = time.perf_counter()
+    old_users = [scan_user_by_address(user_list, address) for address in addresses]
+    old_time = time.perf_counter() - start
+    start = time.perf_counter()
+    new_users = [test_server.get_user_by_address(address) for address in addresses]
+    new_time = time.perf_counter() - start
+    assert old_users == new_users
+    print(
+        "\nUser lookup, {} users: list scan {:.1f}us/message, index {:.2f}us/message ({:.0f}x)".format(
+            len(test_server.user_list),
+            old_time / len(addresses) * 1e6,
+            new_time / len(addresses) * 1e6,
+            old_time / new_time,
+        )
+    )
+    assert new_time < old_time
+
+
+def time_nick_changes(server, user_count):
+    """
+    Fills a server with users, and returns the average time for a user to change nick and back
+    """
+    for x in range(user_count):
+        server.add_user(User(server, "user{}".format(x), "User{}".format(x)))
+    users = [server.get_user_by_address("user{}".format((x * 7919) % user_count)) for x in range(2000)]
+    start = time.perf_counter()
+    for user in users:
+        old_name, old_address = user.name, user.address
+        server.rename_user(user, old_name + "_away", old_address + "_away")
+        server.rename_user(user, old_name, old_address)
+    return (time.perf_counter() - start) / len(users)
+
+
+@pytest.mark.benchmark
+def test_bench_nick_change(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({})
+    small_server = ServerMock(hallo)
+    small_time = time_nick_changes(small_server, 2000)
+    large_time = time_nick_changes(test_server, 50000)
+    assert test_server.get_user_by_name("user7919") is not None
+    assert test_server.get_user_by_name("user7919_away") is None
+    print(
+        "\nNick change: {:.2f}us with 2000 users, {:.2f}us with {} users".format(
+            small_time * 1e6, large_time * 1e6, len(test_server.user_list)
+        )
+    )
+    # Renaming should not scan the user list, so shouldn't slow down with 25 times as many users
+    assert large_time < small_time * 5
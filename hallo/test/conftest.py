@@ -5,9 +5,17 @@ import pytest
 
 from hallo.function_dispatcher import FunctionDispatcher
 from hallo.hallo import Hallo
+from hallo.inc.commons import Commons
+from hallo.inc.http_client import CircuitBreaker
 from hallo.test.server_mock import ServerMock
 
 
+@pytest.fixture(autouse=True)
+def fresh_circuit_breaker(monkeypatch):
+    # Failures mocked in one test should not stop requests being sent in the next
+    monkeypatch.setattr(Commons.http_client, "circuit_breaker", CircuitBreaker())
+
+
 @pytest.fixture
 def hallo_getter():
     # Create a Hallo
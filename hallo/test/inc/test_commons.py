@@ -1,10 +1,15 @@
 import re
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import pytest
 
-from hallo.inc.commons import Commons
+from hallo.inc.commons import CachedObject, Commons, KeyedCache
+from hallo.inc.http_client import RateLimitedError
 
 
 @pytest.mark.parametrize(
@@ -442,3 +447,208 @@ def test_upper():
 
 def test_upper__with_url():
     assert Commons.upper("test http://google.com url") == "TEST http://google.com URL"
+
+
+def test_keyed_cache():
+    cache = KeyedCache(max_size=2)
+    calls = []
+
+    def setter(value):
+        calls.append(value)
+        return value
+
+    assert cache.get("a", lambda: setter(1)) == 1
+    assert cache.get("a", lambda: setter(2)) == 1
+    cache.get("b", lambda: setter(3))
+    cache.get("a", lambda: setter(4))
+    cache.get("c", lambda: setter(5))
+    assert cache.get("b", lambda: setter(6)) == 6
+
+    assert calls == [1, 3, 5, 6]
+    assert cache.get_stats() == {"size": 2, "bytes": 0, "hits": 2, "misses": 4, "stale": 0, "evictions": 2}
+
+
+def test_keyed_cache__expiry():
+    cache = KeyedCache(cache_expiry=timedelta(seconds=-1))
+
+    cache.get("a", lambda: 1)
+
+    assert cache.get("a", lambda: 2) == 2
+    assert cache.get_stats()["hits"] == 0
+
+
+def test_keyed_cache__max_bytes():
+    cache = KeyedCache(max_size=10, max_bytes=10, size_of=len)
+
+    cache.get("a", lambda: "12345")
+    cache.get("b", lambda: "1234")
+    cache.get("c", lambda: "123")
+    cache.get("d", lambda: "12345678901")
+
+    assert cache.get_stats()["size"] == 2
+    assert cache.get_stats()["bytes"] == 7
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_keyed_cache__errors():
+    cache = KeyedCache(error_expiry=timedelta(minutes=1))
+    calls = []
+
+    def fail():
+        calls.append(1)
+        raise ValueError("API down")
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            cache.get("a", fail)
+
+    assert len(calls) == 1
+
+
+def test_keyed_cache__errors_not_shared():
+    cache = KeyedCache(error_expiry=timedelta(minutes=1))
+
+    def fail():
+        raise RateLimitedError("http://example.com", 30)
+
+    errors = []
+    cached_traceback_lengths = []
+    for _ in range(3):
+        with pytest.raises(RateLimitedError) as exc_info:
+            cache.get("a", fail)
+        errors.append(exc_info.value)
+        cached_traceback_lengths.append(len(traceback.extract_tb(exc_info.value.__cause__.__traceback__)))
+
+    # Each caller gets its own copy of the cached error, so tracebacks don't pile up on one shared error
+    assert len({id(error) for error in errors}) == 3
+    assert all(error.retry_after == 30 for error in errors)
+    assert all(error.__cause__ is errors[0].__cause__ for error in errors)
+    assert len(set(cached_traceback_lengths)) == 1
+
+
+def test_keyed_cache__errors_only():
+    cache = KeyedCache(cache_expiry=timedelta(0), error_expiry=timedelta(minutes=1))
+
+    assert cache.get("a", lambda: 1) == 1
+    assert cache.get("a", lambda: 2) == 2
+    assert cache.get_stats()["size"] == 0
+
+
+def test_load_url_json__cache(requests_mock):
+    cache = KeyedCache(cache_expiry=timedelta(minutes=5), size_of=len, error_expiry=timedelta(minutes=1))
+    requests_mock.get("http://example.com/api.json", text='{"a": [1]}')
+    requests_mock.get("http://example.com/broken.json", status_code=502, text="Bad gateway")
+
+    first = Commons.load_url_json("http://example.com/api.json", cache=cache)
+    first["a"].append(2)
+    second = Commons.load_url_json("http://example.com/api.json", cache=cache)
+    for _ in range(2):
+        with pytest.raises(Exception):
+            Commons.load_url_json("http://example.com/broken.json", cache=cache)
+
+    assert second == {"a": [1]}
+    assert requests_mock.call_count == 2
+
+
+def _slow_counter(calls, release):
+    def setter():
+        calls.append(1)
+        release.wait(5)
+        return len(calls)
+    return setter
+
+
+def test_cached_object__single_flight():
+    calls = []
+    release = threading.Event()
+    cached = CachedObject(_slow_counter(calls, release))
+
+    with ThreadPoolExecutor(5) as executor:
+        futures = [executor.submit(cached.get) for _ in range(5)]
+        time.sleep(0.1)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert results == [1] * 5
+    assert len(calls) == 1
+
+
+def test_cached_object__single_flight_error():
+    calls = []
+
+    def fail():
+        calls.append(1)
+        time.sleep(0.1)
+        raise ValueError("API down")
+    cached = CachedObject(fail)
+
+    with ThreadPoolExecutor(3) as executor:
+        futures = [executor.submit(cached.get) for _ in range(3)]
+        errors = [future.exception() for future in futures]
+
+    assert all(isinstance(error, ValueError) for error in errors)
+    assert len(calls) == 1
+    with pytest.raises(ValueError):
+        cached.get()
+    assert len(calls) == 2
+
+
+def test_cached_object__stale_while_revalidate():
+    calls = []
+    release = threading.Event()
+    cached = CachedObject(_slow_counter(calls, release), timedelta(minutes=5), timedelta(minutes=5))
+    release.set()
+    assert cached.get() == 1
+    release.clear()
+
+    # Expired, but within the staleness limit, so the old value is returned while it is refreshed
+    cached.cache_time = datetime.now() - timedelta(minutes=6)
+    assert cached.get() == 1
+    assert cached.get() == 1
+    release.set()
+    for _ in range(50):
+        if cached.value == 2:
+            break
+        time.sleep(0.05)
+    assert cached.get() == 2
+    assert len(calls) == 2
+
+    # Too stale, so callers wait for the new value
+    cached.cache_time = datetime.now() - timedelta(minutes=11)
+    assert cached.get() == 3
+
+
+def test_keyed_cache__single_flight():
+    calls = []
+    release = threading.Event()
+    cache = KeyedCache()
+
+    with ThreadPoolExecutor(4) as executor:
+        futures = [executor.submit(cache.get, "a", _slow_counter(calls, release)) for _ in range(4)]
+        time.sleep(0.1)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert results == [1] * 4
+    assert len(calls) == 1
+    assert cache.get_stats()["misses"] == 4
+
+
+def test_keyed_cache__stale_while_revalidate():
+    cache = KeyedCache(max_stale=timedelta(minutes=5))
+    cache.get("a", lambda: 1)
+    cache._entries["a"] = cache._entries["a"]._replace(expiry=datetime.now() - timedelta(minutes=1))
+    release = threading.Event()
+
+    def setter():
+        release.wait(5)
+        return 2
+
+    assert cache.get("a", setter) == 1
+    release.set()
+    for _ in range(50):
+        if cache._entries["a"].value == 2:
+            break
+        time.sleep(0.05)
+    assert cache.get("a", setter) == 2
+    assert cache.get_stats()["stale"] == 1
@@ -0,0 +1,54 @@
+import threading
+import time
+from collections import Counter
+
+from hallo.inc.host_pool import run_by_host
+
+
+def test_run_by_host_results():
+    def fail():
+        raise ValueError("failed")
+
+    tasks = [("a", "host1", lambda: 1), ("b", "host2", lambda: 2), ("c", "host1", fail)]
+    results = run_by_host(tasks, 4, 1, 5)
+    assert results.results == {"a": 1, "b": 2}
+    assert isinstance(results.errors["c"], ValueError)
+    assert results.timed_out == []
+    assert results.not_started == []
+
+
+def test_run_by_host_limits():
+    lock = threading.Lock()
+    running = Counter()
+    peaks = Counter()
+
+    def task(host):
+        with lock:
+            running[host] += 1
+            running["total"] += 1
+            peaks[host] = max(peaks[host], running[host])
+            peaks["total"] = max(peaks["total"], running["total"])
+        time.sleep(0.02)
+        with lock:
+            running[host] -= 1
+            running["total"] -= 1
+        return host
+
+    tasks = [(x, "host{}".format(x % 3), lambda x=x: task("host{}".format(x % 3))) for x in range(18)]
+    results = run_by_host(tasks, 4, 2, 5)
+    assert len(results.results) == 18
+    assert peaks["total"] <= 4
+    assert all(peaks["host{}".format(x)] <= 2 for x in range(3))
+
+
+def test_run_by_host_slow_host_does_not_block_others():
+    release = threading.Event()
+    tasks = [("slow{}".format(x), "slow", release.wait) for x in range(3)]
+    tasks += [("fast{}".format(x), "fast", lambda: True) for x in range(5)]
+    start = time.monotonic()
+    results = run_by_host(tasks, 4, 1, 0.2)
+    release.set()
+    assert time.monotonic() - start < 2
+    assert all("fast{}".format(x) in results.results for x in range(5))
+    assert results.timed_out == ["slow0"]
+    assert results.not_started == ["slow1", "slow2"]
@@ -0,0 +1,230 @@
+from datetime import datetime, timezone
+
+import pytest
+import requests
+
+from hallo.inc.http_client import CircuitBreaker, CircuitOpenError, HttpClient, RateLimitedError, parse_retry_after
+
+
+def test_get_sets_timeout(requests_mock):
+    client = HttpClient(timeout=(2, 10))
+    requests_mock.get("http://example.com/test", text="hello")
+
+    resp = client.get("http://example.com/test")
+    client.get("http://example.com/test", timeout=3)
+
+    assert resp.text == "hello"
+    assert requests_mock.request_history[0].timeout == (2, 10)
+    assert requests_mock.request_history[1].timeout == 3
+    assert "gzip" in requests_mock.request_history[0].headers["Accept-Encoding"]
+
+
+def test_get_conditional_not_modified(requests_mock):
+    client = HttpClient()
+    requests_mock.get(
+        "http://example.com/feed",
+        [
+            {"text": "feed v1", "headers": {"ETag": '"abc"', "Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"}},
+            {"status_code": 304},
+        ]
+    )
+
+    first = client.get_conditional("http://example.com/feed")
+    second = client.get_conditional("http://example.com/feed")
+
+    assert first.text == "feed v1"
+    assert not first.not_modified
+    assert "If-None-Match" not in requests_mock.request_history[0].headers
+    assert second.text == "feed v1"
+    assert second.not_modified
+    assert requests_mock.request_history[1].headers["If-None-Match"] == '"abc"'
+    assert requests_mock.request_history[1].headers["If-Modified-Since"] == "Wed, 21 Oct 2015 07:28:00 GMT"
+    assert client.get_stats()["not_modified"] == 1
+
+
+def test_get_conditional_modified(requests_mock):
+    client = HttpClient()
+    requests_mock.get(
+        "http://example.com/feed",
+        [{"text": "feed v1", "headers": {"ETag": '"abc"'}}, {"text": "feed v2", "headers": {"ETag": '"def"'}}]
+    )
+
+    client.get_conditional("http://example.com/feed")
+    second = client.get_conditional("http://example.com/feed")
+    client.get_conditional("http://example.com/feed")
+
+    assert second.text == "feed v2"
+    assert not second.not_modified
+    assert requests_mock.request_history[2].headers["If-None-Match"] == '"def"'
+
+
+def test_get_conditional_separate_headers(requests_mock):
+    client = HttpClient()
+    requests_mock.get("http://example.com/feed", text="feed", headers={"ETag": '"abc"'})
+
+    client.get_conditional("http://example.com/feed", {"User-Agent": "one"})
+    client.get_conditional("http://example.com/feed", {"User-Agent": "two"})
+
+    assert "If-None-Match" not in requests_mock.request_history[1].headers
+
+
+def test_get_conditional_forgets_on_error(requests_mock):
+    client = HttpClient()
+    requests_mock.get(
+        "http://example.com/feed",
+        [{"text": "feed", "headers": {"ETag": '"abc"'}}, {"status_code": 500, "text": "error"}, {"text": "feed"}]
+    )
+
+    client.get_conditional("http://example.com/feed")
+    error = client.get_conditional("http://example.com/feed")
+    client.get_conditional("http://example.com/feed")
+
+    assert error.status_code == 500
+    assert "If-None-Match" not in requests_mock.request_history[2].headers
+
+
+def test_get_conditional_max_validators(requests_mock):
+    client = HttpClient(max_validators=2)
+    for num in range(3):
+        requests_mock.get(f"http://example.com/{num}", text="feed", headers={"ETag": f'"{num}"'})
+        client.get_conditional(f"http://example.com/{num}")
+
+    client.get_conditional("http://example.com/0")
+
+    assert client.get_stats()["validators"] == 2
+    assert "If-None-Match" not in requests_mock.request_history[3].headers
+
+
+def test_no_cookies_shared(requests_mock):
+    client = HttpClient()
+    requests_mock.get("http://example.com/login", text="ok", headers={"Set-Cookie": "session=secret"})
+    requests_mock.get("http://example.com/other", text="ok")
+
+    client.get("http://example.com/login")
+    client.get("http://example.com/other")
+
+    assert "Cookie" not in requests_mock.request_history[1].headers
+
+
+def test_rate_limited(requests_mock):
+    client = HttpClient()
+    requests_mock.get("http://example.com/feed", status_code=429, headers={"Retry-After": "120"})
+    requests_mock.get("http://example.com/other", status_code=429)
+
+    with pytest.raises(RateLimitedError) as error:
+        client.get_conditional("http://example.com/feed")
+    assert error.value.retry_after == 120
+    with pytest.raises(RateLimitedError) as error:
+        client.get("http://example.com/other")
+    assert error.value.retry_after is None
+
+
+def test_parse_retry_after():
+    now = datetime(2015, 10, 21, 7, 28, 0, tzinfo=timezone.utc)
+
+    assert parse_retry_after("30", now) == 30
+    assert parse_retry_after("Wed, 21 Oct 2015 07:30:00 GMT", now) == 120
+    assert parse_retry_after("Wed, 21 Oct 2015 07:00:00 GMT", now) == 0
+    assert parse_retry_after("soon", now) is None
+    assert parse_retry_after(None, now) is None
+
+
+def test_get_prefix(requests_mock, monkeypatch):
+    monkeypatch.setattr(HttpClient, "PREFIX_CHUNK_SIZE", 10)
+    client = HttpClient()
+    requests_mock.get("http://example.com/big", content=b"0123456789" * 100)
+    requests_mock.get("http://example.com/page", content=b"<title>Page</title>" + b"x" * 1000)
+    requests_mock.get("http://example.com/small", content=b"small")
+
+    big = client.get_prefix("http://example.com/big", max_bytes=25)
+    page = client.get_prefix("http://example.com/page", until=b"</title>")
+    small = client.get_prefix("http://example.com/small")
+
+    assert big.content == b"0123456789012345678901234"
+    assert not big.complete
+    assert len(page.content) < 100
+    assert b"</title>" in page.content
+    assert small.content == b"small"
+    assert small.complete
+
+
+def test_circuit_breaker_opens_after_failures(requests_mock):
+    client = HttpClient()
+    requests_mock.get("http://down.example.com/feed", status_code=503)
+    requests_mock.get("http://example.com/feed", text="ok")
+
+    for _ in range(5):
+        assert client.get("http://down.example.com/feed").status_code == 503
+    with pytest.raises(CircuitOpenError) as error:
+        client.get("http://down.example.com/feed")
+
+    assert error.value.host == "down.example.com"
+    assert isinstance(error.value, requests.ConnectionError)
+    assert requests_mock.call_count == 5
+    assert client.get("http://example.com/feed").text == "ok"
+    states = client.get_breaker_states()
+    assert states["down.example.com"]["state"] == CircuitBreaker.OPEN
+    assert states["down.example.com"]["failures"] == 5
+    assert states["example.com"]["state"] == CircuitBreaker.CLOSED
+    assert client.get_stats()["open_circuits"] == 1
+
+
+def test_circuit_breaker_connection_errors(requests_mock):
+    client = HttpClient()
+    requests_mock.get("http://example.com/feed", exc=requests.exceptions.ConnectTimeout)
+
+    for _ in range(5):
+        with pytest.raises(requests.exceptions.ConnectTimeout):
+            client.get("http://example.com/feed")
+
+    with pytest.raises(CircuitOpenError):
+        client.get("http://example.com/feed")
+
+
+def test_circuit_breaker_error_rate():
+    breaker = CircuitBreaker(failure_threshold=5, error_rate_threshold=0.5, window=10, min_requests=10)
+
+    for _ in range(5):
+        breaker.record("example.com", False)
+        breaker.record("example.com", True)
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request("example.com")
+
+
+def test_circuit_breaker_half_open(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=2, cool_down=60)
+    now = [1000.0]
+    monkeypatch.setattr("hallo.inc.http_client.time.monotonic", lambda: now[0])
+    breaker.record("example.com", True)
+    breaker.record("example.com", True)
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.before_request("example.com")
+    assert error.value.retry_in == 60
+
+    # After the cool-down, one trial request is allowed through, and failing it opens the circuit again
+    now[0] += 61
+    breaker.before_request("example.com")
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request("example.com")
+    breaker.record("example.com", True)
+    assert breaker.get_states()["example.com"]["state"] == CircuitBreaker.OPEN
+
+    # Succeeding the trial request closes it
+    now[0] += 61
+    breaker.before_request("example.com")
+    breaker.record("example.com", False)
+    breaker.before_request("example.com")
+    assert breaker.get_states()["example.com"]["state"] == CircuitBreaker.CLOSED
+
+
+def test_circuit_breaker_ignores_client_errors(requests_mock):
+    client = HttpClient()
+    requests_mock.get("http://example.com/missing", status_code=404)
+    requests_mock.get("http://example.com/limited", status_code=429)
+
+    for _ in range(10):
+        client.get("http://example.com/missing")
+        with pytest.raises(RateLimitedError):
+            client.get("http://example.com/limited")
+
+    assert client.get_breaker_states()["example.com"]["state"] == CircuitBreaker.CLOSED
@@ -0,0 +1,84 @@
+import pytest
+
+from hallo.inc.irc_message import IRCMessage, unescape_tag_value
+
+
+def test_parse_privmsg():
+    message = IRCMessage.parse(":Nick!user@host.example PRIVMSG #chan :hello: there world")
+    assert message.prefix == "Nick!user@host.example"
+    assert message.nick == "Nick"
+    assert message.user == "user"
+    assert message.host == "host.example"
+    assert message.command == "PRIVMSG"
+    assert message.params == ("#chan", "hello: there world")
+    assert message.trailing == "hello: there world"
+    assert message.tags == {}
+
+
+def test_parse_no_prefix():
+    message = IRCMessage.parse("PING :irc.example.net")
+    assert message.prefix is None
+    assert message.nick is None
+    assert message.command == "PING"
+    assert message.params == ("irc.example.net",)
+
+
+def test_parse_server_prefix():
+    message = IRCMessage.parse(":irc.example.net 353 hallo = #chan :@op +voice user")
+    assert message.nick == "irc.example.net"
+    assert message.user is None
+    assert message.host is None
+    assert message.is_numeric()
+    assert message.params == ("hallo", "=", "#chan", "@op +voice user")
+
+
+def test_parse_no_trailing():
+    message = IRCMessage.parse(":a!b@c MODE #chan +o  someone")
+    assert message.command == "MODE"
+    assert message.params == ("#chan", "+o", "someone")
+    assert message.trailing is None
+    assert not message.is_numeric()
+
+
+def test_parse_empty_trailing():
+    message = IRCMessage.parse(":a!b@c QUIT :")
+    assert message.params == ("",)
+    assert message.trailing == ""
+
+
+def test_parse_lower_case_command():
+    assert IRCMessage.parse(":a!b@c privmsg #chan :hi").command == "PRIVMSG"
+
+
+def test_parse_tags():
+    message = IRCMessage.parse(
+        "@time=2020-01-01T00:00:00.000Z;msgid=abc;flag;note=a\\sb\\:c\\\\ :a!b@c PRIVMSG #chan :hi"
+    )
+    assert message.tags == {
+        "time": "2020-01-01T00:00:00.000Z",
+        "msgid": "abc",
+        "flag": "",
+        "note": "a b;c\\",
+    }
+    assert message.nick == "a"
+    assert message.params == ("#chan", "hi")
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [("plain", "plain"), ("a\\sb", "a b"), ("\\r\\n", "\r\n"), ("x\\y", "xy"), ("end\\", "end")],
+)
+def test_unescape_tag_value(value, expected):
+    assert unescape_tag_value(value) == expected
+
+
+@pytest.mark.parametrize("line", ["", "   ", ":prefix.only", "@tag=1", ":prefix :trailing"])
+def test_parse_invalid(line):
+    assert IRCMessage.parse(line) is None
+
+
+def test_param_default():
+    message = IRCMessage.parse(":a!b@c PART #chan")
+    assert message.param(0) == "#chan"
+    assert message.param(1) == ""
+    assert message.param(-1) == "#chan"
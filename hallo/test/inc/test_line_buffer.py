@@ -0,0 +1,74 @@
+from hallo.inc.line_buffer import LineBuffer, decode_line, decode_lines
+
+
+def test_decode_line__utf8():
+    assert decode_line("héllo ☃".encode("utf-8")) == "héllo ☃"
+
+
+def test_decode_line__latin1_fallback():
+    assert decode_line("héllo".encode("iso-8859-1")) == "héllo"
+
+
+def test_decode_lines__mixed_encodings():
+    raw = "☃ one".encode("utf-8") + b"\r\n" + "twö".encode("iso-8859-1")
+    assert decode_lines(raw) == ["☃ one", "twö"]
+
+
+def test_feed__single_line():
+    buffer = LineBuffer()
+    buffer.feed(b"PING :12345\r\n")
+    assert buffer.pop_line() == "PING :12345"
+    assert buffer.pop_line() is None
+
+
+def test_feed__many_lines_one_chunk():
+    buffer = LineBuffer()
+    buffer.feed(b"line one\r\nline two\r\nline three\r\n")
+    assert buffer.pop_line() == "line one"
+    assert buffer.pop_line() == "line two"
+    assert buffer.pop_line() == "line three"
+    assert not buffer.has_line()
+
+
+def test_feed__keeps_partial_tail():
+    buffer = LineBuffer()
+    buffer.feed(b"line one\r\nline t")
+    assert buffer.pop_line() == "line one"
+    assert buffer.pop_line() is None
+    buffer.feed(b"wo\r\n")
+    assert buffer.pop_line() == "line two"
+
+
+def test_feed__line_ending_split_across_chunks():
+    buffer = LineBuffer()
+    buffer.feed(b"line one\r")
+    assert buffer.pop_line() is None
+    buffer.feed(b"\nline two\r\n")
+    assert buffer.pop_line() == "line one"
+    assert buffer.pop_line() == "line two"
+
+
+def test_feed__byte_at_a_time():
+    buffer = LineBuffer()
+    data = "héllo\r\nwörld\r\n".encode("utf-8")
+    for x in range(len(data)):
+        buffer.feed(data[x:x + 1])
+    assert buffer.pop_line() == "héllo"
+    assert buffer.pop_line() == "wörld"
+
+
+def test_feed__multibyte_character_split_across_chunks():
+    buffer = LineBuffer()
+    data = "snow☃man\r\n".encode("utf-8")
+    buffer.feed(data[:6])
+    buffer.feed(data[6:])
+    assert buffer.pop_line() == "snow☃man"
+
+
+def test_clear():
+    buffer = LineBuffer()
+    buffer.feed(b"line one\r\npartial")
+    buffer.clear()
+    buffer.feed(b"line two\r\n")
+    assert buffer.pop_line() == "line two"
+    assert buffer.pop_line() is None
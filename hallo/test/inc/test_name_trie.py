@@ -0,0 +1,38 @@
+from hallo.inc.name_trie import NameTrie
+
+
+def test_longest_match():
+    trie = NameTrie()
+    trie.add("sub", "short")
+    trie.add("sub check", "long")
+    trie.add("sub check all feeds", "longest")
+    assert trie.longest_match(["sub", "check", "all", "please"]) == ("long", 2)
+    assert trie.longest_match(["sub", "check", "all", "feeds", "now"]) == ("longest", 4)
+    assert trie.longest_match(["sub", "list"]) == ("short", 1)
+    assert trie.longest_match(["check"]) == (None, 0)
+    assert trie.longest_match([]) == (None, 0)
+
+
+def test_longest_match_underscores():
+    trie = NameTrie()
+    trie.add("sub check", "value")
+    assert trie.longest_match(["sub_check", "args"]) == (None, 0)
+    assert trie.longest_match(["sub_check", "args"], split_underscores=True) == ("value", 1)
+    assert trie.longest_match(["sub_chec"], split_underscores=True) == (None, 0)
+
+
+def test_remove_prunes():
+    trie = NameTrie()
+    trie.add("a b c", 1)
+    trie.add("a", 2)
+    assert len(trie) == 2
+    trie.remove("a b c")
+    assert trie.get("a b c") is None
+    assert trie.get("a") == 2
+    assert trie.root.children["a"].children == {}
+    trie.remove("a")
+    assert trie.root.children == {}
+    assert len(trie) == 0
+    # Removing missing names does nothing
+    trie.remove("x y")
+    trie.remove("a")
@@ -0,0 +1,94 @@
+import time
+from datetime import datetime
+from threading import Event
+
+from hallo.inc.scheduler import Scheduler, next_day, next_hour, next_minute
+
+
+def wait_for(condition, timeout=5):
+    end = time.time() + timeout
+    while not condition():
+        assert time.time() < end, "Timed out waiting for scheduler"
+        time.sleep(0.01)
+
+
+def test_one_shot_job():
+    scheduler = Scheduler("test", 2)
+    scheduler.start()
+    try:
+        results = []
+        job = scheduler.schedule("once", time.time() + 0.05, results.append, "ran")
+        wait_for(lambda: job.run_count == 1)
+        assert results == ["ran"]
+        assert scheduler.get_job("once") is None
+        assert job.last_lateness >= 0
+        assert job.last_duration >= 0
+    finally:
+        scheduler.stop()
+
+
+def test_runs_in_due_order():
+    scheduler = Scheduler("test", 1)
+    results = []
+    now = time.time()
+    scheduler.schedule("second", now + 0.1, results.append, 2)
+    scheduler.schedule("first", now + 0.05, results.append, 1)
+    scheduler.start()
+    try:
+        wait_for(lambda: len(results) == 2)
+        assert results == [1, 2]
+    finally:
+        scheduler.stop()
+
+
+def test_recurring_job():
+    scheduler = Scheduler("test", 2)
+    scheduler.start()
+    try:
+        results = []
+        job = scheduler.schedule("repeat", time.time(), results.append, "ran", interval=0.02)
+        wait_for(lambda: len(results) >= 3)
+        assert scheduler.get_job("repeat") is job
+        assert scheduler.cancel("repeat")
+        assert not scheduler.cancel("repeat")
+        count = len(results)
+        time.sleep(0.1)
+        assert len(results) <= count + 1
+    finally:
+        scheduler.stop()
+
+
+def test_skips_overlapping_runs():
+    scheduler = Scheduler("test", 2)
+    scheduler.start()
+    try:
+        release = Event()
+        job = scheduler.schedule("slow", time.time(), release.wait, 5, interval=0.02)
+        wait_for(lambda: job.skipped_count >= 2)
+        assert job.running
+        release.set()
+        wait_for(lambda: job.run_count >= 1)
+        stats = scheduler.get_stats()
+        assert stats[0]["name"] == "slow"
+        assert stats[0]["skipped"] >= 2
+    finally:
+        scheduler.cancel("slow")
+        scheduler.stop()
+
+
+def test_failed_job():
+    scheduler = Scheduler("test", 1)
+    scheduler.start()
+    try:
+        job = scheduler.schedule("fail", time.time(), lambda: 1 / 0)
+        wait_for(lambda: job.run_count == 1)
+        assert job.failed_count == 1
+    finally:
+        scheduler.stop()
+
+
+def test_boundaries():
+    after = datetime(2020, 3, 4, 5, 6, 7, 8).timestamp()
+    assert datetime.fromtimestamp(next_minute(after)) == datetime(2020, 3, 4, 5, 7)
+    assert datetime.fromtimestamp(next_hour(after)) == datetime(2020, 3, 4, 6, 0)
+    assert datetime.fromtimestamp(next_day(after)) == datetime(2020, 3, 5, 0, 0)
@@ -0,0 +1,95 @@
+import time
+from threading import Thread
+
+from hallo.inc.send_queue import SendQueue, TokenBucket
+
+
+def test_priority_order():
+    queue = SendQueue(burst=10, rate=0)
+    queue.put(b"bulk\r\n", SendQueue.PRIORITY_BULK)
+    queue.put(b"reply1\r\n", SendQueue.PRIORITY_NORMAL)
+    queue.put(b"pong\r\n", SendQueue.PRIORITY_ESSENTIAL)
+    queue.put(b"reply2\r\n", SendQueue.PRIORITY_NORMAL)
+    batch, wait = queue.pop_batch()
+    assert batch == [b"pong\r\n", b"reply1\r\n", b"reply2\r\n", b"bulk\r\n"]
+    assert wait is None
+
+
+def test_burst_then_rate_limited():
+    queue = SendQueue(burst=3, rate=2)
+    for x in range(5):
+        queue.put("line{}\r\n".format(x).encode())
+    batch, wait = queue.pop_batch()
+    assert batch == [b"line0\r\n", b"line1\r\n", b"line2\r\n"]
+    assert 0 < wait <= 0.5
+    assert queue.pop_batch()[0] == []
+    time.sleep(wait)
+    assert queue.pop_batch()[0] == [b"line3\r\n"]
+    assert queue.queue_length() == 1
+
+
+def test_essential_not_rate_limited():
+    queue = SendQueue(burst=1, rate=0.01)
+    queue.put(b"reply1\r\n")
+    queue.put(b"reply2\r\n")
+    assert queue.pop_batch()[0] == [b"reply1\r\n"]
+    queue.put(b"pong\r\n", SendQueue.PRIORITY_ESSENTIAL)
+    assert queue.pop_batch()[0] == [b"pong\r\n"]
+
+
+def test_next_batch_waits_for_line():
+    queue = SendQueue(burst=5, rate=1)
+    Thread(target=lambda: (time.sleep(0.05), queue.put(b"hello\r\n"))).start()
+    assert queue.next_batch(2) == [b"hello\r\n"]
+    assert queue.next_batch(0.05) == []
+    queue.close()
+    assert queue.next_batch() is None
+
+
+def test_flush():
+    queue = SendQueue(burst=0, rate=0.01)
+    queue.put(b"reply\r\n")
+    queue.put(b"QUIT\r\n", SendQueue.PRIORITY_ESSENTIAL)
+    assert not queue.flush(0.01)
+
+    def writer():
+        queue.next_batch()
+        queue.batch_sent()
+
+    Thread(target=writer).start()
+    # Only essential lines need to go out, the reply is still rate limited
+    assert queue.flush(2)
+    assert queue.queue_length() == 1
+
+
+def test_clear():
+    queue = SendQueue()
+    queue.put(b"old\r\n")
+    queue.clear()
+    assert queue.queue_length() == 0
+    assert queue.pop_batch() == ([], None)
+
+
+def test_stats():
+    queue = SendQueue(burst=2, rate=0.01)
+    for _ in range(3):
+        queue.put(b"line\r\n", SendQueue.PRIORITY_BULK)
+    time.sleep(0.01)
+    queue.pop_batch()
+    stats = queue.get_stats()
+    assert stats["queue_length"] == 1
+    assert stats["queue_bulk"] == 1
+    assert stats["sent"] == 2
+    assert stats["batches"] == 1
+    assert stats["latency_avg"] >= 0.01
+    assert stats["latency_max"] >= stats["latency_avg"]
+
+
+def test_token_bucket_refill_capped():
+    bucket = TokenBucket(2, 10)
+    bucket.refill(time.monotonic() + 100)
+    assert bucket.tokens == 2
+    assert bucket.try_take()
+    assert bucket.try_take()
+    assert not bucket.try_take()
+    assert 0 < bucket.time_until_token() <= 0.1
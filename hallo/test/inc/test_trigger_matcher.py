@@ -0,0 +1,31 @@
+import re
+
+from hallo.inc.trigger_matcher import TriggerMatcher, scoped_pattern
+
+
+def test_scoped_pattern():
+    assert scoped_pattern(re.compile("(?i)foo+f")) == "(?i:foo+f)"
+    assert scoped_pattern(re.compile("^abc$")) == "(?:^abc$)"
+
+
+def test_matching():
+    matcher = TriggerMatcher({"url": r"(?i)\bhttps?://", "foof": r"(?i)foo+f", "digit": r"[0-9]"})
+    assert matcher.matching("nothing to see here") == set()
+    assert matcher.matching("FOOOF") == {"foof"}
+    assert matcher.matching("see HTTP://example.com/1") == {"url", "digit"}
+
+
+def test_matching_flags_stay_scoped():
+    matcher = TriggerMatcher({"lower": "abc", "any_case": "(?i)xyz"})
+    assert matcher.matching("ABC") == set()
+    assert matcher.matching("XYZ") == {"any_case"}
+
+
+def test_matching_uncombinable():
+    matcher = TriggerMatcher({"a": r"(?P<x>a)", "b": r"(?P<x>b)"})
+    assert matcher.combined is None
+    assert matcher.matching("b") == {"b"}
+
+
+def test_matching_empty():
+    assert TriggerMatcher({}).matching("anything") == set()
@@ -0,0 +1,168 @@
+import time
+from threading import Event, Lock
+
+from hallo.inc.worker_pool import WorkerPool
+
+
+def wait_for(condition, timeout=5):
+    end = time.time() + timeout
+    while not condition():
+        assert time.time() < end, "Timed out waiting for worker pool"
+        time.sleep(0.01)
+
+
+def test_runs_tasks():
+    pool = WorkerPool("test", 2, 100)
+    pool.start()
+    try:
+        results = []
+        for x in range(10):
+            assert pool.submit(x, results.append, x)
+        wait_for(lambda: len(results) == 10)
+        assert sorted(results) == list(range(10))
+    finally:
+        pool.stop()
+
+
+def test_same_key_runs_in_order():
+    pool = WorkerPool("test", 4, 1000)
+    pool.start()
+    try:
+        results = []
+        lock = Lock()
+
+        def task(value):
+            time.sleep(0.001)
+            with lock:
+                results.append(value)
+
+        for x in range(50):
+            pool.submit("#channel", task, x)
+        wait_for(lambda: len(results) == 50)
+        assert results == list(range(50))
+    finally:
+        pool.stop()
+
+
+def test_same_key_never_concurrent():
+    pool = WorkerPool("test", 4, 1000)
+    pool.start()
+    try:
+        running = []
+        max_running = []
+        done = []
+        lock = Lock()
+
+        def task():
+            with lock:
+                running.append(1)
+                max_running.append(len(running))
+            time.sleep(0.005)
+            with lock:
+                running.pop()
+                done.append(1)
+
+        for _ in range(20):
+            pool.submit("#channel", task)
+        wait_for(lambda: len(done) == 20)
+        assert max(max_running) == 1
+    finally:
+        pool.stop()
+
+
+def test_different_keys_run_concurrently():
+    pool = WorkerPool("test", 2, 100)
+    pool.start()
+    try:
+        release = Event()
+        started = []
+        pool.submit("#one", lambda: (started.append(1), release.wait(5)))
+        pool.submit("#two", lambda: (started.append(2), release.wait(5)))
+        wait_for(lambda: len(started) == 2)
+        assert pool.busy_workers() == 2
+        release.set()
+        wait_for(lambda: pool.busy_workers() == 0)
+    finally:
+        pool.stop()
+
+
+def test_overload_drops_passive_first():
+    pool = WorkerPool("test", 1, 3)
+    pool.start()
+    try:
+        release = Event()
+        results = []
+        # Block the only worker
+        pool.submit("block", release.wait, 5)
+        wait_for(lambda: pool.busy_workers() == 1)
+        assert pool.submit("#chan", results.append, "passive1", priority=WorkerPool.PRIORITY_PASSIVE)
+        assert pool.submit("#chan", results.append, "normal1")
+        assert pool.submit("#chan", results.append, "passive2", priority=WorkerPool.PRIORITY_PASSIVE)
+        # Full, new passive task is dropped
+        assert not pool.submit("#chan", results.append, "passive3", priority=WorkerPool.PRIORITY_PASSIVE)
+        # Full, new normal task replaces the oldest passive task
+        assert pool.submit("#chan", results.append, "normal2")
+        assert pool.submit("#chan", results.append, "normal3")
+        # Full of normal tasks, so new normal task is dropped
+        assert not pool.submit("#chan", results.append, "normal4")
+        # Essential tasks are never dropped
+        assert pool.submit("PING", results.append, "ping", priority=WorkerPool.PRIORITY_ESSENTIAL)
+        assert pool.queue_length() == 4
+        release.set()
+        wait_for(lambda: len(results) == 4)
+        assert [r for r in results if r != "ping"] == ["normal1", "normal2", "normal3"]
+        assert "ping" in results
+        stats = pool.get_stats()
+        assert stats["dropped_passive"] == 3
+        assert stats["dropped_normal"] == 1
+        assert stats["queue_length"] == 0
+    finally:
+        pool.stop()
+
+
+def test_finished_passive_tasks_are_released():
+    pool = WorkerPool("test", 2, 1000)
+    pool.start()
+    try:
+        done = []
+        for x in range(500):
+            pool.submit(x % 7, done.append, x, priority=WorkerPool.PRIORITY_PASSIVE)
+        wait_for(lambda: len(done) == 500)
+        assert len(pool._passive_tasks) == 0
+    finally:
+        pool.stop()
+
+
+def test_failing_task_does_not_kill_worker():
+    pool = WorkerPool("test", 1, 100)
+    pool.start()
+    try:
+        results = []
+
+        def fail():
+            raise Exception("Oh no")
+
+        pool.submit("#chan", fail)
+        pool.submit("#chan", results.append, "after")
+        wait_for(lambda: len(results) == 1)
+        assert pool.get_stats()["failed"] == 1
+    finally:
+        pool.stop()
+
+
+def test_stats():
+    pool = WorkerPool("test", 3, 100)
+    pool.start()
+    try:
+        done = []
+        for x in range(5):
+            pool.submit(x, lambda: (time.sleep(0.01), done.append(1)))
+        wait_for(lambda: len(done) == 5)
+        wait_for(lambda: pool.get_stats()["completed"] == 5)
+        stats = pool.get_stats()
+        assert stats["workers"] == 3
+        assert stats["submitted"] == 5
+        assert stats["queue_length"] == 0
+        assert 0 < stats["utilisation"] <= 1
+    finally:
+        pool.stop()
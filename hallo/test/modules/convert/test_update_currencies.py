@@ -1,10 +1,11 @@
+import time
 import unittest
 
 import pytest
 
 import hallo.modules.convert.update_currencies
 import hallo.modules.convert.convert_repo
-from hallo.events import EventMessage, EventHour
+from hallo.events import EventMessage
 from hallo.test.test_base import TestBase
 
 
@@ -37,12 +38,15 @@ class UpdateCurrenciesTest(TestBase, unittest.TestCase):
         finally:
             hallo.modules.convert.update_currencies.UpdateCurrencies.update_all = update_all
 
-    def test_passive_run(self):
+    def test_scheduled_update(self):
         update_all = hallo.modules.convert.update_currencies.UpdateCurrencies.update_all
         mock_update_all = MockUpdate(["Check method called"])
         hallo.modules.convert.update_currencies.UpdateCurrencies.update_all = mock_update_all.method
         try:
-            self.function_dispatcher.dispatch_passive(EventHour())
+            job = self.hallo.scheduler.get_job("update currencies")
+            assert job is not None, "Currency updates should be scheduled when the function loads."
+            assert job.due > time.time()
+            job.func(*job.args)
             self.server.get_send_data(0)
             assert mock_update_all.was_called, "update_all() wasn't called."
         finally:
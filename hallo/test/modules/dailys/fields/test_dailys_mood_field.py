@@ -3,7 +3,8 @@ from datetime import time, date, datetime, timedelta
 import pytest
 
 import hallo.modules.dailys.dailys_field
-from hallo.events import EventMessage, RawDataTelegram, EventMinute
+from hallo.events import EventMessage, RawDataTelegram
+from hallo.inc.scheduler import Scheduler
 from hallo.modules.dailys.field_mood import DailysMoodField
 from hallo.test.modules.dailys.dailys_spreadsheet_mock import DailysSpreadsheetMock
 
@@ -282,20 +283,13 @@ def test_trigger_time_exactly_once(hallo_getter):
     times = [DailysMoodField.TIME_WAKE, time(14, 0, 0), DailysMoodField.TIME_SLEEP]
     moods = ["Happiness", "Anger", "Tiredness"]
     field = DailysMoodField(spreadsheet, times, moods)
-    # Prepare events
-    evt1 = EventMinute()
-    evt1.send_time = datetime(2019, 1, 18, 13, 59, 11)
-    evt2 = EventMinute()
-    evt2.send_time = datetime(2019, 1, 18, 14, 0, 11)
-    evt3 = EventMinute()
-    evt3.send_time = datetime(2019, 1, 18, 14, 1, 11)
-    # Send time before trigger time
-    field.passive_trigger(evt1)
+    # Run query job before trigger time
+    field.send_time_query(datetime(2019, 1, 18, 13, 59, 11))
     # Check mood data not updated and query not sent
     assert mood_date not in spreadsheet.saved_data["mood"]
     test_server.get_send_data(0)
-    # Send time after trigger time
-    field.passive_trigger(evt2)
+    # Run query job after trigger time
+    field.send_time_query(datetime(2019, 1, 18, 14, 0, 11))
     # Check mood query is sent
     notif_dict = spreadsheet.saved_data["mood"][mood_date]
     assert str(time(14, 0, 0)) in notif_dict
@@ -309,8 +303,8 @@ def test_trigger_time_exactly_once(hallo_getter):
     msg_id = "test_message_id"
     notif_dict[str(time(14, 0, 0))]["message_id"] = msg_id
     spreadsheet.saved_data["mood"][mood_date] = notif_dict
-    # Send another time after trigger time
-    field.passive_trigger(evt3)
+    # Run query job again after trigger time
+    field.send_time_query(datetime(2019, 1, 18, 14, 1, 11))
     # Check mood data not updated and query not sent
     notif_dict = spreadsheet.saved_data["mood"][mood_date]
     assert notif_dict[str(time(14, 0, 0))]["message_id"] == msg_id
@@ -620,9 +614,7 @@ def test_no_trigger_after_processed(hallo_getter):
     assert mood_date.isoformat() in data_1400[0].text
     assert "413" in data_1400[0].text
     # Check that when the time happens, a query isn't sent
-    evt_time = EventMinute()
-    evt_time.send_time = datetime.combine(mood_date, time(14, 3, 10))
-    field.passive_trigger(evt_time)
+    field.send_time_query(datetime.combine(mood_date, time(14, 3, 10)))
     # Check data isn't added
     notif_dict = spreadsheet.saved_data["mood"][mood_date]
     assert str(time(14, 0, 0)) in notif_dict
@@ -744,3 +736,39 @@ def test_no_trigger_sleep_after_processed_sleep_and_midnight(hallo_getter):
     field.passive_trigger(evt_sleep1)
     # Check there's no response
     test_server.get_send_data(0)
+
+
+def test_schedule_jobs(hallo_getter):
+    hallo_obj, test_server, test_chan, test_user = hallo_getter({"dailys"})
+    spreadsheet = DailysSpreadsheetMock(test_user, test_chan, saved_data={"mood": {}})
+    times = [DailysMoodField.TIME_WAKE, time(14, 0, 0), time(9, 30, 0), DailysMoodField.TIME_SLEEP]
+    field = DailysMoodField(spreadsheet, times, ["Happiness", "Anger", "Tiredness"])
+    scheduler = Scheduler("test")
+
+    field.schedule_jobs(scheduler)
+    job = scheduler.get_job(field.job_name)
+
+    assert job is not None
+    assert job.func == field.send_time_query
+    assert field.next_query_time(datetime(2019, 1, 18, 9, 0, 0).timestamp()) == (
+        datetime(2019, 1, 18, 9, 30, 0).timestamp()
+    )
+    assert field.next_query_time(datetime(2019, 1, 18, 9, 30, 0).timestamp()) == (
+        datetime(2019, 1, 18, 14, 0, 0).timestamp()
+    )
+    assert field.next_query_time(datetime(2019, 1, 18, 15, 0, 0).timestamp()) == (
+        datetime(2019, 1, 19, 9, 30, 0).timestamp()
+    )
+    field.cancel_jobs(scheduler)
+    assert scheduler.get_job(field.job_name) is None
+
+
+def test_schedule_jobs__no_set_times(hallo_getter):
+    hallo_obj, test_server, test_chan, test_user = hallo_getter({"dailys"})
+    spreadsheet = DailysSpreadsheetMock(test_user, test_chan, saved_data={"mood": {}})
+    field = DailysMoodField(spreadsheet, [DailysMoodField.TIME_WAKE], ["Happiness"])
+    scheduler = Scheduler("test")
+
+    field.schedule_jobs(scheduler)
+
+    assert scheduler.get_stats() == []
@@ -0,0 +1,27 @@
+from hallo.events import EventMessage
+from hallo.inc.commons import Commons
+
+
+def test_circuit_breakers__none(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({"hallo_control"})
+
+    hallo.function_dispatcher.dispatch(EventMessage(test_server, None, test_user, "circuit breakers"))
+
+    data = test_server.get_send_data(1, test_user, EventMessage)
+    assert data[0].text == "No outbound requests have been made."
+
+
+def test_circuit_breakers(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({"hallo_control"})
+    breaker = Commons.http_client.circuit_breaker
+    breaker.record("up.example.com", False)
+    for _ in range(breaker.failure_threshold):
+        breaker.record("down.example.com", True)
+
+    hallo.function_dispatcher.dispatch(EventMessage(test_server, None, test_user, "circuit breakers"))
+
+    data = test_server.get_send_data(1, test_user, EventMessage)
+    lines = data[0].text.split("\n")
+    assert lines[0] == "Circuit breakers:"
+    assert lines[1].startswith("down.example.com: open, 5 requests, 5 failures, 100% recent error rate, retrying in ")
+    assert lines[2] == "up.example.com: closed, 1 requests, 0 failures, 0% recent error rate"
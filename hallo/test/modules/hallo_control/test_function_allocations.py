@@ -0,0 +1,17 @@
+from hallo.events import EventMessage
+
+
+def test_function_allocations(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({"hallo_control", "euler"})
+    fd = hallo.function_dispatcher
+    fd.get_function_object(fd.get_function_by_name("euler"))
+
+    fd.dispatch(EventMessage(test_server, None, test_user, "function allocations"))
+
+    data = test_server.get_send_data(1, test_user, EventMessage)
+    lines = data[0].text.split("\n")
+    assert lines[0] == "Function allocations:"
+    assert lines[1] == "{} built when loading, 1 built for calls, {} shared by all calls, 0 persistent".format(
+        len(fd.get_allocation_stats()), len(fd.shared_functions)
+    )
+    assert lines[2:] == ["Euler: 1 built when loading, 1 built for calls"]
@@ -0,0 +1,19 @@
+from datetime import timedelta
+
+from hallo.events import EventMessage
+from hallo.inc.commons import KeyedCache
+
+
+def test_lookup_cache_stats(hallo_getter, monkeypatch):
+    hallo, test_server, test_channel, test_user = hallo_getter({"hallo_control"})
+    monkeypatch.setattr(KeyedCache, "named_caches", {})
+    cache = KeyedCache.for_responses("test lookup", timedelta(minutes=5))
+    cache.get("a", lambda: "hello")
+    cache.get("a", lambda: "hello")
+
+    hallo.function_dispatcher.dispatch(
+        EventMessage(test_server, None, test_user, "lookup cache stats")
+    )
+
+    data = test_server.get_send_data(1, test_user, EventMessage)
+    assert "test lookup: 1 entries, 5 bytes, 1 hits, 1 misses, 50% hit rate, 0 evictions" in data[0].text
@@ -0,0 +1,22 @@
+from hallo.events import EventMessage
+
+
+def test_passive_stats_empty(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({"hallo_control"})
+    hallo.function_dispatcher.dispatch(
+        EventMessage(test_server, None, test_user, "passive stats")
+    )
+    data = test_server.get_send_data(1, test_user, EventMessage)
+    assert "no messages" in data[0].text.lower()
+
+
+def test_passive_stats(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({"hallo_control", "random"})
+    hallo.function_dispatcher.dispatch_passive(
+        EventMessage(test_server, test_channel, test_user, "just chatting")
+    )
+    hallo.function_dispatcher.dispatch(
+        EventMessage(test_server, None, test_user, "passive stats")
+    )
+    data = test_server.get_send_data(1, test_user, EventMessage)
+    assert "Foof: 0 matched, 1 skipped" in data[0].text
@@ -0,0 +1,11 @@
+from hallo.events import EventMessage
+
+
+def test_permission_cache_stats(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({"hallo_control"})
+    hallo.function_dispatcher.dispatch(
+        EventMessage(test_server, None, test_user, "permission cache stats")
+    )
+    data = test_server.get_send_data(1, test_user, EventMessage)
+    assert "permission cache" in data[0].text.lower()
+    assert "hit rate" in data[0].text.lower()
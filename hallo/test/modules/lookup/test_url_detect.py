@@ -0,0 +1,69 @@
+import struct
+
+import pytest
+
+from hallo.events import EventMessage
+from hallo.inc.commons import KeyedCache
+from hallo.modules.lookup.url_detect import UrlDetect
+
+PNG_HEADER = b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR" + struct.pack(">ii", 640, 480) + b"\x08\x06\x00\x00\x00"
+
+
+@pytest.fixture
+def url_detect(monkeypatch):
+    monkeypatch.setattr(UrlDetect, "description_cache", KeyedCache(cache_expiry=None))
+    return UrlDetect()
+
+
+def test_find_urls(url_detect):
+    urls = url_detect.find_urls(
+        "See HTTP://Example.COM and www.example.org/page?a=1, http://example.com/ again, or http://192.168.0.1/"
+    )
+
+    assert urls == ["http://example.com/", "http://www.example.org/page?a=1"]
+
+
+def test_passive_run__every_url(hallo_getter, requests_mock, url_detect):
+    hallo_obj, test_server, test_channel, test_user = hallo_getter({"lookup"})
+    requests_mock.get(
+        "http://example.com/page",
+        text="<html><head><title>Example &amp; page</title></head><body>" + "x" * 100000 + "</body></html>",
+        headers={"Content-Type": "text/html; charset=utf-8"},
+    )
+    requests_mock.get(
+        "http://example.org/image.png",
+        content=PNG_HEADER + b"\x00" * 200000,
+        headers={"Content-Type": "image/png", "Content-Length": str(len(PNG_HEADER) + 200000)},
+    )
+    requests_mock.get("http://example.net/missing", status_code=404, text="<title>Not found</title>")
+    evt = EventMessage(
+        test_server, test_channel, test_user,
+        "Look at http://example.com/page and http://example.org/image.png and http://example.net/missing"
+    )
+
+    response = url_detect.passive_run(evt, hallo_obj)
+
+    assert response.text.split("\n") == [
+        "URL title: Example & page",
+        "Image: image/png (640px by 480px) 195.34KiB.",
+    ]
+
+
+def test_passive_run__cached(hallo_getter, requests_mock, url_detect):
+    hallo_obj, test_server, test_channel, test_user = hallo_getter({"lookup"})
+    requests_mock.get("http://example.com/", text="<title>Example</title>")
+    evt = EventMessage(test_server, test_channel, test_user, "http://example.com")
+
+    url_detect.passive_run(evt, hallo_obj)
+    response = url_detect.passive_run(evt, hallo_obj)
+
+    assert response.text == "URL title: Example"
+    assert requests_mock.call_count == 1
+
+
+def test_passive_run__no_title(hallo_getter, requests_mock, url_detect):
+    hallo_obj, test_server, test_channel, test_user = hallo_getter({"lookup"})
+    requests_mock.get("http://example.com/", text="<html>No title here</html>")
+    evt = EventMessage(test_server, test_channel, test_user, "http://example.com")
+
+    assert url_detect.passive_run(evt, hallo_obj) is None
@@ -1063,9 +1063,9 @@ class ConnectIRCTest(TestBase, unittest.TestCase):
             if server is not self.server:
                 right_server = server
         assert right_server is not None, "New server wasn't found."
-        # Ensure thread count is up
+        # Ensure thread count is up, by the connection thread, the writer thread and the worker pool
         assert (
-            threading.active_count() == thread_count + 1
+            threading.active_count() == thread_count + 2 + right_server.worker_count
         ), "Incorrect number of running threads."
 
     def test_server_started(self):
@@ -0,0 +1,19 @@
+from hallo.modules.subscriptions.common_fa_key import FAKey
+
+
+def test_fa_reader_page_cache(hallo_getter, requests_mock, monkeypatch):
+    hallo_obj, test_server, test_channel, test_user = hallo_getter({"subscriptions"})
+    monkeypatch.setenv("FA_API_URL", "http://fa.example.com")
+    requests_mock.get("http://fa.example.com//user/dr-spangle/favorites.json", json=[3, 2, 1])
+    fa_key = FAKey(test_user, "cookie_a", "cookie_b")
+    # Sources using the same key share its reader
+    reader = fa_key.get_fa_reader()
+    assert fa_key.get_fa_reader() is reader
+
+    first = reader.get_user_fav_page("dr-spangle")
+    second = reader.get_user_fav_page("Dr-Spangle")
+
+    assert second is first
+    assert first.submission_ids == [3, 2, 1]
+    assert requests_mock.call_count == 1
+    assert reader.page_cache.get_stats()["hits"] == 1
@@ -0,0 +1,76 @@
+import threading
+
+from hallo.modules.subscriptions.enrichment import EnrichmentCache, enrich_all
+
+
+def test_cache_lru():
+    cache = EnrichmentCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+
+    cache.put("c", 3)
+
+    assert len(cache) == 2
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert "b" not in cache._cache
+    assert cache.hit_count == 3
+    assert cache.miss_count == 0
+
+
+def test_enrich_all__cached_and_duplicates():
+    cache = EnrichmentCache()
+    cache.put("cached", "old")
+    calls = []
+
+    def fetch(value):
+        calls.append(value)
+        return value
+
+    enrichments = enrich_all(
+        [
+            ("cached", "http://example.com/1", lambda: fetch("new")),
+            ("a", "http://example.com/2", lambda: fetch("a")),
+            ("a", "http://example.com/2", lambda: fetch("a")),
+        ],
+        cache, 4, 2, 5
+    )
+
+    assert enrichments == {"cached": "old", "a": "a"}
+    assert calls == ["a"]
+    assert cache.get("a") == "a"
+
+
+def test_enrich_all__failure():
+    cache = EnrichmentCache()
+
+    def fail():
+        raise ValueError("Page changed")
+
+    enrichments = enrich_all([("a", "http://example.com/1", fail)], cache, 4, 2, 5)
+
+    assert enrichments == {}
+    assert len(cache) == 0
+
+
+def test_enrich_all__timeout_caches_late_result():
+    cache = EnrichmentCache()
+    release = threading.Event()
+
+    def slow():
+        release.wait(5)
+        return "late"
+
+    enrichments = enrich_all(
+        [("slow", "http://slow.example.com/1", slow), ("fast", "http://example.com/1", lambda: "fast")],
+        cache, 4, 2, 0.2
+    )
+    assert enrichments == {"fast": "fast"}
+
+    release.set()
+    for _ in range(50):
+        if len(cache) == 2:
+            break
+        threading.Event().wait(0.1)
+    assert cache.get("slow") == "late"
@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+from hallo.modules.subscriptions.key_history import KeyHistory
+
+
+def test_add():
+    history = KeyHistory()
+    history.add(["c", "b", "a"], 100)
+    history.add(["d", "c"], 200)
+
+    assert history.keys() == ["d", "c", "b", "a"]
+    assert "a" in history
+    assert "e" not in history
+    assert len(history) == 4
+
+
+def test_max_count():
+    history = KeyHistory(max_count=3)
+    history.add(["c", "b", "a"], 100)
+    history.add(["e", "d", "b"], 200)
+
+    assert history.keys() == ["e", "d", "b"]
+
+
+def test_max_count__keeps_new_keys():
+    history = KeyHistory(max_count=2)
+    history.add(["c", "b", "a"], 100)
+
+    assert history.keys() == ["c", "b", "a"]
+
+
+def test_max_age():
+    history = KeyHistory(max_age=timedelta(seconds=100))
+    history.add(["b", "a"], 100)
+    history.add(["c", "b"], 150)
+    history.add(["d"], 220)
+
+    assert history.keys() == ["d", "c", "b"]
+
+
+def test_max_age__none():
+    history = KeyHistory(max_age=None)
+    history.add(["a"], 100)
+    history.add(["b"], 1e10)
+
+    assert history.keys() == ["b", "a"]
+
+
+def test_json():
+    history = KeyHistory()
+    history.add([3, 2, 1], 100)
+    history.add(["new", 3], 200)
+
+    json_data = history.to_json()
+
+    assert json_data == {"seen": [[100, [1, 2]], [200, [3, "new"]]]}
+    new_history = KeyHistory.from_json(json_data)
+    assert new_history.keys() == ["new", 3, 2, 1]
+    assert new_history.to_json() == json_data
+
+
+def test_from_json__list():
+    history = KeyHistory.from_json(["c", "b", "a"])
+
+    assert history.keys() == ["c", "b", "a"]
+
+
+def test_from_json__none():
+    assert len(KeyHistory.from_json(None)) == 0
@@ -9,7 +9,7 @@ def test_init():
     rf = E621Source("cabinet")
     keys = [
         "search",
-        "last_keys"
+        "key_history"
     ]
     for key in keys:
         assert key in rf.__dict__, "Key is missing from E621Sub object: " + key
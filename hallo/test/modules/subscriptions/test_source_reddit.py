@@ -0,0 +1,57 @@
+from hallo.modules.subscriptions.source_reddit import RedditSource
+
+
+def _post(subreddit, post_id):
+    return {"data": {"subreddit": subreddit, "name": f"t3_{post_id}", "id": post_id}}
+
+
+def test_batch_sources(monkeypatch):
+    monkeypatch.setattr(RedditSource, "BATCH_SIZE", 3)
+    sources = [RedditSource(f"sub{num}") for num in range(7)]
+
+    batches = RedditSource.batch_sources(sources)
+
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert [source for batch in batches for source in batch] == sources
+
+
+def test_batch_sources__url_length(monkeypatch):
+    monkeypatch.setattr(RedditSource, "MAX_URL_LENGTH", 100)
+    sources = [RedditSource("a" * 20) for _ in range(4)]
+
+    batches = RedditSource.batch_sources(sources)
+
+    assert all(len(RedditSource._listing_url([s.subreddit for s in batch])) <= 100 for batch in batches)
+    assert len(batches) == 2
+
+
+def test_current_states(requests_mock):
+    requests_mock.get(
+        "https://www.reddit.com/r/cats+Dogs+birds/new.json?limit=100",
+        json={"data": {"children": [_post("dogs", "d2"), _post("cats", "c1"), _post("dogs", "d1")]}}
+    )
+    sources = [RedditSource("cats"), RedditSource("Dogs"), RedditSource("birds")]
+
+    states = RedditSource.current_states(sources)
+
+    assert [[item["data"]["id"] for item in state] for state in states] == [["c1"], ["d2", "d1"], []]
+    assert len(requests_mock.request_history) == 1
+
+
+def test_current_states__full_listing(requests_mock, monkeypatch):
+    monkeypatch.setattr(RedditSource, "LISTING_LIMIT", 2)
+    requests_mock.get(
+        "https://www.reddit.com/r/cats+dogs/new.json?limit=2",
+        json={"data": {"children": [_post("dogs", "d3"), _post("dogs", "d2")]}}
+    )
+    requests_mock.get(
+        "https://www.reddit.com/r/cats/new.json",
+        json={"data": {"children": [_post("cats", "c2"), _post("cats", "c1")]}}
+    )
+    sources = [RedditSource("cats", ["t3_c1"]), RedditSource("dogs", ["t3_d2"])]
+
+    states = RedditSource.current_states(sources)
+
+    # The cats posts may have been cut off the full listing, so were fetched separately
+    assert [[item["data"]["id"] for item in state] for state in states] == [["c2", "c1"], ["d3", "d2"]]
+    assert len(requests_mock.request_history) == 2
@@ -2,7 +2,8 @@ from xml.etree import ElementTree
 
 import pytest
 
-from hallo.modules.subscriptions.source_rss import RssSource
+from hallo.modules.subscriptions.enrichment import EnrichmentCache
+from hallo.modules.subscriptions.source_rss import FeedReader, RssSource, get_rss_item_link
 from hallo.modules.subscriptions.subscription_repo import SubscriptionRepo
 
 TEST_RSS = "http://spangle.org.uk/hallo/test_rss.xml"
@@ -14,7 +15,7 @@ def test_init():
     keys = [
         "feed_title",
         "url",
-        "last_keys",
+        "key_history",
     ]
     for key in keys:
         assert key in rf.__dict__, "Key is missing from RssFeed object: " + key
@@ -26,7 +27,7 @@ def test_init__with_name():
     keys = [
         "feed_title",
         "url",
-        "last_keys",
+        "key_history",
     ]
     for key in keys:
         assert key in rf.__dict__, "Key is missing from RssFeed object: " + key
@@ -60,9 +61,8 @@ def test_from_input(hallo_getter):
 def test_current_state():
     rf = RssSource(TEST_RSS)
 
-    state = rf.current_state()
+    state = list(rf.current_state())
 
-    assert isinstance(state, list)
     assert len(state) == 3
     assert isinstance(state[0], ElementTree.Element)
     assert state[0].find("title").text == "Item 3"
@@ -152,3 +152,113 @@ def test_json(hallo_getter):
     assert rf2.url == TEST_RSS
     assert rf2.feed_title == rf.feed_title
     assert rf2.last_keys == rf.last_keys
+
+
+def test_current_state__not_modified(requests_mock):
+    url = "http://example.com/not_modified.xml"
+    rss_data = (
+        '<rss version="2.0"><channel><title>Example feed</title>'
+        "<item><title>Item 1</title><link>http://example.com/item1</link></item>"
+        "</channel></rss>"
+    )
+    requests_mock.get(url, [{"text": rss_data, "headers": {"ETag": '"v1"'}}, {"status_code": 304}])
+    rf = RssSource(url, "Old title")
+
+    state = rf.current_state()
+    second_state = rf.current_state()
+
+    assert rf.feed_title == "Example feed"
+    assert [item.find("title").text for item in state] == ["Item 1"]
+    assert requests_mock.request_history[1].headers["If-None-Match"] == '"v1"'
+    assert second_state is state
+
+
+def test_share_state(requests_mock):
+    url = "http://example.com/shared.xml"
+    rss_data = (
+        '<rss version="2.0"><channel><title>Example feed</title>'
+        "<item><title>Item 1</title><link>http://example.com/item1</link></item>"
+        "</channel></rss>"
+    )
+    requests_mock.get(url, [{"text": rss_data, "headers": {"ETag": '"v1"'}}, {"status_code": 304}])
+    rf = RssSource(url, "Old title")
+    other = RssSource(url, "Old title")
+
+    state = rf.current_state()
+    other.share_state(rf, state)
+
+    assert other.feed_title == "Example feed"
+    # The next fetch of the shared feed is not modified, so the shared state is used without parsing it again
+    assert other.current_state() is state
+
+
+def test_feed_reader__rss():
+    rss_data = (
+        '<rss version="2.0"><channel><title>Example feed</title>'
+        "<image><title>Image title</title></image>"
+        "<item><title>Item 2</title><link>http://example.com/item2</link></item>"
+        "<item><title>Item 1</title><link>http://example.com/item1</link></item>"
+        "</channel></rss>"
+    )
+
+    feed = FeedReader(rss_data)
+
+    assert feed.title == "Example feed"
+    assert [item.find("title").text for item in feed] == ["Item 2", "Item 1"]
+    assert [item.find("title").text for item in feed] == ["Item 2", "Item 1"]
+
+
+def test_feed_reader__atom():
+    rss_data = (
+        '<feed xmlns="http://www.w3.org/2005/Atom"><title>Atom feed</title>'
+        '<entry><title>Entry 1</title><link href="http://example.com/entry1"/></entry>'
+        "</feed>"
+    )
+
+    feed = FeedReader(rss_data)
+    items = list(feed)
+
+    assert feed.title == "Atom feed"
+    assert len(items) == 1
+    assert get_rss_item_link(items[0]) == "http://example.com/entry1"
+
+
+def test_feed_reader__no_title():
+    feed = FeedReader("<rss><channel><item><title>Item 1</title></item></channel></rss>")
+
+    assert feed.title == "No title"
+    assert len(list(feed)) == 1
+
+
+def test_feed_reader__lazy(monkeypatch):
+    monkeypatch.setattr(FeedReader, "CHUNK_SIZE", 100)
+    items = "".join(
+        f"<item><title>Item {num}</title><guid>item{num}</guid></item>" for num in range(100, 0, -1)
+    )
+    feed = FeedReader(f"<rss><channel><title>Big feed</title>{items}</channel></rss>")
+    rf = RssSource("http://example.com/feed.xml", "Big feed", [f"item{num}" for num in range(98, 0, -1)])
+
+    new_items = rf.state_change(feed)
+    rf.save_state(feed)
+
+    assert [item.find("title").text for item in new_items] == ["Item 100", "Item 99"]
+    assert len(feed._items) < 20, "Feed should not have been parsed past the run of previously seen items"
+    assert rf.last_keys[:3] == ["item100", "item99", "item98"]
+    assert len(rf.last_keys) == 100
+
+
+def test_item_to_event__xkcd_enrichment(hallo_getter, requests_mock, monkeypatch):
+    hallo_obj, test_server, test_chat, test_user = hallo_getter({"subscriptions"})
+    monkeypatch.setattr(RssSource, "enrichment_cache", EnrichmentCache())
+    requests_mock.get("https://xkcd.com/2000/info.0.json", json={"alt": "Alt text here"})
+    requests_mock.get("https://xkcd.com/2001/info.0.json", status_code=500)
+    rf = RssSource("https://xkcd.com/rss.xml", "xkcd.com")
+    items = [
+        ElementTree.fromstring(f"<item><title>Comic {num}</title><link>https://xkcd.com/{num}/</link></item>")
+        for num in [2001, 2000]
+    ]
+
+    events = rf.events(test_server, test_chat, None, items)
+
+    assert events[0].text == 'Update on "xkcd.com" RSS feed. "Comic 2000" https://xkcd.com/2000/\nAlt text: Alt text here'
+    assert events[1].text == 'Update on "xkcd.com" RSS feed. "Comic 2001" https://xkcd.com/2001/'
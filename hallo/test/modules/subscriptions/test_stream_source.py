@@ -0,0 +1,124 @@
+from hallo.events import EventMessage
+from hallo.modules.subscriptions.enrichment import EnrichmentCache
+from hallo.modules.subscriptions.stream_source import StreamSource
+
+
+class ListSource(StreamSource[int]):
+    def __init__(self, last_keys=None):
+        super().__init__(last_keys)
+        self.read_count = 0
+
+    def current_state(self):
+        raise NotImplementedError()
+
+    def read(self, items):
+        for item in items:
+            self.read_count += 1
+            yield item
+
+    def item_to_key(self, item):
+        return item
+
+    def item_to_event(self, server, channel, user, item):
+        return EventMessage(server, channel, user, str(item), inbound=False)
+
+    @property
+    def title(self):
+        return "list"
+
+    def matches_name(self, name_clean):
+        return False
+
+    @classmethod
+    def from_input(cls, argument, user, sub_repo):
+        raise NotImplementedError()
+
+    @classmethod
+    def from_json(cls, json_data, destination, sub_repo):
+        raise NotImplementedError()
+
+    def to_json(self):
+        return {}
+
+
+def test_state_change__no_last_keys():
+    source = ListSource()
+
+    assert source.state_change(iter([3, 2, 1])) == [3, 2, 1]
+
+
+def test_state_change__bumped_item():
+    source = ListSource([3, 2, 1])
+
+    # Item 2 was bumped to the top of the feed, but items above the last seen item are still new
+    assert source.state_change([2, 5, 4, 3, 1]) == [5, 4]
+
+
+def test_state_change__stops_after_seen_run():
+    source = ListSource(list(range(100, 0, -1)))
+
+    assert source.state_change(source.read(range(102, 0, -1))) == [102, 101]
+    assert source.read_count == 2 + StreamSource.SEEN_RUN_LENGTH
+
+
+def test_save_state():
+    source = ListSource([])
+    source.save_state([3, 2, 1])
+    assert source.last_keys == [3, 2, 1]
+
+    source.save_state(range(10, 0, -1))
+    assert source.last_keys == list(range(10, 0, -1))
+
+    source.save_state(source.read(range(12, 0, -1)))
+    assert source.read_count == 2 + StreamSource.SEEN_RUN_LENGTH
+    assert source.last_keys == list(range(12, 0, -1))
+
+
+def test_state_change__item_returns():
+    source = ListSource([])
+    source.save_state([3, 2, 1])
+    # Item 2 drops out of the feed, then comes back
+    source.save_state([4, 3, 1])
+    assert source.state_change([5, 4, 3, 2, 1]) == [5]
+
+
+def test_json():
+    source = ListSource([3, 2, 1])
+    source.save_state([4, 3, 2, 1])
+
+    json_data = source.key_history.to_json()
+    assert json_data == {"seen": [[json_data["seen"][0][0], [1, 2, 3, 4]]]}
+    assert ListSource(json_data).last_keys == [4, 3, 2, 1]
+
+
+class EnrichedListSource(ListSource):
+    def enrichment_url(self, item):
+        return None if item % 2 else f"http://example.com/{item}"
+
+    def enrich(self, item, url):
+        return f"{item} enriched"
+
+    def enriched_item_to_event(self, server, channel, user, item, enrichment):
+        return EventMessage(server, channel, user, enrichment, inbound=False)
+
+
+def test_events__enriched(monkeypatch):
+    monkeypatch.setattr(StreamSource, "enrichment_cache", EnrichmentCache())
+    source = EnrichedListSource()
+
+    events = source.events(None, None, None, [4, 3, 2])
+
+    assert [event.text for event in events] == ["2 enriched", "3", "4 enriched"]
+
+
+def test_events__enrichment_failed(monkeypatch):
+    monkeypatch.setattr(StreamSource, "enrichment_cache", EnrichmentCache())
+    source = EnrichedListSource()
+
+    def fail(item, url):
+        raise ValueError("Page changed")
+    source.enrich = fail
+
+    events = source.events(None, None, None, [2, 1])
+
+    assert [event.text for event in events] == ["1", "2"]
@@ -0,0 +1,150 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import hallo.modules.subscriptions.source_e621
+import hallo.modules.subscriptions.subscription_exception
+from hallo.events import EventMessage
+from hallo.inc.http_client import RateLimitedError
+from hallo.modules.subscriptions.source_e621 import E621Source
+from hallo.modules.subscriptions.subscription import Subscription
+from hallo.modules.subscriptions.subscription_repo import SubscriptionRepo
+from hallo.test.modules.subscriptions.test_stream_source import ListSource
+
+
+@pytest.fixture
+def no_jitter(monkeypatch):
+    monkeypatch.setattr(Subscription, "JITTER", 0)
+
+
+def test_needs_check(hallo_getter, no_jitter):
+    hallo, test_server, test_channel, test_user = hallo_getter({"subscriptions"})
+    sub = Subscription(test_server, test_channel, ListSource(), timedelta(minutes=10), None, None)
+    assert sub.needs_check()
+
+    sub.apply_state([1])
+
+    assert not sub.needs_check()
+    assert sub.next_check == sub.last_check + timedelta(minutes=10)
+    sub.next_check = datetime.now() - timedelta(seconds=1)
+    assert sub.needs_check()
+
+
+def test_check_interval__quiet(hallo_getter, no_jitter):
+    hallo, test_server, test_channel, test_user = hallo_getter({"subscriptions"})
+    sub = Subscription(
+        test_server, test_channel, ListSource([1]), timedelta(minutes=10), None, None, timedelta(days=1)
+    )
+    sub.apply_state([1])
+    assert sub.next_check - sub.last_check == timedelta(minutes=10)
+
+    # Quiet for 2 hours, so check every half hour
+    sub.first_check = datetime.now() - timedelta(hours=2)
+    sub.apply_state([1])
+    assert abs(sub.next_check - sub.last_check - timedelta(minutes=30)) < timedelta(seconds=1)
+
+    # Quiet for a long time, so check as rarely as allowed
+    sub.first_check = datetime.now() - timedelta(days=365)
+    sub.apply_state([1])
+    assert sub.next_check - sub.last_check == timedelta(days=1)
+
+
+def test_check_interval__updates(hallo_getter, no_jitter):
+    hallo, test_server, test_channel, test_user = hallo_getter({"subscriptions"})
+    sub = Subscription(
+        test_server, test_channel, ListSource([1]), timedelta(minutes=10), None, None, timedelta(days=1)
+    )
+    sub.last_update = datetime.now() - timedelta(hours=4)
+    sub.update_gap = timedelta(hours=8)
+
+    sub.apply_state([2, 1])
+
+    assert test_server.get_send_data(1, test_channel, EventMessage)[0].text == "2"
+    assert abs(sub.update_gap - timedelta(hours=6.8)) < timedelta(seconds=1)
+    assert abs(sub.next_check - sub.last_check - timedelta(hours=1.7)) < timedelta(seconds=1)
+
+
+def test_check_interval__jitter(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({"subscriptions"})
+    sub = Subscription(
+        test_server, test_channel, ListSource(), timedelta(hours=1), None, None, timedelta(days=1)
+    )
+
+    intervals = set(sub.check_interval(datetime.now()) for _ in range(10))
+
+    assert len(intervals) > 1
+    assert all(timedelta(minutes=54) <= interval <= timedelta(minutes=66) for interval in intervals)
+
+
+def test_check_failed(hallo_getter, no_jitter):
+    hallo, test_server, test_channel, test_user = hallo_getter({"subscriptions"})
+    sub = Subscription(
+        test_server, test_channel, ListSource(), timedelta(minutes=10), None, None, timedelta(hours=1)
+    )
+
+    sub.check_failed(ValueError())
+    assert abs(sub.next_check - datetime.now() - timedelta(minutes=20)) < timedelta(seconds=1)
+    sub.check_failed(ValueError())
+    sub.check_failed(ValueError())
+    assert abs(sub.next_check - datetime.now() - timedelta(hours=1)) < timedelta(seconds=1)
+    assert sub.error_count == 3
+    sub.apply_state([1])
+    assert sub.error_count == 0
+
+
+def test_check_failed__fixed(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({"subscriptions"})
+    sub = Subscription(test_server, test_channel, ListSource(), timedelta(minutes=10), None, None)
+
+    sub.check_failed(ValueError())
+    assert not sub.needs_check()
+    assert abs(sub.next_check - datetime.now() - timedelta(minutes=1)) < timedelta(seconds=1)
+
+    sub.check_failed(RateLimitedError("http://example.com", 3600))
+    assert not sub.needs_check()
+    assert abs(sub.next_check - datetime.now() - timedelta(hours=1)) < timedelta(seconds=1)
+
+
+def test_json(hallo_getter):
+    hallo, test_server, test_channel, test_user = hallo_getter({"subscriptions"})
+    sub = Subscription(
+        test_server, test_channel, E621Source("cabinet"), timedelta(minutes=10), None, None, timedelta(days=1)
+    )
+    sub.apply_state([])
+    sub.update_gap = timedelta(hours=3)
+    sub.check_failed(ValueError())
+
+    new_sub = Subscription.from_json(sub.to_json(), hallo, SubscriptionRepo())
+
+    assert new_sub.max_period == timedelta(days=1)
+    assert new_sub.next_check == sub.next_check
+    assert new_sub.first_check == sub.first_check
+    assert new_sub.update_gap == timedelta(hours=3)
+    assert new_sub.error_count == 1
+
+
+def test_create_from_input__adaptive(hallo_getter, monkeypatch):
+    hallo_obj, test_server, test_channel, test_user = hallo_getter({"subscriptions"})
+    # Modules are reloaded when hallo loads them, so patch the current class
+    e621_source = hallo.modules.subscriptions.source_e621.E621Source
+    monkeypatch.setattr(e621_source, "current_state", lambda self: [])
+    evt = EventMessage(test_server, test_channel, test_user, "e621 cabinet PT30M P1D")
+    evt.split_command_text("e621", "cabinet PT30M P1D")
+
+    sub = Subscription.create_from_input(evt, e621_source, SubscriptionRepo())
+
+    assert sub.source.search == "cabinet"
+    assert sub.period == timedelta(minutes=30)
+    assert sub.max_period == timedelta(days=1)
+    assert sub.is_adaptive
+
+    evt = EventMessage(test_server, test_channel, test_user, "e621 PT30M cabinet")
+    evt.split_command_text("e621", "PT30M cabinet")
+    sub = Subscription.create_from_input(evt, e621_source, SubscriptionRepo())
+    assert sub.source.search == "cabinet"
+    assert not sub.is_adaptive
+
+    evt = EventMessage(test_server, test_channel, test_user, "e621 cabinet P1D PT30M")
+    evt.split_command_text("e621", "cabinet P1D PT30M")
+    with pytest.raises(hallo.modules.subscriptions.subscription_exception.SubscriptionException):
+        Subscription.create_from_input(evt, e621_source, SubscriptionRepo())
@@ -1,14 +1,17 @@
 import os
+import time
 import unittest
-from datetime import timedelta
+from datetime import datetime, timedelta
 
 import pytest
 
-from hallo.events import EventMinute, EventMessage
+from hallo.events import EventMessage
 from hallo.modules.subscriptions.source_e621 import E621Source
+from hallo.modules.subscriptions.stream_source import StreamSource
 from hallo.modules.subscriptions.subscription import Subscription
 from hallo.modules.subscriptions.subscription_check import SubscriptionCheck
 from hallo.modules.subscriptions.subscription_repo import SubscriptionRepo
+from hallo.modules.subscriptions.subscription_store import SubscriptionStore
 from hallo.test.server_mock import ServerMock
 from hallo.test.test_base import TestBase
 
@@ -206,7 +209,7 @@ class SubscriptionCheckTest(TestBase, unittest.TestCase):
             )  # type: SubscriptionCheck
             rss_check_obj.subscription_repo = sub_repo
             # Test passive feed updates
-            self.function_dispatcher.dispatch_passive(EventMinute())
+            rss_check_obj.check_due(self.hallo)
             # Check test server 1 data
             serv1_data = serv1.get_send_data(100)
             chan1_count = 0
@@ -224,7 +227,7 @@ class SubscriptionCheckTest(TestBase, unittest.TestCase):
             rf1.last_check = None
             rf2.last_check = None
             rf3.last_check = None
-            self.function_dispatcher.dispatch_passive(EventMinute())
+            rss_check_obj.check_due(self.hallo)
             serv1.get_send_data(0)
             serv2.get_send_data(0)
             # Test that no feeds are checked before timeout, set urls to none and see if anything explodes.
@@ -232,7 +235,7 @@ class SubscriptionCheckTest(TestBase, unittest.TestCase):
             rf1.check_feed = self.do_not_call
             rf2.check_feed = self.do_not_call
             rf3.check_feed = self.do_not_call
-            self.function_dispatcher.dispatch_passive(EventMinute())
+            rss_check_obj.check_due(self.hallo)
             serv1.get_send_data(0)
             serv2.get_send_data(0)
             assert (
@@ -245,3 +248,202 @@ class SubscriptionCheckTest(TestBase, unittest.TestCase):
     def do_not_call(self):
         self.failed = True
         return []
+
+
+class CountSource(StreamSource[int]):
+    type_name = "count"
+
+    def __init__(self, host, items, fail=False):
+        super().__init__(None)
+        self.host = host
+        self.items = items
+        self.fail = fail
+
+    def matches_name(self, name_clean):
+        return False
+
+    @property
+    def title(self):
+        return "count"
+
+    @classmethod
+    def from_input(cls, argument, user, sub_repo):
+        raise NotImplementedError()
+
+    def current_state(self):
+        if self.fail:
+            raise ValueError("Fetch failed")
+        time.sleep(0.05)
+        return self.items
+
+    def item_to_key(self, item):
+        return item
+
+    def item_to_event(self, server, channel, user, item):
+        return EventMessage(server, channel, user, "{}: {}".format(self.host, item), inbound=False)
+
+    @classmethod
+    def from_json(cls, json_data, destination, sub_repo):
+        raise NotImplementedError()
+
+    def to_json(self):
+        return {}
+
+
+def test_passive_run_concurrent(hallo_getter, tmp_path):
+    hallo, test_server, test_channel, test_user = hallo_getter({"subscriptions"})
+    sub_repo = SubscriptionRepo()
+    sub_repo.store = SubscriptionStore(str(tmp_path / "subscriptions.db"))
+    subs = []
+    for x in range(6):
+        source = CountSource("host{}".format(x % 2), [x, -1], fail=(x == 3))
+        source.last_keys = [-1]
+        sub = Subscription(test_server, test_channel, source, timedelta(minutes=10), None, None)
+        sub_repo.add_sub(sub)
+        subs.append(sub)
+    check_class = hallo.function_dispatcher.get_function_by_name("check subscription")
+    check_obj = hallo.function_dispatcher.get_function_object(check_class)  # type: SubscriptionCheck
+    check_obj.subscription_repo = sub_repo
+    start = time.monotonic()
+    check_obj.check_due(hallo)
+    assert time.monotonic() - start < 0.25, "Fetches should have run concurrently"
+    # Updates are sent in subscription order, failed subscriptions are left to retry
+    data = test_server.get_send_data(5, test_channel, EventMessage)
+    assert [evt.text for evt in data] == ["host0: 0", "host1: 1", "host0: 2", "host0: 4", "host1: 5"]
+    assert subs[3].last_check is None
+    assert all(sub.last_check is not None for sub in subs if sub is not subs[3])
+
+
+class SharedCountSource(CountSource):
+    fetch_count = 0
+
+    def get_fetch_key(self):
+        return "shared", self.host
+
+    def current_state(self):
+        SharedCountSource.fetch_count += 1
+        return super().current_state()
+
+    def share_state(self, fetched_by, state):
+        self.shared_from = fetched_by
+
+
+def test_passive_run_shares_fetches(hallo_getter, tmp_path):
+    hallo, test_server, test_channel, test_user = hallo_getter({"subscriptions"})
+    sub_repo = SubscriptionRepo()
+    sub_repo.store = SubscriptionStore(str(tmp_path / "subscriptions.db"))
+    for x in range(4):
+        source = SharedCountSource("host", [2, 1, 0])
+        # Each subscription has seen a different amount of the feed
+        source.last_keys = [x]
+        sub_repo.add_sub(Subscription(test_server, test_channel, source, timedelta(minutes=10), None, None))
+    check_class = hallo.function_dispatcher.get_function_by_name("check subscription")
+    check_obj = hallo.function_dispatcher.get_function_object(check_class)  # type: SubscriptionCheck
+    check_obj.subscription_repo = sub_repo
+    SharedCountSource.fetch_count = 0
+    check_obj.check_due(hallo)
+    assert SharedCountSource.fetch_count == 1
+    assert check_obj.saved_fetch_count == 3
+    fetched_by = sub_repo.sub_list[0].source
+    assert not hasattr(fetched_by, "shared_from")
+    assert all(sub.source.shared_from is fetched_by for sub in sub_repo.sub_list[1:])
+    data = test_server.get_send_data(3, test_channel, EventMessage)
+    assert [evt.text for evt in data] == ["host: 1", "host: 2", "host: 2"]
+
+
+class BatchCountSource(CountSource):
+    batch_sizes = []
+
+    def get_batch_key(self):
+        return "batch"
+
+    @classmethod
+    def batch_sources(cls, sources):
+        return [sources[:3], sources[3:]]
+
+    @classmethod
+    def current_states(cls, sources):
+        BatchCountSource.batch_sizes.append(len(sources))
+        return [source.items for source in sources]
+
+
+def test_passive_run_batches_fetches(hallo_getter, tmp_path):
+    hallo, test_server, test_channel, test_user = hallo_getter({"subscriptions"})
+    sub_repo = SubscriptionRepo()
+    sub_repo.store = SubscriptionStore(str(tmp_path / "subscriptions.db"))
+    for x in range(4):
+        source = BatchCountSource("host", [x, -1])
+        source.last_keys = [-1]
+        sub_repo.add_sub(Subscription(test_server, test_channel, source, timedelta(minutes=10), None, None))
+    check_class = hallo.function_dispatcher.get_function_by_name("check subscription")
+    check_obj = hallo.function_dispatcher.get_function_object(check_class)  # type: SubscriptionCheck
+    check_obj.subscription_repo = sub_repo
+    BatchCountSource.batch_sizes = []
+    check_obj.check_due(hallo)
+    # A batch of one source is fetched with current_state()
+    assert BatchCountSource.batch_sizes == [3]
+    assert check_obj.saved_fetch_count == 2
+    data = test_server.get_send_data(4, test_channel, EventMessage)
+    assert [evt.text for evt in data] == ["host: 0", "host: 1", "host: 2", "host: 3"]
+
+
+def test_schedule_next_check(hallo_getter, tmp_path):
+    hallo, test_server, test_channel, test_user = hallo_getter({"subscriptions"})
+    check_class = hallo.function_dispatcher.get_function_by_name("check subscription")
+    check_obj = hallo.function_dispatcher.get_function_object(check_class)  # type: SubscriptionCheck
+    first_job = hallo.scheduler.get_job(SubscriptionCheck.JOB_NAME)
+    assert first_job is not None, "The first check should be scheduled when the function loads"
+    sub_repo = SubscriptionRepo()
+    sub_repo.store = SubscriptionStore(str(tmp_path / "subscriptions.db"))
+    check_obj.subscription_repo = sub_repo
+    hallo.scheduler.cancel(SubscriptionCheck.JOB_NAME)
+    soon_sub = Subscription(test_server, test_channel, CountSource("host", [1]), timedelta(hours=1), None, None)
+    soon_sub.next_check = datetime.now() + timedelta(minutes=10)
+    later_sub = Subscription(test_server, test_channel, CountSource("host", [1]), timedelta(hours=1), None, None)
+    later_sub.next_check = datetime.now() + timedelta(hours=1)
+    sub_repo.add_sub(later_sub)
+
+    check_obj.schedule_next_check(hallo)
+    job = hallo.scheduler.get_job(SubscriptionCheck.JOB_NAME)
+    assert abs(job.due - later_sub.next_check.timestamp()) < 1
+    # A subscription due sooner brings the check forward, but one due later doesn't push it back
+    sub_repo.add_sub(soon_sub)
+    check_obj.schedule_next_check(hallo)
+    job = hallo.scheduler.get_job(SubscriptionCheck.JOB_NAME)
+    assert abs(job.due - soon_sub.next_check.timestamp()) < 1
+    soon_sub.next_check = datetime.now() + timedelta(days=1)
+    check_obj.schedule_next_check(hallo)
+    assert hallo.scheduler.get_job(SubscriptionCheck.JOB_NAME) is job
+    # Overdue subscriptions are not checked again straight away
+    soon_sub.next_check = datetime.now() - timedelta(minutes=1)
+    hallo.scheduler.cancel(SubscriptionCheck.JOB_NAME)
+    check_obj.schedule_next_check(hallo)
+    job = hallo.scheduler.get_job(SubscriptionCheck.JOB_NAME)
+    assert job.due >= time.time() + SubscriptionCheck.MIN_CHECK_GAP - 1
+    hallo.scheduler.cancel(SubscriptionCheck.JOB_NAME)
+
+
+class FailingSource(CountSource):
+    def current_state(self):
+        raise ValueError("Feed is gone")
+
+
+def test_schedule_next_check__failing(hallo_getter, tmp_path):
+    hallo, test_server, test_channel, test_user = hallo_getter({"subscriptions"})
+    check_class = hallo.function_dispatcher.get_function_by_name("check subscription")
+    check_obj = hallo.function_dispatcher.get_function_object(check_class)  # type: SubscriptionCheck
+    sub_repo = SubscriptionRepo()
+    sub_repo.store = SubscriptionStore(str(tmp_path / "subscriptions.db"))
+    check_obj.subscription_repo = sub_repo
+    failing_sub = Subscription(test_server, test_channel, FailingSource("host", [1]), timedelta(hours=1), None, None)
+    failing_sub.next_check = datetime.now() - timedelta(hours=1)
+    sub_repo.add_sub(failing_sub)
+    hallo.scheduler.cancel(SubscriptionCheck.JOB_NAME)
+
+    check_obj.scheduled_check(hallo)
+    # The failed subscription is retried after a minute, rather than on every check
+    assert failing_sub.error_count == 1
+    assert not failing_sub.needs_check()
+    job = hallo.scheduler.get_job(SubscriptionCheck.JOB_NAME)
+    assert job.due >= time.time() + 59
+    hallo.scheduler.cancel(SubscriptionCheck.JOB_NAME)
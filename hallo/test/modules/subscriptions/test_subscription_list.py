@@ -1,6 +1,6 @@
 import os
 import unittest
-from datetime import timedelta
+from datetime import datetime, timedelta
 
 import pytest
 
@@ -8,6 +8,8 @@ from hallo.events import EventMessage
 from hallo.modules.subscriptions.source_e621 import E621Source
 from hallo.modules.subscriptions.subscription import Subscription
 from hallo.modules.subscriptions.subscription_check import SubscriptionCheck
+from hallo.modules.subscriptions.subscription_repo import SubscriptionRepo
+from hallo.modules.subscriptions.subscription_store import SubscriptionStore
 from hallo.test.test_base import TestBase
 
 
@@ -75,3 +77,27 @@ class SubscriptionListTest(TestBase, unittest.TestCase):
                 and "clefable" not in data_split[2].lower()
         )
         assert "fez" in data_split[1].lower() or "fez" in data_split[2].lower()
+
+
+def test_list_next_check(hallo_getter, tmp_path):
+    hallo, test_server, test_channel, test_user = hallo_getter({"subscriptions"})
+    sub_repo = SubscriptionRepo()
+    sub_repo.store = SubscriptionStore(str(tmp_path / "subscriptions.db"))
+    fixed_sub = Subscription(test_server, test_channel, E621Source("cabinet"), timedelta(minutes=10), None, None)
+    fixed_sub.next_check = datetime(2021, 3, 4, 5, 6, 7, 890)
+    sub_repo.add_sub(fixed_sub)
+    adaptive_sub = Subscription(
+        test_server, test_channel, E621Source("fez"), timedelta(minutes=10), None, None, timedelta(days=1)
+    )
+    adaptive_sub.next_check = datetime(2021, 3, 5, 5, 6, 7)
+    sub_repo.add_sub(adaptive_sub)
+    check_class = hallo.function_dispatcher.get_function_by_name("check subscription")
+    check_obj = hallo.function_dispatcher.get_function_object(check_class)  # type: SubscriptionCheck
+    check_obj.subscription_repo = sub_repo
+
+    hallo.function_dispatcher.dispatch(EventMessage(test_server, test_channel, test_user, "e621 sub list"))
+
+    data = test_server.get_send_data(1, test_channel, EventMessage)
+    data_split = data[0].text.split("\n")
+    assert '"cabinet" [next check 2021-03-04T05:06:07]' in data_split[1]
+    assert '"fez" [next check 2021-03-05T05:06:07, adaptive]' in data_split[2]
@@ -222,3 +222,58 @@ def test_json(hallo_getter):
             os.rename("store/subscriptions.json.tmp", "store/subscriptions.json")
         except OSError:
             pass
+
+
+def test_save_load(hallo_getter, tmp_path):
+    hallo, test_server, test_channel, test_user = hallo_getter({"subscriptions"})
+    path = str(tmp_path / "subscriptions.db")
+    sub_repo = SubscriptionRepo.load(hallo, path)
+    assert sub_repo.sub_list == []
+    for num in range(3):
+        rf = RssSource(f"http://spangle.org.uk/hallo/test_rss.xml?{num}", f"feed {num}", [f"key{num}"])
+        sub_repo.add_sub(Subscription(test_server, test_channel, rf, timedelta(days=1), None, None))
+    sub_repo.save()
+    assert sub_repo.store.write_count == 3
+    sub_repo.save()
+    assert sub_repo.store.write_count == 3
+
+    new_repo = SubscriptionRepo.load(hallo, path)
+    assert [sub.source.feed_title for sub in new_repo.sub_list] == ["feed 0", "feed 1", "feed 2"]
+    assert new_repo.sub_list[1].source.last_keys == ["key1"]
+    new_repo.sub_list[1].source.last_keys = ["key1", "key3"]
+    new_repo.remove_sub(new_repo.sub_list[0])
+    new_repo.save()
+    assert new_repo.store.write_count == 2
+
+    third_repo = SubscriptionRepo.load(hallo, path)
+    assert [sub.source.feed_title for sub in third_repo.sub_list] == ["feed 1", "feed 2"]
+    assert third_repo.sub_list[0].source.last_keys == ["key1", "key3"]
+
+
+def test_load_imports_json(hallo_getter, tmp_path):
+    hallo, test_server, test_channel, test_user = hallo_getter({"subscriptions"})
+    path = str(tmp_path / "subscriptions.db")
+    sub_repo = SubscriptionRepo()
+    rf = RssSource("http://spangle.org.uk/hallo/test_rss.xml", "feed title")
+    sub_repo.add_sub(Subscription(test_server, test_channel, rf, timedelta(days=1), None, None))
+    try:
+        try:
+            os.rename("store/subscriptions.json", "store/subscriptions.json.tmp")
+        except OSError:
+            pass
+        sub_repo.save_json()
+        imported_repo = SubscriptionRepo.load(hallo, path)
+        assert len(imported_repo.sub_list) == 1
+        # Once imported, the store is used rather than the JSON file
+        imported_repo.remove_sub(imported_repo.sub_list[0])
+        imported_repo.save()
+        assert SubscriptionRepo.load(hallo, path).sub_list == []
+    finally:
+        try:
+            os.remove("store/subscriptions.json")
+        except OSError:
+            pass
+        try:
+            os.rename("store/subscriptions.json.tmp", "store/subscriptions.json")
+        except OSError:
+            pass
@@ -0,0 +1,77 @@
+import sqlite3
+
+from hallo.modules.subscriptions.subscription_store import SubscriptionStore
+
+
+class Sub:
+    pass
+
+
+def test_save_only_changed(tmp_path):
+    path = str(tmp_path / "subscriptions.db")
+    store = SubscriptionStore(path)
+    assert not store.exists()
+    subs = [Sub(), Sub(), Sub()]
+
+    assert store.save([(sub, {"num": num}) for num, sub in enumerate(subs)], [{"common": 1}]) == 5
+    assert store.exists()
+    assert store.save([(sub, {"num": num}) for num, sub in enumerate(subs)], [{"common": 1}]) == 0
+    assert store.save([(sub, {"num": num * 2}) for num, sub in enumerate(subs)], [{"common": 1}]) == 2
+    assert store.save([(subs[0], {"num": 0}), (subs[2], {"num": 4})], [{"common": 1}]) == 1
+
+    sub_rows, common_rows = SubscriptionStore(path).load()
+    assert [json_data for row_id, json_data in sub_rows] == [{"num": 0}, {"num": 4}]
+    assert common_rows == [{"common": 1}]
+
+
+def test_save_common(tmp_path):
+    path = str(tmp_path / "subscriptions.db")
+    store = SubscriptionStore(path)
+    store.save([], [{"common": 1}])
+
+    assert store.save([], [{"common": 2}, {"common": 3}]) == 3
+
+    assert SubscriptionStore(path).load()[1] == [{"common": 2}, {"common": 3}]
+
+
+def test_track(tmp_path):
+    path = str(tmp_path / "subscriptions.db")
+    SubscriptionStore(path).save([(Sub(), {"num": 0}), (Sub(), {"num": 1})], [])
+    store = SubscriptionStore(path)
+    sub_rows, common_rows = store.load()
+    subs = []
+    for row_id, json_data in sub_rows:
+        sub = Sub()
+        store.track(sub, row_id, json_data)
+        subs.append(sub)
+
+    assert store.save([(subs[0], {"num": 0}), (subs[1], {"num": 5}), (Sub(), {"num": 2})], []) == 2
+
+    assert [json_data for row_id, json_data in SubscriptionStore(path).load()[0]] == [
+        {"num": 0}, {"num": 5}, {"num": 2}
+    ]
+
+
+def test_wal_mode(tmp_path):
+    path = str(tmp_path / "subscriptions.db")
+    SubscriptionStore(path).save([], [])
+
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    finally:
+        conn.close()
+
+
+def test_failed_save_is_retried(tmp_path):
+    path = str(tmp_path / "subscriptions.db")
+    store = SubscriptionStore(path)
+    sub = Sub()
+    store.save([(sub, {"num": 0})], [])
+    try:
+        store.save([(sub, {"num": 1}), (Sub(), {"num": object()})], [])
+    except TypeError:
+        pass
+
+    assert SubscriptionStore(path).load()[0][0][1] == {"num": 0}
+    assert store.save([(sub, {"num": 1})], []) == 1
@@ -1,4 +1,4 @@
-from hallo.permission_mask import PermissionMask
+from hallo.permission_mask import PermissionMask, PermissionMaskAttribute
 
 
 class UserGroup:
@@ -6,6 +6,8 @@ class UserGroup:
     UserGroup object, mostly exists for a speedy way to apply a PermissionsMask to a large amount of users at once
     """
 
+    permission_mask = PermissionMaskAttribute()
+
     def __init__(self, name, hallo):
         """
         Constructor